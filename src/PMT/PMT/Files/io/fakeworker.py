@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+#--------------------------------------------------------------------------------------------------
+# This module is a stand-in for the Maya/ Unreal workers that runs on plain python.
+# It speaks the same protocol (see worker.py) and writes placeholder files instead of real exports,
+# so the worker pool can be tried out on a machine without the DCCs (set FAKE=true under [WORKERS]).
+# It also has a few ops to misbehave on purpose: crash, leak and sleep.
+#--------------------------------------------------------------------------------------------------
+
+leaked = []
+
+def export(scenePath, projName, assetType):
+    '''
+    Pretends to export a Maya scene, the FBX ends up where maya.py would put it.
+
+    Returns:
+    dict: {'output': the path of the placeholder FBX}.
+    '''
+    if not os.path.exists(scenePath):
+        raise FileNotFoundError(f'Scene not found: {scenePath}')
+
+    intermediateDepotPath = os.path.join(os.getenv('LOCALAPPDATA'), 'PMT', projName, 'Intermediate Depot', assetType)
+    os.makedirs(intermediateDepotPath, exist_ok=True)
+    exportFilePath = os.path.join(intermediateDepotPath, f'{os.path.splitext(os.path.basename(scenePath))[0]}.fbx')
+
+    with open(scenePath, 'rb') as fsrc, open(exportFilePath, 'wb') as fdst:
+        fdst.write(b'FAKEFBX\n' + fsrc.read())
+    return {'output': exportFilePath}
+
+def importFile(filePath, destinationPath='/Game/Meshes/'):
+    '''
+    Pretends to import a file into Unreal.
+
+    Returns:
+    dict: {'assets': the object path the asset would get}.
+    '''
+    if not os.path.exists(filePath):
+        raise FileNotFoundError(f'File not found: {filePath}')
+    name = os.path.splitext(os.path.basename(filePath))[0]
+    return {'assets': [f'{destinationPath.rstrip("/")}/{name}.{name}']}
+
+def importFiles(filePaths, destinationPath='/Game/Meshes/'):
+    '''
+    Pretends to import many files into Unreal, missing files get no assets.
+
+    Returns:
+    dict: file path -> the object paths the assets would get.
+    '''
+    return {filePath: importFile(filePath, destinationPath)['assets'] if os.path.exists(filePath) else [] for filePath in filePaths}
+
+def crash(code=1):
+    '''
+    Dies without answering, like a DCC would.
+    '''
+    os._exit(code)
+
+def leak(mb=64):
+    '''
+    Holds on to some memory for good, to trip the memory limit of the pool.
+    '''
+    leaked.append(b'x' * (mb * 1024 * 1024)) # filled in so the pages are really resident
+    return {'leakedMb': sum(len(block) for block in leaked) // (1024 * 1024)}
+
+def sleep(seconds=1.0):
+    '''
+    Takes its time, to try out timeouts and cancellation.
+    '''
+    time.sleep(seconds)
+    return {'slept': seconds}
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from worker import serve
+
+    serve({'export': export, 'import': importFile, 'importBatch': importFiles, 'crash': crash, 'leak': leak, 'sleep': sleep}, name='Fake')
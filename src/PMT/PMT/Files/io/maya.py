@@ -14,36 +14,59 @@ def exportAssetAndClose(projName, assetType):
     projName (str): The name of the project.
     assetType (str): The type of asset to export.
     '''
+    loadFbxPlugin()
+        
+    mayaFile = cmds.file(q=True, sn=True)
+    if not mayaFile:
+        cmds.error('No file is currently open')
+        return
+    
+    exportFilePath = getExportPath(projName, assetType, mayaFile)
+    
+    cmds.scriptJob(idleEvent=lambda: saveAndQuit(exportFilePath), runOnce=True)
+    
+def loadFbxPlugin():
+    '''
+    Loads the fbxmaya plugin if it isn't already.
+    '''
     if not cmds.pluginInfo('fbxmaya', q=True, loaded=True): # very imp to load the plugin else won't export
         cmds.loadPlugin('fbxmaya')
-        
+    
+def getExportPath(projName, assetType, mayaFile):
+    '''
+    Returns where the FBX of a scene goes (the intermediate depot of the project) and makes sure the folder exists.
+    
+    Args:
+    projName (str): The name of the project.
+    assetType (str): The type of asset to export.
+    mayaFile (str): The path of the Maya scene.
+    
+    Returns:
+    str: The file path to export the FBX file to.
+    '''
     basePath = os.path.join(os.getenv('LOCALAPPDATA'), 'PMT', projName)
     intermediateDepotPath = os.path.join(basePath, 'Intermediate Depot', assetType)
     
     if not os.path.exists(intermediateDepotPath):
         os.makedirs(intermediateDepotPath)
         
-    mayaFile = cmds.file(q=True, sn=True)
-    if not mayaFile:
-        cmds.error('No file is currently open')
-        return
-    
     mayaFileName = os.path.basename(mayaFile)
-    exportFilePath = os.path.join(intermediateDepotPath, f'{os.path.splitext(mayaFileName)[0]}.fbx')
-    
-    cmds.scriptJob(idleEvent=lambda: saveAndQuit(exportFilePath), runOnce=True)
+    return os.path.join(intermediateDepotPath, f'{os.path.splitext(mayaFileName)[0]}.fbx')
     
-def saveAndQuit(exportFilePath):
+def exportScene(exportFilePath):
     '''
-    This function exports the current scene as an FBX file and closes Maya.
+    This function exports the geometry of the current scene as an FBX file and saves the scene if it changed.
     
     Args:
     exportFilePath (str): The file path to export the FBX file to.
+    
+    Returns:
+    bool: True if something was exported, False if the scene has no geometry.
     '''
     allGeometry = cmds.ls(geometry=True)
     if not allGeometry:
         cmds.warning('No geometry found in the scene')
-        return
+        return False
 
     cmds.select(allGeometry)
     cmds.file(exportFilePath, force=True, options='v=0;', typ='FBX export', pr=True, es=True)
@@ -51,4 +74,16 @@ def saveAndQuit(exportFilePath):
     if cmds.file(modified=True, query=True):
         cmds.file(save=True, force=True)
         
+    return True
+    
+def saveAndQuit(exportFilePath):
+    '''
+    This function exports the current scene as an FBX file and closes Maya.
+    
+    Args:
+    exportFilePath (str): The file path to export the FBX file to.
+    '''
+    if not exportScene(exportFilePath):
+        return
+        
     cmds.quit(force=True)
\ No newline at end of file
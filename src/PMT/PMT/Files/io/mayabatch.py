@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import time
+
+#--------------------------------------------------------------------------------------------------
+# This module exports a whole list of Maya scenes in one headless Maya session.
+# It's run by mayapy:  mayapy mayabatch.py <request.json>
+# The request lists the scenes, and a result manifest is written after every scene
+# so the PMT knows how far it got even if Maya crashes halfway.
+#--------------------------------------------------------------------------------------------------
+
+def writeManifest(manifestPath, results):
+    '''
+    Writes the per-asset results, replacing the file in one go so the PMT never reads half of it.
+
+    Args:
+    manifestPath (str): The path of the result manifest.
+    results (list): The results so far.
+    '''
+    tmpPath = manifestPath + '.tmp'
+    with open(tmpPath, 'w') as f:
+        json.dump({'results': results}, f, indent=4)
+    os.replace(tmpPath, manifestPath)
+
+def batchExport(requestPath):
+    '''
+    Opens, exports and saves every scene of the request in turn.
+
+    Args:
+    requestPath (str): The path of the request json, {'items': [{'asset', 'projName', 'assetType', 'scenePath'}], 'manifestPath'}.
+    '''
+    with open(requestPath, 'r') as f:
+        request = json.load(f)
+
+    loadFbxPlugin()
+    results = []
+
+    for item in request['items']:
+        start = time.time()
+        result = {'asset': item['asset'], 'scenePath': item['scenePath'], 'output': None, 'success': False, 'error': None}
+        try:
+            cmds.file(item['scenePath'], open=True, force=True)
+            exportFilePath = getExportPath(item['projName'], item['assetType'], item['scenePath'])
+            if exportScene(exportFilePath):
+                result['output'] = exportFilePath
+                result['success'] = True
+            else:
+                result['error'] = 'No geometry found in the scene'
+        except Exception as e:
+            result['error'] = str(e) # one broken scene shouldn't stop the rest of the batch
+        result['seconds'] = round(time.time() - start, 3)
+
+        results.append(result)
+        writeManifest(request['manifestPath'], results)
+
+        cmds.file(new=True, force=True) # don't let the last scene leak into the next one
+
+if __name__ == '__main__':
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    exec(open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'maya.py')).read()) # same export code as the GUI path (can't import it, 'maya' is taken)
+
+    try:
+        batchExport(sys.argv[1])
+    finally:
+        maya.standalone.uninitialize()
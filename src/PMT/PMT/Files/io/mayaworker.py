@@ -0,0 +1,45 @@
+import os
+import sys
+
+#--------------------------------------------------------------------------------------------------
+# This module is a warm headless Maya worker. It's run by mayapy:  mayapy mayaworker.py
+# Maya is started once and then exports scene after scene as the PMT asks for them
+# (see worker.py for the protocol).
+#--------------------------------------------------------------------------------------------------
+
+def export(scenePath, projName, assetType):
+    '''
+    Opens a scene, exports it to the intermediate depot and saves it.
+
+    Args:
+    scenePath (str): The path of the Maya scene.
+    projName (str): The name of the project.
+    assetType (str): The type of the asset.
+
+    Returns:
+    dict: {'output': the path of the exported FBX}.
+    '''
+    try:
+        cmds.file(scenePath, open=True, force=True)
+        exportFilePath = getExportPath(projName, assetType, scenePath)
+        if not exportScene(exportFilePath):
+            raise RuntimeError('No geometry found in the scene')
+        return {'output': exportFilePath}
+    finally:
+        cmds.file(new=True, force=True) # don't let this scene leak into the next request
+
+if __name__ == '__main__':
+    ioDir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, ioDir)
+    from worker import serve
+
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    exec(open(os.path.join(ioDir, 'maya.py')).read()) # same export code as the GUI path (can't import it, 'maya' is taken)
+    loadFbxPlugin()
+
+    try:
+        serve({'export': export}, name='Maya')
+    finally:
+        maya.standalone.uninitialize()
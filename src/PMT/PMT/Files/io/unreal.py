@@ -1,3 +1,5 @@
+import os
+import json
 import unreal
 
 #----------------------------------------------------------------------------------------------------
@@ -22,4 +24,59 @@ def importAsset(filePath, destinationPath = '/Game/Mesh/'):
     assetImportData.replace_existing = True
     
     importedAssets = assetTools.import_assets_automated(assetImportData)
-    return importedAssets
\ No newline at end of file
+    return importedAssets
+
+def importAssets(filePaths, destinationPath = '/Game/Meshes/'):
+    '''
+    Import many files into the same destination with a single automated import.
+    The imported assets are matched back to their files through their import data.
+    
+    Args:
+    filePaths (list): The file paths of the assets to import.
+    destinationPath (str): The path to import the assets to.
+    
+    Returns:
+    dict: file path -> the object paths of the assets imported from it.
+    '''
+    assetTools = unreal.AssetToolsHelpers.get_asset_tools()
+    assetImportData = unreal.AutomatedAssetImportData()
+    assetImportData.destination_path = destinationPath
+    assetImportData.filenames = filePaths
+    assetImportData.replace_existing = True
+    
+    importedAssets = assetTools.import_assets_automated(assetImportData) or []
+    
+    normPath = lambda path: os.path.normcase(os.path.abspath(path))
+    imported = {normPath(filePath): [] for filePath in filePaths}
+    
+    for asset in importedAssets:
+        try:
+            sourceFile = asset.get_editor_property('asset_import_data').get_first_filename()
+        except Exception:
+            continue # e.g. a material created along the way, it has no source file of its own
+        if sourceFile and normPath(sourceFile) in imported:
+            imported[normPath(sourceFile)].append(asset.get_path_name())
+            
+    return {filePath: imported[normPath(filePath)] for filePath in filePaths}
+
+def batchImport(requestPath):
+    '''
+    Imports the files of a request and writes a result manifest for the PMT.
+    
+    Args:
+    requestPath (str): The path of the request json, {'files', 'destinationPath', 'manifestPath'}.
+    '''
+    with open(requestPath, 'r') as f:
+        request = json.load(f)
+        
+    try:
+        imported = importAssets(request['files'], request['destinationPath'])
+        results = [{'file': filePath, 'success': bool(assets), 'assets': assets, 'error': None if assets else 'Nothing was imported from this file'}
+                   for filePath, assets in imported.items()]
+    except Exception as e:
+        results = [{'file': filePath, 'success': False, 'assets': [], 'error': str(e)} for filePath in request['files']]
+        
+    tmpPath = request['manifestPath'] + '.tmp'
+    with open(tmpPath, 'w') as f:
+        json.dump({'results': results}, f, indent=4)
+    os.replace(tmpPath, request['manifestPath'])
@@ -0,0 +1,42 @@
+import os
+import sys
+
+#--------------------------------------------------------------------------------------------------
+# This module is a warm Unreal worker. It's run by the pythonscript commandlet of the editor:
+#   UnrealEditor-Cmd <project.uproject> -run=pythonscript -script=<unrealworker.py>
+# The project is loaded once and then imports asset after asset as the PMT asks for them
+# (see worker.py for the protocol).
+#--------------------------------------------------------------------------------------------------
+
+ioDir = os.environ.get('PMT_IO_DIR') or os.path.dirname(os.path.abspath(__file__)) # __file__ isn't always set inside the editor
+sys.path.insert(0, ioDir)
+from worker import serve
+
+exec(open(os.path.join(ioDir, 'unreal.py')).read())
+
+def importFile(filePath, destinationPath='/Game/Meshes/'):
+    '''
+    Imports a file into the project of the worker.
+
+    Args:
+    filePath (str): The file path of the asset to import.
+    destinationPath (str): The path to import the asset to.
+
+    Returns:
+    dict: {'assets': the object paths of the imported assets}.
+    '''
+    importedAssets = importAsset(filePath, destinationPath)
+    if not importedAssets:
+        raise RuntimeError(f'Nothing was imported from {filePath}')
+    return {'assets': [asset.get_path_name() for asset in importedAssets]}
+
+def importFiles(filePaths, destinationPath='/Game/Meshes/'):
+    '''
+    Imports many files into the project of the worker in one go.
+
+    Returns:
+    dict: file path -> the object paths of the assets imported from it.
+    '''
+    return importAssets(filePaths, destinationPath)
+
+serve({'import': importFile, 'importBatch': importFiles}, name='Unreal')
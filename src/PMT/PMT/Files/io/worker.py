@@ -0,0 +1,95 @@
+import os
+import sys
+import json
+import time
+import traceback
+
+#--------------------------------------------------------------------------------------------------
+# This module is the worker side of the PMT worker protocol.
+# A worker is a long lived (headless Maya/ Unreal/ plain python) process that reads one json
+# request per line on stdin and answers with one json response per line:
+#   -> {"id": 1, "op": "export", "args": {...}}
+#   <- {"id": 1, "ok": true, "result": {...}, "rss": 123456}
+# "ping" is the heartbeat and "shutdown" stops the worker. Everything else is up to the handlers.
+#--------------------------------------------------------------------------------------------------
+
+def getRss():
+    '''
+    Returns the current memory use of the worker so the pool can recycle leaky ones.
+
+    Returns:
+    int: The resident set size in bytes, 0 if it can't be found out.
+    '''
+    try:
+        if os.name == 'nt':
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                            ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                            ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                            ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                            ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+            return counters.WorkingSetSize
+
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except Exception:
+        return 0
+
+def serve(handlers, name='worker'):
+    '''
+    Runs the request loop until stdin closes or a shutdown request comes in.
+    The protocol gets its own copy of stdout, and the real stdout is pointed at stderr,
+    so whatever the DCC prints can't corrupt the responses.
+
+    Args:
+    handlers (dict): op name -> function taking the request args as keyword arguments and returning something json-able.
+    name (str): The name of the worker, sent in the ready message.
+    '''
+    protocolOut = os.fdopen(os.dup(sys.stdout.fileno()), 'w', buffering=1)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    def send(message):
+        message['rss'] = getRss()
+        protocolOut.write(json.dumps(message) + '\n')
+        protocolOut.flush()
+
+    send({'id': None, 'event': 'ready', 'name': name, 'pid': os.getpid(), 'ops': sorted(handlers)})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            send({'id': None, 'ok': False, 'error': f'Malformed request: {line[:200]}'})
+            continue
+
+        requestId = request.get('id')
+        op = request.get('op')
+
+        if op == 'ping':
+            send({'id': requestId, 'ok': True, 'result': {'time': time.time()}})
+            continue
+        if op == 'shutdown':
+            send({'id': requestId, 'ok': True, 'result': None})
+            break
+
+        handler = handlers.get(op)
+        if handler is None:
+            send({'id': requestId, 'ok': False, 'error': f'Unknown op "{op}"'})
+            continue
+
+        try:
+            send({'id': requestId, 'ok': True, 'result': handler(**request.get('args', {}))})
+        except Exception as e:
+            send({'id': requestId, 'ok': False, 'error': f'{e}\n{traceback.format_exc()}'})
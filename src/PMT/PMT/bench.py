@@ -0,0 +1,493 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+from query import AssetQuery
+
+#-----------------------------------------------------------------------------------
+# Benchmarks of the PMT backend on synthetic studios.
+# Every scale (projects x assets x extra files per asset) gets its own temp root that
+# LOCALAPPDATA is pointed at, so the real studio is never touched and it runs on linux too.
+# The results are json, and can be compared against a saved baseline to catch regressions:
+#
+#   python bench.py --scales 2x50x2,5x200x4 --out results.json
+#   python bench.py --baseline results.json            (exit code 1 on a regression)
+#   python bench.py --suite stress --backend sharded    (exit code 1 on a lost update)
+#   python bench.py --suite format --records 1000,50000  (json vs binary config files)
+#-----------------------------------------------------------------------------------
+
+RESULTS_VERSION = 1
+
+def parseSize(text):
+    '''
+    Args:
+    text (str): A size like "512", "64K" or "2M".
+
+    Returns:
+    int: The size in bytes.
+    '''
+    text = text.strip().upper()
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def parseScale(text):
+    '''
+    Args:
+    text (str): "projects x assets x files", e.g. "5x200x4".
+
+    Returns:
+    tuple: (projects, assets per project, extra files per asset).
+    '''
+    parts = [int(part) for part in text.lower().split('x')]
+    if len(parts) == 2:
+        parts.append(0)
+    if len(parts) != 3 or min(parts) < 0 or parts[0] < 2:
+        raise argparse.ArgumentTypeError(f'Bad scale "{text}", expected PROJECTSxASSETSxFILES with at least 2 projects.')
+    return tuple(parts)
+
+def summarize(samples):
+    '''
+    Args:
+    samples (list): Durations in seconds.
+
+    Returns:
+    dict: count, total, mean, p50, p95 and max, in milliseconds.
+    '''
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0] * 1000, 4),
+        'total': round(sum(ordered) * 1000, 3),
+        'mean': round(statistics.mean(ordered) * 1000, 4),
+        'p50': round(ordered[len(ordered) // 2] * 1000, 4),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        'max': round(ordered[-1] * 1000, 4),
+    }
+
+class SyntheticStudio:
+    '''
+    A throwaway studio root with a PMT pointed at it.
+    '''
+    def __init__(self, backend=None, root=None):
+        '''
+        Args:
+        backend (str): The storage backend to use, the one of the path config if None.
+        root (str): An existing studio root to share (stress workers), a new temp one if None.
+        '''
+        self.owned = root is None # only the studio that made the root deletes it
+        self.root = root or tempfile.mkdtemp(prefix='pmt_bench_')
+        self.oldLocalAppData = os.environ.get('LOCALAPPDATA')
+        os.environ['LOCALAPPDATA'] = self.root # the PMT reads its base path from here
+
+        from pmt import PMT
+
+        class BenchPMT(PMT):
+            def initPaths(self):
+                super().initPaths()
+                if backend:
+                    self.storageBackend = backend
+                self.watcherEnabled = False
+
+        self.pmt = BenchPMT()
+
+    def addFiles(self, assetPath, count, size, rng):
+        '''
+        Fills an asset with extra files next to its Maya scene, standing in for textures/ caches.
+        '''
+        folder = os.path.join(assetPath, 'Maya')
+        os.makedirs(folder, exist_ok=True)
+        block = rng.randbytes(min(size, 1024 * 1024)) if size else b''
+        for i in range(count):
+            with open(os.path.join(folder, f'data_{i}.bin'), 'wb') as f:
+                remaining = size
+                while remaining > 0:
+                    f.write(block[:remaining])
+                    remaining -= len(block)
+
+    def close(self):
+        self.pmt.search.flush() # nothing left for atexit to write into the deleted root
+        self.pmt.jobs.shutdown()
+        if self.pmt.trash is not None:
+            self.pmt.trash.stopReclaimer()
+        if self.oldLocalAppData is None:
+            os.environ.pop('LOCALAPPDATA', None)
+        else:
+            os.environ['LOCALAPPDATA'] = self.oldLocalAppData
+        if self.owned:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+def timeCall(samples, fn, *args, **kwargs):
+    '''
+    Times a PMT call and checks its (bool, msg) result, a failed call would make the numbers meaningless.
+    '''
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    samples.append(time.perf_counter() - start)
+    if isinstance(result, tuple) and result and result[0] is False:
+        raise RuntimeError(f'{fn.__name__} failed: {result[1]}')
+    return result
+
+def benchOps(projects, assets, files, fileSize, sample, backend=None, seed=1):
+    '''
+    Times the main PMT operations on one synthetic studio.
+
+    Args:
+    projects (int): The number of projects.
+    assets (int): The number of assets per project.
+    files (int): The number of extra files per asset.
+    fileSize (int): The size of every extra file in bytes.
+    sample (int): How many assets the rename/ copy/ move/ delete operations are timed on.
+    backend (str): The storage backend.
+    seed (int): The seed of the random choices, so two runs do the same work.
+
+    Returns:
+    dict: operation -> summary (see summarize).
+    '''
+    rng = random.Random(seed)
+    studio = SyntheticStudio(backend)
+    pmt = studio.pmt
+    timings = {op: [] for op in ('createProjectFolder', 'createAsset', 'getAssets', 'queryAssetsPage', 'renameAsset', 'copyAsset', 'moveAsset', 'deleteAsset', 'deleteProject')}
+    types = ['Characters', 'Environments', 'Props']
+    pageQuery = AssetQuery(dcc='Maya', sortBy='type', limit=100) # the first page of the GUI's asset view
+
+    try:
+        projNames = [f'Proj{i:03d}' for i in range(projects)]
+        for projName in projNames:
+            timeCall(timings['createProjectFolder'], pmt.createProjectFolder, projName)
+
+        for projName in projNames:
+            for i in range(assets):
+                assetType = types[i % len(types)]
+                assetName = f'{projName.lower()}_asset_{i:05d}' # unique across projects, copies never land on an existing asset
+                timeCall(timings['createAsset'], pmt.createAsset, projName, assetType, assetName, True)
+                if files:
+                    studio.addFiles(os.path.join(pmt.basePath, projName, 'Art Depot', assetType, assetName), files, fileSize, rng)
+
+        for _ in range(3):
+            for projName in projNames:
+                timeCall(timings['getAssets'], pmt.getAssets, projName, 'Maya')
+                timeCall(timings['queryAssetsPage'], pmt.queryAssets, projName, pageQuery)
+
+        srcProj, dstProj = projNames[0], projNames[1]
+        names = sorted(pmt.getAssets(srcProj, 'Maya'))
+        picked = rng.sample(names, min(sample * 3, len(names)))
+        toRename, toCopy, toMove = picked[0::3], picked[1::3], picked[2::3]
+
+        for assetName in toRename:
+            timeCall(timings['renameAsset'], pmt.renameAsset, srcProj, assetName, f'{assetName}_renamed')
+        for assetName in toCopy:
+            timeCall(timings['copyAsset'], pmt.copyMoveAsset, srcProj, [dstProj], assetName, move=False)
+        for assetName in toMove:
+            timeCall(timings['moveAsset'], pmt.copyMoveAsset, srcProj, [dstProj], assetName, move=True)
+        for assetName in toCopy:
+            timeCall(timings['deleteAsset'], pmt.deleteAsset, dstProj, assetName, 'Maya')
+
+        for projName in projNames:
+            timeCall(timings['deleteProject'], pmt.deleteProject, projName)
+    finally:
+        studio.close()
+
+    return {op: summarize(samples) for op, samples in timings.items()}
+
+STRESS_PROJECT = 'Stress'
+STRESS_COUNTER = 'stress_counter'
+
+def stressWorker(root, backend, workerId, ops, barrier, queue):
+    '''
+    One artist of the stress suite, in its own process: creates and renames its own assets and bumps
+    a counter on an asset every worker shares, locked read-modify-write like the PMT does.
+    Puts (workerId, operation -> durations, failed calls, error) on the queue.
+    '''
+    timings = {op: [] for op in ('createAsset', 'renameAsset', 'increment')}
+    failed = 0
+    error = None
+    studio = None
+
+    def call(samples, fn, *args):
+        nonlocal failed
+        try:
+            timeCall(samples, fn, *args)
+        except RuntimeError: # an asset another process clobbered is what's being measured, not a reason to stop
+            failed += 1
+
+    try:
+        studio = SyntheticStudio(backend, root)
+        pmt = studio.pmt
+        barrier.wait() # everyone starts hammering at the same time
+        for i in range(ops):
+            assetName = f'w{workerId:02d}_asset_{i:04d}'
+            call(timings['createAsset'], pmt.createAsset, STRESS_PROJECT, 'Props', assetName)
+            if i % 2 == 0:
+                call(timings['renameAsset'], pmt.renameAsset, STRESS_PROJECT, assetName, f'{assetName}_renamed')
+
+            start = time.perf_counter()
+            with pmt.store.lockAssets([(STRESS_PROJECT, STRESS_COUNTER)]):
+                details = dict(pmt.store.getAsset(STRESS_PROJECT, STRESS_COUNTER) or {})
+                details['count'] = details.get('count', 0) + 1
+                pmt.store.putAsset(STRESS_PROJECT, STRESS_COUNTER, details)
+            timings['increment'].append(time.perf_counter() - start)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    finally:
+        if studio is not None:
+            studio.close()
+    queue.put((workerId, timings, failed, error))
+
+def checkStress(pmt, procs, ops, failedCalls):
+    '''
+    Checks what the stress workers left behind against what they did.
+
+    Args:
+    pmt (PMT): A PMT on the stressed studio.
+    procs (int): The number of workers.
+    ops (int): The number of assets every worker created.
+    failedCalls (int): The PMT calls of the workers that failed.
+
+    Returns:
+    dict: The counts of what went wrong, all 0 when nothing was lost.
+    '''
+    if getattr(pmt.store, 'cache', None) is not None:
+        pmt.store.cache.invalidate() # read what's on disk, not what this process remembers
+    assets = pmt.store.getAssets(STRESS_PROJECT)
+    expected = {f'w{workerId:02d}_asset_{i:04d}' + ('_renamed' if i % 2 == 0 else '') for workerId in range(procs) for i in range(ops)}
+    counter = (assets.get(STRESS_COUNTER) or {}).get('count', 0)
+    check = {
+        'missingAssets': len(expected - set(assets)),
+        'extraAssets': len(set(assets) - expected - {STRESS_COUNTER}),
+        'lostIncrements': procs * ops - counter,
+        'indexMismatches': 0,
+        'failedCalls': failedCalls,
+    }
+    if hasattr(pmt.store, 'getShardDir'): # the index must match the shards it's derived from
+        shardDir = pmt.store.getShardDir(STRESS_PROJECT)
+        shards = {name[:-len('.json')] for name in os.listdir(shardDir) if name.endswith('.json') and not name.startswith('.')}
+        check['indexMismatches'] = len(shards ^ set(assets)) + sum(1 for name in shards & set(assets)
+                                                                 if pmt.store.readShard(STRESS_PROJECT, name) != assets[name])
+    return check
+
+def benchStress(procs, ops, backend=None):
+    '''
+    Runs several PMT processes against one studio at the same time, each working on its own assets
+    plus one shared asset, and checks that no update got lost.
+
+    Args:
+    procs (int): The number of processes.
+    ops (int): The number of assets every process creates.
+    backend (str): The storage backend.
+
+    Returns:
+    dict: operation -> summary (see summarize), plus 'check' (see checkStress).
+    '''
+    studio = SyntheticStudio(backend)
+    pmt = studio.pmt
+    try:
+        timeCall([], pmt.createProjectFolder, STRESS_PROJECT)
+        timeCall([], pmt.createAsset, STRESS_PROJECT, 'Props', STRESS_COUNTER)
+
+        ctx = multiprocessing.get_context('spawn') # what windows does anyway, and no forking of the job threads
+        barrier = ctx.Barrier(procs)
+        queue = ctx.Queue()
+        workers = [ctx.Process(target=stressWorker, args=(studio.root, backend, workerId, ops, barrier, queue)) for workerId in range(procs)]
+        for worker in workers:
+            worker.start()
+        reports = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        errors = [f'worker {workerId}: {error}' for workerId, _, _, error in reports if error]
+        if errors:
+            raise RuntimeError('; '.join(errors))
+
+        results = {op: summarize([sample for _, timings, _, _ in reports for sample in timings[op]]) for op in reports[0][1]}
+        results['check'] = checkStress(pmt, procs, ops, sum(failed for _, _, failed, _ in reports))
+        return results
+    finally:
+        studio.close()
+
+def makeAssetConfig(records, rng):
+    '''
+    Returns:
+    dict: A project config with that many assets, shaped like the ones createAsset writes.
+    '''
+    types = ['Characters', 'Environments', 'Props']
+    assets = {}
+    for i in range(records):
+        assetType = types[i % len(types)]
+        assetName = f'asset_{i:06d}'
+        assets[assetName] = {
+            'creationDate': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00',
+            'type': assetType,
+            'path': f'C:\\Users\\artist\\AppData\\Local\\PMT\\MyGame\\Art Depot\\{assetType}\\{assetName}',
+            'Maya': {'filename': f'{assetName}.ma', 'version': '2024'} if rng.random() < 0.8 else 'NA',
+            'Substance': {'filename': f'{assetName}.spp', 'version': '2023'} if rng.random() < 0.5 else 'NA',
+        }
+    return {'Assets': assets}
+
+def benchFormat(records, repeat=3, seed=1):
+    '''
+    Times writing/ reading a project config in every format, plus reading a single asset out of it.
+
+    Args:
+    records (int): The number of assets in the config.
+    repeat (int): How many times every operation is timed.
+    seed (int): The seed of the synthetic assets.
+
+    Returns:
+    dict: '<format>.<operation>' -> summary (see summarize), plus 'bytes' with the file sizes.
+    '''
+    from serializers import SERIALIZERS
+
+    rng = random.Random(seed)
+    data = makeAssetConfig(records, rng)
+    names = list(data['Assets'])
+    root = tempfile.mkdtemp(prefix='pmt_bench_')
+    results = {}
+    sizes = {}
+    try:
+        for serializer in SERIALIZERS.values():
+            path = serializer.getPath(os.path.join(root, 'PMT_Bench_Config.json'))
+            timings = {'dump': [], 'load': [], 'loadRecord': []}
+            for _ in range(max(1, repeat)):
+                timeCall(timings['dump'], serializer.dump, path, data)
+                timeCall(timings['load'], serializer.load, path)
+                for name in rng.sample(names, min(10, len(names))):
+                    timeCall(timings['loadRecord'], serializer.loadRecord, path, name)
+            if serializer.load(path) != data:
+                raise RuntimeError(f'The {serializer.name} format doesn\'t read back what it wrote.')
+            sizes[serializer.name] = os.path.getsize(path)
+            results.update({f'{serializer.name}.{op}': summarize(samples) for op, samples in timings.items()})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    results['bytes'] = sizes
+    return results
+
+def compare(results, baseline, threshold=0.25, minDelta=0.25, metric='min'):
+    '''
+    Compares results with a baseline, operation by operation.
+
+    Args:
+    results (dict): The results of this run.
+    baseline (dict): The results of the baseline run.
+    threshold (float): How much slower (0.25 = 25%) counts as a regression.
+    minDelta (float): Milliseconds below which a difference is noise, whatever the ratio.
+    metric (str): The summary field that is compared.
+
+    Returns:
+    list: One row per (suite, scale, operation) found in both, with 'regression' set on the slow ones.
+    '''
+    rows = []
+    for suite, scales in results.get('results', {}).items():
+        for scale, ops in scales.items():
+            baseOps = baseline.get('results', {}).get(suite, {}).get(scale, {})
+            for op, summary in ops.items():
+                base = baseOps.get(op)
+                if not base or metric not in base or metric not in summary:
+                    continue
+                ratio = summary[metric] / base[metric] if base[metric] else float('inf') if summary[metric] else 1.0
+                regression = ratio > 1 + threshold and summary[metric] - base[metric] > minDelta
+                rows.append({'suite': suite, 'scale': scale, 'op': op, 'baseline': base[metric], 'current': summary[metric],
+                             'ratio': round(ratio, 3), 'regression': regression})
+    return rows
+
+def getMachine():
+    '''
+    Returns:
+    dict: Where the results come from, a baseline from another machine isn't comparable.
+    '''
+    return {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count(), 'node': platform.node()}
+
+def buildParser():
+    parser = argparse.ArgumentParser(description='Benchmarks of the PMT backend on synthetic studios.')
+    parser.add_argument('--suite', choices=['ops', 'stress', 'format'], default='ops', help='what to benchmark, stress runs several PMT processes on one studio, format compares the config formats')
+    parser.add_argument('--scales', default='2x20x1,4x100x2', help='comma separated PROJECTSxASSETSxFILES')
+    parser.add_argument('--file-size', default='16K', help='size of every extra asset file, e.g. 512, 64K, 2M')
+    parser.add_argument('--sample', type=int, default=10, help='assets the rename/ copy/ move/ delete operations are timed on')
+    parser.add_argument('--backend', choices=['json', 'journal', 'sharded', 'sqlite'], help='storage backend, the path config one by default')
+    parser.add_argument('--out', help='write the results to this json file')
+    parser.add_argument('--baseline', help='compare with the results in this json file')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scale, the fastest run of every operation is kept')
+    parser.add_argument('--threshold', type=float, default=0.25, help='slowdown that counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--min-delta', type=float, default=0.25, help='milliseconds below which a slowdown is noise')
+    parser.add_argument('--metric', choices=['min', 'p50', 'mean', 'p95'], default='min', help='the summary field that is compared, min is the least noisy')
+    parser.add_argument('--procs', type=int, default=4, help='stress: processes working on the studio at the same time')
+    parser.add_argument('--ops', type=int, default=50, help='stress: assets every process creates')
+    parser.add_argument('--records', default='1000,10000,50000', help='format: comma separated asset counts of the configs')
+    parser.add_argument('--seed', type=int, default=1)
+    return parser
+
+def runSuite(args):
+    '''
+    Returns:
+    dict: scale -> operation -> summary.
+    '''
+    if args.suite == 'stress':
+        key = f'{args.procs}x{args.ops}'
+        print(f'[stress] {key} on {args.backend or "the configured backend"} ...', file=sys.stderr)
+        return {key: benchStress(max(1, args.procs), max(1, args.ops), args.backend)}
+
+    if args.suite == 'format':
+        results = {}
+        for records in args.records.split(','):
+            print(f'[format] {int(records)} assets ...', file=sys.stderr)
+            results[str(int(records))] = benchFormat(int(records), args.repeat, args.seed)
+        return results
+
+    results = {}
+    fileSize = parseSize(args.file_size)
+    for scale in args.scales.split(','):
+        projects, assets, files = parseScale(scale)
+        key = f'{projects}x{assets}x{files}'
+        print(f'[{args.suite}] {key} ...', file=sys.stderr)
+        runs = [benchOps(projects, assets, files, fileSize, args.sample, args.backend, args.seed) for _ in range(max(1, args.repeat))]
+        results[key] = {op: min((run[op] for run in runs), key=lambda summary: summary.get('p50', 0)) for op in runs[0]} # best of n, the slow runs are mostly noise
+    return results
+
+def main(argv=None):
+    args = buildParser().parse_args(argv)
+
+    results = {
+        'version': RESULTS_VERSION,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': getMachine(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('out', 'baseline')},
+        'results': {args.suite: runSuite(args)},
+    }
+
+    exitCode = 0
+    for scale, ops in results['results'][args.suite].items():
+        check = ops.get('check')
+        if check and any(check.values()):
+            print(f'[{args.suite}] {scale}: updates got lost {check}', file=sys.stderr)
+            exitCode = 1
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold, args.min_delta, args.metric)
+        results['comparison'] = {'baseline': args.baseline, 'sameMachine': baseline.get('machine') == results['machine'], 'rows': rows}
+        for row in rows:
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f"{row['suite']:6} {row['scale']:12} {row['op']:20} {row['baseline']:10.3f} -> {row['current']:10.3f} ms  x{row['ratio']:<6} {flag}", file=sys.stderr)
+        if any(row['regression'] for row in rows):
+            exitCode = 1
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return exitCode
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+import os
+import errno
+import shutil
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+#-------------------------------------------------------------------------------
+# This module is the content-addressed blob store of the PMT.
+# Files with the same content are kept once under <base>/.blobs/<sha256> and
+# every copy of them in the projects is a hardlink to that blob.
+#-------------------------------------------------------------------------------
+
+DEDUPE_DEPOTS = ['Art Depot', 'Intermediate Depot'] # engine projects are left alone, the editor writes into them all the time
+
+def hashFile(path, chunkSize=1024 * 1024):
+    '''
+    Hashes the content of a file.
+
+    Args:
+    path (str): The path of the file.
+    chunkSize (int): How much to read at a time.
+
+    Returns:
+    str: The sha256 of the file as hex.
+    '''
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunkSize), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class BlobStore:
+    '''
+    Keeps one physical copy of each file content and hands out hardlinks to it.
+    As a hardlink shares its data with the blob, a linked file has to be turned back into
+    a private copy (breakLink) before anything writes to it.
+    '''
+    def __init__(self, basePath):
+        '''
+        Initializes the blob store.
+
+        Args:
+        basePath (str): The base path of the PMT, the blobs live in a hidden folder inside it.
+        '''
+        self.basePath = basePath
+        self.blobPath = os.path.join(basePath, '.blobs')
+
+    def getBlobPath(self, digest):
+        '''
+        Returns where the blob of a hash lives (sharded by the first two characters to keep folders small).
+
+        Args:
+        digest (str): The sha256 of the content.
+        '''
+        return os.path.join(self.blobPath, digest[:2], digest)
+
+    def linkFile(self, src, dst):
+        '''
+        Replaces dst with a hardlink to src in one go.
+
+        Args:
+        src (str): The file to link to.
+        dst (str): The path of the link.
+        '''
+        tmpPath = os.path.join(os.path.dirname(dst), f'.tmp_{os.path.basename(dst)}_{os.getpid()}_{threading.get_ident()}') # the copy threads may link the same file at once
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        os.link(src, tmpPath)
+        os.replace(tmpPath, dst)
+        if os.path.lexists(tmpPath): # the rename is a no-op if dst already was a link to src (another thread got there first)
+            os.remove(tmpPath)
+
+    def ingest(self, path, digest=None):
+        '''
+        Puts a file into the blob store. If the content is new, the file itself becomes the blob (nothing is copied),
+        otherwise the file is swapped for a link to the existing blob.
+
+        Args:
+        path (str): The path of the file.
+        digest (str): The sha256 of the file if it's already known.
+
+        Returns:
+        str: The sha256 of the file.
+        int: The bytes that were freed by linking the file to an existing blob.
+        '''
+        digest = digest or hashFile(path)
+        blobPath = self.getBlobPath(digest)
+
+        if not os.path.exists(blobPath):
+            os.makedirs(os.path.dirname(blobPath), exist_ok=True)
+            try:
+                os.link(path, blobPath)
+                return digest, 0
+            except FileExistsError:
+                pass # another thread/ session ingested the same content first (e.g. one source copied to many targets at once), use its blob
+
+        if os.path.samefile(path, blobPath):
+            return digest, 0
+
+        size = os.path.getsize(path)
+        self.linkFile(blobPath, path)
+        return digest, size
+
+    def copyFile(self, src, dst):
+        '''
+        "Copies" a file by linking both the source and the destination to the same blob.
+        Falls back to a real copy if the filesystem can't hardlink (e.g. a different volume).
+
+        Args:
+        src (str): The file to copy.
+        dst (str): The path to copy it to.
+
+        Returns:
+        bool: True if the file was linked, False if it had to be copied.
+        '''
+        try:
+            digest, _ = self.ingest(src)
+            self.linkFile(self.getBlobPath(digest), dst)
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EACCES):
+                raise
+            shutil.copyfile(src, dst)
+            return False
+
+    def isLinked(self, path):
+        '''
+        Args:
+        path (str): The path of the file.
+
+        Returns:
+        bool: True if the file shares its data with a blob (or another copy).
+        '''
+        return os.path.exists(path) and os.stat(path).st_nlink > 1
+
+    def breakLink(self, path):
+        '''
+        Copy-on-write: gives a linked file its own data again, so that a DCC saving over it
+        doesn't change the blob and every other project using it.
+
+        Args:
+        path (str): The path of the file that is about to be written to.
+
+        Returns:
+        bool: True if the link was broken, False if the file wasn't linked.
+        '''
+        if not self.isLinked(path):
+            return False
+
+        fd, tmpPath = tempfile.mkstemp(prefix='.tmp_', dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            shutil.copy2(path, tmpPath)
+            os.replace(tmpPath, path)
+        except BaseException:
+            if os.path.exists(tmpPath):
+                os.remove(tmpPath)
+            raise
+        return True
+
+    def listFiles(self, roots):
+        '''
+        Lists every file under some folders with their sizes.
+
+        Args:
+        roots (list): The folders to look in.
+
+        Returns:
+        list: (path, size, inode) of every file.
+        '''
+        files = []
+        stack = [root for root in roots if os.path.isdir(root)]
+        while stack:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False) and not entry.name.startswith('.tmp_'):
+                        st = entry.stat()
+                        files.append((entry.path, st.st_size, (st.st_dev, st.st_ino)))
+        return files
+
+    def dedupe(self, projPaths, workers=8):
+        '''
+        Retro-fits the blob store onto files that already exist: every group of files with the same content
+        ends up as links to a single blob.
+        Only files whose size matches another file (or a blob) are hashed at all.
+
+        Args:
+        projPaths (list): The project folders to dedupe (only their art and intermediate depots are touched).
+        workers (int): The number of files hashed at the same time.
+
+        Returns:
+        int: The number of files that were linked to a blob.
+        int: The number of bytes reclaimed.
+        '''
+        files = self.listFiles([os.path.join(projPath, depot) for projPath in projPaths for depot in DEDUPE_DEPOTS])
+        blobs = self.listFiles([self.blobPath])
+
+        bySize = {}
+        for path, size, inode in files + blobs:
+            bySize.setdefault(size, []).append((path, inode))
+
+        candidates = [path for path, size, inode in files if size > 0 and len({i for _, i in bySize[size]}) > 1] # same inode means already linked
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            digests = dict(zip(candidates, pool.map(hashFile, candidates)))
+
+        linked = 0
+        reclaimed = 0
+        for path, digest in digests.items():
+            _, freed = self.ingest(path, digest)
+            if freed:
+                linked += 1
+                reclaimed += freed
+
+        return linked, reclaimed
+
+    def collectGarbage(self):
+        '''
+        Removes the blobs that no project file links to anymore.
+
+        Returns:
+        int: The number of bytes freed.
+        '''
+        freed = 0
+        for path, size, _ in self.listFiles([self.blobPath]):
+            if os.stat(path).st_nlink == 1:
+                os.remove(path)
+                freed += size
+        return freed
@@ -0,0 +1,535 @@
+import os
+import json
+import sqlite3
+import threading
+import contextlib
+from serializers import loadConfigFile
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module defines the SQLite catalog of the PMT.
+# It keeps the projects, assets and per-DCC records in indexed tables so that
+# a single asset can be read/written without touching the rest of the project.
+#-------------------------------------------------------------------------------
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    creationDate TEXT,
+    path TEXT,
+    assetCount INTEGER NOT NULL DEFAULT 0,
+    gameEngine TEXT NOT NULL DEFAULT '"NA"'
+);
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    projectId INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    nameKey TEXT, -- the name lowercased by python, sqlite's lower() only folds ascii
+    type TEXT,
+    path TEXT,
+    creationDate TEXT,
+    extra TEXT,
+    UNIQUE (projectId, name)
+);
+CREATE INDEX IF NOT EXISTS assetsByType ON assets (projectId, type);
+CREATE TABLE IF NOT EXISTS dccRecords (
+    assetId INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+    dcc TEXT NOT NULL,
+    filename TEXT,
+    version TEXT,
+    PRIMARY KEY (assetId, dcc)
+);
+CREATE INDEX IF NOT EXISTS dccRecordsByDcc ON dccRecords (dcc, filename);
+'''
+
+INDEXES = '''
+CREATE INDEX IF NOT EXISTS assetsByNameKey ON assets (projectId, nameKey, name);
+''' # made after the migrations, the columns may not be there before
+
+ASSET_FIELDS = ('creationDate', 'type', 'path') # everything else in an asset dict is either a DCC record or goes to 'extra'
+
+class Catalog:
+    '''
+    The SQLite backed store of the PMT.
+    It has the same interface as the JsonStore so the PMT doesn't care which one it talks to.
+    '''
+    def __init__(self, basePath, parentConfigPath):
+        '''
+        Initializes the catalog. The database is only opened on first use.
+
+        Args:
+        basePath (str): The base path of the PMT.
+        parentConfigPath (str): The path of the parent config, only used for the migration.
+        '''
+        self.basePath = basePath
+        self.parentConfigPath = parentConfigPath
+        self.dbPath = os.path.join(basePath, 'Tools', 'PMT_Catalog.db')
+        self.lock = threading.RLock() # one connection shared across threads, so serialize the access
+        self._conn = None
+
+    @property
+    def conn(self):
+        '''
+        Opens the database in WAL mode and creates the tables if needed.
+
+        Returns:
+        sqlite3.Connection: The connection to the catalog.
+        '''
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.dbPath), exist_ok=True)
+            conn = sqlite3.connect(self.dbPath, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL') # readers don't block the writer and vice versa
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.create_function('pylower', 1, foldCase, deterministic=True)
+            conn.executescript(SCHEMA)
+            self.migrate(conn)
+            conn.executescript(INDEXES)
+            self._conn = conn
+        return self._conn
+
+    def migrate(self, conn):
+        '''
+        Brings a catalog made by an older PMT up to the current schema.
+
+        Args:
+        conn (sqlite3.Connection): The freshly opened connection.
+        '''
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(assets)')]
+        if 'nameKey' not in columns:
+            with conn:
+                conn.execute('ALTER TABLE assets ADD COLUMN nameKey TEXT')
+                conn.execute('UPDATE assets SET nameKey = pylower(name)')
+
+    def close(self):
+        '''
+        Closes the connection to the catalog.
+        '''
+        with self.lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def getProjConfigPath(self, projName):
+        '''
+        Returns the path of the legacy json config of a project, kept around for the migration.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        return os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config.json')
+
+    def getProjectId(self, projName, create=False):
+        '''
+        Returns the row id of a project.
+
+        Args:
+        projName (str): The name of the project.
+        create (bool): Whether to insert a bare project row if it doesn't exist.
+
+        Returns:
+        int: The id of the project, None if it doesn't exist.
+        '''
+        row = self.conn.execute('SELECT id FROM projects WHERE name = ?', (projName,)).fetchone()
+        if row:
+            return row[0]
+        if create:
+            return self.conn.execute('INSERT INTO projects (name) VALUES (?)', (projName,)).lastrowid
+        return None
+
+#-------------------------------------------------------------------------------
+# Projects
+#-------------------------------------------------------------------------------
+
+    def loadProjects(self):
+        '''
+        Loads the projects in the same shape as the parent config.
+
+        Returns:
+        dict: The data about the projects.
+        '''
+        with self.lock:
+            rows = self.conn.execute('SELECT name, creationDate, path, assetCount, gameEngine FROM projects ORDER BY id').fetchall()
+
+        return {name: {
+                    'creationDate': creationDate,
+                    'path': path,
+                    'Asset Count': assetCount,
+                    'Game Engine': json.loads(gameEngine)
+                } for name, creationDate, path, assetCount, gameEngine in rows}
+
+    def saveProjects(self, projects, projNames=None):
+        '''
+        Syncs the projects table with the projects dict of the PMT.
+        Projects that are not in the dict anymore are deleted along with their assets.
+
+        Args:
+        projects (dict): The data about the projects.
+        projNames (iterable): The projects the caller added/ changed/ removed, only those rows are touched,
+                              so the projects another session made meanwhile stay. None syncs the whole table.
+        '''
+        with self.lock, self.conn:
+            names = list(projects) if projNames is None else [name for name in projNames if name in projects]
+            for projName in names:
+                details = projects[projName]
+                self.conn.execute(
+                    'INSERT INTO projects (name, creationDate, path, assetCount, gameEngine) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(name) DO UPDATE SET creationDate = excluded.creationDate, path = excluded.path, '
+                    'assetCount = excluded.assetCount, gameEngine = excluded.gameEngine',
+                    (projName, details.get('creationDate'), details.get('path'),
+                     details.get('Asset Count', 0), json.dumps(details.get('Game Engine', 'NA'))))
+
+            existing = [row[0] for row in self.conn.execute('SELECT name FROM projects')] if projNames is None else projNames
+            for projName in existing:
+                if projName not in projects:
+                    self.conn.execute('DELETE FROM projects WHERE name = ?', (projName,))
+
+    def updateAssetCounts(self, deltas):
+        '''
+        Adds to the Asset Count of some projects in the database itself, so two sessions counting at once both count.
+
+        Args:
+        deltas (dict): project name -> how many assets it gained (negative if it lost some).
+
+        Returns:
+        dict: project name -> its new Asset Count, for the projects that still exist.
+        '''
+        with self.lock, self.conn:
+            counts = {}
+            for projName, delta in deltas.items():
+                self.conn.execute('UPDATE projects SET assetCount = assetCount + ? WHERE name = ?', (delta, projName))
+                row = self.conn.execute('SELECT assetCount FROM projects WHERE name = ?', (projName,)).fetchone()
+                if row is not None:
+                    counts[projName] = row[0]
+            return counts
+
+    def initProject(self, projName):
+        '''
+        Makes sure the project has a row to hang its assets on.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        with self.lock, self.conn:
+            self.getProjectId(projName, create=True)
+
+    def renameProject(self, oldName, newName):
+        '''
+        Renames a project, the assets follow as they point to the project id.
+
+        Args:
+        oldName (str): The old name of the project.
+        newName (str): The new name of the project.
+        '''
+        with self.lock, self.conn:
+            self.conn.execute('UPDATE projects SET name = ? WHERE name = ?', (newName, oldName))
+
+    def deleteProject(self, projName):
+        '''
+        Deletes a project and (cascading) all its assets.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM projects WHERE name = ?', (projName,))
+
+    def isEmpty(self):
+        '''
+        Returns:
+        bool: True if nothing has been stored in the catalog yet.
+        '''
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM projects').fetchone()[0] == 0
+
+#-------------------------------------------------------------------------------
+# Assets
+#-------------------------------------------------------------------------------
+
+    def rowsToAssets(self, rows):
+        '''
+        Folds the joined asset/DCC rows back into the asset dicts of the project config.
+
+        Args:
+        rows (list): Rows of (name, type, path, creationDate, extra, dcc, filename, version).
+
+        Returns:
+        dict: The assets keyed by their names.
+        '''
+        assets = {}
+        for name, assetType, path, creationDate, extra, dcc, filename, version in rows:
+            if name not in assets:
+                assets[name] = {
+                    'creationDate': creationDate,
+                    'type': assetType,
+                    'path': path,
+                    **(json.loads(extra) if extra else {})
+                }
+            if dcc is not None:
+                assets[name][dcc] = {'filename': filename, 'version': version} if filename is not None else 'NA'
+        return assets
+
+    def getAssets(self, projName):
+        '''
+        Returns all the assets of a project.
+
+        Args:
+        projName (str): The name of the project.
+
+        Returns:
+        dict: The assets of the project keyed by their names.
+        '''
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT a.name, a.type, a.path, a.creationDate, a.extra, d.dcc, d.filename, d.version '
+                'FROM assets a JOIN projects p ON p.id = a.projectId '
+                'LEFT JOIN dccRecords d ON d.assetId = a.id '
+                'WHERE p.name = ? ORDER BY a.id, d.dcc', (projName,)).fetchall()
+        return self.rowsToAssets(rows)
+
+    def getAsset(self, projName, assetName):
+        '''
+        Returns a single asset of a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+
+        Returns:
+        dict: The details of the asset, None if the asset doesn't exist.
+        '''
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT a.name, a.type, a.path, a.creationDate, a.extra, d.dcc, d.filename, d.version '
+                'FROM assets a JOIN projects p ON p.id = a.projectId '
+                'LEFT JOIN dccRecords d ON d.assetId = a.id '
+                'WHERE p.name = ? AND a.name = ? ORDER BY d.dcc', (projName, assetName)).fetchall()
+        return self.rowsToAssets(rows).get(assetName)
+
+    def getSortColumns(self, query):
+        '''
+        Returns the sql of the sort key of a query, column for column the same as AssetQuery.sortKey
+        so the cursors work the same whichever store made them.
+
+        Args:
+        query (AssetQuery): The query.
+
+        Returns:
+        list: The sql expressions, f is the DCC record of the query's DCC.
+        '''
+        tail = ['a.nameKey', 'a.name']
+        if query.sortBy == 'name':
+            return tail
+        return [{'type': "pylower(coalesce(a.type, ''))", # python's lower, like the file stores, not sqlite's ascii one
+                 'creationDate': "coalesce(a.creationDate, '')",
+                 'file': "pylower(coalesce(f.filename, ''))",
+                 'status': 'CASE WHEN f.filename IS NULL THEN 1 ELSE 0 END'}[query.sortBy]] + tail
+
+    def queryAssets(self, projName, query, cursor=None):
+        '''
+        Returns a page of the assets of a project that match a query. The filters, the order and
+        the page are all done by sqlite, only the assets of the page are read and folded into dicts.
+
+        Args:
+        projName (str): The name of the project.
+        query (AssetQuery): The filters, fields, order and page size.
+        cursor (str): The nextCursor of the previous page, None for the first page.
+
+        Returns:
+        dict: {'assets': [(name, details), ...], 'nextCursor': str/ None, 'total': int}.
+        '''
+        after = query.decodeCursor(cursor)
+        joins = 'FROM assets a JOIN projects p ON p.id = a.projectId '
+        params = []
+        if query.dcc:
+            joins += 'LEFT JOIN dccRecords f ON f.assetId = a.id AND f.dcc = ? '
+            params.append(query.dcc)
+        where = ['p.name = ?']
+        params.append(projName)
+        if query.hasFile is not None:
+            where.append(f'f.filename IS {"NOT " if query.hasFile else ""}NULL')
+        if query.types is not None:
+            where.append(f'a.type IN ({", ".join("?" * len(query.types))})')
+            params += query.types
+        if query.namePrefix: # the query is lowercased already, so is nameKey (LIKE would only fold ascii)
+            where.append('substr(a.nameKey, 1, ?) = ?')
+            params += [len(query.namePrefix), query.namePrefix]
+        if query.nameContains:
+            where.append('instr(a.nameKey, ?) > 0')
+            params.append(query.nameContains)
+        if query.createdAfter:
+            where.append("coalesce(a.creationDate, '') >= ?")
+            params.append(query.createdAfter)
+        if query.createdBefore:
+            where.append("coalesce(a.creationDate, '') < ?")
+            params.append(query.createdBefore)
+
+        keys = self.getSortColumns(query)
+        pageWhere, pageParams = list(where), list(params)
+        if after is not None:
+            if len(after) != len(keys):
+                raise ValueError('The cursor belongs to a listing with another order.')
+            pageWhere.append(f'({", ".join(keys)}) {"<" if query.descending else ">"} ({", ".join("?" * len(keys))})')
+            pageParams += after
+        order = ', '.join(f'{key} {"DESC" if query.descending else "ASC"}' for key in keys)
+
+        with self.lock:
+            total = self.conn.execute(f'SELECT COUNT(*) {joins}WHERE {" AND ".join(where)}', params).fetchone()[0]
+            page = self.conn.execute(
+                f'SELECT a.id, {", ".join(keys)} {joins}WHERE {" AND ".join(pageWhere)} ORDER BY {order} LIMIT ?',
+                pageParams + [query.limit + 1 if query.limit is not None else -1]).fetchall()
+            nextCursor = None
+            if query.limit is not None and len(page) > query.limit: # one extra to know if there is a next page
+                page = page[:query.limit]
+                nextCursor = query.encodeCursor(page[-1][1:])
+
+            assets = {}
+            ids = [row[0] for row in page]
+            for start in range(0, len(ids), 500): # below the sqlite variable limit
+                chunk = ids[start:start + 500]
+                rows = self.conn.execute(
+                    'SELECT a.name, a.type, a.path, a.creationDate, a.extra, d.dcc, d.filename, d.version '
+                    'FROM assets a LEFT JOIN dccRecords d ON d.assetId = a.id '
+                    f'WHERE a.id IN ({", ".join("?" * len(chunk))}) ORDER BY a.id, d.dcc', chunk).fetchall()
+                assets.update(self.rowsToAssets(rows))
+        names = [row[-1] for row in page] # the last sort column is the name
+        return {'assets': [(name, query.project(assets[name])) for name in names], 'nextCursor': nextCursor, 'total': total}
+
+    def insertAsset(self, projId, assetName, assetDetails):
+        '''
+        Writes an asset and its DCC records, replacing the old ones. Expects to be inside a transaction.
+
+        Args:
+        projId (int): The id of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The details of the asset.
+        '''
+        dccs = {}
+        extra = {}
+        for key, value in assetDetails.items():
+            if key in ASSET_FIELDS:
+                continue
+            if value == 'NA' or isinstance(value, dict):
+                dccs[key] = value
+            else:
+                extra[key] = value
+
+        self.conn.execute('DELETE FROM assets WHERE projectId = ? AND name = ?', (projId, assetName))
+        assetId = self.conn.execute(
+            'INSERT INTO assets (projectId, name, nameKey, type, path, creationDate, extra) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (projId, assetName, foldCase(assetName), assetDetails.get('type'), assetDetails.get('path'),
+             assetDetails.get('creationDate'), json.dumps(extra) if extra else None)).lastrowid
+
+        self.conn.executemany(
+            'INSERT INTO dccRecords (assetId, dcc, filename, version) VALUES (?, ?, ?, ?)',
+            [(assetId, dcc, None, None) if value == 'NA' else (assetId, dcc, value.get('filename'), value.get('version'))
+             for dcc, value in dccs.items()])
+
+    def putAsset(self, projName, assetName, assetDetails):
+        '''
+        Adds or replaces an asset in a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The details of the asset.
+        '''
+        with self.lock, self.conn:
+            self.insertAsset(self.getProjectId(projName, create=True), assetName, assetDetails)
+
+    def putAssets(self, projName, assets):
+        '''
+        Adds or replaces many assets in a project in a single transaction.
+
+        Args:
+        projName (str): The name of the project.
+        assets (dict): The details of the assets keyed by their names.
+        '''
+        with self.lock, self.conn:
+            projId = self.getProjectId(projName, create=True)
+            for assetName, assetDetails in assets.items():
+                self.insertAsset(projId, assetName, assetDetails)
+
+    def removeAsset(self, projName, assetName):
+        '''
+        Removes an asset (and its DCC records) from a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        '''
+        with self.lock, self.conn:
+            self.conn.execute(
+                'DELETE FROM assets WHERE name = ? AND projectId = (SELECT id FROM projects WHERE name = ?)',
+                (assetName, projName))
+
+    def lockAssets(self, keys):
+        '''
+        The catalog writes go through sqlite transactions already, nothing more to hold here.
+
+        Args:
+        keys (iterable): (projName, assetName) pairs.
+
+        Returns:
+        contextmanager: A no-op.
+        '''
+        return contextlib.nullcontext()
+
+#-------------------------------------------------------------------------------
+# One-shot migration from the json configs
+#-------------------------------------------------------------------------------
+
+    def importConfigs(self):
+        '''
+        Imports the parent config and all the project configs into the catalog.
+        The config files (json or binary) are left untouched so that they can serve as a backup.
+
+        Returns:
+        bool: True if the configs are imported successfully, False otherwise.
+        str: A message indicating the result of the operation.
+        '''
+        try:
+            projects = loadConfigFile(self.parentConfigPath).get('Projects', {})
+        except FileNotFoundError:
+            return False, 'No parent config to import.'
+        except Exception as e:
+            return False, f'Error reading parent config: {str(e)}'
+
+        assetCount = 0
+        skipped = []
+
+        with self.lock, self.conn:
+            self.saveProjects(projects)
+
+            for projName in projects:
+                try:
+                    assets = loadConfigFile(self.getProjConfigPath(projName)).get('Assets', {})
+                except (OSError, ValueError):
+                    skipped.append(projName) # a broken project config shouldn't stop the rest of the studio from migrating
+                    continue
+
+                projId = self.getProjectId(projName, create=True)
+                for assetName, assetDetails in assets.items():
+                    self.insertAsset(projId, assetName, assetDetails)
+                    assetCount += 1
+
+        msg = f'Imported {len(projects)} projects and {assetCount} assets into the catalog.'
+        if skipped:
+            msg += f' Skipped unreadable project configs: {", ".join(skipped)}'
+        return True, msg
+
+def foldCase(text):
+    '''
+    Returns:
+    str: The text lowercased the way AssetQuery does it (python's lower), None stays None.
+    '''
+    return text.lower() if text is not None else None
+
+tracing.traceMethods(Catalog, 'config', skip=('migrate', 'getProjConfigPath', 'getProjectId', 'rowsToAssets', 'getSortColumns', 'insertAsset', 'close')) # the catalog's reads/ writes are its config load/ save
+
+if __name__ == '__main__':
+    basePath = os.path.join(os.getenv('LOCALAPPDATA'), 'PMT')
+    catalog = Catalog(basePath, os.path.join(basePath, 'Tools', 'PMT_ParentConfig.json'))
+    success, msg = catalog.importConfigs()
+    print(msg)
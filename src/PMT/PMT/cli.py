@@ -0,0 +1,318 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracing
+from query import AssetQuery, SORT_FIELDS
+
+#-----------------------------------------------------------------------------------
+# The headless entry point of the PMT, for scripts, farm jobs and terminals without a display.
+# Same backend as the GUI, but nothing from Qt is imported, and the PMT itself is only imported
+# once the arguments are parsed, so "--help" and typos are instant.
+#
+#   python cli.py projects list
+#   python cli.py --json assets create MyGame Props crate --maya
+#   python cli.py assets list MyGame --dcc Maya --missing --sort creationDate --limit 50
+#   python cli.py export MyGame crate barrel --unreal
+#   python cli.py startup --budget 0.5
+#   python cli.py config export assets.json --project MyGame     (json whatever the FORMAT is)
+#   python cli.py --trace assets copy MyGame crate OtherGame   (chrome trace of the run in Tools/)
+#-----------------------------------------------------------------------------------
+
+STARTUP_BUDGET = 0.5 # seconds a cold "projects list" may take, checked by the startup command and tests/test_startup.py
+HEAVY_MODULES = ('PyQt5', 'tkinter', 'cgitb', 'multiprocessing') # none of these belong in the startup path
+
+def getPMT():
+    '''
+    Imports and creates the backend, deferred so the parsing of the arguments doesn't pay for it.
+
+    Returns:
+    PMT: The PMT object.
+    '''
+    from pmt import PMT
+    return PMT()
+
+def projectsList(args):
+    pmt = getPMT()
+    projects = pmt.projects
+    return True, f'{len(projects)} projects.', [{'name': projName, **projDetails} for projName, projDetails in projects.items()]
+
+def projectsCreate(args):
+    success, msg = getPMT().createProjectFolder(args.name)
+    return success, msg, None
+
+def projectsRename(args):
+    success, msg = getPMT().renameProject(args.old, args.new)
+    return success, msg, None
+
+def projectsDelete(args):
+    success, msg = getPMT().deleteProject(args.name)
+    return success, msg, None
+
+def assetsList(args):
+    pmt = getPMT()
+    if args.project not in pmt.projects:
+        return False, f'Project "{args.project}" not found.', None
+    if args.missing and not args.dcc:
+        return False, '--missing needs a --dcc.', None
+    query = AssetQuery(dcc=args.dcc, hasFile=(not args.missing) if args.dcc else None, types=args.type, namePrefix=args.prefix, nameContains=args.contains,
+                       createdAfter=args.after, createdBefore=args.before, fields=args.fields.split(',') if args.fields else None,
+                       sortBy=args.sort, descending=args.desc, limit=args.limit or None)
+    page = pmt.queryAssets(args.project, query, args.cursor)
+    msg = f'Showing {len(page["assets"])} of {page["total"]} assets in {args.project}.'
+    if page['nextCursor']:
+        msg += f' Next page: --cursor {page["nextCursor"]}'
+    return True, msg, [{'name': assetName, **assetDetails} for assetName, assetDetails in page['assets']]
+
+def assetsCreate(args):
+    success, msg = getPMT().createAsset(args.project, args.type, args.name, args.maya, args.substance)
+    return success, msg, None
+
+def assetsImport(args):
+    success, msg, results = getPMT().createAssets(args.project, args.manifest)
+    return success, msg, results
+
+def assetsRename(args):
+    success, msg = getPMT().renameAsset(args.project, args.old, args.new)
+    return success, msg, None
+
+def assetsDelete(args):
+    success, msg = getPMT().deleteAsset(args.project, args.name, args.dcc)
+    return success, msg, None
+
+def assetsCopy(args):
+    success, msg = getPMT().copyMoveAsset(args.project, args.targets, args.name, move=args.move)
+    return success, msg, None
+
+def export(args):
+    pmt = getPMT()
+    try:
+        if len(args.assets) == 1:
+            success, msg = pmt.exportAssetFromMaya(args.unreal, args.project, args.assets[0], force=args.force)
+            return success, msg, None
+        success, msg, results = pmt.exportAssetsFromMaya(args.project, args.assets, force=args.force) # one maya session for all of them
+        if success and args.unreal:
+            importSuccess, importMsg, _ = pmt.importAssetsToUnreal(args.project, [result['output'] for result in results if result.get('output')])
+            success, msg = importSuccess, f'{msg} {importMsg}'
+        return success, msg, results
+    finally:
+        pmt.shutdownWorkers()
+
+def importPending(args):
+    pmt = getPMT()
+    try:
+        return pmt.importAssetsToUnreal(args.project, force=args.force)
+    finally:
+        pmt.shutdownWorkers()
+
+def search(args):
+    results = getPMT().searchAssets(args.query, args.limit, args.project)
+    return True, f'{len(results)} assets matching "{args.query}".', results
+
+def reconcile(args):
+    success, msg, report = getPMT().reconcile(fix=args.fix)
+    return success, msg, report
+
+def trashList(args):
+    items = getPMT().listTrash()
+    for item in items:
+        item['name'] = item['id']
+        for key in ('deletedAt', 'expiresAt'):
+            item[key] = time.strftime('%Y-%m-%d %H:%M', time.localtime(item[key]))
+        item.pop('assets', None) # the asset records of a deleted project, too much to print
+    return True, f'{len(items)} items in the trash.', items
+
+def trashRestore(args):
+    success, msg = getPMT().restoreFromTrash(args.id)
+    return success, msg, None
+
+def trashEmpty(args):
+    success, msg = getPMT().emptyTrash()
+    return success, msg, None
+
+def configExport(args):
+    success, msg = getPMT().exportConfig(args.out, args.project)
+    return success, msg, None
+
+def startup(args):
+    '''
+    Measures the cold start of the cli ("projects list" in a fresh interpreter) and fails if it's over the budget.
+    Meant to run in CI so a heavy import sneaking into the startup path gets noticed.
+    '''
+    if args.probe: # the child side: report what got imported
+        getPMT().getProjects()
+        heavy = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+        return not heavy, f'Heavy modules imported: {", ".join(heavy)}' if heavy else 'No heavy modules imported.', {'heavyModules': heavy}
+
+    import subprocess
+    import statistics
+
+    times = []
+    probe = None
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, os.path.abspath(__file__), '--json', 'startup', '--probe'], capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if process.returncode not in (0, 1):
+            return False, f'The cli failed to start: {process.stderr.strip()}', None
+        probe = json.loads(process.stdout)
+
+    if not probe['ok']:
+        return False, probe['message'], probe['data']
+    median = statistics.median(times)
+    data = {'median': round(median, 3), 'min': round(min(times), 3), 'max': round(max(times), 3), 'budget': args.budget, 'runs': args.runs, **probe['data']}
+    if median > args.budget:
+        return False, f'Cold start took {median:.3f}s, over the {args.budget}s budget.', data
+    return True, f'Cold start took {median:.3f}s (budget {args.budget}s).', data
+
+def buildParser():
+    '''
+    Returns:
+    argparse.ArgumentParser: The parser with every command.
+    '''
+    parser = argparse.ArgumentParser(prog='pmt', description='Headless Makra\'s PMT.')
+    parser.add_argument('--json', action='store_true', help='print the result as json, for scripts')
+    parser.add_argument('--trace', action='store_true', help='record a chrome trace of the command to Tools/')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    projects = commands.add_parser('projects', help='list/ create/ rename/ delete projects').add_subparsers(dest='action', required=True)
+    projects.add_parser('list').set_defaults(func=projectsList)
+    cmd = projects.add_parser('create')
+    cmd.add_argument('name')
+    cmd.set_defaults(func=projectsCreate)
+    cmd = projects.add_parser('rename')
+    cmd.add_argument('old')
+    cmd.add_argument('new')
+    cmd.set_defaults(func=projectsRename)
+    cmd = projects.add_parser('delete')
+    cmd.add_argument('name')
+    cmd.set_defaults(func=projectsDelete)
+
+    assets = commands.add_parser('assets', help='list/ create/ rename/ delete/ copy assets').add_subparsers(dest='action', required=True)
+    cmd = assets.add_parser('list')
+    cmd.add_argument('project')
+    cmd.add_argument('--dcc', choices=['Maya', 'Substance'], help='only the assets that have a file for this DCC')
+    cmd.add_argument('--missing', action='store_true', help='only the assets that have no file for the --dcc instead')
+    cmd.add_argument('--type', nargs='+', choices=['Characters', 'Environments', 'Props'])
+    cmd.add_argument('--prefix', help='only the assets whose name starts with this')
+    cmd.add_argument('--contains', help='only the assets whose name contains this')
+    cmd.add_argument('--after', help='only the assets created at or after this date, e.g. 2024-05-01')
+    cmd.add_argument('--before', help='only the assets created before this date')
+    cmd.add_argument('--fields', help='the comma separated details to print, e.g. type,path')
+    cmd.add_argument('--sort', choices=SORT_FIELDS, default='name', help='file/ status are the ones of the --dcc')
+    cmd.add_argument('--desc', action='store_true')
+    cmd.add_argument('--limit', type=int, default=100, help='the page size, 0 for every asset')
+    cmd.add_argument('--cursor', help='the cursor printed with the previous page')
+    cmd.set_defaults(func=assetsList)
+    cmd = assets.add_parser('create')
+    cmd.add_argument('project')
+    cmd.add_argument('type', choices=['Characters', 'Environments', 'Props'])
+    cmd.add_argument('name')
+    cmd.add_argument('--maya', action='store_true')
+    cmd.add_argument('--substance', action='store_true')
+    cmd.set_defaults(func=assetsCreate)
+    cmd = assets.add_parser('import', help='create every asset of a csv/ json manifest')
+    cmd.add_argument('project')
+    cmd.add_argument('manifest')
+    cmd.set_defaults(func=assetsImport)
+    cmd = assets.add_parser('rename')
+    cmd.add_argument('project')
+    cmd.add_argument('old')
+    cmd.add_argument('new')
+    cmd.set_defaults(func=assetsRename)
+    cmd = assets.add_parser('delete')
+    cmd.add_argument('project')
+    cmd.add_argument('name')
+    cmd.add_argument('--dcc', choices=['Maya', 'Substance'], required=True)
+    cmd.set_defaults(func=assetsDelete)
+    cmd = assets.add_parser('copy')
+    cmd.add_argument('project')
+    cmd.add_argument('name')
+    cmd.add_argument('targets', nargs='+')
+    cmd.add_argument('--move', action='store_true')
+    cmd.set_defaults(func=assetsCopy)
+
+    cmd = commands.add_parser('export', help='export assets from maya to fbx')
+    cmd.add_argument('project')
+    cmd.add_argument('assets', nargs='+')
+    cmd.add_argument('--unreal', action='store_true', help='also import the fbx files to unreal')
+    cmd.add_argument('--force', action='store_true', help='export even if the fbx is up to date')
+    cmd.set_defaults(func=export)
+
+    cmd = commands.add_parser('import', help='import the new/ changed fbx files of a project to unreal')
+    cmd.add_argument('project')
+    cmd.add_argument('--force', action='store_true', help='import every fbx, not just the pending ones')
+    cmd.set_defaults(func=importPending)
+
+    cmd = commands.add_parser('search', help='search the assets of every project')
+    cmd.add_argument('query')
+    cmd.add_argument('--project')
+    cmd.add_argument('--limit', type=int, default=50)
+    cmd.set_defaults(func=search)
+
+    cmd = commands.add_parser('reconcile', help='check the configs against the disk')
+    cmd.add_argument('--fix', action='store_true', help='rewrite the configs to match the disk')
+    cmd.set_defaults(func=reconcile)
+
+    trash = commands.add_parser('trash', help='list/ restore deleted projects and assets, or free their space now').add_subparsers(dest='action', required=True)
+    trash.add_parser('list').set_defaults(func=trashList)
+    cmd = trash.add_parser('restore')
+    cmd.add_argument('id', help='the id from "trash list"')
+    cmd.set_defaults(func=trashRestore)
+    trash.add_parser('empty').set_defaults(func=trashEmpty)
+
+    config = commands.add_parser('config', help='export the configs as json, whatever the storage format').add_subparsers(dest='action', required=True)
+    cmd = config.add_parser('export')
+    cmd.add_argument('out', help='the json file to write')
+    cmd.add_argument('--project', help='export the assets of this project instead of the projects')
+    cmd.set_defaults(func=configExport)
+
+    cmd = commands.add_parser('startup', help='measure the cold start of the cli against a budget')
+    cmd.add_argument('--budget', type=float, default=STARTUP_BUDGET, help='seconds')
+    cmd.add_argument('--runs', type=int, default=5)
+    cmd.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    cmd.set_defaults(func=startup)
+
+    return parser
+
+def printResult(success, msg, data):
+    '''
+    Prints a result for people, the --json flag prints it for scripts instead.
+    '''
+    print(msg)
+    if isinstance(data, list):
+        for item in data:
+            if isinstance(item, dict):
+                name = item.get('name') or item.get('asset') or item.get('file') or ''
+                details = ', '.join(f'{key}: {value}' for key, value in item.items() if key not in ('name', 'asset', 'file') and not isinstance(value, (dict, list)))
+                print(f'  {name}  {details}')
+            else:
+                print(f'  {item}')
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, list):
+                if value:
+                    print(f'  {key}: {len(value)}')
+            else:
+                print(f'  {key}: {value}')
+
+def main(argv=None):
+    args = buildParser().parse_args(argv)
+    if args.trace:
+        tracing.TRACER.enable() # the PMT points it at Tools/ once it knows the base path
+    try:
+        success, msg, data = args.func(args)
+    except Exception as e:
+        success, msg, data = False, f'Error: {str(e)}', None
+
+    if args.json:
+        print(json.dumps({'ok': success, 'message': msg, 'data': data}, indent=2, default=str))
+    else:
+        printResult(success, msg, data)
+    if args.trace:
+        print(f'Trace written to {tracing.TRACER.dump()}', file=sys.stderr)
+    return 0 if success else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+import os
+import sys
+import errno
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module is the copy engine behind copyMoveAsset.
+# It fans the files (and the target projects) out over a thread pool, lets the
+# kernel do the copying wherever it can and turns same-volume moves into renames.
+#-------------------------------------------------------------------------------
+
+FICLONE = 0x40049409 # linux ioctl to reflink a whole file (btrfs, xfs, ...)
+
+class CopyEngine:
+    '''
+    Copies/moves folder trees with byte level progress.
+    '''
+    def __init__(self, workers=8, largeFileSize=1024 * 1024, progress=None, blobs=None):
+        '''
+        Initializes the copy engine.
+
+        Args:
+        workers (int): The number of files copied at the same time.
+        largeFileSize (int): Files from this size on go through reflink/ copy_file_range/ sendfile.
+        progress (function): Called with (bytesDone, bytesTotal) as the copy goes on.
+        blobs (BlobStore): If given, copies become hardlinks to deduplicated blobs instead of new data.
+        '''
+        self.workers = max(1, workers)
+        self.largeFileSize = largeFileSize
+        self.progress = progress
+        self.blobs = blobs
+        self.lock = threading.Lock()
+        self.bytesDone = 0
+        self.bytesTotal = 0
+        self.canReflink = sys.platform.startswith('linux')
+
+    def reportProgress(self, nbytes):
+        '''
+        Adds to the bytes copied so far and lets the caller know.
+
+        Args:
+        nbytes (int): The number of bytes that were just copied.
+        '''
+        with self.lock:
+            self.bytesDone += nbytes
+            done, total = self.bytesDone, self.bytesTotal
+        if self.progress:
+            self.progress(done, total)
+
+    def planTree(self, src, dst):
+        '''
+        Lists the folders and files of a tree with os.scandir (no extra stat calls on most platforms).
+
+        Args:
+        src (str): The folder to copy.
+        dst (str): Where the folder should end up.
+
+        Returns:
+        list: The folders to create.
+        list: The files to copy as (srcPath, dstPath, size).
+        '''
+        dirs = [dst]
+        files = []
+        stack = [(src, dst)]
+
+        while stack:
+            srcDir, dstDir = stack.pop()
+            with os.scandir(srcDir) as it:
+                for entry in it:
+                    dstPath = os.path.join(dstDir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(dstPath)
+                        stack.append((entry.path, dstPath))
+                    else:
+                        files.append((entry.path, dstPath, entry.stat().st_size))
+
+        return dirs, files
+
+    def copyFile(self, src, dst, size):
+        '''
+        Copies a single file, trying the cheapest way first:
+        reflink (no data copied at all) -> copy_file_range -> sendfile -> plain buffered copy.
+
+        Args:
+        src (str): The file to copy.
+        dst (str): The path to copy it to.
+        size (int): The size of the file.
+        '''
+        if self.blobs is not None and self.blobs.copyFile(src, dst):
+            self.reportProgress(size)
+            return
+
+        if size < self.largeFileSize:
+            shutil.copyfile(src, dst)
+            shutil.copymode(src, dst)
+            self.reportProgress(size)
+            return
+
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            srcFd, dstFd = fsrc.fileno(), fdst.fileno()
+
+            if self.canReflink:
+                try:
+                    import fcntl
+                    fcntl.ioctl(dstFd, FICLONE, srcFd)
+                    self.reportProgress(size)
+                    shutil.copymode(src, dst)
+                    return
+                except (ImportError, OSError):
+                    pass # filesystem can't do it, fall through to an in-kernel copy
+
+            for kernelCopy in (self.copyFileRange, self.sendFile):
+                try:
+                    kernelCopy(srcFd, dstFd, size)
+                    break
+                except (AttributeError, OSError) as e: # AttributeError: not available on this OS
+                    if isinstance(e, OSError) and e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF):
+                        raise
+            else:
+                copied = os.lseek(dstFd, 0, os.SEEK_CUR) # carry on from wherever the kernel copy gave up
+                fsrc.seek(copied)
+                fdst.seek(copied)
+                while True:
+                    chunk = fsrc.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    fdst.write(chunk)
+                    self.reportProgress(len(chunk))
+
+        shutil.copymode(src, dst)
+
+    def copyFileRange(self, srcFd, dstFd, size):
+        '''
+        Copies with os.copy_file_range (linux), the data never comes up to python.
+        Both file offsets move along with the copy.
+        '''
+        offset = os.lseek(dstFd, 0, os.SEEK_CUR)
+        while offset < size:
+            n = os.copy_file_range(srcFd, dstFd, min(size - offset, 64 * 1024 * 1024))
+            if n == 0:
+                break
+            offset += n
+            self.reportProgress(n)
+
+    def sendFile(self, srcFd, dstFd, size):
+        '''
+        Copies with os.sendfile, the fallback for kernels without copy_file_range.
+        Picks up from where the destination offset is.
+        '''
+        offset = os.lseek(dstFd, 0, os.SEEK_CUR)
+        while offset < size:
+            n = os.sendfile(dstFd, srcFd, offset, min(size - offset, 64 * 1024 * 1024))
+            if n == 0:
+                break
+            offset += n
+            self.reportProgress(n)
+
+    def copyTree(self, src, dsts):
+        '''
+        Copies a folder tree to one or more destinations, merging into folders that already exist.
+        Every (file, destination) pair is its own job on the thread pool.
+
+        Args:
+        src (str): The folder to copy.
+        dsts (list): The destination folders.
+
+        Returns:
+        int: The number of bytes copied.
+        '''
+        with tracing.span('copyTree', 'fs', src=src, dsts=list(dsts)) as s:
+            jobs = []
+            for dst in dsts:
+                dirs, files = self.planTree(src, dst)
+                for folder in dirs:
+                    os.makedirs(folder, exist_ok=True)
+                jobs += files
+
+            nbytes = sum(size for _, _, size in jobs)
+            with self.lock:
+                self.bytesTotal += nbytes
+            s.set(files=len(jobs), bytes=nbytes)
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for future in [pool.submit(self.copyFile, *job) for job in jobs]:
+                    future.result() # re-raises the first error
+
+            return nbytes
+
+    def isSameVolume(self, src, dst):
+        '''
+        Checks if a move can be a rename.
+
+        Args:
+        src (str): The folder to move.
+        dst (str): Where the folder should end up.
+        '''
+        parent = os.path.dirname(os.path.abspath(dst))
+        while not os.path.exists(parent):
+            parent = os.path.dirname(parent)
+        return os.stat(src).st_dev == os.stat(parent).st_dev
+
+    def moveTree(self, src, dst):
+        '''
+        Moves a folder. Same volume and nothing at the destination yet means a plain rename,
+        anything else is a copy followed by deleting the source.
+
+        Args:
+        src (str): The folder to move.
+        dst (str): Where the folder should end up.
+
+        Returns:
+        bool: True if the folder was renamed, False if it had to be copied.
+        '''
+        with tracing.span('moveTree', 'fs', src=src, dst=dst) as s:
+            if not os.path.exists(dst) and self.isSameVolume(src, dst):
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                try:
+                    os.rename(src, dst)
+                    s.set(renamed=True)
+                    return True
+                except OSError as e:
+                    if e.errno != errno.EXDEV: # e.g. a bind mount that looked like the same device
+                        raise
+
+            s.set(renamed=False)
+            self.copyTree(src, [dst])
+            shutil.rmtree(src)
+            return False
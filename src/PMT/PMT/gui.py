@@ -5,7 +5,9 @@ import re
 from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
-from pmt import PMT 
+import threading
+from models import AssetTableModel, ProjectListModel, SearchResultsModel
+from guimonitor import MONITOR, timedView
 from functools import partial
 import os
 
@@ -18,20 +20,25 @@ class PMTWindow(QMainWindow):
     '''
     This class defines the main window for the PMT application.
     '''
+    assetsChanged = pyqtSignal(dict) # the deltas of a watcher sync, emitted from the watcher's thread
+    backendLoaded = pyqtSignal(object, str) # (PMT object or None, error message), emitted from the loading thread
+    
     def __init__(self):
         '''
         The constructor for PMTWindow class.
-        - Intializes the PMT object to talk to the backend.
-        - Initializes the project list.
         - Initializes the GUI state stack to keep track of the GUI state for a folder viewer functionality.
-        - After initializing the GUI, it calls the initUI method to set up the GUI.
+        - Calls the initUI method to set up the GUI, with the project list in a loading state.
+        - Starts loading the PMT object (the backend) on a thread, so the window paints right away.
         '''
         super().__init__()
-        self.pmt = PMT()
-        self.projList = self.pmt.getProjects()
+        self.pmt = None # set once the backend is loaded, see onBackendLoaded
+        self.projList = []
         self.guiStateStack = []
+        MONITOR.start() # before the UI is built, so the startup is measured too
         self.initUI()
+        self.loadBackend()
 
+    @timedView
     def initUI(self):
         '''
         The template I always follow to create a PyQt GUI.
@@ -55,8 +62,9 @@ class PMTWindow(QMainWindow):
         '''
         Set up the main layouts for the main window.
         
-        Have divided the main window mainly into 2 sections:
+        Have divided the main window mainly into 3 sections:
         - Create Project
+        - Search Assets
         - Existing Projects        
         '''
         self.centralWidget = QWidget()  
@@ -69,6 +77,11 @@ class PMTWindow(QMainWindow):
         self.createProjGb.setLayout(self.createProjLayout)
         self.mainLayout.addWidget(self.createProjGb) 
         
+        self.searchLayout = QVBoxLayout()
+        self.searchGb = QGroupBox('Search Assets')
+        self.searchGb.setLayout(self.searchLayout)
+        self.mainLayout.addWidget(self.searchGb)
+        
         self.projListLayout = QVBoxLayout()
         self.projListGb = QGroupBox('Existing Projects')
         self.projListGb.setLayout(self.projListLayout)
@@ -83,8 +96,140 @@ class PMTWindow(QMainWindow):
         '''
         self.initStatusBar() # to display error/success messages
         self.initCreateProjGUI()
+        self.initSearchGUI()
         self.initBackBtnGUI()
-        self.initExistingProjGUI()
+        self.initLoadingGUI() # the project list, jobs panel and watcher come with the backend
+        self.initDevPanelGUI()
+        
+    def initLoadingGUI(self):
+        '''
+        Show a loading state in the project list and keep the inputs disabled until the backend is there.
+        '''
+        self.loadingLabel = QLabel('Loading projects...', self)
+        self.loadingLabel.setAlignment(Qt.AlignCenter)
+        self.projListLayout.addWidget(self.loadingLabel)
+        
+        self.loadingBar = QProgressBar(self)
+        self.loadingBar.setRange(0, 0) # busy indicator, we don't know how long it takes
+        self.projListLayout.addWidget(self.loadingBar)
+        
+        for widget in (self.projNameInput, self.createProjBtn, self.searchInput):
+            widget.setEnabled(False)
+        self.statusBar.showMessage('Loading...')
+        
+    def loadBackend(self):
+        '''
+        Create the PMT object on a thread: importing it, reading the configs and the first launch setup of the base folder
+        all happen while the window is already on screen. The result comes back to the GUI thread through a signal.
+        '''
+        self.backendLoaded.connect(self.onBackendLoaded)
+        
+        def load():
+            try:
+                from pmt import PMT # the import itself is part of the cost
+                self.backendLoaded.emit(PMT(), '')
+            except Exception as e:
+                self.backendLoaded.emit(None, str(e))
+        
+        threading.Thread(target=load, name='PMT-backend', daemon=True).start()
+        
+    def onBackendLoaded(self, pmt, error):
+        '''
+        Swap the loading state for the actual project list once the backend is loaded.
+        
+        Args:
+        pmt (PMT): The PMT object, None if loading failed.
+        error (str): What went wrong, if it did.
+        '''
+        if pmt is None:
+            self.loadingLabel.setText(f'Could not load the projects: {error}')
+            self.loadingBar.hide()
+            self.statusBar.showMessage('Loading failed')
+            return
+        
+        self.pmt = pmt
+        for widget in (self.projNameInput, self.createProjBtn, self.searchInput):
+            widget.setEnabled(True)
+        
+        self.initExistingProjGUI() # clears the loading widgets too
+        self.initJobsPanelGUI()
+        self.initWatcher()
+        self.initLagMonitor()
+        if self.pmt.trashEnabled:
+            self.pmt.getTrash() # starts the reclaimer, so what expired since the last session gets freed
+        self.statusBar.showMessage('View/Create Projects')
+        
+    def initWatcher(self):
+        '''
+        Start syncing changes made in explorer/ the DCCs into the configs.
+        The sync itself runs on the watcher's thread, the signal brings the deltas over to the GUI thread.
+        '''
+        self.assetsChanged.connect(self.onAssetsChanged)
+        if self.pmt.watcherEnabled:
+            self.pmt.startWatcher(self.assetsChanged.emit)
+            
+    def onAssetsChanged(self, deltas):
+        '''
+        Refresh only the parts of the GUI the synced assets show up in.
+        
+        Args:
+        deltas (dict): project name -> {'added', 'updated', 'removed'} asset names, as returned by PMT.syncPaths.
+        '''
+        counts = {key: sum(len(delta[key]) for delta in deltas.values()) for key in ('added', 'updated', 'removed')}
+        self.statusBar.showMessage(f'Synced changes from disk: {counts["added"]} added, {counts["updated"]} updated, {counts["removed"]} removed.')
+        
+        if hasattr(self, 'projModel'):
+            self.projModel.setProjects(self.pmt.projects) # same names, just the tooltips (asset counts)
+        
+        if hasattr(self, 'assetModel') and self.assetModel.projName in deltas:
+            delta = deltas[self.assetModel.projName]
+            changed = {assetName: self.pmt.store.getAsset(self.assetModel.projName, assetName) for assetName in delta['added'] + delta['updated']}
+            self.assetModel.updateAssets({assetName: assetDetails for assetName, assetDetails in changed.items() if assetDetails}, delta['removed'])
+        
+        if self.searchInput.text().strip():
+            self.runSearch()
+        
+    def initJobsPanelGUI(self):
+        '''
+        Initialize the dockable panel that lists the background jobs (exports/imports).
+        '''
+        self.jobsPanel = JobsPanel(self, self.pmt)
+        self.jobsPanel.jobFinished.connect(self.statusBar.showMessage)
+        self.addDockWidget(Qt.BottomDockWidgetArea, self.jobsPanel)
+        
+    def initDevPanelGUI(self):
+        '''
+        Initialize the developer panel with the view build times and the GUI stalls, hidden until Ctrl+Shift+D.
+        '''
+        self.devPanel = DevPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.devPanel)
+        self.devPanel.hide()
+        self.devPanelShortcut = QShortcut(QKeySequence('Ctrl+Shift+D'), self)
+        self.devPanelShortcut.activated.connect(lambda: self.devPanel.setVisible(not self.devPanel.isVisible()))
+        
+    def initLagMonitor(self):
+        '''
+        Apply the GUI settings of the path config to the lag monitor, it's been running with the defaults since startup.
+        '''
+        if not self.pmt.lagMonitorEnabled:
+            MONITOR.stop()
+            return
+        MONITOR.start(threshold=self.pmt.lagThreshold)
+        MONITOR.setLogPath(os.path.join(self.pmt.basePath, 'Tools', 'PMT_GuiLag.log'))
+        if self.pmt.devPanelEnabled:
+            self.devPanel.show()
+        
+    def closeEvent(self, event):
+        '''
+        Stop the background jobs (and the DCCs they launched) and the warm workers when the window closes.
+        '''
+        if self.pmt is not None: # closed before the backend finished loading, nothing to stop
+            self.pmt.jobs.shutdown()
+            self.pmt.shutdownWorkers()
+            self.pmt.stopWatcher()
+            self.pmt.search.flush() # don't wait for the delayed save
+        MONITOR.stop()
+        super().closeEvent(event)
         
     def initStatusBar(self):
         '''
@@ -114,6 +259,68 @@ class PMTWindow(QMainWindow):
         self.createProjBtn.clicked.connect(self.onCreateProjBtnClick)
         self.createProjLayout.addWidget(self.createProjBtn)
         
+    def initSearchGUI(self):
+        '''
+        Initialize the search box that finds assets across every project.
+        The query runs a moment after the typing stops, not on every key press.
+        '''
+        self.searchInput = QLineEdit(self)
+        self.searchInput.setPlaceholderText('Search assets in all projects (name, type, file)...')
+        self.searchInput.setClearButtonEnabled(True)
+        self.searchLayout.addWidget(self.searchInput)
+        
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.searchTimer.timeout.connect(self.runSearch)
+        self.searchInput.textChanged.connect(self.searchTimer.start)
+        
+        self.searchModel = SearchResultsModel(self)
+        self.searchView = QTableView(self)
+        self.searchView.setModel(self.searchModel)
+        self.searchView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.searchView.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.searchView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.searchView.verticalHeader().setVisible(False)
+        self.searchView.horizontalHeader().setStretchLastSection(True)
+        self.searchView.setMaximumHeight(180)
+        self.searchView.activated.connect(self.onSearchResultActivated) # double click/ enter
+        self.searchView.hide() # only shown while there's a query
+        self.searchLayout.addWidget(self.searchView)
+        
+    def runSearch(self):
+        '''
+        Search the assets for what's in the search box and show the results.
+        '''
+        query = self.searchInput.text().strip()
+        if not query:
+            self.searchModel.setResults([])
+            self.searchView.hide()
+            return
+        
+        results = self.pmt.searchAssets(query)
+        self.searchModel.setResults(results)
+        self.searchView.setVisible(bool(results))
+        self.statusBar.showMessage(f'{len(results)} assets matching "{query}"' if results else f'No assets matching "{query}"')
+        
+    def onSearchResultActivated(self, index):
+        '''
+        Jump to the project of the search result and select the asset in its Maya view.
+        '''
+        result = index.data(SearchResultsModel.ResultRole)
+        if result['project'] not in self.pmt.projects:
+            self.statusBar.showMessage(f'Project {result["project"]} does not exist anymore.')
+            return
+        
+        self.guiStateStack = [] # jumping in from anywhere, back should lead home
+        self.openProj(result['project'])
+        self.showAssets(result['project'], 'Maya')
+        
+        row = self.assetModel.fetchUntil(result['asset']) # it may be a few pages down
+        if row is not None:
+            self.assetView.selectRow(row)
+            self.assetView.scrollTo(self.assetModel.index(row, AssetTableModel.NAME), QAbstractItemView.PositionAtCenter)
+        
     def onCreateProjBtnClick(self):
         '''
         Create a new project based on the project name entered in the input field.
@@ -143,9 +350,12 @@ class PMTWindow(QMainWindow):
         self.backBtn.clicked.connect(self.onBackBtnClick)
         self.backLayout.addWidget(self.backBtn, alignment=Qt.AlignRight)
             
+    @timedView
     def initExistingProjGUI(self):
         '''
         Initialize the GUI components for viewing existing projects.
+        The projects live in a list model that is kept across navigations and hands its rows to the view in batches,
+        so coming back to the home screen with hundreds of projects is instant.
         '''
         self.clearExistingProjGUI() # clear the existing project list before populating it again
         self.pushGUIState(None) # clear the GUI state stack
@@ -153,34 +363,54 @@ class PMTWindow(QMainWindow):
         
         self.pmt.currProj = None
         self.projList = self.pmt.getProjects()
-
-        for proj in self.projList:
-            if proj == 'Studio Assets': # don't show the studio assets project in the list as it should be shown separately
-                continue
-            
-            projGb = QGroupBox(proj)
-            projGb.setFixedHeight(80) # to keep the real estate taken by each project group box fixed
-            projGbLayout = QHBoxLayout()
-            projGb.setLayout(projGbLayout)
-
-            openBtn = QPushButton('Open', self)
-            openBtn.clicked.connect(partial(self.openProj, proj))
-            projGbLayout.addWidget(openBtn)
-
-            renameBtn = QPushButton('Rename', self)
-            renameBtn.clicked.connect(partial(self.createRenameProjGUI, proj, projGbLayout))
-            projGbLayout.addWidget(renameBtn)
-
-            deleteBtn = QPushButton('Delete', self)
-            deleteBtn.clicked.connect(partial(self.deleteProj, proj))
-            projGbLayout.addWidget(deleteBtn)
-
-            self.projListLayout.addWidget(projGb)
+        
+        if not hasattr(self, 'projModel'):
+            self.projModel = ProjectListModel(self)
+            self.projModel.renameRequested.connect(lambda oldName, newName: self.renameProj(newName, oldName), Qt.QueuedConnection) # not while the editor is still closing
+        self.projModel.setProjects(self.pmt.projects) # only resets the rows if the projects changed
+        
+        projFilterInput = QLineEdit(self)
+        projFilterInput.setPlaceholderText('Filter projects...')
+        projFilterInput.setText(self.projModel.filterText) # the filter survives navigating around too
+        projFilterInput.textChanged.connect(self.projModel.setFilter)
+        self.projListLayout.addWidget(projFilterInput)
+        
+        self.projView = QListView(self)
+        self.projView.setModel(self.projModel)
+        self.projView.setUniformItemSizes(True) # no measuring every row
+        self.projView.setEditTriggers(QAbstractItemView.EditKeyPressed) # F2 renames, double click opens
+        self.projView.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.projView.customContextMenuRequested.connect(self.showProjContextMenu)
+        self.projView.activated.connect(lambda index: self.openProj(index.data(ProjectListModel.ProjectNameRole)))
+        self.projListLayout.addWidget(self.projView)
             
         self.studioAssetsBtn = QPushButton('Studio Assets', self)
         self.studioAssetsBtn.clicked.connect(lambda: self.openProj('Studio Assets'))
-        self.projListLayout.addWidget(self.studioAssetsBtn) 
-            
+        self.projListLayout.addWidget(self.studioAssetsBtn)
+        
+        self.trashBtn = QPushButton('Trash', self)
+        self.trashBtn.clicked.connect(self.openTrashDialog)
+        self.projListLayout.addWidget(self.trashBtn)
+        
+    def showProjContextMenu(self, pos):
+        '''
+        Show the Open/Rename/Delete actions for the project under the cursor.
+        
+        Args:
+        pos (QPoint): Where the view was right clicked.
+        '''
+        index = self.projView.indexAt(pos)
+        if not index.isValid():
+            return
+        
+        projName = index.data(ProjectListModel.ProjectNameRole)
+        menu = QMenu(self)
+        menu.addAction('Open', partial(self.openProj, projName))
+        menu.addAction('Rename', lambda: self.projView.edit(index)) # edits the row in place, renameProj is called once it's committed
+        menu.addAction('Delete', partial(self.deleteProj, projName))
+        menu.exec_(self.projView.viewport().mapToGlobal(pos))
+
+    @timedView
     def openProj(self, projName):
         '''
         This function opens a project and shows the assets for the project based on the project name.
@@ -214,6 +444,10 @@ class PMTWindow(QMainWindow):
                 createEngineSrcBtn.setText('Open Unreal Project')
                 unrealProjectPath = os.path.join(self.pmt.projects[projName]['path'], 'Game Engine Depot', f'{projName}.uproject')
                 createEngineSrcBtn.clicked.connect(lambda: self.openAsset(unrealProjectPath))
+                
+                importPendingBtn = QPushButton('Import Pending to Unreal', self) # every new/changed FBX of the intermediate depot in one editor launch
+                importPendingBtn.clicked.connect(partial(self.importPendingAssets, projName))
+                self.projListLayout.addWidget(importPendingBtn)
             else:
                 createEngineSrcBtn.clicked.connect(lambda: self.onCreateUnrealProjBtnClick(projName))
             
@@ -229,15 +463,17 @@ class PMTWindow(QMainWindow):
         self.projListLayout.addWidget(projGBox)
         self.statusBar.showMessage(f'Opened Project: {projName}')
 
+    @timedView
     def showAssets(self, projName, dccType):
         '''
         This function shows the assets for a project based on the DCC type.
+        The assets live in a table model that pulls them from the store a page at a time as the view scrolls.
+        Sorting and filtering by name, type and DCC status are part of its query, the per asset actions go through a context menu.
         
         Args:
         projName (str): The name of the project.
         dccType (str): The DCC type to show assets for.
         '''
-        assets = self.pmt.getAssets(projName=projName, dccType=dccType)
         self.clearExistingProjGUI()
         self.pushGUIState(dccType)
 
@@ -245,85 +481,138 @@ class PMTWindow(QMainWindow):
         projGBoxLayout = QVBoxLayout()
         projGBox.setLayout(projGBoxLayout)
         
-        typeGroupBoxes = {}
-
-        for assetName, assetDetails in assets.items(): 
-            assetType = assetDetails['type'] 
-            if assetType not in typeGroupBoxes:
-                typeGroupBox = QGroupBox(f'{assetType} Assets') # group the assets based on their type
-                typeGroupBoxLayout = QVBoxLayout()
-                typeGroupBox.setLayout(typeGroupBoxLayout)
-                typeGroupBoxes[assetType] = typeGroupBox
-                projGBoxLayout.addWidget(typeGroupBox)
-
-            if assetDetails[dccType] != 'NA':
-                assetBoxName = f'{assetName} - {assetDetails[dccType]["filename"]}'
-            else:
-                assetBoxName = f'{assetName} - No {dccType} Asset'
-    
-            assetBox = QGroupBox(assetBoxName)
-            assetBox.setFixedHeight(80)
-            assetBoxLayout = QHBoxLayout()
-            assetBox.setLayout(assetBoxLayout)
-    
-            if assetDetails[dccType] != 'NA':
-                openBtn = QPushButton('Open', self)
-                renameBtn = QPushButton('Rename', self)
-                copyMoveBtn = QPushButton('Copy/Move', self)
-                exportBtn = QPushButton('Export', self)
-                deleteBtn = QPushButton('Delete', self)
+        if not hasattr(self, 'assetModel'): # the models outlive the views, only their rows change
+            self.assetModel = AssetTableModel(self)
             
-                if dccType == 'Substance': # as I coulnd't find a way to export from substance yet, will do in post
-                    exportBtn.setEnabled(False)
+        self.assetModel.setAssets(partial(self.pmt.queryAssets, projName), dccType, projName, sortBy='type') # grouped by type like it used to be, the filter widgets below start out empty
+        
+        filterLayout = QHBoxLayout()
+        
+        nameFilterInput = QLineEdit(self)
+        nameFilterInput.setPlaceholderText('Filter by name...')
+        nameFilterInput.textChanged.connect(self.assetModel.setNameFilter)
+        filterLayout.addWidget(nameFilterInput)
+        
+        typeFilterCombo = QComboBox(self)
+        typeFilterCombo.addItem('All Types', None)
+        for assetType in self.pmt.getAssetTypes(projName): # not just the types of the first page
+            typeFilterCombo.addItem(assetType, assetType)
+        typeFilterCombo.currentIndexChanged.connect(lambda i: self.assetModel.setTypeFilter(typeFilterCombo.itemData(i)))
+        filterLayout.addWidget(typeFilterCombo)
+        
+        statusFilterCombo = QComboBox(self)
+        statusFilterCombo.addItem('All', None)
+        statusFilterCombo.addItem(f'With {dccType} File', AssetTableModel.HAS_FILE)
+        statusFilterCombo.addItem(f'No {dccType} File', AssetTableModel.MISSING)
+        statusFilterCombo.currentIndexChanged.connect(lambda i: self.assetModel.setStatusFilter(statusFilterCombo.itemData(i)))
+        filterLayout.addWidget(statusFilterCombo)
+        
+        if dccType == 'Maya': # batch export only makes sense for maya for now
+            exportSelectedBtn = QPushButton('Export Selected', self)
+            exportSelectedBtn.clicked.connect(partial(self.exportSelectedAssets, projName))
+            filterLayout.addWidget(exportSelectedBtn)
             
-                openBtn.clicked.connect(partial(self.openAsset, os.path.join(assetDetails['path'], dccType, assetDetails[dccType]['filename'])))     
-                renameBtn.clicked.connect(partial(self.openRenameAssetDialog, assetName, dccType))
-                copyMoveBtn.clicked.connect(partial(self.openCopyMoveAssetDialog, assetName, dccType))
-                exportBtn.clicked.connect(partial(self.openExportAssetDialog, assetName, dccType))       
-                deleteBtn.clicked.connect(partial(self.delAsset, projName, assetName, dccType))
-    
-                assetBoxLayout.addWidget(openBtn)
-                assetBoxLayout.addWidget(renameBtn)
-                assetBoxLayout.addWidget(copyMoveBtn)
-                assetBoxLayout.addWidget(exportBtn)
-                assetBoxLayout.addWidget(deleteBtn)
-            else:
-                createBtn = QPushButton(f'Create {dccType} Asset', self)
-                createBtn.clicked.connect(partial(self.createDCCFiles, projName, assetDetails['type'], assetName, dccType))
-                assetBoxLayout.addWidget(createBtn)
-    
-            typeGroupBoxes[assetType].layout().addWidget(assetBox)
+        projGBoxLayout.addLayout(filterLayout)
+        
+        self.assetView = QTableView(self)
+        self.assetView.setModel(self.assetModel)
+        self.assetView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.assetView.setSelectionMode(QAbstractItemView.ExtendedSelection) # ctrl/shift click for Export Selected
+        self.assetView.horizontalHeader().setSortIndicator(AssetTableModel.TYPE, Qt.AscendingOrder) # grouped by type like it used to be
+        self.assetView.setSortingEnabled(True) # same order as the model already has, so no second query
+        self.assetView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed) # no measuring every row
+        self.assetView.verticalHeader().setVisible(False)
+        self.assetView.horizontalHeader().setStretchLastSection(True)
+        self.assetView.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.assetView.customContextMenuRequested.connect(partial(self.showAssetContextMenu, projName, dccType))
+        self.assetView.doubleClicked.connect(partial(self.onAssetDoubleClick, projName, dccType))
+        projGBoxLayout.addWidget(self.assetView)
 
         self.projListLayout.addWidget(projGBox)
-        self.statusBar.showMessage(f'Opened {dccType} Assets for Project: {projName}')         
-    
-    def createRenameProjGUI(self, projName, layout):
+        self.statusBar.showMessage(f'Opened {dccType} Assets for Project: {projName} ({self.assetModel.total} assets)')         
+        
+    def getSelectedAssets(self):
         '''
-        Create a GUI to rename a project.
-
+        Returns:
+        list: (asset name, asset details) of every selected row of the asset view.
+        '''
+        return [(index.data(AssetTableModel.AssetNameRole), index.data(AssetTableModel.AssetDetailsRole))
+                for index in self.assetView.selectionModel().selectedRows()]
+        
+    def showAssetContextMenu(self, projName, dccType, pos):
+        '''
+        Show the actions for the asset under the cursor, they used to be a row of buttons on every asset.
+        
         Args:
-        projName (str): The name of the project to rename.
-        layout (QLayout): The layout to add the rename GUI to.        
+        projName (str): The name of the project.
+        dccType (str): The DCC type of the view.
+        pos (QPoint): Where the view was right clicked.
         '''
-        for i in range(layout.count()): # hide the existing project group box and show the rename GUI
-            widget = layout.itemAt(i).widget()
-            if widget:
-                widget.setVisible(False)  
-                
-        renameInput = QLineEdit(projName)
-        layout.addWidget(renameInput)
+        index = self.assetView.indexAt(pos)
+        if not index.isValid():
+            return
+        
+        assetName = index.data(AssetTableModel.AssetNameRole)
+        assetDetails = index.data(AssetTableModel.AssetDetailsRole)
+        menu = QMenu(self)
+        
+        if assetDetails[dccType] != 'NA':
+            menu.addAction('Open', partial(self.openAsset, os.path.join(assetDetails['path'], dccType, assetDetails[dccType]['filename'])))
+            menu.addAction('Rename', partial(self.openRenameAssetDialog, assetName, dccType))
+            menu.addAction('Copy/Move', partial(self.openCopyMoveAssetDialog, assetName, dccType))
+            exportAction = menu.addAction('Export', partial(self.openExportAssetDialog, assetName, dccType))
+            exportAction.setEnabled(dccType != 'Substance') # as I coulnd't find a way to export from substance yet, will do in post
+            menu.addAction('Delete', partial(self.delAsset, projName, assetName, dccType))
+        else:
+            menu.addAction(f'Create {dccType} Asset', partial(self.createDCCFiles, projName, assetDetails['type'], assetName, dccType))
+            
+        selectedCount = len(self.assetView.selectionModel().selectedRows())
+        if dccType == 'Maya' and selectedCount > 1:
+            menu.addSeparator()
+            menu.addAction(f'Export Selected ({selectedCount})', partial(self.exportSelectedAssets, projName))
+        
+        menu.exec_(self.assetView.viewport().mapToGlobal(pos))
         
-        confirmBtn = QPushButton('Confirm', self)
-        confirmBtn.clicked.connect(lambda checked, projName=projName, layout=layout: self.renameProj(renameInput.text().strip(), projName))
-        layout.addWidget(confirmBtn)
+    def onAssetDoubleClick(self, projName, dccType, index):
+        '''
+        Open the asset that was double clicked, or create its file if it doesn't have one for this DCC.
+        '''
+        assetName = index.data(AssetTableModel.AssetNameRole)
+        assetDetails = index.data(AssetTableModel.AssetDetailsRole)
         
-        cancelBtn = QPushButton('Cancel', self)
-        cancelBtn.clicked.connect(lambda checked, layout=layout: self.initExistingProjGUI())
-        layout.addWidget(cancelBtn)
+        if assetDetails[dccType] != 'NA':
+            self.openAsset(os.path.join(assetDetails['path'], dccType, assetDetails[dccType]['filename']))
+        else:
+            self.createDCCFiles(projName, assetDetails['type'], assetName, dccType)
+    
+    def exportSelectedAssets(self, projName):
+        '''
+        Export all the selected assets in one Maya session as a background job.
+        Calls the submitBatchExport method from the PMT class.
         
-        renameInput.setFocus() # some UX haha
-        renameInput.selectAll()
+        Args:
+        projName (str): The name of the project.
+        '''
+        assetNames = [assetName for assetName, assetDetails in self.getSelectedAssets() if assetDetails.get('Maya', 'NA') != 'NA']
         
+        if not assetNames:
+            self.statusBar.showMessage('No assets selected to export')
+            return
+        
+        job = self.pmt.submitBatchExport(projName, assetNames)
+        self.statusBar.showMessage(f'{job.name} queued, see the Jobs panel')
+    
+    def importPendingAssets(self, projName):
+        '''
+        Import every new or changed FBX of the project to Unreal as a background job.
+        Calls the submitBatchImport method from the PMT class.
+        
+        Args:
+        projName (str): The name of the project.
+        '''
+        job = self.pmt.submitBatchImport(projName)
+        self.statusBar.showMessage(f'{job.name} queued, see the Jobs panel')
+    
     def renameProj(self, newName, oldName):
         '''
         Meant to call the renameProject method from the PMT class and update the GUI accordingly.
@@ -403,6 +692,15 @@ class PMTWindow(QMainWindow):
         if self.createAssetDialog.exec_():
             self.statusBar.showMessage('Opened Asset Creator!')
             
+    def openTrashDialog(self):
+        '''
+        Open the trash dialog (class defined below), a restored project shows up in the list right after.
+        '''
+        self.trashDialog = TrashDialog(self, self.pmt)
+        self.trashDialog.exec_()
+        if self.trashDialog.restored:
+            self.initExistingProjGUI()
+            
     def openCopyMoveAssetDialog(self, currAsset, dccType):
         '''
         Open the copy/move asset dialog (class defined below).
@@ -526,6 +824,7 @@ class CreateAssetDialog(QDialog):
         self.pmt = pmt
         self.initUI()
         
+    @timedView
     def initUI(self):
         '''
         Again, my typical template to create a PyQt GUI.
@@ -661,6 +960,7 @@ class CopyMoveAssetDialog(QDialog):
         self.pmt = pmt
         self.initUI()
         
+    @timedView
     def initUI(self):
         '''
         The template I always follow to create a PyQt GUI.
@@ -791,6 +1091,7 @@ class RenameAssetDialog(QDialog):
         self.pmt = pmt
         self.initUI()
         
+    @timedView
     def initUI(self):
         '''
         The template I always follow to create a PyQt GUI.
@@ -896,6 +1197,7 @@ class ExportAssetDialog(QDialog):
         self.pmt = pmt
         self.initUI()
         
+    @timedView
     def initUI(self):
         '''
         The template I always follow to create a PyQt GUI.
@@ -936,6 +1238,9 @@ class ExportAssetDialog(QDialog):
         self.engineChk.setChecked(True)
         self.mainLayout.addWidget(self.engineChk)
         
+        self.forceChk = QCheckBox('Force re-export', self) # unchanged scenes are skipped otherwise
+        self.mainLayout.addWidget(self.forceChk)
+        
     def initExportBtnGUI(self):
         '''
         The Export button to export the asset based on the selected export option.
@@ -946,13 +1251,389 @@ class ExportAssetDialog(QDialog):
     
     def onExportBtnClick(self):
         '''
-        Export the asset based on the selected export option.
-        Calls the exportAssetFromMaya method from the PMT class.  
+        Queue the export of the asset based on the selected export option.
+        Calls the submitExport method from the PMT class, the export itself runs in the background
+        and shows up in the Jobs panel of the main window.
         '''
-        success, msg = self.pmt.exportAssetFromMaya(self.engineChk.isChecked())
+        job = self.pmt.submitExport(self.pmt.currProj, self.pmt.currAsset, self.engineChk.isChecked(), self.forceChk.isChecked())
         
-        if success:
-            QMessageBox.information(self, 'Success', msg)
-            self.accept()
-        else:
-            QMessageBox.critical(self, 'Error', msg)
\ No newline at end of file
+        QMessageBox.information(self, 'Export Queued', f'{job.name} queued. You can follow it in the Jobs panel.')
+        self.accept()
+        
+#-------------------------------------------------------------------------------------------
+# The class below is meant to create a dialog box for restoring deleted projects/assets.
+#-------------------------------------------------------------------------------------------
+
+class TrashDialog(QDialog):
+    '''
+    This class defines the dialog box listing what's in the trash, to restore it or free the space now.
+    '''
+    def __init__(self, parent=None, pmt=None):
+        '''
+        The constructor for TrashDialog class.
+        
+        Args:
+        parent (QWidget): The parent widget.
+        pmt (PMT): The PMT object to talk to the backend.
+        '''
+        super(TrashDialog, self).__init__(parent)
+        self.pmt = pmt
+        self.restored = False
+        self.initUI()
+        
+    @timedView
+    def initUI(self):
+        '''
+        The template I always follow to create a PyQt GUI.
+        '''
+        self.initWindow()
+        self.initLayouts()
+        self.initComponents()
+        
+    def initWindow(self):
+        '''
+        Set up the dialog box properties and display it.
+        '''
+        self.setWindowTitle('Trash')
+        self.setWindowIcon(QIcon('Files/logo.png'))
+        
+        self.setGeometry(300, 300, 600, 300)
+        self.show()
+        
+    def initLayouts(self):
+        '''
+        Set up the layouts for the dialog box.
+        
+        Divided the dialog box into 2 sections:
+        - Trash Table
+        - Buttons
+        '''
+        self.mainLayout = QVBoxLayout(self)
+        self.btnLayout = QHBoxLayout()
+        
+    def initComponents(self):
+        '''
+        Initialize the components that go into the layouts.
+        '''
+        self.initTrashTableGUI()
+        self.initBtnsGUI()
+        self.refreshItems()
+        
+    def initTrashTableGUI(self):
+        '''
+        Initialize the table that lists the deleted items.
+        '''
+        self.trashTable = QTableWidget(0, 4, self)
+        self.trashTable.setHorizontalHeaderLabels(['Item', 'Project', 'Deleted', 'Freed After'])
+        self.trashTable.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.trashTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.trashTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.trashTable.verticalHeader().setVisible(False)
+        self.mainLayout.addWidget(self.trashTable)
+        
+    def initBtnsGUI(self):
+        '''
+        Initialize the buttons to restore the selected items and to empty the trash.
+        '''
+        self.restoreBtn = QPushButton('Restore Selected', self)
+        self.restoreBtn.clicked.connect(self.onRestoreBtnClick)
+        self.btnLayout.addWidget(self.restoreBtn)
+        
+        self.emptyBtn = QPushButton('Empty Trash', self)
+        self.emptyBtn.clicked.connect(self.onEmptyBtnClick)
+        self.btnLayout.addWidget(self.emptyBtn)
+        
+        self.mainLayout.addLayout(self.btnLayout)
+        
+    def refreshItems(self):
+        '''
+        Fill the table with what's in the trash, newest first.
+        '''
+        items = self.pmt.listTrash()
+        self.trashTable.setRowCount(len(items))
+        for row, item in enumerate(items):
+            if item['kind'] == 'project':
+                label = f'Project {item["project"]}'
+            elif item['kind'] == 'asset':
+                label = f'Asset {item["asset"]}'
+            else:
+                label = f'{item["dcc"]} files of {item["asset"]}'
+            labelItem = QTableWidgetItem(label)
+            labelItem.setData(Qt.UserRole, item['id']) # so that restore knows which item a row is
+            labelItem.setData(Qt.UserRole + 1, item['kind'])
+            self.trashTable.setItem(row, 0, labelItem)
+            self.trashTable.setItem(row, 1, QTableWidgetItem(item['project']))
+            self.trashTable.setItem(row, 2, QTableWidgetItem(QDateTime.fromSecsSinceEpoch(int(item['deletedAt'])).toString('yyyy-MM-dd hh:mm')))
+            self.trashTable.setItem(row, 3, QTableWidgetItem(QDateTime.fromSecsSinceEpoch(int(item['expiresAt'])).toString('yyyy-MM-dd hh:mm')))
+        
+    def onRestoreBtnClick(self):
+        '''
+        Restore the selected items, projects first so their assets have somewhere to go back to.
+        '''
+        order = ('project', 'asset', 'dcc')
+        rows = sorted(self.trashTable.selectionModel().selectedRows(), key=lambda index: order.index(self.trashTable.item(index.row(), 0).data(Qt.UserRole + 1)))
+        msgs = []
+        for index in rows:
+            success, msg = self.pmt.restoreFromTrash(self.trashTable.item(index.row(), 0).data(Qt.UserRole))
+            self.restored = self.restored or success
+            msgs.append(msg)
+        if msgs:
+            QMessageBox.information(self, 'Restore', '\n'.join(msgs))
+        self.refreshItems()
+        
+    def onEmptyBtnClick(self):
+        '''
+        Free the space of everything in the trash now, on a background job as it can take a while.
+        '''
+        if QMessageBox.question(self, 'Empty Trash', 'Delete everything in the trash for good?') != QMessageBox.Yes:
+            return
+        job = self.pmt.jobs.submit('Empty Trash', self.pmt.emptyTrash)
+        self.parent().statusBar.showMessage(f'{job.name} queued, see the Jobs panel')
+        self.accept()
+            
+#-------------------------------------------------------------------------------------------
+# The class below is the dockable panel that shows the background jobs of the PMT.
+#-------------------------------------------------------------------------------------------
+
+class JobsPanel(QDockWidget):
+    '''
+    This class defines the panel listing the queued/running/finished jobs with their progress.
+    The jobs run on their own threads, so the panel just polls them on a timer instead of being called from those threads.
+    '''
+    jobFinished = pyqtSignal(str) # emitted with the job's message when a job finishes
+    
+    def __init__(self, parent=None, pmt=None):
+        '''
+        The constructor for JobsPanel class.
+        
+        Args:
+        parent (QWidget): The parent widget.
+        pmt (PMT): The PMT object to talk to the backend.
+        '''
+        super(JobsPanel, self).__init__('Jobs', parent)
+        self.pmt = pmt
+        self.reportedJobs = set() # finished jobs we already told the main window about
+        self.initUI()
+        
+    @timedView
+    def initUI(self):
+        '''
+        The template I always follow to create a PyQt GUI.
+        '''
+        self.initLayouts()
+        self.initComponents()
+        
+    def initLayouts(self):
+        '''
+        Set up the layouts for the panel.
+        
+        Divided the panel into 2 sections:
+        - Jobs Table
+        - Buttons
+        '''
+        self.container = QWidget(self)
+        self.mainLayout = QVBoxLayout(self.container)
+        self.btnLayout = QHBoxLayout()
+        self.setWidget(self.container)
+        
+    def initComponents(self):
+        '''
+        Initialize the components that go into the layouts.
+        '''
+        self.initJobsTableGUI()
+        self.initBtnsGUI()
+        self.initRefreshTimer()
+        
+    def initJobsTableGUI(self):
+        '''
+        Initialize the table that lists the jobs.
+        '''
+        self.jobsTable = QTableWidget(0, 4, self.container)
+        self.jobsTable.setHorizontalHeaderLabels(['Job', 'Status', 'Progress', 'Message'])
+        self.jobsTable.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.jobsTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.jobsTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.jobsTable.verticalHeader().setVisible(False)
+        self.mainLayout.addWidget(self.jobsTable)
+        
+    def initBtnsGUI(self):
+        '''
+        Initialize the buttons to cancel a job and to clear the finished ones.
+        '''
+        self.cancelBtn = QPushButton('Cancel Selected', self.container)
+        self.cancelBtn.clicked.connect(self.onCancelBtnClick)
+        self.btnLayout.addWidget(self.cancelBtn)
+        
+        self.clearBtn = QPushButton('Clear Finished', self.container)
+        self.clearBtn.clicked.connect(self.onClearBtnClick)
+        self.btnLayout.addWidget(self.clearBtn)
+        
+        self.mainLayout.addLayout(self.btnLayout)
+        
+    def initRefreshTimer(self):
+        '''
+        Poll the jobs twice a second to keep the table up to date.
+        '''
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.timeout.connect(self.refreshJobs)
+        self.refreshTimer.start(500)
+        
+    def refreshJobs(self):
+        '''
+        Update the table with the current state of the jobs.
+        '''
+        jobs = self.pmt.jobs.getJobs()
+        
+        if self.jobsTable.rowCount() != len(jobs):
+            self.jobsTable.setRowCount(len(jobs))
+            
+        for row, job in enumerate(jobs):
+            nameItem = QTableWidgetItem(job.name)
+            nameItem.setData(Qt.UserRole, job.id) # so that cancel knows which job a row is
+            self.jobsTable.setItem(row, 0, nameItem)
+            self.jobsTable.setItem(row, 1, QTableWidgetItem(job.status))
+            
+            progressBar = self.jobsTable.cellWidget(row, 2)
+            if progressBar is None:
+                progressBar = QProgressBar()
+                self.jobsTable.setCellWidget(row, 2, progressBar)
+            progressBar.setValue(int(job.progress * 100))
+            
+            self.jobsTable.setItem(row, 3, QTableWidgetItem(job.message.strip().splitlines()[-1] if job.message.strip() else ''))
+            
+            if job.isFinished() and job.id not in self.reportedJobs:
+                self.reportedJobs.add(job.id)
+                self.jobFinished.emit(f'{job.name}: {job.status}')
+                
+    def onCancelBtnClick(self):
+        '''
+        Cancel the selected jobs.
+        '''
+        for index in self.jobsTable.selectionModel().selectedRows():
+            jobId = self.jobsTable.item(index.row(), 0).data(Qt.UserRole)
+            self.pmt.jobs.cancel(jobId)
+        self.refreshJobs()
+        
+    def onClearBtnClick(self):
+        '''
+        Remove the finished jobs from the table.
+        '''
+        self.pmt.jobs.clearFinished()
+        self.jobsTable.setRowCount(0)
+        self.refreshJobs()
+
+#-------------------------------------------------------------------------------------------
+# The class below is the developer panel, it shows what the lag monitor measured.
+#-------------------------------------------------------------------------------------------
+
+class DevPanel(QDockWidget):
+    '''
+    This class defines the panel with the build times of the views and the stalls of the event loop.
+    It reads them from the lag monitor every second while it's visible.
+    '''
+    def __init__(self, parent=None):
+        '''
+        The constructor for DevPanel class.
+        
+        Args:
+        parent (QWidget): The parent widget.
+        '''
+        super(DevPanel, self).__init__('Developer', parent)
+        self.initUI()
+        
+    def initUI(self):
+        '''
+        The template I always follow to create a PyQt GUI.
+        '''
+        self.initLayouts()
+        self.initComponents()
+        
+    def initLayouts(self):
+        '''
+        Set up the layouts for the panel.
+        
+        Divided the panel into 3 sections:
+        - View Timings
+        - Stalls
+        - Buttons
+        '''
+        self.container = QWidget(self)
+        self.mainLayout = QVBoxLayout(self.container)
+        self.btnLayout = QHBoxLayout()
+        self.setWidget(self.container)
+        
+    def initComponents(self):
+        '''
+        Initialize the components that go into the layouts.
+        '''
+        self.initViewsTableGUI()
+        self.initStallsTableGUI()
+        self.initBtnsGUI()
+        self.initRefreshTimer()
+        
+    def initViewsTableGUI(self):
+        '''
+        Initialize the table with the build times of the views, in ms.
+        '''
+        self.mainLayout.addWidget(QLabel('View build times (ms)', self.container))
+        self.viewsTable = QTableWidget(0, 5, self.container)
+        self.viewsTable.setHorizontalHeaderLabels(['View', 'Count', 'Mean', 'Max', 'Last'])
+        self.viewsTable.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.viewsTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.viewsTable.verticalHeader().setVisible(False)
+        self.mainLayout.addWidget(self.viewsTable)
+        
+    def initStallsTableGUI(self):
+        '''
+        Initialize the table with the latest stalls, newest first.
+        '''
+        self.mainLayout.addWidget(QLabel('Stalls', self.container))
+        self.stallsTable = QTableWidget(0, 3, self.container)
+        self.stallsTable.setHorizontalHeaderLabels(['Time', 'ms', 'Action'])
+        self.stallsTable.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.stallsTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stallsTable.verticalHeader().setVisible(False)
+        self.mainLayout.addWidget(self.stallsTable)
+        
+    def initBtnsGUI(self):
+        '''
+        Initialize the button to clear the stats.
+        '''
+        self.clearBtn = QPushButton('Clear', self.container)
+        self.clearBtn.clicked.connect(self.onClearBtnClick)
+        self.btnLayout.addWidget(self.clearBtn)
+        self.mainLayout.addLayout(self.btnLayout)
+        
+    def initRefreshTimer(self):
+        '''
+        Refresh the tables every second, only while the panel is shown.
+        '''
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.timeout.connect(self.refreshStats)
+        self.visibilityChanged.connect(lambda visible: self.refreshTimer.start(1000) if visible else self.refreshTimer.stop())
+        
+    def refreshStats(self):
+        '''
+        Update the tables with what the lag monitor measured so far.
+        '''
+        views = MONITOR.getViewStats()
+        self.viewsTable.setRowCount(len(views))
+        for row, stats in enumerate(views):
+            self.viewsTable.setItem(row, 0, QTableWidgetItem(stats['view']))
+            self.viewsTable.setItem(row, 1, QTableWidgetItem(str(stats['count'])))
+            for col, key in enumerate(('mean', 'max', 'last'), 2):
+                self.viewsTable.setItem(row, col, QTableWidgetItem(f'{stats[key]:.1f}'))
+        
+        stalls = list(reversed(MONITOR.stalls))
+        self.stallsTable.setRowCount(len(stalls))
+        for row, stall in enumerate(stalls):
+            self.stallsTable.setItem(row, 0, QTableWidgetItem(stall['time']))
+            self.stallsTable.setItem(row, 1, QTableWidgetItem(str(stall['ms'])))
+            self.stallsTable.setItem(row, 2, QTableWidgetItem(stall['action']))
+        
+    def onClearBtnClick(self):
+        '''
+        Forget the stats measured so far.
+        '''
+        MONITOR.clear()
+        self.refreshStats()
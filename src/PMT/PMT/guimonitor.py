@@ -0,0 +1,188 @@
+import time
+import datetime
+import functools
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, QEvent, Qt, QCoreApplication
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module measures how responsive the GUI is.
+# A QTimer ticks every few ms on the GUI thread, if a tick comes in late the
+# event loop was blocked for that long (a stall). Stalls over the threshold are
+# kept with whatever the user/ the GUI was doing right before (the last click or
+# key press and the views built since), and written to Tools/PMT_GuiLag.log.
+# The views (project list, asset table, dialogs) time how long they take to
+# build through the timedView decorator. Both show up in the developer panel
+# (Ctrl+Shift+D) and, when tracing is on, in the chrome trace.
+#-------------------------------------------------------------------------------
+
+USER_EVENTS = (QEvent.MouseButtonPress, QEvent.MouseButtonDblClick, QEvent.KeyPress)
+
+class GuiMonitor(QObject):
+    '''
+    The event loop lag detector plus the view build timings, one per process (see MONITOR).
+    '''
+    def __init__(self):
+        super().__init__()
+        self.enabled = False
+        self.interval = 0.05 # seconds between ticks
+        self.threshold = 0.2 # seconds of lag that count as a stall
+        self.timer = None
+        self.lastTick = None
+        self.lastInput = None
+        self.actions = deque(maxlen=20) # (time, what) of the latest clicks/ key presses/ views
+        self.stalls = deque(maxlen=200)
+        self.views = {} # view name -> {'count', 'total', 'max', 'last'} in seconds
+        self.logPath = None
+        self.pendingLog = [] # stalls from before the log path was known (the backend loads after the window shows)
+
+    def start(self, interval=None, threshold=None):
+        '''
+        Starts the lag detector, needs the QApplication to exist.
+
+        Args:
+        interval (float): Seconds between ticks, smaller catches shorter stalls but costs a bit more.
+        threshold (float): Seconds of lag from which a stall is recorded.
+        '''
+        if interval:
+            self.interval = interval
+        if threshold:
+            self.threshold = threshold
+        self.enabled = True
+        if self.timer is None:
+            self.timer = QTimer(self)
+            self.timer.setTimerType(Qt.PreciseTimer)
+            self.timer.timeout.connect(self.tick)
+            QCoreApplication.instance().installEventFilter(self)
+        self.timer.start(int(self.interval * 1000))
+        self.lastTick = time.perf_counter()
+
+    def stop(self):
+        '''
+        Stops the lag detector and the view timings.
+        '''
+        self.enabled = False
+        if self.timer is not None:
+            self.timer.stop()
+            QCoreApplication.instance().removeEventFilter(self)
+            self.timer = None
+
+    def setLogPath(self, logPath):
+        '''
+        Sets the stall log, the stalls recorded so far are written to it right away.
+        '''
+        self.logPath = logPath
+        pending, self.pendingLog = self.pendingLog, []
+        for line in pending:
+            self.writeLog(line)
+
+    def tick(self):
+        now = time.perf_counter()
+        lag = now - self.lastTick - self.interval
+        if lag >= self.threshold:
+            self.recordStall(lag, self.lastTick, now)
+        self.lastTick = now
+
+    def eventFilter(self, obj, event):
+        '''
+        Remembers the latest user input, an event going up the parents keeps its timestamp so it's only counted once.
+        '''
+        if event.type() in USER_EVENTS:
+            key = (event.type(), event.timestamp())
+            if key != self.lastInput:
+                self.lastInput = key
+                self.setAction(self.describeInput(obj, event))
+        return False
+
+    def describeInput(self, obj, event):
+        '''
+        Returns:
+        str: e.g. 'click QPushButton "Maya"' or 'key Return on QLineEdit'.
+        '''
+        widget = obj.parent() if obj.objectName() == 'qt_scrollarea_viewport' and obj.parent() is not None else obj # clicks on lists/ tables land on their viewport
+        text = widget.text() if callable(getattr(widget, 'text', None)) else None
+        label = f'{type(widget).__name__} "{text}"' if isinstance(text, str) and text else type(widget).__name__
+        if event.type() == QEvent.KeyPress:
+            return f'key {event.text() or event.key()} on {label}'
+        return f'{"double click" if event.type() == QEvent.MouseButtonDblClick else "click"} {label}'
+
+    def setAction(self, what):
+        self.actions.append((time.perf_counter(), what))
+
+    def getActionsSince(self, since):
+        '''
+        Returns:
+        str: What happened from a point in time on, e.g. 'click QPushButton "Maya" > PMTWindow.showAssets'.
+        '''
+        actions = [what for at, what in self.actions if at >= since]
+        return ' > '.join(actions) if actions else 'idle (timer/ signal from a thread)'
+
+    def recordStall(self, lag, start, end):
+        '''
+        Keeps a stall, logs it and puts it on the trace.
+
+        Args:
+        lag (float): How long the event loop was blocked.
+        start (float): The tick before the stall, whatever happened from then on is the suspect.
+        end (float): The tick that came in late.
+        '''
+        action = self.getActionsSince(start)
+        stall = {'time': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'ms': round(lag * 1000), 'action': action}
+        self.stalls.append(stall)
+        tracing.TRACER.instant('stall', 'gui', ms=stall['ms'], action=action)
+        self.writeLog(f'{stall["time"]}  stall {stall["ms"]} ms  {action}')
+
+    def writeLog(self, line):
+        if self.logPath is None:
+            self.pendingLog.append(line)
+            return
+        try:
+            with open(self.logPath, 'a') as f:
+                f.write(line + '\n')
+        except OSError as e:
+            print(f'Error writing the lag log: {e}')
+
+    def recordView(self, name, seconds):
+        '''
+        Adds a build time to the stats of a view.
+        '''
+        stats = self.views.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0})
+        stats['count'] += 1
+        stats['total'] += seconds
+        stats['max'] = max(stats['max'], seconds)
+        stats['last'] = seconds
+
+    def getViewStats(self):
+        '''
+        Returns:
+        list: One dict per view {'view', 'count', 'mean', 'max', 'last'} in ms, the slowest in total first.
+        '''
+        rows = [{'view': name, 'count': stats['count'], 'mean': stats['total'] / stats['count'] * 1000,
+                 'max': stats['max'] * 1000, 'last': stats['last'] * 1000, 'total': stats['total'] * 1000} for name, stats in self.views.items()]
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def clear(self):
+        self.stalls.clear()
+        self.views = {}
+
+MONITOR = GuiMonitor()
+
+def timedView(fn):
+    '''
+    Decorator for the methods that build a view, records how long the build took.
+    The view counts as the current action too, so a stall during it is blamed on it.
+    '''
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not MONITOR.enabled:
+            return fn(*args, **kwargs)
+        MONITOR.setAction(name)
+        start = time.perf_counter()
+        try:
+            with tracing.span(name, 'gui'):
+                return fn(*args, **kwargs)
+        finally:
+            MONITOR.recordView(name, time.perf_counter() - start)
+    return wrapper
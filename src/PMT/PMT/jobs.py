@@ -0,0 +1,329 @@
+import os
+import time
+import signal
+import itertools
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module runs the long PMT operations (Maya exports, Unreal imports, ...)
+# as queued background jobs so that whoever called them (the GUI mostly)
+# doesn't have to sit and wait. It doesn't know anything about Qt.
+#-------------------------------------------------------------------------------
+
+class JobCancelled(Exception):
+    '''
+    Raised inside a job when it notices that it was cancelled.
+    '''
+    pass
+
+class Job:
+    '''
+    A single queued operation with its status, progress and result.
+    '''
+    QUEUED = 'Queued'
+    RUNNING = 'Running'
+    DONE = 'Done'
+    FAILED = 'Failed'
+    CANCELLED = 'Cancelled'
+
+    def __init__(self, jobId, name, manager=None):
+        '''
+        Initializes the job.
+
+        Args:
+        jobId (int): The id of the job.
+        name (str): What to show for the job in the jobs panel.
+        manager (JobManager): The manager to notify when the job changes.
+        '''
+        self.id = jobId
+        self.name = name
+        self.manager = manager
+        self.status = Job.QUEUED
+        self.progress = 0.0
+        self.message = ''
+        self.result = None
+        self.createdAt = time.time()
+        self.startedAt = None
+        self.finishedAt = None
+        self.cancelEvent = threading.Event()
+        self.process = None
+        self.lock = threading.Lock()
+
+    def isFinished(self):
+        '''
+        Returns:
+        bool: True if the job won't change anymore.
+        '''
+        return self.status in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    def update(self, status=None, progress=None, message=None):
+        '''
+        Updates the state of the job and lets the listeners know.
+
+        Args:
+        status (str): The new status.
+        progress (float): The progress between 0 and 1.
+        message (str): What the job is doing right now.
+        '''
+        with self.lock:
+            if status is not None:
+                self.status = status
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            if message is not None:
+                self.message = message
+        if self.manager:
+            self.manager.notify(self)
+
+    def setProgress(self, progress, message=None):
+        '''
+        Called by the running operation to report how far it got.
+        Also the natural place to bail out if the job was cancelled in the meantime.
+
+        Args:
+        progress (float): The progress between 0 and 1.
+        message (str): What the job is doing right now.
+        '''
+        self.checkCancelled()
+        self.update(progress=progress, message=message)
+
+    def cancel(self):
+        '''
+        Asks the job to stop. A queued job never starts, a running one is stopped at its next
+        progress report and any process it launched is killed.
+        '''
+        self.cancelEvent.set()
+        with self.lock:
+            process = self.process
+        if process is not None:
+            killProcess(process)
+        if self.status == Job.QUEUED:
+            self.update(status=Job.CANCELLED, message='Cancelled')
+
+    def isCancelled(self):
+        '''
+        Returns:
+        bool: True if the job was asked to stop.
+        '''
+        return self.cancelEvent.is_set()
+
+    def checkCancelled(self):
+        '''
+        Raises JobCancelled if the job was asked to stop.
+        '''
+        if self.isCancelled():
+            raise JobCancelled()
+
+    def attachProcess(self, process):
+        '''
+        Remembers the process the job is waiting on so that cancelling can kill it.
+
+        Args:
+        process (subprocess.Popen): The process, None once it's done.
+        '''
+        with self.lock:
+            self.process = process
+        if process is not None and self.isCancelled():
+            killProcess(process)
+
+def killProcess(process):
+    '''
+    Kills a process along with its children (the DCCs are launched through a shell).
+
+    Args:
+    process (subprocess.Popen): The process to kill.
+    '''
+    if process.poll() is not None:
+        return
+    tracing.TRACER.instant('killProcess', 'process', pid=process.pid)
+    try:
+        if os.name == 'nt':
+            subprocess.run(f'taskkill /F /T /PID {process.pid}', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGKILL) # the process was started in its own session
+    except OSError:
+        process.kill()
+
+def runProcess(command, job=None, pollInterval=0.25):
+    '''
+    Runs a shell command and waits for it, killing it if the job gets cancelled.
+
+    Args:
+    command (str): The command to run.
+    job (Job): The job the command runs for, if any.
+    pollInterval (float): How often to check for cancellation.
+
+    Returns:
+    int: The return code of the process.
+    str: The stdout of the process.
+    str: The stderr of the process.
+    '''
+    with tracing.span('runProcess', 'process', command=command[:300]) as s:
+        kwargs = {'start_new_session': True} if os.name != 'nt' else {}
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+        s.set(pid=process.pid)
+
+        if job is None:
+            stdout, stderr = process.communicate()
+            s.set(returncode=process.returncode)
+            return process.returncode, stdout, stderr
+
+        job.attachProcess(process)
+        try:
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=pollInterval)
+                    break
+                except subprocess.TimeoutExpired:
+                    if job.isCancelled():
+                        killProcess(process)
+        finally:
+            job.attachProcess(None)
+
+        s.set(returncode=process.returncode)
+        job.checkCancelled()
+        return process.returncode, stdout, stderr
+
+class JobManager:
+    '''
+    Queues jobs on a small thread pool and keeps track of them.
+    '''
+    def __init__(self, workers=2):
+        '''
+        Initializes the job manager.
+
+        Args:
+        workers (int): How many jobs run at the same time (each one may be a whole DCC).
+        '''
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='PMTJob')
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def addListener(self, listener):
+        '''
+        Registers a function to be called with a job whenever it changes.
+        Careful, it's called from the job threads.
+
+        Args:
+        listener (function): The function to call.
+        '''
+        self.listeners.append(listener)
+
+    def notify(self, job):
+        '''
+        Lets the listeners know that a job changed.
+
+        Args:
+        job (Job): The job that changed.
+        '''
+        for listener in list(self.listeners):
+            try:
+                listener(job)
+            except Exception:
+                pass # a broken listener shouldn't take the job down with it
+
+    def submit(self, name, fn, *args, **kwargs):
+        '''
+        Queues a job. The function is called with the job as the 'job' keyword argument and should
+        return the usual (bool, str) tuple of the PMT.
+
+        Args:
+        name (str): What to show for the job.
+        fn (function): The operation to run.
+
+        Returns:
+        Job: The queued job.
+        '''
+        with self.lock:
+            job = Job(next(self.ids), name, self)
+            self.jobs[job.id] = job
+
+        self.pool.submit(self.run, job, fn, args, kwargs)
+        self.notify(job)
+        return job
+
+    def run(self, job, fn, args, kwargs):
+        '''
+        Runs a job on one of the pool threads and records how it went.
+        '''
+        if job.isCancelled():
+            job.finishedAt = time.time()
+            job.update(status=Job.CANCELLED, message='Cancelled')
+            return
+
+        job.startedAt = time.time()
+        job.update(status=Job.RUNNING, message='Started')
+
+        try:
+            with tracing.span(f'job: {job.name}', 'job', jobId=job.id):
+                result = fn(*args, job=job, **kwargs)
+            job.result = result
+            success, msg = result[0], result[1]
+            job.finishedAt = time.time()
+            job.update(status=Job.DONE if success else Job.FAILED, progress=1.0 if success else None, message=msg)
+        except JobCancelled:
+            job.finishedAt = time.time()
+            job.update(status=Job.CANCELLED, message='Cancelled')
+        except Exception as e:
+            job.finishedAt = time.time()
+            job.update(status=Job.FAILED, message=f'Error: {str(e)}')
+
+    def getJobs(self):
+        '''
+        Returns:
+        list: All the jobs, oldest first.
+        '''
+        with self.lock:
+            return list(self.jobs.values())
+
+    def getJob(self, jobId):
+        '''
+        Args:
+        jobId (int): The id of the job.
+
+        Returns:
+        Job: The job, None if there's no such job.
+        '''
+        with self.lock:
+            return self.jobs.get(jobId)
+
+    def cancel(self, jobId):
+        '''
+        Cancels a job.
+
+        Args:
+        jobId (int): The id of the job.
+
+        Returns:
+        bool: True if the job was found and asked to stop.
+        '''
+        job = self.getJob(jobId)
+        if job is None or job.isFinished():
+            return False
+        job.cancel()
+        return True
+
+    def clearFinished(self):
+        '''
+        Forgets about the jobs that are done, failed or cancelled.
+        '''
+        with self.lock:
+            self.jobs = {jobId: job for jobId, job in self.jobs.items() if not job.isFinished()}
+
+    def shutdown(self, cancelRunning=True):
+        '''
+        Stops the manager, e.g. when the app closes.
+
+        Args:
+        cancelRunning (bool): Whether to cancel the jobs that are still queued/ running.
+        '''
+        if cancelRunning:
+            for job in self.getJobs():
+                if not job.isFinished():
+                    job.cancel()
+        self.pool.shutdown(wait=False)
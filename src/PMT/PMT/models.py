@@ -0,0 +1,446 @@
+#-------------------------------------------------------------------------------------------
+# Qt imports, same as the gui
+#-------------------------------------------------------------------------------------------
+from PyQt5.QtGui import *
+from PyQt5.QtCore import *
+import bisect
+from query import AssetQuery
+
+#-------------------------------------------------------------------------------------------
+# This module defines the Qt item models behind the views of the PMT GUI.
+# A view only asks the model for the rows it is showing, so a project with
+# thousands of assets costs a few dozen visible rows instead of thousands of widgets.
+#-------------------------------------------------------------------------------------------
+
+class AssetTableModel(QAbstractTableModel):
+    '''
+    This class holds the assets of a project for a single DCC, one row per asset.
+    The rows come from the store a page at a time as the view scrolls (canFetchMore/ fetchMore), and the
+    filters and the sorting are part of the query (PMT.queryAssets), so a project with tens of thousands
+    of assets only loads the pages that were scrolled to.
+    '''
+    COLUMNS = ['Name', 'Type', 'File', 'Status', 'Created']
+    NAME, TYPE, FILE, STATUS, CREATED = range(len(COLUMNS))
+    SORT_FIELDS = {NAME: 'name', TYPE: 'type', FILE: 'file', STATUS: 'status', CREATED: 'creationDate'} # column -> AssetQuery sortBy
+
+    HAS_FILE = 'Has File'
+    MISSING = 'Missing'
+
+    AssetNameRole = Qt.UserRole + 1 # the asset name, whatever column the index is in
+    AssetDetailsRole = Qt.UserRole + 2 # the whole asset dict
+
+    def __init__(self, parent=None, pageSize=200):
+        '''
+        The constructor for AssetTableModel class.
+
+        Args:
+        parent (QObject): The parent object.
+        pageSize (int): How many assets to pull from the store at a time.
+        '''
+        super(AssetTableModel, self).__init__(parent)
+        self.pageSize = pageSize
+        self.rows = []
+        self.dccType = None
+        self.projName = None
+        self.fetchPage = None
+        self.query = None
+        self.cursor = None # of the next page, None once every page is loaded
+        self.total = 0
+        self.sortBy = 'name'
+        self.descending = False
+        self.nameFilter = ''
+        self.typeFilter = None
+        self.statusFilter = None
+
+    def setAssets(self, fetchPage, dccType, projName=None, sortBy='name', descending=False):
+        '''
+        Swaps in the assets of another project/ DCC, with the filters cleared, and loads their first page.
+
+        Args:
+        fetchPage (function): (query, cursor) -> page, e.g. partial(pmt.queryAssets, projName).
+        dccType (str): The DCC the view is showing ('Maya' or 'Substance').
+        projName (str): The project the assets belong to, so later deltas can be matched to it.
+        sortBy (str): The AssetQuery sort field to start with.
+        descending (bool): Whether the order is reversed.
+        '''
+        self.fetchPage = fetchPage
+        self.dccType = dccType
+        self.projName = projName
+        self.sortBy = sortBy
+        self.descending = descending
+        self.nameFilter = ''
+        self.typeFilter = None
+        self.statusFilter = None
+        self.reload()
+
+    def reload(self):
+        '''
+        Rebuilds the query from the filters/ order and starts over with its first page.
+        '''
+        self.beginResetModel()
+        self.query = AssetQuery(dcc=self.dccType, hasFile=None if self.statusFilter is None else self.statusFilter == self.HAS_FILE,
+                                types=self.typeFilter, nameContains=self.nameFilter or None,
+                                sortBy=self.sortBy, descending=self.descending, limit=self.pageSize)
+        self.cursor = None
+        self.rows = self.loadPage(None)
+        self.endResetModel()
+
+    def loadPage(self, cursor):
+        '''
+        Returns:
+        list: (asset name, asset details) of the page after the cursor, the cursor of the page after that is kept.
+        '''
+        page = self.fetchPage(self.query, cursor)
+        self.cursor = page['nextCursor']
+        self.total = page['total']
+        return page['assets']
+
+    def setNameFilter(self, text):
+        '''
+        Args:
+        text (str): Only assets whose name contains this are shown (case insensitive).
+        '''
+        text = text.strip().lower()
+        if text != self.nameFilter:
+            self.nameFilter = text
+            self.reload()
+
+    def setTypeFilter(self, assetType):
+        '''
+        Args:
+        assetType (str): Only assets of this type are shown, None for all of them.
+        '''
+        if assetType != self.typeFilter:
+            self.typeFilter = assetType
+            self.reload()
+
+    def setStatusFilter(self, status):
+        '''
+        Args:
+        status (str): HAS_FILE or MISSING, None for both.
+        '''
+        if status != self.statusFilter:
+            self.statusFilter = status
+            self.reload()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.cursor is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        '''
+        Pulls the next page from the store, called by the view when it scrolls near the end.
+        '''
+        if parent.isValid() or self.cursor is None:
+            return
+        assets = self.loadPage(self.cursor)
+        if assets:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(assets) - 1)
+            self.rows += assets
+            self.endInsertRows()
+
+    def fetchUntil(self, assetName):
+        '''
+        Loads pages until an asset shows up, e.g. to select a search result.
+
+        Returns:
+        int: The row of the asset, None if it doesn't match the query.
+        '''
+        while True:
+            row = next((row for row, (name, _) in enumerate(self.rows) if name == assetName), None)
+            if row is not None or self.cursor is None:
+                return row
+            self.fetchMore()
+
+    def updateAssets(self, changed, removed):
+        '''
+        Applies a delta to the rows without resetting the model, so the view keeps its selection and scroll position.
+        Changed rows that don't match the query anymore are taken out, the ones that do go where the order puts them,
+        unless that's past the loaded pages (they'll come with the page they belong to).
+
+        Args:
+        changed (dict): asset name -> asset details, for the assets that were added or updated.
+        removed (list): The names of the assets that are gone.
+        '''
+        if self.query is None:
+            return
+        changed = dict(changed)
+        for row, (assetName, assetDetails) in enumerate(self.rows): # still matching and in the same spot, updated in place
+            newDetails = changed.get(assetName)
+            if newDetails is not None and self.query.matches(assetName, newDetails) and self.query.sortKey(assetName, newDetails) == self.query.sortKey(assetName, assetDetails):
+                self.rows[row] = (assetName, self.query.project(changed.pop(assetName)))
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+        gone = set(removed) | set(changed) # the other changed ones are put back below if they still match
+        for row in reversed(range(len(self.rows))): # bottom up so the rows above keep their index
+            if self.rows[row][0] in gone:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+
+        lastKey = self.query.decodeCursor(self.cursor)
+        keys = [self.query.sortKey(assetName, assetDetails) for assetName, assetDetails in self.rows]
+        if self.descending:
+            keys.reverse() # bisect wants them ascending
+        for assetName, assetDetails in changed.items():
+            if not self.query.matches(assetName, assetDetails):
+                continue
+            key = self.query.sortKey(assetName, assetDetails)
+            if lastKey is not None and (key < lastKey if self.descending else key > lastKey):
+                continue
+            pos = bisect.bisect(keys, key)
+            row = len(keys) - pos if self.descending else pos
+            keys.insert(pos, key)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, (assetName, self.query.project(assetDetails)))
+            self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def hasFile(self, assetDetails):
+        '''
+        Returns:
+        bool: True if the asset has a file for the DCC of the model.
+        '''
+        return assetDetails.get(self.dccType, 'NA') != 'NA'
+
+    def data(self, index, role=Qt.DisplayRole):
+        '''
+        Returns the data of a cell, only ever called for the rows the view is showing.
+        '''
+        if not index.isValid():
+            return None
+
+        assetName, assetDetails = self.rows[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == self.NAME:
+                return assetName
+            if column == self.TYPE:
+                return assetDetails.get('type', '')
+            if column == self.FILE:
+                return assetDetails[self.dccType]['filename'] if self.hasFile(assetDetails) else f'No {self.dccType} Asset'
+            if column == self.STATUS:
+                return self.HAS_FILE if self.hasFile(assetDetails) else self.MISSING
+            if column == self.CREATED:
+                return assetDetails.get('creationDate', '')
+        elif role == Qt.ToolTipRole:
+            return assetDetails.get('path', '')
+        elif role == Qt.ForegroundRole and not self.hasFile(assetDetails):
+            return QBrush(Qt.gray) # the asset exists but not for this DCC
+        elif role == self.AssetNameRole:
+            return assetName
+        elif role == self.AssetDetailsRole:
+            return assetDetails
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        '''
+        Sorting is part of the query, so the store sorts every asset and not just the loaded pages.
+        Ties are broken by name so a type/ status column keeps its assets in order.
+        '''
+        if column not in self.SORT_FIELDS or self.query is None:
+            return
+        sortBy, descending = self.SORT_FIELDS[column], order == Qt.DescendingOrder
+        if (sortBy, descending) != (self.sortBy, self.descending):
+            self.sortBy, self.descending = sortBy, descending
+            self.reload()
+
+class ProjectListModel(QAbstractListModel):
+    '''
+    This class holds the projects of the studio for the home screen.
+    The names are all kept in memory (they're tiny), but the view is only handed a batch of rows at a time
+    as it scrolls (canFetchMore/ fetchMore). The model outlives the views, so going back to the home screen
+    doesn't rebuild anything unless the projects changed.
+    '''
+    ProjectNameRole = Qt.UserRole + 1
+
+    renameRequested = pyqtSignal(str, str) # (old name, new name), emitted when a row is edited
+
+    def __init__(self, parent=None, batchSize=100):
+        '''
+        The constructor for ProjectListModel class.
+
+        Args:
+        parent (QObject): The parent object.
+        batchSize (int): How many rows to hand to the view at a time.
+        '''
+        super(ProjectListModel, self).__init__(parent)
+        self.batchSize = batchSize
+        self.projects = {}
+        self.names = []
+        self.filtered = []
+        self.fetched = 0
+        self.filterText = ''
+
+    def setProjects(self, projects):
+        '''
+        Swaps in the projects, only resetting the view if the list of names actually changed.
+
+        Args:
+        projects (dict): project name -> project details, as loaded from the parent config.
+
+        Returns:
+        bool: True if the rows changed.
+        '''
+        names = [name for name in projects if name != 'Studio Assets'] # shown separately
+        changed = names != self.names
+        self.projects = projects
+        self.names = names
+
+        if changed:
+            self.applyFilter()
+        elif self.fetched:
+            self.dataChanged.emit(self.index(0), self.index(self.fetched - 1), [Qt.ToolTipRole]) # same rows, maybe new details
+        return changed
+
+    def setFilter(self, text):
+        '''
+        Only shows the projects whose name contains the text (case insensitive).
+        The filter runs over every project, not just the rows fetched so far.
+
+        Args:
+        text (str): The filter text, empty for all projects.
+        '''
+        text = text.strip().lower()
+        if text == self.filterText:
+            return
+        self.filterText = text
+        self.applyFilter()
+
+    def applyFilter(self):
+        '''
+        Rebuilds the filtered list and starts the view over with the first batch.
+        '''
+        self.beginResetModel()
+        self.filtered = [name for name in self.names if self.filterText in name.lower()] if self.filterText else list(self.names)
+        self.fetched = min(self.batchSize, len(self.filtered))
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.fetched < len(self.filtered)
+
+    def fetchMore(self, parent=QModelIndex()):
+        '''
+        Hands the next batch of rows to the view, called by the view when it scrolls near the end.
+        '''
+        if parent.isValid():
+            return
+        count = min(self.batchSize, len(self.filtered) - self.fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.fetched:
+            return None
+
+        projName = self.filtered[index.row()]
+
+        if role in (Qt.DisplayRole, Qt.EditRole, self.ProjectNameRole):
+            return projName
+        if role == Qt.ToolTipRole:
+            projDetails = self.projects.get(projName, {})
+            return f"{projDetails.get('path', '')}\nAssets: {projDetails.get('Asset Count', 0)}\nCreated: {projDetails.get('creationDate', '')}"
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        '''
+        Editing a row asks for a rename, the row itself changes once the project list is reloaded.
+        '''
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        oldName, newName = self.filtered[index.row()], str(value).strip()
+        if newName and newName != oldName:
+            self.renameRequested.emit(oldName, newName)
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+class SearchResultsModel(QAbstractTableModel):
+    '''
+    This class holds the results of a cross-project asset search, best match first.
+    '''
+    COLUMNS = ['Asset', 'Project', 'Type', 'Files']
+    ASSET, PROJECT, TYPE, FILES = range(len(COLUMNS))
+
+    ResultRole = Qt.UserRole + 1 # the whole result dict
+
+    def __init__(self, parent=None):
+        '''
+        The constructor for SearchResultsModel class.
+
+        Args:
+        parent (QObject): The parent object.
+        '''
+        super(SearchResultsModel, self).__init__(parent)
+        self.results = []
+
+    def setResults(self, results):
+        '''
+        Args:
+        results (list): The results of PMT.searchAssets.
+        '''
+        self.beginResetModel()
+        self.results = list(results)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.results)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        result = self.results[index.row()]
+        column = index.column()
+
+        if role == Qt.DisplayRole:
+            if column == self.ASSET:
+                return result['asset']
+            if column == self.PROJECT:
+                return result['project']
+            if column == self.TYPE:
+                return result['type']
+            if column == self.FILES:
+                return ', '.join(result['files'])
+        elif role == Qt.ToolTipRole:
+            return result['path']
+        elif role == self.ResultRole:
+            return result
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
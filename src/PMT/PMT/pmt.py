@@ -1,21 +1,29 @@
 #-------------------------------------------------------------------------------
 # Lots of imports haha
 #-------------------------------------------------------------------------------
-from cgitb import text
 import datetime
-from logging import _srcfile
-from multiprocessing import process
 import os
+import sys
+import errno
 import shutil
-from tkinter import SEL
+import threading
 import json
+import copy
 import configparser
-import subprocess
+from store import createStore, ConfigCache
+from serializers import atomicWriteJson, findConfigFile
+from blobstore import BlobStore, hashFile
+from jobs import JobManager, runProcess
+from search import SearchIndex
+from query import AssetQuery
+import tracing
 
 #-------------------------------------------------------------------------------
 # This module is meant to handle the backend of the PMT.
 #-------------------------------------------------------------------------------
 
+EXPORT_SETTINGS = {'type': 'FBX export', 'options': 'v=0;', 'selection': 'geometry', 'version': 1} # what Files/io/maya.py exports with, bump the version when that changes
+
 class PMT:
     '''
     This class defines the PMT and ensures that the backend of the PMT is handled.    
@@ -25,15 +33,16 @@ class PMT:
         Initializes the PMT class.
         
         - Sets the paths for the PMT
-        - Creates the base folder 
+        - Creates the base folder (first launch only)
         - Loads the parent configuration.
         '''
         self.initPaths()  
+        self.initTracing()
+        self.initStore()
         self.createBaseFolder()
         self.currProj = None
         self.currAsset = None
-        self.projects = self.loadParentConfig()
-        self.getProjects()
+        self.projects = self.loadParentConfig() # loaded once, getProjects would just read it again
         
     def initPaths(self):
         '''
@@ -50,27 +59,116 @@ class PMT:
         self.basePath = os.path.join(os.getenv('LOCALAPPDATA'), 'PMT') # base path is the hidden folder in the local app data
         self.unrealPath = pathConfig.get('PATHS', 'UNREAL')
         self.mayaPath = pathConfig.get('PATHS', 'MAYA')
+        self.mayapyPath = pathConfig.get('PATHS', 'MAYAPY', fallback=os.path.join(os.path.dirname(self.mayaPath), 'mayapy.exe' if os.name == 'nt' else 'mayapy')) # headless maya for batch exports
         self.substancePath = pathConfig.get('PATHS', 'SUBSTANCE')
+        self.unrealCmdPath = pathConfig.get('PATHS', 'UNREAL_CMD', fallback=os.path.join(os.path.dirname(self.unrealPath), 'UnrealEditor-Cmd.exe' if os.name == 'nt' else 'UnrealEditor-Cmd')) # headless editor for the unreal workers
         
         self.parentConfigPath = os.path.join(self.basePath, 'Tools', 'PMT_ParentConfig.json')   
+        self.bootstrapPath = os.path.join(self.basePath, 'Tools', 'PMT_Bootstrap.json') # written once the base folder is fully set up
+        self.storageBackend = pathConfig.get('STORAGE', 'BACKEND', fallback='json') # json/ journal/ sharded/ sqlite
+        self.storageFormat = pathConfig.get('STORAGE', 'FORMAT', fallback='json') # json/ binary, what the configs are written in (not the sqlite catalog)
+        self.journalLimit = pathConfig.getint('STORAGE', 'JOURNAL_LIMIT', fallback=256 * 1024) # bytes before a journal is compacted
+        self.dedupeEnabled = pathConfig.getboolean('STORAGE', 'DEDUPE', fallback=False) # copies between projects become hardlinks to shared blobs
+        
+        self.ioWorkers = pathConfig.getint('PERFORMANCE', 'IO_WORKERS', fallback=8) # threads used for the bulk filesystem work
+        self.jobWorkers = pathConfig.getint('PERFORMANCE', 'JOB_WORKERS', fallback=2) # background exports/imports running at the same time
+        self.cacheSize = pathConfig.getint('STORAGE', 'CACHE_SIZE', fallback=64) # how many parsed configs to keep in memory
+        
+        self.workersEnabled = pathConfig.getboolean('WORKERS', 'ENABLED', fallback=False) # keep headless DCCs warm between exports/imports
+        self.mayaWorkers = pathConfig.getint('WORKERS', 'MAYA', fallback=1)
+        self.unrealWorkers = pathConfig.getint('WORKERS', 'UNREAL', fallback=1) # per unreal project
+        self.workerMemoryLimit = pathConfig.getint('WORKERS', 'MEMORY_LIMIT_MB', fallback=4096) * 1024 * 1024 # a worker using more than this is recycled
+        self.workerHeartbeat = pathConfig.getfloat('WORKERS', 'HEARTBEAT', fallback=10) # seconds between pings of the idle workers
+        self.workerTimeout = pathConfig.getfloat('WORKERS', 'TIMEOUT', fallback=600) # seconds a single export/import may take
+        self.fakeWorkers = pathConfig.getboolean('WORKERS', 'FAKE', fallback=False) # plain python stand-ins, for machines without the DCCs
+        
+        self.watcherEnabled = pathConfig.getboolean('WATCHER', 'ENABLED', fallback=False) # sync the configs with changes made in explorer/ the DCCs
+        self.watcherBackend = pathConfig.get('WATCHER', 'BACKEND', fallback='auto') # auto/ inotify/ polling
+        self.watcherDebounce = pathConfig.getfloat('WATCHER', 'DEBOUNCE', fallback=1.0) # seconds of quiet before a batch of changes is synced
+        self.watcherPollInterval = pathConfig.getfloat('WATCHER', 'POLL_INTERVAL', fallback=5.0) # seconds between passes when polling
+        
+        self.tracingEnabled = pathConfig.getboolean('TRACING', 'ENABLED', fallback=False) # record a chrome trace of the session to Tools/
+        self.traceMaxEvents = pathConfig.getint('TRACING', 'MAX_EVENTS', fallback=200000) # the oldest spans are dropped past this
+        self.traceDumpInterval = pathConfig.getfloat('TRACING', 'DUMP_INTERVAL', fallback=30) # seconds between writes, so a killed session still leaves a trace
+        
+        self.lagMonitorEnabled = pathConfig.getboolean('GUI', 'LAG_MONITOR', fallback=False) # log the stalls of the GUI's event loop
+        self.lagThreshold = pathConfig.getfloat('GUI', 'LAG_THRESHOLD_MS', fallback=200) / 1000 # blocked for longer than this is a stall
+        self.devPanelEnabled = pathConfig.getboolean('GUI', 'DEV_PANEL', fallback=False) # show the developer panel at startup (Ctrl+Shift+D toggles it)
+        
+        self.trashEnabled = pathConfig.getboolean('TRASH', 'ENABLED', fallback=False) # deletes are a rename into .trash, restorable until reclaimed
+        self.trashRetention = pathConfig.getfloat('TRASH', 'RETENTION_DAYS', fallback=7) * 24 * 3600 # seconds an item stays restorable
+        self.trashWorkers = pathConfig.getint('TRASH', 'RECLAIM_WORKERS', fallback=2) # items deleted at the same time, keeps the disk usable meanwhile
+        self.trashReclaimInterval = pathConfig.getfloat('TRASH', 'RECLAIM_INTERVAL', fallback=3600) # seconds between two passes of the reclaimer
+        
+    def initTracing(self):
+        '''
+        Starts recording spans if the path config asks for it (or the cli's --trace already did).
+        The trace goes to Tools/PMT_Trace_<date>_<pid>.json, open it in chrome://tracing or ui.perfetto.dev.
+        '''
+        if self.tracingEnabled or tracing.TRACER.enabled:
+            tracing.TRACER.enable(os.path.join(self.basePath, 'Tools'), self.traceMaxEvents, self.traceDumpInterval)
+        
+    def dumpTrace(self):
+        '''
+        Writes the trace recorded so far.
+
+        Returns:
+        bool: True if the trace is written successfully, False otherwise.
+        str: A message indicating the result of the operation.
+        '''
+        if not tracing.TRACER.enabled:
+            return False, 'Tracing is off, turn it on under [TRACING] in the path config.'
+        try:
+            path = tracing.TRACER.dump()
+            return True, f'Trace written to {path}'
+        except Exception as e:
+            return False, f'Error writing the trace: {str(e)}'
+        
+    def initStore(self):
+        '''
+        Initializes the store that all the project/asset metadata is read from and written to.
+        The first time the sqlite catalog is used, the existing json configs are migrated into it.
+        '''
+        self.cache = ConfigCache(self.cacheSize) # so that navigating the GUI doesn't re-parse unchanged configs
+        self.store = createStore(self.storageBackend, self.basePath, self.parentConfigPath, self.cache, self.journalLimit, self.storageFormat)
+        self.blobs = BlobStore(self.basePath)
+        self.jobs = JobManager(self.jobWorkers)
+        self.workerPools = {}
+        self.workerPoolsLock = threading.Lock()
+        self.exportManifestLock = threading.Lock() # single and batch export jobs may finish at the same time
+        self.search = SearchIndex(os.path.join(self.basePath, 'Tools', 'PMT_SearchIndex.json')) # loaded on first use, not at startup
+        self.searchLock = threading.Lock()
+        self.syncLock = threading.RLock() # held by the asset operations so the watcher never sees them half done
+        self.watcher = None
+        self.trash = None
+        
+        if self.storageBackend == 'sqlite' and self.store.isEmpty(): # nothing to import is fine too, the configs may be in either format
+            self.store.importConfigs()
         
     def createBaseFolder(self):
         '''
         Creates the base folder for the PMT in a hidden directory that should be difficult to find.
         The only easy way to access the folder is through the PMT. Hard constrain :]        
+        All of it is idempotent, so once it went through the bootstrap file is written and later launches skip it with a single stat.
+        Delete Tools/PMT_Bootstrap.json to have it run again.
         '''
         try:
+            if os.path.exists(self.bootstrapPath):
+                return True, f'Base folder already set up at {self.basePath}'
+            
             if not os.path.exists(self.basePath):
                 os.makedirs(self.basePath)                
                 if os.name == 'nt':
                     os.system(f'attrib +h {self.basePath}') # hides the folder
-                return True, f'Base folder created at {self.basePath}'
             
-            if not os.path.exists(self.parentConfigPath):
+            if findConfigFile(self.parentConfigPath) is None: # it may have been converted to the binary format
                 self.initParentConfigs()
                 
             self.createStudioAssetsFolder()
             
+            atomicWriteJson(self.bootstrapPath, {'created': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+            return True, f'Base folder created at {self.basePath}'
+            
         except Exception as e:
             raise RuntimeError('C:/ drive not found') # this code would only fail if there is no C:/ drive on the system xD
         
@@ -84,7 +182,7 @@ class PMT:
         if not os.path.exists(configPath):
             os.makedirs(configPath)
             
-        if not os.path.exists(self.parentConfigPath):
+        if findConfigFile(self.parentConfigPath) is None:
             with open(self.parentConfigPath, 'w') as f:
                 json.dump({'Projects':{}}, f) # an empty dictionary for the projects
         
@@ -119,12 +217,9 @@ class PMT:
                 configFolderPath = os.path.join(studioAssetsPath, configFolder)
                 os.makedirs(configFolderPath)
                 
-                projectConfigPath = os.path.join(configFolderPath, f'PMT_Studio Assets_Config.json') # naming convention of the project config file
-                
                 self.projects = self.loadParentConfig()
                 
-                with open(projectConfigPath, 'w') as f:
-                    json.dump({'Assets': {}}, f)
+                self.store.initProject('Studio Assets')
                     
                 self.projects['Studio Assets'] = { 
                         'creationDate' : datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -133,7 +228,7 @@ class PMT:
                         'Game Engine' : 'NA'
                     } # adding the studio assets to list of the projects in parent config
                 
-                self.saveParentConfig()
+                self.saveParentConfig(['Studio Assets'])
 
                 return True, f'Studio Assets folder created!'
             else:
@@ -148,20 +243,55 @@ class PMT:
         Returns:
         dict: The data about the projects in the parent config.
         '''
-        try:
-            with open(self.parentConfigPath, 'r') as file:
-                data = json.load(file)
-                return data.get('Projects', {})
-        except FileNotFoundError:
-            return {}
+        return self.store.loadProjects()
         
-    def saveParentConfig(self):
+    def saveParentConfig(self, projNames=None):
         '''
         Updates the parent config with the current data we have about the projects.
+        
+        Args:
+        projNames (iterable): The projects that were added/ changed/ removed. Only those are written, so the projects
+                              another session made since ours were loaded stay. None writes all of them.
+        '''
+        self.store.saveProjects(self.projects, projNames)
+        
+    def adjustAssetCounts(self, deltas):
         '''
-        currentData = {'Projects': self.projects}
-        with open(self.parentConfigPath, 'w') as file:
-            json.dump(currentData, file, indent=4)
+        Changes the Asset Count of some projects in the parent config. The store counts on top of what's on disk,
+        so the assets other sessions added/ removed since our projects were loaded aren't lost.
+        
+        Args:
+        deltas (dict): project name -> how many assets it gained (negative if it lost some).
+        '''
+        for projName, count in self.store.updateAssetCounts(deltas).items():
+            if projName in self.projects:
+                self.projects[projName]['Asset Count'] = count
+        
+    def exportConfig(self, outPath, projName=None):
+        '''
+        Writes a config out as json, whatever the backend/ format, for other tools or as a backup.
+        
+        Args:
+        outPath (str): The json file to write.
+        projName (str): The project whose assets are exported, the projects (parent config) if None.
+        
+        Returns:
+        bool: True if the config is exported successfully, False otherwise.
+        str: A message indicating the result of the operation.
+        '''
+        try:
+            if projName is None:
+                data = {'Projects': copy.deepcopy(self.projects)}
+            elif projName not in self.projects:
+                return False, f'Project "{projName}" not found.'
+            else:
+                data = {'Assets': copy.deepcopy(self.store.getAssets(projName))}
+            
+            os.makedirs(os.path.dirname(os.path.abspath(outPath)), exist_ok=True)
+            atomicWriteJson(os.path.abspath(outPath), data)
+            return True, f'Exported {len(next(iter(data.values())))} {"assets" if projName else "projects"} to {outPath}.'
+        except Exception as e:
+            return False, f'Error exporting the config: {str(e)}'
         
     def createProjectFolder(self, projName):
         '''
@@ -204,11 +334,9 @@ class PMT:
                         'Game Engine' : 'NA'
                     }
                 
-                self.saveParentConfig()
+                self.saveParentConfig([projName])
                 
-                projectConfigPath = os.path.join(configFolderPath, f'PMT_{projName}_Config.json')
-                with open(projectConfigPath, 'w') as f:
-                    json.dump({'Assets': {}}, f)
+                self.store.initProject(projName)
                 
                 self.getProjects()
                 
@@ -229,15 +357,90 @@ class PMT:
         list: The list of projects.
         '''
         try :
-            with open(self.parentConfigPath, 'r') as file:
-                data = json.load(file)
-                self.projects = data.get('Projects', {})
+            self.projects = self.store.loadProjects()
             return list(self.projects.keys())
         except FileNotFoundError:
             return []
-        except json.JSONDecodeError:
+        except ValueError: # corrupt config
             return []
             
+    def getSearchIndex(self):
+        '''
+        Returns the asset search index, loading it the first time and catching up with the projects
+        that were added/ removed since it was saved.
+        
+        Returns:
+        SearchIndex: The index.
+        '''
+        with self.searchLock:
+            if not self.search.loaded:
+                self.search.load()
+                indexed = self.search.getProjects()
+                for projName in self.projects:
+                    if projName not in indexed:
+                        self.search.putAssets(projName, self.store.getAssets(projName))
+                for projName in indexed - set(self.projects):
+                    self.search.removeProject(projName)
+        return self.search
+        
+    def rebuildSearchIndex(self):
+        '''
+        Indexes every asset of every project from scratch, e.g. if the configs were changed outside of the PMT.
+        
+        Returns:
+        bool: True if the index is rebuilt successfully, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        '''
+        try:
+            index = self.getSearchIndex()
+            index.clear()
+            for projName in self.projects:
+                index.putAssets(projName, self.store.getAssets(projName))
+            index.flush()
+            return True, f'Indexed {len(index.docs)} assets from {len(self.projects)} projects.'
+        except Exception as e:
+            return False, f'Error rebuilding the search index: {str(e)}'
+        
+    def searchAssets(self, query, limit=50, projName=None):
+        '''
+        Searches the assets of every project by name, type, project and DCC filename.
+        Prefixes ("swo") and small typos ("swrod") match too.
+        
+        Args:
+        query (str): What to look for.
+        limit (int): The most results to return.
+        projName (str): Only look in this project, None for all of them.
+        
+        Returns:
+        list: The matching assets, best first, as {'project', 'asset', 'type', 'files', 'path', 'score'}.
+        '''
+        return self.getSearchIndex().search(query, limit, projName)
+        
+    def indexAssets(self, projName, assetNames):
+        '''
+        Brings the search index up to date with the store for some assets, the ones that are gone are removed.
+        
+        Args:
+        projName (str): The name of the project.
+        assetNames (list): The names of the assets that changed.
+        '''
+        index = self.getSearchIndex()
+        for assetName in assetNames:
+            assetDetails = self.store.getAsset(projName, assetName)
+            if assetDetails:
+                index.putAsset(projName, assetName, assetDetails)
+            else:
+                index.removeAsset(projName, assetName)
+            
+    def getCacheStats(self):
+        '''
+        Returns the hit/miss counters of the config cache, handy to see if the cache is doing its job.
+        
+        Returns:
+        dict: The stats of the cache.
+        '''
+        return self.cache.getStats()
+            
     def renameProject(self, oldName, newName):
         '''
         Renames a project.
@@ -256,15 +459,12 @@ class PMT:
         try:
             oldPath = os.path.join(self.basePath, oldName)
             newPath = os.path.join(self.basePath, newName)
-    
-            oldConfigPath = os.path.join(oldPath, 'Tools', f'PMT_{oldName}_Config.json')
-            newConfigPath = os.path.join(oldPath, 'Tools', f'PMT_{newName}_Config.json') # also renaming the project config file
 
             if os.path.exists(newPath):
                 return False, f'Project "{newName}" already exists.'
 
-            if os.path.exists(oldConfigPath):
-                os.rename(oldConfigPath, newConfigPath)
+            if os.path.exists(oldPath):
+                self.store.renameProject(oldName, newName) # also renaming the project config
                 os.rename(oldPath, newPath)
 
             oldUnrealProjectPath = os.path.join(newPath, 'Game Engine Depot', f'{oldName}.uproject') # renaming the unreal project file if it exists
@@ -276,7 +476,8 @@ class PMT:
                    
             self.projects[newName] = self.projects.pop(oldName)
             self.projects[newName]['path'] = newPath
-            self.saveParentConfig() # renaming the project in the parent config
+            self.saveParentConfig([oldName, newName]) # renaming the project in the parent config
+            self.getSearchIndex().renameProject(oldName, newName, newPath)
             
             self.getProjects()
     
@@ -299,13 +500,19 @@ class PMT:
         '''
         projPath = os.path.join(self.basePath, projName)
         try:
-            shutil.rmtree(projPath) # using shutil to delete entirely
+            try:
+                assets = copy.deepcopy(self.store.getAssets(projName)) # kept with the trash item, the sqlite catalog forgets them
+            except (OSError, ValueError, KeyError):
+                assets = {}
+            itemId = self.moveToTrash(projPath, {'kind': 'project', 'project': projName, 'details': copy.deepcopy(self.projects.get(projName, {})), 'assets': assets})
             
             del self.projects[projName] # deleting the project from the parent config
-            self.saveParentConfig()
+            self.store.deleteProject(projName)
+            self.saveParentConfig([projName])
+            self.getSearchIndex().removeProject(projName)
             self.getProjects()
             
-            return True, f'Project "{projName}" deleted successfully.'
+            return True, f'Project "{projName}" deleted successfully{self.getRestoreHint(itemId)}.'
         except Exception as e:
             return False, f'Error deleting project "{projName}": {str(e)}'
         
@@ -325,7 +532,38 @@ class PMT:
         bool: True if the asset is created successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
-        projConfigPath = os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config.json')
+        assetPath = os.path.join(self.basePath, projName, 'Art Depot', assetType, assetName)
+
+        with self.syncLock, self.store.lockAssets([(projName, assetName)]): # the watcher mustn't sync the files before the configs know about them, nor another session touch the same asset
+            try:
+                if not os.path.exists(assetPath) or individualFiles:
+                    
+                    self.store.putAsset(projName, assetName, self.createAssetFiles(projName, assetType, assetName, useMaya, useSubstance)) # adding the asset to the project config
+                        
+                    self.adjustAssetCounts({projName: 1}) # incrementing the asset count in the parent config
+                    self.indexAssets(projName, [assetName])
+                    
+                    return True, f'Asset "{assetName}" created successfully.'
+                else:
+                    return False, f'Asset "{assetName}"" already exists.'
+            except Exception as e:
+                return False, f'Error creating asset: {str(e)}'
+        
+    def createAssetFiles(self, projName, assetType, assetName, useMaya=False, useSubstance=False):
+        '''
+        Creates the folders and the DCC files of an asset on disk, without touching any config.
+        Shared by createAsset and createAssets.
+        
+        Args:
+        projName (str): The name of the project to create the asset in.
+        assetType (str): The type of asset to create (Characters/ Environments/ Props)
+        assetName (str): The name of the asset to create.
+        useMaya (bool): Whether the asset uses Maya.
+        useSubstance (bool): Whether the asset uses Substance.
+        
+        Returns:
+        dict: The details of the asset to be put in the project config.
+        '''
         prefix = { 
             'Characters': 'char_',
             'Environments': 'env_',
@@ -333,72 +571,228 @@ class PMT:
         }.get(assetType, '') # prefix for the asset name
 
         assetPath = os.path.join(self.basePath, projName, 'Art Depot', assetType, assetName)
+                
+        if not os.path.exists(assetPath):
+            os.makedirs(assetPath, exist_ok=True)
+
+        assetDetails = {}
+    
+        if useMaya:
+            mayaPath = os.path.join(assetPath, 'Maya')
+            os.makedirs(mayaPath, exist_ok=True)
+            mayaFilename = f'{prefix}{assetName}.ma' # ascii so that we can procedurally create the file
+            with open(os.path.join(mayaPath, mayaFilename), 'w') as f:
+                f.write('//Maya ASCII 2024 scene\n') # make a vaild maya file
+            assetDetails['Maya'] = {'filename': mayaFilename, 'version': '2024'} # remove the 'NA' and add the details if maya is used
 
+        if useSubstance:
+            substancePath = os.path.join(assetPath, 'Substance')
+            os.makedirs(substancePath, exist_ok=True)
+            substanceFilename = f'{prefix}{assetName}.spp'                                                                                    # couldn't find a way to procedurally create a substance file
+            shutil.copy(os.path.join(self.scriptDir, 'Files', 'empty', 'emptySubstance.spp'), os.path.join(substancePath, substanceFilename)) # so copying an empty file
+            assetDetails['Substance'] = {'filename': substanceFilename, 'version': '2023'} # similarly remove the 'NA' and add the details if substance is used                  
+            
+        for dcc in ['Maya', 'Substance']:
+            if dcc not in assetDetails:
+                assetDetails[dcc] = 'NA' # if not used, then 'NA'
+            
+        return {
+                'creationDate': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'type': assetType,
+                'path': assetPath,
+                **assetDetails
+            }
+        
+    def loadAssetManifest(self, manifestPath):
+        '''
+        Reads the assets to create from a manifest, e.g. a spreadsheet exported as csv.
+        - csv: a header row with type, name, useMaya, useSubstance columns.
+        - json: a list of objects with the same keys (or {'Assets': [...]}).
+        
+        Args:
+        manifestPath (str): The path of the manifest.
+        
+        Returns:
+        list: The specs of the assets as dicts.
+        '''
+        if manifestPath.lower().endswith('.csv'):
+            import csv
+            with open(manifestPath, 'r', newline='') as f:
+                return [{key.strip(): value.strip() for key, value in row.items() if key} for row in csv.DictReader(f)]
+        
+        with open(manifestPath, 'r') as f:
+            data = json.load(f)
+        return data.get('Assets', []) if isinstance(data, dict) else data
+    
+    def normalizeAssetSpec(self, spec):
+        '''
+        Turns one entry of a batch into (type, name, useMaya, useSubstance).
+        Accepts tuples/ lists in that order or dicts with those keys, and forgiving values from spreadsheets
+        ('char'/ 'Character' for the type, 'yes'/ 'x'/ '1' for the flags).
+        
+        Args:
+        spec (tuple/ list/ dict): The asset spec.
+        
+        Returns:
+        tuple: The normalized spec.
+        '''
+        if isinstance(spec, dict):
+            spec = (spec.get('type', ''), spec.get('name', ''), spec.get('useMaya', False), spec.get('useSubstance', False))
+        
+        assetType, assetName, useMaya, useSubstance = (list(spec) + [False, False])[:4]
+        
+        assetType = {
+            'char': 'Characters', 'character': 'Characters', 'characters': 'Characters',
+            'env': 'Environments', 'environment': 'Environments', 'environments': 'Environments',
+            'prop': 'Props', 'props': 'Props'
+        }.get(str(assetType).strip().lower(), assetType)
+        
+        toBool = lambda value: value if isinstance(value, bool) else str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'x')
+        
+        return assetType, str(assetName).strip(), toBool(useMaya), toBool(useSubstance)
+        
+    def createAssets(self, projName, specs, workers=None):
+        '''
+        Creates many assets in a project in one go.
+        The folders and DCC files are created in parallel, then the project config and the parent config
+        are only written once for the whole batch.
+        
+        Args:
+        projName (str): The name of the project to create the assets in.
+        specs (list/ str): The assets to create as (type, name, useMaya, useSubstance) or a path to a csv/json manifest.
+        workers (int): The number of threads creating the files, defaults to IO_WORKERS from the path config.
+        
+        Returns:
+        bool: True if every asset is created successfully, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        list: The per-asset results as {'name', 'type', 'success', 'msg'}.
+        '''
+        from concurrent.futures import ThreadPoolExecutor
+        
         try:
-            if not os.path.exists(assetPath) or individualFiles:
-                
-                if not os.path.exists(assetPath):
-                    os.makedirs(assetPath)
-
-                assetDetails = {}
-            
-                if useMaya:
-                    mayaPath = os.path.join(assetPath, 'Maya')
-                    os.makedirs(mayaPath, exist_ok=True)
-                    mayaFilename = f'{prefix}{assetName}.ma' # ascii so that we can procedurally create the file
-                    with open(os.path.join(mayaPath, mayaFilename), 'w') as f:
-                        f.write('//Maya ASCII 2024 scene\n') # make a vaild maya file
-                    assetDetails['Maya'] = {'filename': mayaFilename, 'version': '2024'} # remove the 'NA' and add the details if maya is used
-
-                if useSubstance:
-                    substancePath = os.path.join(assetPath, 'Substance')
-                    os.makedirs(substancePath, exist_ok=True)
-                    substanceFilename = f'{prefix}{assetName}.spp'                                                                                    # couldn't find a way to procedurally create a substance file
-                    shutil.copy(os.path.join(self.scriptDir, 'Files', 'empty', 'emptySubstance.spp'), os.path.join(substancePath, substanceFilename)) # so copying an empty file
-                    assetDetails['Substance'] = {'filename': substanceFilename, 'version': '2023'} # similarly remove the 'NA' and add the details if substance is used                  
-                    
-                for dcc in ['Maya', 'Substance']:
-                    if dcc not in assetDetails:
-                        assetDetails[dcc] = 'NA' # if not used, then 'NA'
-                    
-                with open(projConfigPath, 'r') as f:
-                    data = json.load(f)
-                    data['Assets'][assetName] = {
-                        'creationDate': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                        'type': assetType,
-                        'path': assetPath,
-                        **assetDetails
-                    } # adding the asset to the project config
-                
-                with open(projConfigPath, 'w') as f:
-                    json.dump(data, f, indent=4)
-                    
-                self.projects[projName]['Asset Count'] += 1 # incrementing the asset count in the parent config
-                self.saveParentConfig()
-                
-                return True, f'Asset "{assetName}" created successfully.'
-            else:
-                return False, f'Asset "{assetName}"" already exists.'
+            if isinstance(specs, str):
+                specs = self.loadAssetManifest(specs)
+            specs = [self.normalizeAssetSpec(spec) for spec in specs]
         except Exception as e:
-            return False, f'Error creating asset: {str(e)}'
+            return False, f'Error reading the asset manifest: {str(e)}', []
         
-    def getAssets(self, projName, dccType):
+        if projName not in self.projects:
+            return False, f'Project "{projName}" not found.', []
+            
+        with self.syncLock: # the watcher mustn't sync the files before the configs know about them
+            existing = self.store.getAssets(projName)
+            results = [None] * len(specs)
+            toCreate = []
+            seen = set()
+            
+            for i, (assetType, assetName, useMaya, useSubstance) in enumerate(specs): # validating up front so that we never touch the disk for a bad row
+                if not assetName:
+                    msg = 'Asset name cannot be empty.'
+                elif assetType not in ('Characters', 'Environments', 'Props'):
+                    msg = f'Invalid asset type "{assetType}".'
+                elif assetName in seen:
+                    msg = f'Asset "{assetName}" is listed more than once.'
+                elif assetName in existing or os.path.exists(os.path.join(self.basePath, projName, 'Art Depot', assetType, assetName)):
+                    msg = f'Asset "{assetName}" already exists.'
+                else:
+                    msg = None
+                    toCreate.append(i)
+                seen.add(assetName)
+                
+                if msg:
+                    results[i] = {'name': assetName, 'type': assetType, 'success': False, 'msg': msg}
+            
+            created = {}
+            
+            def create(i):
+                assetType, assetName, useMaya, useSubstance = specs[i]
+                return i, self.createAssetFiles(projName, assetType, assetName, useMaya, useSubstance)
+            
+            with ThreadPoolExecutor(max_workers=workers or self.ioWorkers) as pool:
+                futures = [pool.submit(create, i) for i in toCreate]
+                for i, future in zip(toCreate, futures):
+                    assetType, assetName = specs[i][:2]
+                    try:
+                        created[assetName] = future.result()[1]
+                        results[i] = {'name': assetName, 'type': assetType, 'success': True, 'msg': f'Asset "{assetName}" created successfully.'}
+                    except Exception as e:
+                        results[i] = {'name': assetName, 'type': assetType, 'success': False, 'msg': f'Error creating asset: {str(e)}'}
+            
+            try:
+                if created:
+                    self.store.putAssets(projName, created) # one commit for the whole batch
+                    self.adjustAssetCounts({projName: len(created)})
+                    self.getSearchIndex().putAssets(projName, created)
+            except Exception as e:
+                for result in results:
+                    if result['success']:
+                        result['success'] = False
+                        result['msg'] = f'Error saving the project config: {str(e)}'
+                return False, f'Error saving the project config: {str(e)}', results
+        
+        failed = len(specs) - len(created)
+        msg = f'Created {len(created)} of {len(specs)} assets.'
+        if failed:
+            msg += f' {failed} failed.'
+        return failed == 0, msg, results
+        
+    def getAssets(self, projName, dccType=None):
         '''
-        Returns the assets list of in a project for a particular DCC type.
+        Returns the assets of a project that have a file for a particular DCC type.
+        For a filtered/ sorted page of them, see queryAssets.
         
         Args:
         projName (str): The name of the project to get the assets from.
-        dccType (str): The DCC type to get the assets for.
-        '''
-        projConfigPath = os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config.json')
+        dccType (str): The DCC type to get the assets for, None for all the assets of the project.
         
+        Returns:
+        dict: asset name -> asset details, empty if the project can't be read.
+        '''
         try:
-            with open(projConfigPath, 'r') as file:
-                data = json.load(file)
-                return data.get('Assets', {})
+            if dccType is None:
+                return self.store.getAssets(projName)
+            return dict(self.store.queryAssets(projName, AssetQuery(dcc=dccType, hasFile=True))['assets'])
         except Exception as e:
             return {}
         
+    def queryAssets(self, projName, query=None, cursor=None):
+        '''
+        Returns a page of the assets of a project, filtered, projected and sorted by the store
+        (in sql for the sqlite catalog), so the GUI/ CLI only pull the rows they show.
+        
+        Args:
+        projName (str): The name of the project to get the assets from.
+        query (AssetQuery): The filters, fields, order and page size, all the assets by name if None.
+        cursor (str): The nextCursor of the previous page, None for the first page.
+        
+        Returns:
+        dict: {'assets': [(name, details), ...], 'nextCursor': str/ None, 'total': int}, an empty page if the project can't be read.
+        
+        Raises:
+        ValueError: If the cursor is broken or doesn't belong to this query's order.
+        '''
+        query = query or AssetQuery()
+        query.decodeCursor(cursor) # a bad cursor is the caller's mistake, not an empty project
+        try:
+            return self.store.queryAssets(projName, query, cursor)
+        except Exception as e:
+            return {'assets': [], 'nextCursor': None, 'total': 0}
+        
+    def getAssetTypes(self, projName):
+        '''
+        Returns the asset types of a project, from the type folders of its Art Depot.
+        
+        Args:
+        projName (str): The name of the project.
+        
+        Returns:
+        list: The sorted asset types, e.g. for a type filter.
+        '''
+        try:
+            return sorted(entry.name for entry in os.scandir(os.path.join(self.basePath, projName, 'Art Depot')) if entry.is_dir() and not entry.name.startswith('.'))
+        except OSError:
+            return []
+        
     def deleteAsset(self, projName, assetName, dccType):
         '''
         Deletes an asset from a project.
@@ -412,110 +806,113 @@ class PMT:
         bool: True if the asset is deleted successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
-        projConfigPath = os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config.json')
         assetDeleted = False
         
-        try:
-            with open(projConfigPath, 'r') as f:
-                data = json.load(f)
-            
-            if assetName in data['Assets'] and dccType in data['Assets'][assetName]:
-                assetPath = data['Assets'][assetName]['path']
-                dccPath = os.path.join(assetPath, dccType)
-                msg = ''
-                
-                if os.path.exists(dccPath):
-                    shutil.rmtree(dccPath)
-                    assetDeleted = True
-                    msg = 'Deleted {dccType} asset: {assetName}'
-                    data['Assets'][assetName][dccType] = 'NA' # setting the asset's particular DCC to 'NA' as it's deleted
+        with self.syncLock, self.store.lockAssets([(projName, assetName)]): # the watcher mustn't sync the files before the configs know about them, nor another session touch the same asset
+            try:
+                assetDetails = self.store.getAsset(projName, assetName)
+                
+                if assetDetails and dccType in assetDetails:
+                    assetDetails = copy.deepcopy(assetDetails) # the store may hand out shared dicts
+                    assetPath = assetDetails['path']
+                    dccPath = os.path.join(assetPath, dccType)
+                    msg = ''
+                    entries = os.listdir(assetPath) if os.path.exists(assetPath) else None
                     
-                if os.path.exists(assetPath) and len(os.listdir(assetPath)) == 0: # if the last DCC asset is deleted, delete the entire asset
-                    shutil.rmtree(assetPath)
-                    msg = f'Deleted entire asset: {assetName}'
-                    del data['Assets'][assetName] # deleting the asset from the project config
-                    self.projects[projName]['Asset Count'] -= 1 # decrementing the asset count in the parent config
-                    self.saveParentConfig()
+                    if entries is not None and set(entries) <= {dccType}: # the last DCC asset goes, so the entire asset goes (into the trash in one piece)
+                        itemId = None
+                        if entries:
+                            itemId = self.moveToTrash(assetPath, {'kind': 'asset', 'project': projName, 'asset': assetName, 'details': assetDetails})
+                            assetDeleted = True
+                        else:
+                            os.rmdir(assetPath) # nothing left in it anyway
+                        msg = f'Deleted entire asset: {assetName}{self.getRestoreHint(itemId)}'
+                        self.store.removeAsset(projName, assetName) # deleting the asset from the project config
+                        self.adjustAssetCounts({projName: -1}) # decrementing the asset count in the parent config
+                    else:
+                        if os.path.exists(dccPath):
+                            itemId = self.moveToTrash(dccPath, {'kind': 'dcc', 'project': projName, 'asset': assetName, 'dcc': dccType, 'details': assetDetails[dccType]})
+                            assetDeleted = True
+                            msg = f'Deleted {dccType} asset: {assetName}{self.getRestoreHint(itemId)}'
+                            assetDetails[dccType] = 'NA' # setting the asset's particular DCC to 'NA' as it's deleted
+                        self.store.putAsset(projName, assetName, assetDetails)
                     
-                with open(projConfigPath, 'w') as f:
-                    json.dump(data, f, indent=4)
+                    self.indexAssets(projName, [assetName])
+                    return True, msg
+                else:
+                    return False, f'Asset "{assetName}" not found.'
                 
-                return True, msg
-            else:
-                return False, f'Asset "{assetName}" not found.'
-            
-        except Exception as e:
-            return False, f'Error deleting asset: {str(e)}'         
+            except Exception as e:
+                return False, f'Error deleting asset: {str(e)}'         
 
-    def copyMoveAsset(self, srcProj, targetProjs, assetName, move=False):
+    def copyMoveAsset(self, srcProj, targetProjs, assetName, move=False, progress=None, workers=None):
         '''
         Copies or moves an asset from one project to a list of target projects.
+        The files go through the CopyEngine, so they are copied in parallel and a move
+        to the last target is just a rename when it's on the same volume.
         
         Args:
         srcProj (str): The name of the source project from which the asset is to be copied/moved.
         targetProjs (list): The list of target projects to copy/move the asset to.
+        assetName (str): The name of the asset.
+        move (bool): Whether to move instead of copy.
+        progress (function): Called with (bytesDone, bytesTotal) while the files are copied.
+        workers (int): The number of files copied at the same time, defaults to IO_WORKERS from the path config.
         
         Returns:
         bool: True if the asset is copied/moved successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
-        srcConfigPath = os.path.join(self.basePath, srcProj, 'Tools', f'PMT_{srcProj}_Config.json')
+        with self.syncLock, self.store.lockAssets([(proj, assetName) for proj in [srcProj, *targetProjs]]): # the watcher mustn't sync the files before the configs know about them, nor another session touch the same asset
+            try:
+                assetDetails = self.store.getAsset(srcProj, assetName)
 
-        try:
-            with open(srcConfigPath, 'r') as f:
-                srcData = json.load(f)
-
-            if assetName not in srcData['Assets']:
-                return False, f'Asset "{assetName}" not found in source project.'
-
-            assetDetails = srcData['Assets'][assetName]
-            assetType = assetDetails['type']
-            srcAssetPath = assetDetails['path']
-
-            for targetProj in targetProjs:
-                targetAssetPath = os.path.join(self.basePath, targetProj, 'Art Depot', assetType, assetName)
-                targetConfigPath = os.path.join(self.basePath, targetProj, 'Tools', f'PMT_{targetProj}_Config.json') # also create the target project config file
-            
-                if not os.path.exists(targetAssetPath):
-                    os.makedirs(targetAssetPath, exist_ok=True)
-        
-                for root, dirs, files in os.walk(srcAssetPath):
-                    relPath = os.path.relpath(root, srcAssetPath)
-                    targetPath = os.path.join(targetAssetPath, relPath)
-                    os.makedirs(targetPath, exist_ok=True)
-                    for file in files:
-                        srcPath = os.path.join(root, file)
-                        dstPath = os.path.join(targetPath, file)
-                        shutil.copy(srcPath, dstPath)
-                
-                assetDetails['path'] = targetAssetPath
-            
-                with open(targetConfigPath, 'r+') as f: # change the target project config file
-                    targetData = json.load(f)
-                    targetData['Assets'][assetName] = assetDetails
-                    f.seek(0)
-                    f.truncate()
-                    json.dump(targetData, f, indent=4)
-                    
-            if move: # if move is True, delete the asset from the source project
-                shutil.rmtree(srcAssetPath)
-                del srcData['Assets'][assetName]
-                self.projects[srcProj]['Asset Count'] -= 1
-                with open(srcConfigPath, 'w') as f:
-                    json.dump(srcData, f, indent=4)
+                if not assetDetails:
+                    return False, f'Asset "{assetName}" not found in source project.'
 
-            self.saveParentConfig()
-            
-            if move:
-                return True, f'Asset "{assetName}" successfully moved to target projects.'
-            else:
-                return True, f'Asset "{assetName}" successfully copied to target projects.'
+                assetDetails = copy.deepcopy(assetDetails)
+                assetType = assetDetails['type']
+                srcAssetPath = assetDetails['path']
+                
+                targetPaths = {targetProj: os.path.join(self.basePath, targetProj, 'Art Depot', assetType, assetName) for targetProj in targetProjs}
+                copyTargets = list(targetPaths.values())
+                from copyengine import CopyEngine # the optional subsystems are imported when first used, keeps the startup (and the cli) quick
+                engine = CopyEngine(workers or self.ioWorkers, progress=progress, blobs=self.blobs if self.dedupeEnabled else None)
+                
+                if move and copyTargets:
+                    moveTarget = copyTargets.pop() # the last target gets the source itself, the others get copies
+                    engine.copyTree(srcAssetPath, copyTargets)
+                    engine.moveTree(srcAssetPath, moveTarget)
+                else:
+                    engine.copyTree(srcAssetPath, copyTargets)
+                
+                counts = {}
+                for targetProj, targetAssetPath in targetPaths.items():
+                    if not self.store.getAsset(targetProj, assetName):
+                        counts[targetProj] = 1 # a target that had the asset already just gets it overwritten
+                    self.store.putAsset(targetProj, assetName, {**assetDetails, 'path': targetAssetPath}) # change the target project config
+                        
+                if move: # if move is True, delete the asset from the source project
+                    if os.path.exists(srcAssetPath): # already gone if it was moved/renamed
+                        shutil.rmtree(srcAssetPath)
+                    self.store.removeAsset(srcProj, assetName)
+                    counts[srcProj] = counts.get(srcProj, 0) - 1
+                
+                self.adjustAssetCounts(counts)
+                
+                for projName in list(targetPaths) + ([srcProj] if move else []):
+                    self.indexAssets(projName, [assetName])
+                
+                if move:
+                    return True, f'Asset "{assetName}" successfully moved to target projects.'
+                else:
+                    return True, f'Asset "{assetName}" successfully copied to target projects.'
 
-        except Exception as e:
-            if move:
-                return False, f'Error moving asset: {str(e)}'
-            else:
-                return False, f'Error copying asset: {str(e)}'
+            except Exception as e:
+                if move:
+                    return False, f'Error moving asset: {str(e)}'
+                else:
+                    return False, f'Error copying asset: {str(e)}'
             
     def renameAsset(self, projName, oldAssetName, newAssetName):
         '''
@@ -530,45 +927,485 @@ class PMT:
         bool: True if the asset is renamed successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
-        projConfigPath = os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config.json')
-        try:
-            with open(projConfigPath, 'r') as f:
-                data = json.load(f)
+        with self.syncLock, self.store.lockAssets([(projName, oldAssetName), (projName, newAssetName)]): # the watcher mustn't sync the files before the configs know about them, nor another session touch the same asset
+            try:
+                assetDetails = self.store.getAsset(projName, oldAssetName)
+            
+                if not assetDetails:
+                    return False, f'Asset "{oldAssetName}" not found.'
+                
+                if self.store.getAsset(projName, newAssetName): # also renaming to the same name, the put would be undone by the remove
+                    return False, f'Asset "{newAssetName}" already exists.'
+            
+                assetDetails = copy.deepcopy(assetDetails)
+                oldAssetPath = assetDetails['path']
+                newAssetPath = oldAssetPath.replace(oldAssetName, newAssetName)
+            
+                os.rename(oldAssetPath, newAssetPath)
+            
+                for dcc in ['Maya', 'Substance']:
+                    if assetDetails[dcc] != 'NA':
+                        dccDetails = assetDetails[dcc]
+                        oldFilename = dccDetails['filename']
+                        newFilename = oldFilename.replace(oldAssetName, newAssetName)
+                        dccDetails['filename'] = newFilename 
+                    
+                        oldFilePath = os.path.join(newAssetPath, dcc, oldFilename)
+                        newFilePath = os.path.join(newAssetPath, dcc, newFilename)
+                        os.rename(oldFilePath, newFilePath)
+
+                assetDetails['path'] = newAssetPath
+                self.store.putAsset(projName, newAssetName, assetDetails) # add the new asset name to the project config and remove the old one
+                self.store.removeAsset(projName, oldAssetName)
+                self.indexAssets(projName, [oldAssetName, newAssetName])
+                
+                return True, f'Asset "{oldAssetName}" renamed to "{newAssetName}" successfully.'
         
-            if oldAssetName not in data['Assets']:
-                return False, f'Asset "{oldAssetName}" not found.'
+            except Exception as e:
+                return False, f'Error renaming asset: {str(e)}'
         
-            assetDetails = data['Assets'].pop(oldAssetName) # also remove the old asset name from the project config and add the new one
-            oldAssetPath = assetDetails['path']
-            newAssetPath = oldAssetPath.replace(oldAssetName, newAssetName)
+    def shouldWatch(self, folderPath):
+        '''
+        Tells the watcher which folders to watch: the projects' Art Depots and nothing else
+        (the configs, the blobs and the other depots are written by the PMT itself).
         
-            os.rename(oldAssetPath, newAssetPath)
+        Args:
+        folderPath (str): The folder to decide on.
         
-            for dcc in ['Maya', 'Substance']:
-                if assetDetails[dcc] != 'NA':
-                    dccDetails = assetDetails[dcc]
-                    oldFilename = dccDetails['filename']
-                    newFilename = oldFilename.replace(oldAssetName, newAssetName)
-                    dccDetails['filename'] = newFilename 
+        Returns:
+        bool: True if the folder should be watched.
+        '''
+        parts = os.path.relpath(folderPath, self.basePath).split(os.sep)
+        if parts == ['.']:
+            return True
+        if parts[0] in ('Tools', '.blobs') or parts[0].startswith('.'):
+            return False
+        return len(parts) == 1 or parts[1] == 'Art Depot'
+        
+    def getSyncScope(self, path):
+        '''
+        Works out what a changed path belongs to.
+        
+        Args:
+        path (str): A path below the base path.
+        
+        Returns:
+        tuple: (project, type, asset) for a change inside an asset, (project, type) for a change of a type folder,
+               (project,) for the whole Art Depot of a project, () for everything, None if it's not about assets.
+        '''
+        parts = os.path.relpath(path, self.basePath).split(os.sep)
+        if parts == ['.']:
+            return ()
+        if parts[0] == '..' or parts[0] not in self.projects:
+            return None
+        if any(part.startswith('.') for part in parts[1:]): # temp/ hidden files (atomic writes, trash, ...)
+            return None
+        if len(parts) == 1:
+            return (parts[0],)
+        if parts[1] != 'Art Depot':
+            return None
+        return tuple(parts[:1] + parts[2:4])
+        
+    def scanAsset(self, projName, assetType, assetName, oldDetails=None):
+        '''
+        Builds the config entry of an asset from what's on disk, keeping whatever the old entry knew.
+        
+        Args:
+        projName (str): The name of the project.
+        assetType (str): The type folder the asset is in.
+        assetName (str): The name of the asset.
+        oldDetails (dict): The current config entry of the asset, if it has one.
+        
+        Returns:
+        dict: The asset details, None if the asset folder is gone.
+        '''
+        assetPath = os.path.join(self.basePath, projName, 'Art Depot', assetType, assetName)
+        if not os.path.isdir(assetPath):
+            return None
+        
+        filenames = {}
+        for dcc in ('Maya', 'Substance'):
+            try:
+                filenames[dcc] = os.listdir(os.path.join(assetPath, dcc))
+            except OSError:
+                filenames[dcc] = []
+        from reconcile import makeAssetDetails
+        return makeAssetDetails(assetPath, assetType, filenames, oldDetails, self.getFolderDate(assetPath))
+        
+    def getFolderDate(self, path):
+        '''
+        Returns:
+        str: When a folder was created (changed on linux), as the configs write dates.
+        '''
+        return datetime.datetime.fromtimestamp(os.stat(path).st_ctime).strftime('%Y-%m-%d %H:%M:%S')
+        
+    def syncPaths(self, paths):
+        '''
+        Applies changes made outside of the PMT to the project configs, only looking at the assets the paths belong to.
+        A path of a type folder (or higher up) only checks which assets came or went, the untouched ones aren't re-read.
+        
+        Args:
+        paths (list): The changed paths, as reported by the watcher.
+        
+        Returns:
+        dict: project name -> {'added': [...], 'updated': [...], 'removed': [...]} asset names, only the projects that changed.
+        '''
+        assetScopes = set()
+        typeScopes = set()
+        
+        for path in paths:
+            scope = self.getSyncScope(path)
+            if scope is None:
+                continue
+            if len(scope) == 3:
+                assetScopes.add(scope)
+            elif len(scope) == 2:
+                typeScopes.add(scope)
+            else: # a project or the whole base path, every type folder of it
+                for projName in ([scope[0]] if scope else list(self.projects)):
+                    depotPath = os.path.join(self.basePath, projName, 'Art Depot')
+                    types = {assetDetails.get('type') for assetDetails in self.store.getAssets(projName).values()}
+                    if os.path.isdir(depotPath):
+                        types.update(entry.name for entry in os.scandir(depotPath) if entry.is_dir())
+                    typeScopes.update((projName, assetType) for assetType in types if assetType)
+        
+        deltas = {}
+        counts = {} # project name -> how many assets it gained
+        with self.syncLock:
+            for projName, assetType in typeScopes: # only the assets that appeared/ disappeared
+                if projName not in self.projects:
+                    continue
+                typePath = os.path.join(self.basePath, projName, 'Art Depot', assetType)
+                try:
+                    onDisk = {entry.name for entry in os.scandir(typePath) if entry.is_dir() and not entry.name.startswith('.')}
+                except OSError:
+                    onDisk = set()
+                inConfig = {assetName for assetName, assetDetails in self.store.getAssets(projName).items() if assetDetails.get('type') == assetType}
+                assetScopes.update((projName, assetType, assetName) for assetName in onDisk ^ inConfig)
+            
+            for projName, assetType, assetName in sorted(assetScopes):
+                if projName not in self.projects:
+                    continue
+                oldDetails = self.store.getAsset(projName, assetName)
+                if oldDetails and oldDetails.get('type') != assetType and os.path.isdir(oldDetails.get('path', '')):
+                    continue # a different asset that happens to have the same name, the config only keeps one
+                newDetails = self.scanAsset(projName, assetType, assetName, oldDetails)
+                if newDetails == oldDetails:
+                    continue
                 
-                    oldFilePath = os.path.join(newAssetPath, dcc, oldFilename)
-                    newFilePath = os.path.join(newAssetPath, dcc, newFilename)
-                    os.rename(oldFilePath, newFilePath)
+                delta = deltas.setdefault(projName, {'added': [], 'updated': [], 'removed': []})
+                if newDetails is None:
+                    self.store.removeAsset(projName, assetName)
+                    counts[projName] = counts.get(projName, 0) - 1
+                    delta['removed'].append(assetName)
+                else:
+                    self.store.putAsset(projName, assetName, newDetails)
+                    if oldDetails:
+                        delta['updated'].append(assetName)
+                    else:
+                        counts[projName] = counts.get(projName, 0) + 1
+                        delta['added'].append(assetName)
+                self.indexAssets(projName, [assetName])
+            
+            if counts:
+                self.adjustAssetCounts(counts)
+        return deltas
+        
+    def reconcile(self, fix=False):
+        '''
+        Checks every project config and the parent config against the Art Depots on disk:
+        missing files/ assets/ projects, orphan folders, wrong Asset Counts and stale paths (e.g. after a project rename).
+        The depots are scanned in parallel and folders that didn't change since the last reconcile aren't listed again.
+        
+        Args:
+        fix (bool): Rewrite the configs to match the disk. Config entries of things that are gone are dropped,
+                    orphan folders and projects are added.
+        
+        Returns:
+        bool: True if the configs matched the disk (or were fixed), False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        dict: The report, see Reconciler.check.
+        '''
+        try:
+            if not os.path.isdir(self.basePath):
+                return False, f'Base folder {self.basePath} not found.', {}
+            
+            from reconcile import Reconciler
+            reconciler = Reconciler(self.basePath, self.ioWorkers, os.path.join(self.basePath, 'Tools', 'PMT_ScanCache.json'))
+            with self.syncLock:
+                self.projects = self.loadParentConfig()
+                report = reconciler.check(self.projects, self.store.getAssets)
+                disk = report.pop('disk')
+                issues = sum(len(value) for key, value in report.items() if key != 'stats')
+                
+                if fix and issues:
+                    self.applyReconcile(disk, report)
+            
+            stats = report['stats']
+            msg = f'Scanned {stats["assets"]} assets in {stats["projects"]} projects in {stats["seconds"]}s ({stats["dirsReused"]} folders unchanged): '
+            if not issues:
+                return True, msg + 'everything matches.', report
+            if fix:
+                return True, msg + f'fixed {issues} issues.', report
+            return False, msg + f'{issues} issues found.', report
+        except Exception as e:
+            return False, f'Error reconciling the configs: {str(e)}', {}
+        
+    def applyReconcile(self, disk, report):
+        '''
+        Rewrites the configs to match a reconcile scan, only the projects with issues are touched.
+        
+        Args:
+        disk (dict): The scanned assets, project name -> asset name -> {'path', 'type', 'files'}.
+        report (dict): The report of the scan.
+        '''
+        from reconcile import makeAssetDetails
+        
+        for projName in report['missingProjects']:
+            del self.projects[projName]
+            self.store.deleteProject(projName)
+            self.getSearchIndex().removeProject(projName)
+            
+        for projName in report['orphanProjects']:
+            projPath = os.path.join(self.basePath, projName)
+            self.projects[projName] = {
+                    'creationDate' : self.getFolderDate(projPath),
+                    'path' : projPath,
+                    'Asset Count' : 0,
+                    'Game Engine' : 'NA'
+                }
+            projConfigPath = self.store.getProjConfigPath(projName)
+            if not os.path.exists(projConfigPath):
+                os.makedirs(os.path.dirname(projConfigPath), exist_ok=True) # a project folder copied in by hand may not have one
+                self.store.initProject(projName)
+        
+        for issue in report['staleProjectPaths']:
+            self.projects[issue['project']]['path'] = issue['expected']
+        
+        touched = {issue['project'] for key in ('missingAssets', 'missingFiles', 'orphanFolders', 'stalePaths') for issue in report[key]}
+        touched.update(report['orphanProjects'])
+        for projName in sorted(touched):
+            configAssets = self.store.getAssets(projName)
+            diskAssets = disk[projName]
+            
+            changed = {}
+            for assetName, asset in diskAssets.items():
+                oldDetails = configAssets.get(assetName)
+                newDetails = makeAssetDetails(asset['path'], asset['type'], asset['files'], oldDetails, None if oldDetails else self.getFolderDate(asset['path']))
+                if newDetails != oldDetails:
+                    changed[assetName] = newDetails
+            removed = [assetName for assetName in configAssets if assetName not in diskAssets]
+            
+            if changed:
+                self.store.putAssets(projName, changed)
+            for assetName in removed:
+                self.store.removeAsset(projName, assetName)
+            self.indexAssets(projName, list(changed) + removed)
+        
+        for projName, diskAssets in disk.items():
+            self.projects[projName]['Asset Count'] = len(diskAssets)
+        self.saveParentConfig(set(report['missingProjects']) | set(report['orphanProjects']) | {issue['project'] for issue in report['staleProjectPaths']} | set(disk))
+        
+    def startWatcher(self, onChange=None):
+        '''
+        Starts watching the Art Depots for changes made outside of the PMT, they're synced into the configs as they come.
+        
+        Args:
+        onChange (function): Called with the deltas of syncPaths after every sync that changed something, on the watcher's thread.
+        
+        Returns:
+        bool: True if the watcher is running, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        '''
+        if self.watcher is not None:
+            return True, 'Watcher already running.'
+        
+        def sync(paths):
+            deltas = self.syncPaths(paths)
+            if deltas and onChange:
+                onChange(deltas)
+        
+        try:
+            from watcher import Watcher
+            self.watcher = Watcher(self.basePath, sync, self.watcherDebounce, self.watcherPollInterval, self.watcherBackend, self.shouldWatch)
+            backend = self.watcher.start()
+            return True, f'Watching {self.basePath} ({backend}).'
+        except Exception as e:
+            self.watcher = None
+            return False, f'Error starting the watcher: {str(e)}'
+        
+    def stopWatcher(self):
+        '''
+        Stops the watcher, if it's running.
+        '''
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        
+#---------------------------------------------------------------------------------------------------
+# Deleting goes through the trash: an instant rename now, the space is freed in the background later.
+#---------------------------------------------------------------------------------------------------
 
-            assetDetails['path'] = newAssetPath
-            data['Assets'][newAssetName] = assetDetails
+    def getTrash(self):
+        '''
+        Returns the trash, creating it (and starting its reclaimer) the first time.
+        
+        Returns:
+        Trash: The trash of the base path.
+        '''
+        if self.trash is None:
+            from trash import Trash
+            self.trash = Trash(self.basePath, self.trashRetention, self.trashWorkers)
+            self.trash.startReclaimer(self.trashReclaimInterval)
+        return self.trash
+        
+    def moveToTrash(self, path, meta):
+        '''
+        Deletes a folder: renamed into the trash if it's on, deleted for good if it's off
+        or the folder is on another volume than the trash (a rename can't cross volumes).
         
-            with open(projConfigPath, 'w') as f:
-                json.dump(data, f, indent=4)
+        Args:
+        path (str): The folder to delete.
+        meta (dict): What restoreFromTrash needs to put it back.
+        
+        Returns:
+        str: The id of the trash item, None if the folder was deleted for good.
+        '''
+        if self.trashEnabled:
+            try:
+                return self.getTrash().put(path, meta)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+        shutil.rmtree(path)
+        return None
+        
+    def getRestoreHint(self, itemId):
+        '''
+        Returns:
+        str: The bit of a delete message saying it can be undone, empty if it can't.
+        '''
+        if itemId is None or self.trashRetention <= 0: # gone for good right away
+            return ''
+        return f' (restorable from the trash for {self.trashRetention / 86400:g} days)'
+        
+    def listTrash(self):
+        '''
+        Returns:
+        list: The items in the trash, newest first, as {'id', 'kind', 'project', 'asset', 'dcc', 'deletedAt', 'expiresAt', ...}.
+        '''
+        return self.getTrash().listItems()
+        
+    def restoreFromTrash(self, itemId):
+        '''
+        Puts a deleted project, asset or DCC folder back where it was, along with its config entries.
+        
+        Args:
+        itemId (str): The id of the trash item.
+        
+        Returns:
+        bool: True if the item is restored successfully, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        '''
+        trash = self.getTrash()
+        with self.syncLock:
+            try:
+                meta = trash.getItem(itemId)
+                if meta is None:
+                    return False, f'"{itemId}" is not in the trash (anymore).'
+                projName = meta['project']
+                
+                if meta['kind'] == 'project':
+                    if projName in self.projects:
+                        return False, f'A project named "{projName}" exists already.'
+                    trash.restore(itemId)
+                    self.projects[projName] = {**meta['details'], 'path': meta['originalPath']}
+                    self.store.initProject(projName)
+                    self.store.putAssets(projName, meta['assets'])
+                    self.saveParentConfig([projName])
+                    self.getSearchIndex().putAssets(projName, meta['assets'])
+                    self.getProjects()
+                    return True, f'Project "{projName}" restored successfully.'
+                
+                if projName not in self.projects:
+                    return False, f'Project "{projName}" does not exist anymore, restore it first.'
+                assetName = meta['asset']
+                assetDetails = self.store.getAsset(projName, assetName)
+                
+                if meta['kind'] == 'asset':
+                    if assetDetails:
+                        return False, f'An asset named "{assetName}" exists already in {projName}.'
+                    trash.restore(itemId)
+                    self.store.putAsset(projName, assetName, meta['details'])
+                    self.adjustAssetCounts({projName: 1})
+                else:
+                    dccType = meta['dcc']
+                    if not assetDetails:
+                        return False, f'Asset "{assetName}" does not exist anymore, restore it first.'
+                    if isinstance(assetDetails.get(dccType), dict):
+                        return False, f'Asset "{assetName}" has a {dccType} file again.'
+                    trash.restore(itemId)
+                    self.store.putAsset(projName, assetName, {**copy.deepcopy(assetDetails), dccType: meta['details']})
+                
+                self.indexAssets(projName, [assetName])
+                return True, f'Asset "{assetName}" restored successfully.'
+            except Exception as e:
+                return False, f'Error restoring from the trash: {str(e)}'
+        
+    def emptyTrash(self, job=None):
+        '''
+        Frees the space of everything in the trash now, instead of waiting for the retention window.
+        
+        Args:
+        job (Job): The background job this runs for, if any.
+        
+        Returns:
+        bool: True if the trash is emptied successfully, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        '''
+        try:
+            freed = self.getTrash().reclaim(everything=True)
+            return True, f'Emptied the trash ({freed} items).'
+        except Exception as e:
+            return False, f'Error emptying the trash: {str(e)}'
+        
+    def prepareForWrite(self, filePath):
+        '''
+        Copy-on-write for deduplicated files: if the file is a hardlink to a shared blob,
+        it gets its own copy before a DCC saves over it, so the other projects keep their version.
+        Always done (not just with DEDUPE on) as links made earlier stay around when the option is turned off.
+        
+        Args:
+        filePath (str): The file that is about to be written to.
+        '''
+        self.blobs.breakLink(filePath)
+        
+    def dedupe(self, projNames=None):
+        '''
+        Replaces duplicate files across projects with hardlinks to a single blob and drops blobs nobody uses anymore.
+        
+        Args:
+        projNames (list): The projects to dedupe, all of them by default.
+        
+        Returns:
+        bool: True if the dedupe went through, False otherwise.
+        str: A message indicating the result of the operation (with the bytes reclaimed).
+        '''
+        try:
+            projNames = projNames if projNames is not None else self.getProjects()
+            projPaths = [os.path.join(self.basePath, projName) for projName in projNames]
             
-            return True, f'Asset "{oldAssetName}" renamed to "{newAssetName}" successfully.'
-    
+            linked, reclaimed = self.blobs.dedupe(projPaths, self.ioWorkers)
+            reclaimed += self.blobs.collectGarbage()
+            
+            return True, f'Linked {linked} duplicate files, reclaimed {reclaimed / (1024 * 1024):.2f} MB ({reclaimed} bytes).'
         except Exception as e:
-            return False, f'Error renaming asset: {str(e)}'
+            return False, f'Error deduplicating assets: {str(e)}'
         
     def openAsset(self, filePath):
         try:
             if os.path.exists(filePath):
+                self.prepareForWrite(filePath) # the artist is likely going to save over it
                 os.startfile(filePath)
                 return True, f'Opening file!'
             else:
@@ -614,7 +1451,7 @@ class PMT:
                 'Asset Count': 0,
                 'Game Engine': gameEngineDetails
             }
-            self.saveParentConfig()
+            self.saveParentConfig([projName])
 
             return True, f'Unreal project for "{projName}" created successfully.'
         
@@ -626,47 +1463,363 @@ class PMT:
 # They do so by calling shell commands using python's subprocess.
 #---------------------------------------------------------------------------------------------------       
         
-    def exportAssetFromMaya(self, importToUnreal=False):
+    def getWorkerPool(self, dcc, projName=None):
+        '''
+        Returns the pool of warm workers for a DCC, creating it the first time (the workers themselves start on the first request).
+        Unreal workers have a project loaded, so every Unreal project gets its own pool.
+        
+        Args:
+        dcc (str): 'Maya' or 'Unreal'.
+        projName (str): The name of the project, for Unreal.
+        
+        Returns:
+        WorkerPool: The pool.
+        '''
+        key = (dcc, projName if dcc == 'Unreal' else None)
+        with self.workerPoolsLock:
+            pool = self.workerPools.get(key)
+            if pool is not None:
+                return pool
+            
+            ioPath = os.path.join(self.scriptDir, 'Files', 'io')
+            if self.fakeWorkers:
+                command = [sys.executable, os.path.join(ioPath, 'fakeworker.py')]
+            elif dcc == 'Maya':
+                command = [self.mayapyPath, os.path.join(ioPath, 'mayaworker.py')]
+            else:
+                unrealProjectPath = os.path.join(self.basePath, projName, 'Game Engine Depot', f'{projName}.uproject')
+                command = [self.unrealCmdPath, unrealProjectPath, '-run=pythonscript', f'-script={os.path.join(ioPath, "unrealworker.py")}', '-unattended', '-nullrhi']
+            
+            from workers import WorkerPool
+            pool = WorkerPool(dcc if not projName else f'{dcc} ({projName})', command,
+                              size=self.mayaWorkers if dcc == 'Maya' else self.unrealWorkers,
+                              memoryLimit=self.workerMemoryLimit, heartbeatInterval=self.workerHeartbeat,
+                              requestTimeout=self.workerTimeout, env={'PMT_IO_DIR': ioPath})
+            self.workerPools[key] = pool
+            return pool
+        
+    def getWorkerStats(self):
+        '''
+        Returns:
+        list: The stats of every worker pool (restarts, and the pid/ memory/ requests of each worker).
+        '''
+        with self.workerPoolsLock:
+            return [pool.getStats() for pool in self.workerPools.values()]
+        
+    def shutdownWorkers(self):
+        '''
+        Stops all the warm workers, e.g. when the app closes.
+        '''
+        with self.workerPoolsLock:
+            pools, self.workerPools = list(self.workerPools.values()), {}
+        for pool in pools:
+            pool.shutdown()
+        
+    def getExportManifestPath(self, projName):
+        '''
+        Returns the path of the export manifest of a project, it remembers what every asset was last exported from and to.
+        '''
+        return os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_ExportManifest.json')
+        
+    def loadExportManifest(self, projName):
+        '''
+        Returns:
+        dict: asset name -> {'source', 'sourceHash', 'sourceStat', 'settings', 'output', 'outputHash', 'outputStat', 'exportedAt'}.
+        '''
+        try:
+            with open(self.getExportManifestPath(projName), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+    def isExportUpToDate(self, projName, assetName, scenePath, manifest=None):
+        '''
+        Checks if the FBX of an asset is still what exporting its scene would give.
+        The scene and the FBX are only hashed if their size/ mtime changed, so an unchanged asset is skipped without reading it.
+        
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        scenePath (str): The path of the Maya scene.
+        manifest (dict): The export manifest if it's already loaded.
+        
+        Returns:
+        bool: True if the export can be skipped.
+        str: The path of the FBX from the last export, None if there's none.
+        '''
+        record = (manifest if manifest is not None else self.loadExportManifest(projName)).get(assetName)
+        if not record or record.get('settings') != EXPORT_SETTINGS or os.path.normcase(record.get('source', '')) != os.path.normcase(scenePath):
+            return False, None
+        
+        for path, hashKey, statKey in ((scenePath, 'sourceHash', 'sourceStat'), (record['output'], 'outputHash', 'outputStat')):
+            try:
+                st = os.stat(path)
+            except OSError:
+                return False, None # e.g. someone cleaned the intermediate depot
+            if [st.st_mtime_ns, st.st_size] != record.get(statKey) and hashFile(path) != record.get(hashKey):
+                return False, None
+            
+        return True, record['output']
+        
+    def recordExports(self, projName, exports):
+        '''
+        Remembers what assets were just exported from and to, after the export (maya saves the scene once it's done).
+        
+        Args:
+        projName (str): The name of the project.
+        exports (list): (asset name, scene path, FBX path) of every successful export.
+        '''
+        records = {}
+        for assetName, scenePath, outputPath in exports:
+            try:
+                sourceStat, outputStat = os.stat(scenePath), os.stat(outputPath)
+                records[assetName] = {'source': scenePath, 'sourceHash': hashFile(scenePath), 'sourceStat': [sourceStat.st_mtime_ns, sourceStat.st_size],
+                                      'settings': EXPORT_SETTINGS, 'output': outputPath, 'outputHash': hashFile(outputPath),
+                                      'outputStat': [outputStat.st_mtime_ns, outputStat.st_size], 'exportedAt': datetime.datetime.now().isoformat()}
+            except OSError:
+                continue # no FBX after all, it'll just be exported again next time
+            
+        if not records:
+            return
+        with self.exportManifestLock:
+            manifest = self.loadExportManifest(projName)
+            manifest.update(records)
+            atomicWriteJson(self.getExportManifestPath(projName), manifest)
+            
+    def getExportPath(self, projName, assetType, scenePath):
+        '''
+        Returns where Files/io/maya.py exports the FBX of a scene to.
+        '''
+        fbxFileName = os.path.splitext(os.path.basename(scenePath))[0] + '.fbx'
+        return os.path.join(self.basePath, projName, 'Intermediate Depot', assetType, fbxFileName)
+        
+    def submitExport(self, projName, assetName, importToUnreal=False, force=False):
+        '''
+        Queues the export of an asset (and its import to Unreal) as a background job, so the caller doesn't block on Maya.
+        
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset to export.
+        importToUnreal (bool): Whether to import the asset to Unreal Engine after exporting.
+        force (bool): Whether to export even if the scene didn't change since the last export.
+        
+        Returns:
+        Job: The queued job, check its status/ progress/ message or cancel it through the job manager.
+        '''
+        jobName = f'Export {projName}/{assetName}' + (' + Unreal import' if importToUnreal else '')
+        return self.jobs.submit(jobName, self.exportAssetFromMaya, importToUnreal, projName=projName, assetName=assetName, force=force)
+        
+    def exportAssetFromMaya(self, importToUnreal=False, projName=None, assetName=None, job=None, force=False):
         '''
         Meant to call shell commands to automate the export of an asset from Maya.
         It opens the asset in Maya, exports it as an FBX file, saves and closes Maya.
         
         Args:
         importToUnreal (bool): Whether to import the asset to Unreal Engine after exporting.
+        projName (str): The name of the project, the current project by default.
+        assetName (str): The name of the asset, the current asset by default.
+        job (Job): The background job this runs in, if any (for progress and cancellation).
+        force (bool): Whether to export even if the scene didn't change since the last export.
         
         Returns:
         bool: True if the asset is exported successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
-        projConfigPath = os.path.join(self.basePath, self.currProj, 'Tools', f'PMT_{self.currProj}_Config.json')
-    
-        with open(projConfigPath, 'r') as f:
-            data = json.load(f)
-
-        assetDetails = data['Assets'][self.currAsset]
+        projName = projName or self.currProj # a queued job can't rely on whatever is current when it finally runs
+        assetName = assetName or self.currAsset
+        
+        assetDetails = self.store.getAsset(projName, assetName)
         assetType = assetDetails['type']
         mayaFilePath = os.path.join(assetDetails['path'], 'Maya', assetDetails['Maya']['filename'])
+        
+        if not force and self.isExportUpToDate(projName, assetName, mayaFilePath)[0]:
+            success, msg = self.finishExport(mayaFilePath, assetType, projName, importToUnreal, job)
+            return success, msg.replace('Asset exported successfully', 'Asset is up to date, export skipped') # no need to wake maya up at all
+        
+        exportPath = self.getExportPath(projName, assetType, mayaFilePath)
+        self.prepareForWrite(mayaFilePath) # maya saves the scene after the export
+        self.prepareForWrite(exportPath) # and overwrites the fbx in place, which may be linked to other projects' copies
+        sourcePath = mayaFilePath
         mayaFilePath = mayaFilePath.replace('\\', '/') # maya doesn't like backslashes
 
+        if self.workersEnabled: # a warm maya is already waiting, no need to launch one
+            if job:
+                job.setProgress(0.1, 'Exporting in a Maya worker...')
+            success, result = self.getWorkerPool('Maya').call('export', {'scenePath': mayaFilePath, 'projName': projName, 'assetType': assetType}, job=job)
+            if not success:
+                return False, f'Failed to export asset. Error: {result}'
+            self.recordExports(projName, [(assetName, sourcePath, exportPath)])
+            return self.finishExport(mayaFilePath, assetType, projName, importToUnreal, job)
+
         mayaScriptPath = os.path.join(self.scriptDir, 'Files', 'io', 'maya.py')
         mayaScriptPath = mayaScriptPath.replace('\\', '/')
 
         command = (f'"{self.mayaPath}" -command "file -open \\"{mayaFilePath}\\"; '
                    f'python(\\"exec(open(\\\'{mayaScriptPath}\\\').read()); '
-                   f'exportAssetAndClose(\\\'{self.currProj}\\\', \\\'{assetType}\\\')\\\")"') # this was a lot of work to get the command right :]
+                   f'exportAssetAndClose(\\\'{projName}\\\', \\\'{assetType}\\\')\\\")"') # this was a lot of work to get the command right :]
 
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate()
+        if job:
+            job.setProgress(0.1, 'Exporting from Maya...')
+            
+        returncode, stdout, stderr = runProcess(command, job)
 
-        if process.returncode == 0: # if the process is successful, import the asset to Unreal Engine if asked by the user
-            if importToUnreal:
-                self.importAssetToUnreal(mayaFilePath, assetType=assetType)
-            return True, 'Asset exported successfully.'
+        if returncode == 0: # if the process is successful, import the asset to Unreal Engine if asked by the user
+            self.recordExports(projName, [(assetName, sourcePath, exportPath)])
+            return self.finishExport(mayaFilePath, assetType, projName, importToUnreal, job)
         else:
             errMsg = stderr
             return False, f'Failed to export asset. Error: {errMsg}'
+        
+    def finishExport(self, mayaFilePath, assetType, projName, importToUnreal, job=None):
+        '''
+        Imports a freshly exported asset to Unreal Engine if asked by the user.
+        
+        Returns:
+        bool: True if everything went well, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        '''
+        if importToUnreal:
+            if job:
+                job.setProgress(0.5, 'Importing to Unreal Engine...')
+            success, msg = self.importAssetToUnreal(mayaFilePath, assetType=assetType, projName=projName, job=job)
+            if not success:
+                return False, f'Asset exported successfully, but the Unreal import failed. {msg}'
+        return True, 'Asset exported successfully.'
+
+    def submitBatchExport(self, projName, assetNames, force=False):
+        '''
+        Queues a batch export of many assets (one Maya session for all of them) as a background job.
+        
+        Args:
+        projName (str): The name of the project.
+        assetNames (list): The names of the assets to export.
+        force (bool): Whether to export the assets whose scenes didn't change since their last export too.
+        
+        Returns:
+        Job: The queued job.
+        '''
+        return self.jobs.submit(f'Batch export {len(assetNames)} assets from {projName}', self.exportAssetsFromMaya, projName, assetNames, force=force)
+        
+    def exportAssetsFromMaya(self, projName, assetNames, job=None, force=False):
+        '''
+        Exports many assets in a single headless Maya (mayapy) session instead of launching Maya for each one,
+        since the Maya startup is most of the time of an export.
+        mayapy runs Files/io/mayabatch.py which writes a result manifest after every scene.
+        
+        Args:
+        projName (str): The name of the project.
+        assetNames (list): The names of the assets to export.
+        job (Job): The background job this runs in, if any.
+        force (bool): Whether to export the assets whose scenes didn't change since their last export too.
+        
+        Returns:
+        bool: True if every asset is exported successfully (or was up to date), False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        list: The per-asset results from the manifest as {'asset', 'scenePath', 'output', 'success', 'error', 'seconds'},
+              with 'skipped' set for the assets that were up to date.
+        '''
+        assets = self.store.getAssets(projName)
+        manifest = self.loadExportManifest(projName)
+        items = []
+        results = []
+        scenePaths = {}
+        
+        for assetName in assetNames:
+            assetDetails = assets.get(assetName)
+            if not assetDetails or assetDetails.get('Maya', 'NA') == 'NA':
+                results.append({'asset': assetName, 'scenePath': None, 'output': None, 'success': False, 'error': 'No Maya file for this asset.'})
+                continue
+            
+            scenePath = os.path.join(assetDetails['path'], 'Maya', assetDetails['Maya']['filename'])
+            
+            if not force:
+                upToDate, outputPath = self.isExportUpToDate(projName, assetName, scenePath, manifest)
+                if upToDate:
+                    results.append({'asset': assetName, 'scenePath': scenePath.replace('\\', '/'), 'output': outputPath, 'success': True,
+                                    'error': None, 'seconds': 0, 'skipped': True})
+                    continue
+            
+            self.prepareForWrite(scenePath) # maya saves the scenes after the export
+            self.prepareForWrite(self.getExportPath(projName, assetDetails['type'], scenePath)) # and overwrites their fbx in place
+            scenePaths[assetName] = scenePath
+            items.append({'asset': assetName, 'projName': projName, 'assetType': assetDetails['type'], 'scenePath': scenePath.replace('\\', '/')})
+            
+        if items and self.workersEnabled:
+            results += self.exportItemsWithWorkers(items, job)
+        elif items:
+            toolsPath = os.path.join(self.basePath, projName, 'Tools')
+            stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            requestPath = os.path.join(toolsPath, f'PMT_BatchExport_{stamp}.json')
+            manifestPath = os.path.join(toolsPath, f'PMT_BatchExport_{stamp}_Result.json')
+            
+            with open(requestPath, 'w') as f:
+                json.dump({'items': items, 'manifestPath': manifestPath}, f, indent=4)
+            
+            batchScriptPath = os.path.join(self.scriptDir, 'Files', 'io', 'mayabatch.py')
+            command = f'"{self.mayapyPath}" "{batchScriptPath}" "{requestPath}"'
+            
+            if job:
+                job.setProgress(0.05, f'Exporting {len(items)} assets in one Maya session...')
+            
+            try:
+                returncode, stdout, stderr = runProcess(command, job)
+                
+                try:
+                    with open(manifestPath, 'r') as f:
+                        exported = json.load(f)['results']
+                except (OSError, ValueError):
+                    exported = []
+                    
+                done = {result['asset'] for result in exported}
+                for item in items: # whatever isn't in the manifest never got its turn (maya died before it)
+                    if item['asset'] not in done:
+                        exported.append({'asset': item['asset'], 'scenePath': item['scenePath'], 'output': None, 'success': False,
+                                         'error': f'Maya exited before exporting it (code {returncode}). {stderr.strip()}'})
+                results += exported
+            finally:
+                for path in (requestPath, manifestPath):
+                    if os.path.exists(path):
+                        os.remove(path)
+                        
+        self.recordExports(projName, [(result['asset'], scenePaths[result['asset']], result['output']) for result in results
+                                      if result['success'] and result['asset'] in scenePaths])
+        
+        succeeded = sum(1 for result in results if result['success'])
+        skipped = sum(1 for result in results if result.get('skipped'))
+        msg = f'Exported {succeeded - skipped} of {len(assetNames)} assets' + (f', {skipped} already up to date.' if skipped else '.')
+        return succeeded == len(assetNames), msg, results
+
+    def exportItemsWithWorkers(self, items, job=None):
+        '''
+        Spreads the scenes of a batch export over the warm Maya workers.
+        
+        Args:
+        items (list): The scenes to export as {'asset', 'projName', 'assetType', 'scenePath'}.
+        job (Job): The background job this runs in, if any.
+        
+        Returns:
+        list: The per-asset results, same as the ones of the mayapy batch.
+        '''
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        pool = self.getWorkerPool('Maya')
+        
+        def export(item):
+            start = datetime.datetime.now()
+            success, result = pool.call('export', {'scenePath': item['scenePath'], 'projName': item['projName'], 'assetType': item['assetType']}, job=job)
+            return {'asset': item['asset'], 'scenePath': item['scenePath'], 'output': result['output'] if success else None, 'success': success,
+                    'error': None if success else result, 'seconds': round((datetime.datetime.now() - start).total_seconds(), 3)}
+        
+        results = []
+        with ThreadPoolExecutor(max_workers=pool.size) as executor:
+            futures = [executor.submit(export, item) for item in items]
+            for future in as_completed(futures):
+                results.append(future.result())
+                if job:
+                    job.setProgress(len(results) / len(items), f'Exported {len(results)} of {len(items)} assets...')
+        return results
 
-    def importAssetToUnreal(self, mayaFilePath, assetType):
+    def importAssetToUnreal(self, mayaFilePath, assetType, projName=None, job=None):
         '''
         This function imports an asset into Unreal Engine based on the file path.
         Currently I'm facing an issue where any asset I export from Maya is not being imported due to some smoothing group issue.
@@ -674,35 +1827,204 @@ class PMT:
         Args:
         mayaFilePath (str): The file path of the asset to import.
         assetType (str): The type of asset to import.
+        projName (str): The name of the project, the current project by default.
+        job (Job): The background job this runs in, if any.
         
         Returns:
         bool: True if the asset is imported to Unreal Engine successfully, False otherwise.
         str: A message indicating the result of the operation to be displayed in the GUI.
         '''
+        projName = projName or self.currProj
         mayaFileName = os.path.basename(mayaFilePath)
         fbxFileName = os.path.splitext(mayaFileName)[0] + '.fbx'
-        assetPath = os.path.join(self.basePath, self.currProj, 'Intermediate Depot', assetType, fbxFileName)
+        assetPath = os.path.join(self.basePath, projName, 'Intermediate Depot', assetType, fbxFileName)
         assetPath = assetPath.replace('\\', '/')
 
         unrealScriptPath = os.path.join(self.scriptDir, 'Files', 'io', 'unreal.py')
         unrealScriptPath = unrealScriptPath.replace('\\', '/')
 
-        unrealProjectPath = os.path.join(self.basePath, self.currProj, 'Game Engine Depot', f'{self.currProj}.uproject')
+        unrealProjectPath = os.path.join(self.basePath, projName, 'Game Engine Depot', f'{projName}.uproject')
         unrealProjectPath = unrealProjectPath.replace('\\', '/')
 
         if not os.path.exists(unrealProjectPath):
             errMsg = 'Create the Unreal Engine Project first.'
             return False, errMsg
 
+        if self.workersEnabled:
+            success, result = self.getWorkerPool('Unreal', projName).call('import', {'filePath': assetPath, 'destinationPath': '/Game/Meshes/'}, job=job)
+            if success:
+                return True, 'Asset imported to Unreal Engine successfully.'
+            return False, f'Failed to import asset to Unreal Engine. Error: {result}'
+
         pythonCommand = f"exec(open('{unrealScriptPath}').read()); importAsset('{assetPath}', '/Game/Meshes/')"
 
         command = f'"{self.unrealPath}" "{unrealProjectPath}" -run=pythonscript -script="{pythonCommand}"' # this command is a lot simpler than the Maya one haha
 
-        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate()
+        returncode, stdout, stderr = runProcess(command, job)
 
-        if process.returncode == 0:
+        if returncode == 0:
             return True, 'Asset imported to Unreal Engine successfully.'
         else:
             errMsg = stderr
-            return False, f'Failed to import asset to Unreal Engine. Error: {errMsg}'
\ No newline at end of file
+            return False, f'Failed to import asset to Unreal Engine. Error: {errMsg}'
+
+    def getImportRecordPath(self, projName):
+        '''
+        Returns the path of the file that remembers which FBX files were imported to Unreal, and in what state.
+        '''
+        return os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_UnrealImports.json')
+        
+    def loadImportRecord(self, projName):
+        '''
+        Returns:
+        dict: FBX path relative to the intermediate depot -> [mtime_ns, size] when it was last imported.
+        '''
+        try:
+            with open(self.getImportRecordPath(projName), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+        
+    def getPendingImports(self, projName):
+        '''
+        Lists the FBX files of the intermediate depot that are new or changed since they were last imported to Unreal.
+        
+        Args:
+        projName (str): The name of the project.
+        
+        Returns:
+        list: The paths of the pending FBX files.
+        '''
+        depotPath = os.path.join(self.basePath, projName, 'Intermediate Depot')
+        imported = self.loadImportRecord(projName)
+        
+        pending = []
+        for dirPath, _, fileNames in os.walk(depotPath):
+            for fileName in fileNames:
+                if not fileName.lower().endswith('.fbx'):
+                    continue
+                filePath = os.path.join(dirPath, fileName)
+                st = os.stat(filePath)
+                if imported.get(os.path.relpath(filePath, depotPath)) != [st.st_mtime_ns, st.st_size]:
+                    pending.append(filePath)
+        return sorted(pending)
+        
+    def submitBatchImport(self, projName, fbxPaths=None, force=False):
+        '''
+        Queues a batch import to Unreal Engine as a background job.
+        
+        Args:
+        projName (str): The name of the project.
+        fbxPaths (list or dict): The FBX files to import, the pending ones by default.
+        force (bool): Whether to import every FBX of the intermediate depot, changed or not.
+        
+        Returns:
+        Job: The queued job.
+        '''
+        return self.jobs.submit(f'Import to Unreal ({projName})', self.importAssetsToUnreal, projName, fbxPaths, force)
+        
+    def importAssetsToUnreal(self, projName, fbxPaths=None, force=False, job=None):
+        '''
+        Imports many FBX files to Unreal Engine with one editor launch per destination folder, instead of one launch per file.
+        The editor runs batchImport from Files/io/unreal.py, which writes a result manifest with the assets imported from each file.
+        
+        Args:
+        projName (str): The name of the project.
+        fbxPaths (list or dict): The FBX files to import (a dict maps each file to its destination path),
+                                 every pending FBX of the intermediate depot by default.
+        force (bool): Whether to import every FBX of the intermediate depot, changed or not (only used without fbxPaths).
+        job (Job): The background job this runs in, if any.
+        
+        Returns:
+        bool: True if every file is imported successfully, False otherwise.
+        str: A message indicating the result of the operation to be displayed in the GUI.
+        list: The per-file results as {'file', 'success', 'assets', 'error'}.
+        '''
+        unrealProjectPath = os.path.join(self.basePath, projName, 'Game Engine Depot', f'{projName}.uproject')
+        if not os.path.exists(unrealProjectPath):
+            return False, 'Create the Unreal Engine Project first.', []
+        
+        depotPath = os.path.join(self.basePath, projName, 'Intermediate Depot')
+        if fbxPaths is None:
+            fbxPaths = [os.path.join(dirPath, fileName) for dirPath, _, fileNames in os.walk(depotPath)
+                        for fileName in fileNames if fileName.lower().endswith('.fbx')] if force else self.getPendingImports(projName)
+        if not isinstance(fbxPaths, dict):
+            fbxPaths = {fbxPath: '/Game/Meshes/' for fbxPath in fbxPaths} # same destination as the single import
+            
+        if not fbxPaths:
+            return True, 'Nothing to import, Unreal is up to date.', []
+        
+        results = []
+        batches = {}
+        signatures = {}
+        for fbxPath, destinationPath in fbxPaths.items():
+            if not os.path.exists(fbxPath):
+                results.append({'file': fbxPath, 'success': False, 'assets': [], 'error': 'File not found.'})
+                continue
+            st = os.stat(fbxPath) # taken before the import, so a file changing during it stays pending
+            signatures[fbxPath.replace('\\', '/')] = (fbxPath, [st.st_mtime_ns, st.st_size])
+            batches.setdefault(destinationPath, []).append(fbxPath.replace('\\', '/'))
+            
+        for i, (destinationPath, files) in enumerate(batches.items()):
+            if job:
+                job.setProgress(i / len(batches), f'Importing {len(files)} files to {destinationPath}...')
+            results += self.runImportBatch(projName, unrealProjectPath, files, destinationPath, job)
+            
+        imported = self.loadImportRecord(projName)
+        for result in results:
+            if result['success'] and result['file'] in signatures:
+                fbxPath, signature = signatures[result['file']]
+                if os.path.abspath(fbxPath).startswith(os.path.abspath(depotPath) + os.sep):
+                    imported[os.path.relpath(fbxPath, depotPath)] = signature
+        atomicWriteJson(self.getImportRecordPath(projName), imported)
+        
+        succeeded = sum(1 for result in results if result['success'])
+        return succeeded == len(fbxPaths), f'Imported {succeeded} of {len(fbxPaths)} files to Unreal Engine.', results
+        
+    def runImportBatch(self, projName, unrealProjectPath, files, destinationPath, job=None):
+        '''
+        Imports one batch of files (all going to the same destination) in a single editor session, or a warm Unreal worker if enabled.
+        
+        Returns:
+        list: The per-file results as {'file', 'success', 'assets', 'error'}.
+        '''
+        if self.workersEnabled:
+            success, result = self.getWorkerPool('Unreal', projName).call('importBatch', {'filePaths': files, 'destinationPath': destinationPath}, job=job)
+            if not success:
+                return [{'file': filePath, 'success': False, 'assets': [], 'error': result} for filePath in files]
+            return [{'file': filePath, 'success': bool(result.get(filePath)), 'assets': result.get(filePath, []),
+                     'error': None if result.get(filePath) else 'Nothing was imported from this file'} for filePath in files]
+        
+        toolsPath = os.path.join(self.basePath, projName, 'Tools')
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        requestPath = os.path.join(toolsPath, f'PMT_BatchImport_{stamp}.json').replace('\\', '/')
+        manifestPath = os.path.join(toolsPath, f'PMT_BatchImport_{stamp}_Result.json').replace('\\', '/')
+        
+        with open(requestPath, 'w') as f:
+            json.dump({'files': files, 'destinationPath': destinationPath, 'manifestPath': manifestPath}, f, indent=4)
+            
+        unrealScriptPath = os.path.join(self.scriptDir, 'Files', 'io', 'unreal.py').replace('\\', '/')
+        pythonCommand = f"exec(open('{unrealScriptPath}').read()); batchImport('{requestPath}')"
+        command = f'"{self.unrealPath}" "{unrealProjectPath.replace(os.sep, "/")}" -run=pythonscript -script="{pythonCommand}"'
+        
+        try:
+            returncode, stdout, stderr = runProcess(command, job)
+            
+            try:
+                with open(manifestPath, 'r') as f:
+                    results = json.load(f)['results']
+            except (OSError, ValueError):
+                results = []
+                
+            done = {result['file'] for result in results}
+            for filePath in files: # the editor died before writing the manifest
+                if filePath not in done:
+                    results.append({'file': filePath, 'success': False, 'assets': [],
+                                    'error': f'Unreal exited before importing it (code {returncode}). {stderr.strip()}'})
+            return results
+        finally:
+            for path in (requestPath, manifestPath):
+                if os.path.exists(path):
+                    os.remove(path)
+
+tracing.traceMethods(PMT, skip=('shouldWatch', 'getSyncScope', 'getFolderDate', 'dumpTrace')) # every public operation is a span, minus the per path helpers of the watcher
@@ -0,0 +1,195 @@
+import json
+import heapq
+import base64
+import datetime
+from operator import itemgetter
+
+#-------------------------------------------------------------------------------
+# This module describes what to pull out of a project's assets: the filters,
+# the fields to keep, a stable order and the page size. The file stores run a
+# query over the config they have in memory (AssetQuery.run), the sqlite
+# catalog turns it into SQL, and both hand back one page at a time:
+#
+#   {'assets': [(name, details), ...], 'nextCursor': '...' or None, 'total': 1234}
+#
+# The cursor is the sort key of the last asset of the page (keyset pagination),
+# so a page is the same whatever got added or removed before it, and the next
+# one never skips or repeats an asset. Ties are broken by the name, which is
+# unique within a project, so the order is total.
+#-------------------------------------------------------------------------------
+
+SORT_FIELDS = ('name', 'type', 'creationDate', 'file', 'status') # file/ status are the ones of the query's DCC
+
+class AssetQuery:
+    '''
+    The filters, projection, order and page size of an asset listing.
+    '''
+    def __init__(self, dcc=None, hasFile=None, types=None, namePrefix=None, nameContains=None, createdAfter=None, createdBefore=None,
+                 fields=None, sortBy='name', descending=False, limit=None):
+        '''
+        Args:
+        dcc (str): The DCC ('Maya'/ 'Substance') hasFile and the file/ status sort refer to.
+        hasFile (bool): True for only the assets with a file for the DCC, False for only the ones without, None for both.
+        types (str/ list): Only the assets of this type/ these types, None for all of them.
+        namePrefix (str): Only the assets whose name starts with this (case insensitive).
+        nameContains (str): Only the assets whose name contains this (case insensitive).
+        createdAfter (str/ date/ datetime): Only the assets created at or after this, e.g. '2024-05-01'.
+        createdBefore (str/ date/ datetime): Only the assets created before this.
+        fields (list): The keys of the details to keep, None for all of them.
+        sortBy (str): One of SORT_FIELDS.
+        descending (bool): Whether the order is reversed.
+        limit (int): The page size, None for a single page with everything.
+
+        Raises:
+        ValueError: If the query doesn't make sense (unknown sort field, file/ status without a DCC, ...).
+        '''
+        if sortBy not in SORT_FIELDS:
+            raise ValueError(f'Can\'t sort by "{sortBy}", expected one of {", ".join(SORT_FIELDS)}.')
+        if (hasFile is not None or sortBy in ('file', 'status')) and not dcc:
+            raise ValueError('Filtering/ sorting on the DCC file needs a DCC.')
+        if limit is not None and limit < 1:
+            raise ValueError('The page size has to be at least 1.')
+
+        self.dcc = dcc
+        self.hasFile = hasFile
+        self.types = [types] if isinstance(types, str) else list(types) if types else None
+        self.namePrefix = namePrefix.lower() if namePrefix else None
+        self.nameContains = nameContains.lower() if nameContains else None
+        self.createdAfter = toDateText(createdAfter)
+        self.createdBefore = toDateText(createdBefore)
+        self.fields = list(fields) if fields is not None else None
+        self.sortBy = sortBy
+        self.descending = descending
+        self.limit = limit
+
+    def getParams(self):
+        '''
+        Returns:
+        dict: The arguments the query was made with.
+        '''
+        return {'dcc': self.dcc, 'hasFile': self.hasFile, 'types': self.types, 'namePrefix': self.namePrefix, 'nameContains': self.nameContains,
+                'createdAfter': self.createdAfter, 'createdBefore': self.createdBefore, 'fields': self.fields,
+                'sortBy': self.sortBy, 'descending': self.descending, 'limit': self.limit}
+
+    def replace(self, **changes):
+        '''
+        Returns:
+        AssetQuery: A copy of the query with some arguments changed, e.g. query.replace(sortBy='type').
+        '''
+        return AssetQuery(**{**self.getParams(), **changes})
+
+    def hasDccFile(self, assetDetails):
+        return assetDetails.get(self.dcc, 'NA') != 'NA'
+
+    def matches(self, assetName, assetDetails):
+        '''
+        Returns:
+        bool: True if the asset passes every filter.
+        '''
+        if self.hasFile is not None and self.hasDccFile(assetDetails) != self.hasFile:
+            return False
+        if self.types is not None and assetDetails.get('type') not in self.types:
+            return False
+        if self.namePrefix and not assetName.lower().startswith(self.namePrefix):
+            return False
+        if self.nameContains and self.nameContains not in assetName.lower():
+            return False
+        created = assetDetails.get('creationDate') or ''
+        if self.createdAfter and created < self.createdAfter:
+            return False
+        if self.createdBefore and created >= self.createdBefore:
+            return False
+        return True
+
+    def sortKey(self, assetName, assetDetails):
+        '''
+        Returns:
+        tuple: Where the asset goes in the order, ending with the name so no two assets compare equal.
+        '''
+        tail = (assetName.lower(), assetName)
+        if self.sortBy == 'name':
+            return tail
+        if self.sortBy == 'type':
+            return ((assetDetails.get('type') or '').lower(),) + tail
+        if self.sortBy == 'creationDate':
+            return (assetDetails.get('creationDate') or '',) + tail
+        if self.sortBy == 'file':
+            return ((assetDetails[self.dcc]['filename'] if self.hasDccFile(assetDetails) else '').lower(),) + tail
+        return (0 if self.hasDccFile(assetDetails) else 1,) + tail # status, the ones with a file first
+
+    def project(self, assetDetails):
+        '''
+        Returns:
+        dict: The details with only the fields of the query.
+        '''
+        if self.fields is None:
+            return assetDetails
+        return {field: assetDetails[field] for field in self.fields if field in assetDetails}
+
+    def encodeCursor(self, key):
+        '''
+        Returns:
+        str: An opaque cursor for the page after the asset with that sort key.
+        '''
+        text = json.dumps({'sortBy': self.sortBy, 'descending': self.descending, 'after': list(key)})
+        return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+    def decodeCursor(self, cursor):
+        '''
+        Returns:
+        tuple: The sort key a page starts after, None for the first page.
+
+        Raises:
+        ValueError: If the cursor is broken or comes from a query with another order.
+        '''
+        if not cursor:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            key = tuple(data['after'])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f'"{cursor}" is not a valid cursor.')
+        if data.get('sortBy') != self.sortBy or data.get('descending') != self.descending:
+            raise ValueError('The cursor belongs to a listing with another order.')
+        return key
+
+    def run(self, assets, cursor=None):
+        '''
+        Runs the query over the assets of a project in memory. The page is picked with a heap,
+        so a page of a big project costs a pass over it, not a full sort.
+
+        Args:
+        assets (dict): asset name -> asset details.
+        cursor (str): The nextCursor of the previous page, None for the first page.
+
+        Returns:
+        dict: The page, see the top of the module.
+        '''
+        after = self.decodeCursor(cursor)
+        matching = [(self.sortKey(assetName, assetDetails), assetName, assetDetails)
+                    for assetName, assetDetails in assets.items() if self.matches(assetName, assetDetails)]
+        total = len(matching)
+        if after is not None:
+            matching = [entry for entry in matching if (entry[0] < after if self.descending else entry[0] > after)]
+
+        if self.limit is None:
+            page = sorted(matching, key=itemgetter(0), reverse=self.descending)
+        else:
+            page = (heapq.nlargest if self.descending else heapq.nsmallest)(self.limit + 1, matching, key=itemgetter(0))
+
+        nextCursor = None
+        if self.limit is not None and len(page) > self.limit: # one extra to know if there is a next page
+            page = page[:self.limit]
+            nextCursor = self.encodeCursor(page[-1][0])
+        return {'assets': [(assetName, self.project(assetDetails)) for _, assetName, assetDetails in page], 'nextCursor': nextCursor, 'total': total}
+
+def toDateText(value):
+    '''
+    Returns:
+    str: A date/ datetime as the configs write it ('%Y-%m-%d %H:%M:%S'), strings are kept as they are.
+    '''
+    if isinstance(value, datetime.datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, datetime.date):
+        return value.strftime('%Y-%m-%d')
+    return value or None
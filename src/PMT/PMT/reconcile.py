@@ -0,0 +1,293 @@
+import os
+import json
+import time
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from serializers import atomicWriteJson
+
+#-------------------------------------------------------------------------------
+# This module checks the configs against what is actually in the Art Depots.
+# The depots are listed with os.scandir on a thread pool (one task per type
+# folder of every project), and the entries of every folder are cached with the
+# folder's mtime. A folder whose mtime didn't change since the last scan isn't
+# listed again, so a rescan of an unchanged studio root costs a stat per folder.
+# It only reports, the PMT decides what to fix.
+#-------------------------------------------------------------------------------
+
+DCC_EXTENSIONS = {'Maya': ('.ma', '.mb'), 'Substance': ('.spp',)}
+DCC_VERSIONS = {'Maya': '2024', 'Substance': '2023'}
+
+def makeAssetDetails(assetPath, assetType, filenames, oldDetails=None, creationDate=None):
+    '''
+    Builds the config entry of an asset from the files found on disk, keeping whatever the old entry knew.
+
+    Args:
+    assetPath (str): The folder of the asset.
+    assetType (str): The type folder the asset is in.
+    filenames (dict): DCC -> the names of the files in its folder.
+    oldDetails (dict): The current config entry of the asset, if it has one.
+    creationDate (str): Used if the old entry doesn't have one.
+
+    Returns:
+    dict: The asset details.
+    '''
+    oldDetails = oldDetails or {}
+    assetDetails = {
+        'creationDate': oldDetails.get('creationDate') or creationDate or datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'type': assetType,
+        'path': assetPath,
+    }
+    for dcc, extensions in DCC_EXTENSIONS.items():
+        dccFiles = sorted(f for f in filenames.get(dcc, ()) if f.lower().endswith(extensions))
+        oldDcc = oldDetails.get(dcc)
+        if isinstance(oldDcc, dict) and oldDcc.get('filename') in dccFiles:
+            assetDetails[dcc] = oldDcc # still there, keep it as is
+        elif dccFiles:
+            assetDetails[dcc] = {'filename': dccFiles[0], 'version': oldDcc.get('version', DCC_VERSIONS[dcc]) if isinstance(oldDcc, dict) else DCC_VERSIONS[dcc]}
+        else:
+            assetDetails[dcc] = 'NA'
+    return assetDetails
+
+class DirCache:
+    '''
+    The entries of every scanned folder, keyed by the folder path relative to the base path.
+    An entry is only reused while the folder's mtime is the same. Folders modified right
+    before they were listed aren't cached at all, a change in the same mtime tick would go unnoticed.
+    '''
+    RACY_WINDOW = 2 * 10**9 # ns
+
+    def __init__(self, basePath, cachePath=None):
+        '''
+        Args:
+        basePath (str): The base path of the PMT.
+        cachePath (str): Where the cache is persisted, None to keep it in memory only.
+        '''
+        self.basePath = basePath
+        self.cachePath = cachePath
+        self.entries = {} # relative folder path -> (mtime, {name: is folder})
+        self.lock = threading.Lock()
+        self.listed = 0
+        self.reused = 0
+        self.load()
+
+    def load(self):
+        if not self.cachePath:
+            return
+        try:
+            with open(self.cachePath, 'r') as f:
+                data = json.load(f)
+            self.entries = {path: (mtime, dict(entries)) for path, (mtime, entries) in data.items()}
+        except (OSError, ValueError, TypeError):
+            self.entries = {}
+
+    def save(self):
+        if not self.cachePath:
+            return
+        with self.lock:
+            data = {path: [mtime, list(entries.items())] for path, (mtime, entries) in self.entries.items()}
+        os.makedirs(os.path.dirname(self.cachePath), exist_ok=True)
+        atomicWriteJson(self.cachePath, data, indent=None)
+
+    def listDir(self, path):
+        '''
+        Lists a folder, or hands back the cached listing if its mtime didn't change.
+
+        Args:
+        path (str): The folder.
+
+        Returns:
+        dict: entry name -> True for folders, None if the folder doesn't exist.
+        '''
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+        key = self.getKey(path)
+        cached = self.entries.get(key)
+        if cached is not None and cached[0] == mtime:
+            with self.lock:
+                self.reused += 1
+            return cached[1]
+
+        try:
+            with os.scandir(path) as it:
+                entries = {entry.name: entry.is_dir(follow_symlinks=False) for entry in it if not entry.name.startswith('.')}
+        except OSError:
+            return None
+
+        with self.lock:
+            self.listed += 1
+            if time.time_ns() - mtime > self.RACY_WINDOW:
+                self.entries[key] = (mtime, entries)
+            else:
+                self.entries.pop(key, None)
+        return entries
+
+    def getKey(self, path):
+        '''
+        Returns:
+        str: The path relative to the base path ('.' for the base path itself), cheaper than os.path.relpath.
+        '''
+        return path[len(self.basePath) + 1:] or '.'
+
+    def prune(self, seen):
+        '''
+        Forgets the folders that weren't seen in the last scan (deleted/ moved away).
+        '''
+        with self.lock:
+            for key in [key for key in self.entries if key not in seen]:
+                del self.entries[key]
+
+class Reconciler:
+    '''
+    Scans the Art Depots and compares them with the parent config and the project configs.
+    '''
+    IGNORED = ('Tools', '.blobs') # folders in the base path that aren't projects
+
+    def __init__(self, basePath, workers=8, cachePath=None):
+        '''
+        Args:
+        basePath (str): The base path of the PMT.
+        workers (int): The number of folders listed at the same time.
+        cachePath (str): Where the folder cache is persisted, None to keep it in memory only.
+        '''
+        self.basePath = basePath
+        self.workers = workers
+        self.cache = DirCache(basePath, cachePath)
+
+    def scanType(self, projName, assetType):
+        '''
+        Scans one type folder of a project.
+
+        Returns:
+        dict: asset name -> {'path', 'files': {dcc: [filenames]}}.
+        list: The folders that were looked at, for pruning the cache.
+        '''
+        typePath = os.path.join(self.basePath, projName, 'Art Depot', assetType)
+        seen = [typePath]
+        assets = {}
+        for assetName, isDir in (self.cache.listDir(typePath) or {}).items():
+            if not isDir:
+                continue
+            assetPath = os.path.join(typePath, assetName)
+            seen.append(assetPath)
+            files = {}
+            for dcc, dccIsDir in (self.cache.listDir(assetPath) or {}).items():
+                if dccIsDir and dcc in DCC_EXTENSIONS:
+                    dccPath = os.path.join(assetPath, dcc)
+                    seen.append(dccPath)
+                    files[dcc] = [name for name, nameIsDir in (self.cache.listDir(dccPath) or {}).items() if not nameIsDir]
+            assets[assetName] = {'path': assetPath, 'type': assetType, 'files': files}
+        return assets, seen
+
+    def scan(self, projNames=None):
+        '''
+        Scans the Art Depots of the projects in parallel.
+
+        Args:
+        projNames (list): The projects to scan, every project folder in the base path by default.
+
+        Returns:
+        dict: project name -> asset name -> {'path', 'type', 'files'}, plus a list of (project, asset, type) duplicates
+              for asset names that show up under more than one type.
+        '''
+        if projNames is None:
+            projNames = [name for name, isDir in (self.cache.listDir(self.basePath) or {}).items() if isDir and name not in self.IGNORED]
+
+        tasks = []
+        seen = {self.cache.getKey(self.basePath)}
+        for projName in projNames:
+            depotPath = os.path.join(self.basePath, projName, 'Art Depot')
+            seen.update(self.cache.getKey(path) for path in (os.path.join(self.basePath, projName), depotPath))
+            tasks.extend((projName, assetType) for assetType, isDir in (self.cache.listDir(depotPath) or {}).items() if isDir)
+
+        disk = {projName: {} for projName in projNames}
+        duplicates = []
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for (projName, assetType), (assets, folders) in zip(tasks, pool.map(lambda task: self.scanType(*task), tasks)):
+                seen.update(self.cache.getKey(path) for path in folders)
+                for assetName, asset in assets.items():
+                    if assetName in disk[projName]:
+                        duplicates.append((projName, assetName, assetType))
+                    else:
+                        disk[projName][assetName] = asset
+
+        self.cache.prune(seen)
+        return disk, duplicates
+
+    def check(self, projects, getAssets):
+        '''
+        Compares the configs with the disk.
+
+        Args:
+        projects (dict): The projects of the parent config.
+        getAssets (function): Returns the config assets of a project, raises if the project has no config.
+
+        Returns:
+        dict: The report, every list empty means the configs match the disk. Also has the scanned assets under 'disk'.
+        '''
+        start = time.perf_counter()
+        listed, reused = self.cache.listed, self.cache.reused
+
+        onDisk = [name for name, isDir in (self.cache.listDir(self.basePath) or {}).items()
+                  if isDir and name not in self.IGNORED and os.path.isdir(os.path.join(self.basePath, name, 'Art Depot'))]
+        disk, duplicates = self.scan(sorted(onDisk))
+
+        report = {key: [] for key in ('missingProjects', 'orphanProjects', 'staleProjectPaths', 'wrongAssetCounts',
+                                      'missingAssets', 'missingFiles', 'orphanFolders', 'stalePaths', 'duplicateAssets')}
+        report['duplicateAssets'] = [{'project': projName, 'asset': assetName, 'type': assetType} for projName, assetName, assetType in duplicates]
+
+        for projName in sorted(projects):
+            if projName not in disk:
+                report['missingProjects'].append(projName)
+        for projName in sorted(disk):
+            if projName not in projects:
+                report['orphanProjects'].append(projName)
+
+        assetTotal = 0
+        for projName in sorted(disk):
+            diskAssets = disk[projName]
+            assetTotal += len(diskAssets)
+            projPath = os.path.join(self.basePath, projName)
+
+            if projName in projects:
+                projDetails = projects[projName]
+                if os.path.normcase(projDetails.get('path', '')) != os.path.normcase(projPath):
+                    report['staleProjectPaths'].append({'project': projName, 'path': projDetails.get('path', ''), 'expected': projPath})
+                if projDetails.get('Asset Count') != len(diskAssets):
+                    report['wrongAssetCounts'].append({'project': projName, 'count': projDetails.get('Asset Count'), 'actual': len(diskAssets)})
+
+            try:
+                configAssets = getAssets(projName) if projName in projects else {}
+            except (OSError, ValueError, KeyError):
+                configAssets = {}
+
+            for assetName in sorted(configAssets):
+                assetDetails = configAssets[assetName]
+                asset = diskAssets.get(assetName)
+                if asset is None:
+                    report['missingAssets'].append({'project': projName, 'asset': assetName, 'path': assetDetails.get('path', '')})
+                    continue
+                if os.path.normcase(assetDetails.get('path', '')) != os.path.normcase(asset['path']) or assetDetails.get('type') != asset['type']:
+                    report['stalePaths'].append({'project': projName, 'asset': assetName, 'path': assetDetails.get('path', ''), 'expected': asset['path']})
+                for dcc in DCC_EXTENSIONS:
+                    dccDetails = assetDetails.get(dcc)
+                    if isinstance(dccDetails, dict) and dccDetails.get('filename') not in asset['files'].get(dcc, ()):
+                        report['missingFiles'].append({'project': projName, 'asset': assetName, 'dcc': dcc, 'filename': dccDetails.get('filename')})
+
+            for assetName in sorted(set(diskAssets) - set(configAssets)):
+                asset = diskAssets[assetName]
+                report['orphanFolders'].append({'project': projName, 'asset': assetName, 'type': asset['type'], 'path': asset['path']})
+
+        self.cache.save()
+        report['stats'] = {
+            'projects': len(disk),
+            'assets': assetTotal,
+            'dirsListed': self.cache.listed - listed,
+            'dirsReused': self.cache.reused - reused,
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+        report['disk'] = disk
+        return report
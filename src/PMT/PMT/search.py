@@ -0,0 +1,362 @@
+import os
+import re
+import json
+import atexit
+import heapq
+import bisect
+import threading
+from collections import Counter
+from difflib import SequenceMatcher
+from serializers import atomicWriteJson
+
+#-------------------------------------------------------------------------------
+# This module is the cross-project asset search of the PMT.
+# Every asset is indexed by its name, type, project and DCC filenames.
+# Prefix matches go through a sorted list of terms (bisect), substring and
+# typo-tolerant matches through a trigram index of the terms.
+# The indexed assets are persisted so a new session doesn't re-read every config.
+#-------------------------------------------------------------------------------
+
+SPLIT_PATTERN = re.compile(r'[\s_\-.]+')
+
+def getTrigrams(term):
+    '''
+    Args:
+    term (str): The term.
+
+    Returns:
+    set: The three letter pieces of the term, padded so the start and end of a short term count too ("$$s", "$sw", ...).
+    '''
+    padded = f'$${term}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SearchIndex:
+    '''
+    An in-memory index of the assets of every project, kept up to date by the PMT as assets change.
+    '''
+    VERSION = 1
+
+    def __init__(self, indexPath, saveDelay=2.0):
+        '''
+        Initializes the index, nothing is read from disk until it's loaded.
+
+        Args:
+        indexPath (str): Where the index is persisted.
+        saveDelay (float): Seconds to wait after a change before saving, so a burst of changes is saved once.
+        '''
+        self.indexPath = indexPath
+        self.saveDelay = saveDelay
+        self.docs = {} # (project, asset) -> {'project', 'asset', 'type', 'files', 'path'}
+        self.docTerms = {} # (project, asset) -> the terms the asset was indexed under
+        self.terms = {} # term -> the assets indexed under it
+        self.sortedTerms = [] # for prefix matching
+        self.trigrams = {} # trigram -> the terms containing it
+        self.projects = set() # the projects that were indexed, even the ones without assets
+        self.loaded = False
+        self.dirty = False
+        self.saveTimer = None
+        self.lock = threading.RLock()
+        self.writeLock = threading.Lock()
+        atexit.register(self.flush)
+
+    def makeDoc(self, projName, assetName, assetDetails):
+        '''
+        Picks the searchable bits out of an asset.
+
+        Returns:
+        dict: {'project', 'asset', 'type', 'files', 'path'}.
+        '''
+        files = [assetDetails[dcc]['filename'] for dcc in ('Maya', 'Substance')
+                 if isinstance(assetDetails.get(dcc), dict) and assetDetails[dcc].get('filename')]
+        return {'project': projName, 'asset': assetName, 'type': assetDetails.get('type', ''), 'files': files, 'path': assetDetails.get('path', '')}
+
+    def getDocTerms(self, doc):
+        '''
+        Returns:
+        set: The lowercase words an asset can be found by ("hero_sword_01.ma" -> "hero", "sword", "01").
+             Queries are split the same way, so whole names don't need to be terms of their own.
+        '''
+        values = [doc['asset'], doc['type'], doc['project']] + [f.rsplit('.', 1)[0] for f in doc['files']]
+        return {word for value in values for word in SPLIT_PATTERN.split(value.lower()) if word}
+
+    def addTerm(self, term, key):
+        '''
+        Files an asset under a term, a new term also goes into the sorted terms and the trigram table.
+        '''
+        keys = self.terms.get(term)
+        if keys is None:
+            keys = self.terms[term] = set()
+            bisect.insort(self.sortedTerms, term)
+            for trigram in getTrigrams(term):
+                self.trigrams.setdefault(trigram, set()).add(term)
+        keys.add(key)
+
+    def removeTerm(self, term, key):
+        '''
+        Takes an asset off a term.
+        '''
+        keys = self.terms.get(term)
+        if keys is None:
+            return
+        keys.discard(key)
+        if keys:
+            return
+        del self.terms[term] # last asset using the term, drop it everywhere
+        i = bisect.bisect_left(self.sortedTerms, term)
+        if i < len(self.sortedTerms) and self.sortedTerms[i] == term:
+            del self.sortedTerms[i]
+        for trigram in getTrigrams(term):
+            termSet = self.trigrams.get(trigram)
+            if termSet is not None:
+                termSet.discard(term)
+                if not termSet:
+                    del self.trigrams[trigram]
+
+    def indexDoc(self, doc):
+        '''
+        (Re)indexes an asset under all its terms.
+        '''
+        key = (doc['project'], doc['asset'])
+        self.unindexDoc(key)
+        terms = self.getDocTerms(doc)
+        self.docs[key] = doc
+        self.docTerms[key] = terms
+        for term in terms:
+            self.addTerm(term, key)
+
+    def unindexDoc(self, key):
+        '''
+        Takes an asset out of the index.
+        '''
+        self.docs.pop(key, None)
+        for term in self.docTerms.pop(key, ()):
+            self.removeTerm(term, key)
+
+#-------------------------------------------------------------------------------
+# Incremental updates, called by the PMT whenever assets change.
+#-------------------------------------------------------------------------------
+
+    def putAsset(self, projName, assetName, assetDetails):
+        '''
+        Adds or updates an asset.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The asset record from the store.
+        '''
+        with self.lock:
+            self.projects.add(projName)
+            self.indexDoc(self.makeDoc(projName, assetName, assetDetails))
+            self.markDirty()
+
+    def putAssets(self, projName, assets):
+        '''
+        Adds or updates many assets of a project.
+
+        Args:
+        projName (str): The name of the project.
+        assets (dict): asset name -> asset record.
+        '''
+        with self.lock:
+            self.projects.add(projName)
+            for assetName, assetDetails in assets.items():
+                self.indexDoc(self.makeDoc(projName, assetName, assetDetails))
+            self.markDirty()
+
+    def removeAsset(self, projName, assetName):
+        '''
+        Removes an asset.
+        '''
+        with self.lock:
+            self.unindexDoc((projName, assetName))
+            self.markDirty()
+
+    def removeProject(self, projName):
+        '''
+        Removes every asset of a project.
+        '''
+        with self.lock:
+            self.projects.discard(projName)
+            for key in [key for key in self.docs if key[0] == projName]:
+                self.unindexDoc(key)
+            self.markDirty()
+
+    def renameProject(self, oldName, newName, newPath=None):
+        '''
+        Moves the assets of a project over to its new name.
+
+        Args:
+        oldName (str): The old name of the project.
+        newName (str): The new name of the project.
+        newPath (str): The new folder of the project, to fix up the asset paths.
+        '''
+        with self.lock:
+            self.projects.discard(oldName)
+            self.projects.add(newName)
+            docs = [doc for key, doc in list(self.docs.items()) if key[0] == oldName]
+            for doc in docs:
+                self.unindexDoc((oldName, doc['asset']))
+                path = doc['path']
+                if newPath and path:
+                    oldPath = os.path.join(os.path.dirname(newPath), oldName)
+                    if os.path.normcase(path).startswith(os.path.normcase(oldPath + os.sep)):
+                        path = newPath + path[len(oldPath):]
+                self.indexDoc({**doc, 'project': newName, 'path': path})
+            self.markDirty()
+
+    def getProjects(self):
+        '''
+        Returns:
+        set: The projects that were indexed.
+        '''
+        with self.lock:
+            return set(self.projects)
+
+    def clear(self):
+        '''
+        Forgets everything, e.g. before a rebuild.
+        '''
+        with self.lock:
+            self.docs, self.docTerms, self.terms, self.sortedTerms, self.trigrams, self.projects = {}, {}, {}, [], {}, set()
+            self.markDirty()
+
+#-------------------------------------------------------------------------------
+# Searching
+#-------------------------------------------------------------------------------
+
+    def matchToken(self, token):
+        '''
+        Finds the assets matching a single query word.
+        Exact term > prefix of a term > inside a term > a term within a typo or two.
+
+        Args:
+        token (str): The lowercase query word.
+
+        Returns:
+        dict: (project, asset) -> the best score of the word for that asset.
+        '''
+        termScores = {}
+
+        i = bisect.bisect_left(self.sortedTerms, token)
+        while i < len(self.sortedTerms) and self.sortedTerms[i].startswith(token):
+            term = self.sortedTerms[i]
+            termScores[term] = 1.0 if term == token else 0.8
+            i += 1
+
+        if len(token) >= 3:
+            queryGrams = getTrigrams(token)
+            shared = Counter(term for trigram in queryGrams for term in self.trigrams.get(trigram, ()))
+            for term, count in shared.items():
+                if term in termScores:
+                    continue
+                if token in term:
+                    termScores[term] = 0.6
+                elif count * 3 >= len(queryGrams) and abs(len(term) - len(token)) <= 2: # cheap filters before the real similarity
+                    ratio = SequenceMatcher(None, token, term).ratio()
+                    if ratio >= 0.75:
+                        termScores[term] = 0.5 * ratio
+
+        matches = {}
+        for term, score in termScores.items():
+            for key in self.terms[term]:
+                if score > matches.get(key, 0):
+                    matches[key] = score
+        return matches
+
+    def search(self, query, limit=50, projName=None):
+        '''
+        Finds the assets matching every word of a query.
+
+        Args:
+        query (str): What to look for, e.g. "sword", "hero prop", "swrod".
+        limit (int): The most results to return.
+        projName (str): Only look in this project, None for all of them.
+
+        Returns:
+        list: The matching assets, best first, as {'project', 'asset', 'type', 'files', 'path', 'score'}.
+        '''
+        tokens = [token for token in SPLIT_PATTERN.split(query.lower()) if token]
+        if not tokens:
+            return []
+
+        with self.lock:
+            scores = None
+            for token in sorted(tokens, key=len, reverse=True): # longest word first, it narrows things down the most
+                matches = self.matchToken(token)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+                if not scores:
+                    return []
+
+            if projName is not None:
+                scores = {key: score for key, score in scores.items() if key[0] == projName}
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0][1].lower(), item[0][0].lower())) # no need to sort them all
+            return [{**self.docs[key], 'score': round(score, 3)} for key, score in best]
+
+#-------------------------------------------------------------------------------
+# Persistence
+#-------------------------------------------------------------------------------
+
+    def load(self):
+        '''
+        Loads the persisted index, only the assets are stored, the term tables are rebuilt from them.
+
+        Returns:
+        bool: True if there was a usable index on disk.
+        '''
+        with self.lock:
+            self.loaded = True
+            try:
+                with open(self.indexPath, 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return False
+            if data.get('version') != self.VERSION:
+                return False
+
+            self.projects = set(data.get('projects', []))
+            for projName, assetName, assetType, files, path in data.get('docs', []):
+                doc = {'project': projName, 'asset': assetName, 'type': assetType, 'files': files, 'path': path}
+                key = (projName, assetName)
+                terms = self.getDocTerms(doc)
+                self.docs[key] = doc
+                self.docTerms[key] = terms
+                for term in terms:
+                    self.terms.setdefault(term, set()).add(key)
+
+            self.sortedTerms = sorted(self.terms) # one sort instead of an insort per term
+            for term in self.sortedTerms:
+                for trigram in getTrigrams(term):
+                    self.trigrams.setdefault(trigram, set()).add(term)
+            return True
+
+    def markDirty(self):
+        '''
+        Schedules a save, a burst of changes ends up as a single write.
+        '''
+        self.dirty = True
+        if self.saveTimer is None and self.saveDelay is not None:
+            self.saveTimer = threading.Timer(self.saveDelay, self.flush)
+            self.saveTimer.daemon = True
+            self.saveTimer.start()
+
+    def flush(self):
+        '''
+        Saves the index now if it changed.
+        '''
+        with self.writeLock: # so an older snapshot can never be written over a newer one
+            with self.lock:
+                if self.saveTimer is not None:
+                    self.saveTimer.cancel()
+                    self.saveTimer = None
+                if not self.dirty or not self.loaded:
+                    return
+                docs = [[doc['project'], doc['asset'], doc['type'], doc['files'], doc['path']] for doc in self.docs.values()]
+                projects = sorted(self.projects)
+                self.dirty = False
+
+            os.makedirs(os.path.dirname(self.indexPath), exist_ok=True) # written outside the lock, searches don't wait on the disk
+            atomicWriteJson(self.indexPath, {'version': self.VERSION, 'projects': projects, 'docs': docs}, indent=None)
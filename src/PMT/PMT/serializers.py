@@ -0,0 +1,269 @@
+import os
+import json
+import struct
+import marshal
+import tempfile
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module holds the file formats the stores write their configs in.
+# JSON is the default and what gets exported/ handed to other tools. The
+# binary format is for big studios, where parsing a project config with tens
+# of thousands of assets on every cold start adds up:
+#
+#   header   'PMTB', format version, marshal version          (8 bytes)
+#   blocks   the entries of the config's table (the assets/ projects), a marshal
+#            list of BLOCK_SIZE of them per block
+#   head     marshal of the rest of the config + the name of the table
+#   index    marshal of (block size, names, offsets), block j is offsets[j]..offsets[j + 1]
+#   footer   offsets of the head, the index and the footer, 'PMTB' (28 bytes)
+#
+# A single asset is read through the footer, the index and its block, without
+# decoding the other blocks (loadRecord). The blocks rather than one blob per
+# record keep a full load close to a single marshal.loads, the strings repeated
+# across the records of a block (types, 'NA', versions) are stored once too.
+#-------------------------------------------------------------------------------
+
+def atomicWrite(path, write, binary=False):
+    '''
+    Writes a file so that a crash midway never leaves a truncated file behind.
+    The content goes to a temp file next to the target first, which then replaces the target in one go.
+
+    Args:
+    path (str): The path of the file.
+    write (function): Writes the content to the open temp file.
+    binary (bool): Whether the temp file is opened in binary mode.
+    '''
+    fd, tmpPath = tempfile.mkstemp(prefix='.tmp_', suffix=os.path.splitext(path)[1], dir=os.path.dirname(path)) # same folder so os.replace doesn't cross volumes
+    try:
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmpPath, path)
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+
+def atomicWriteJson(path, data, indent=4):
+    '''
+    Writes a json file so that a crash midway never leaves a truncated config behind (see atomicWrite).
+
+    Args:
+    path (str): The path of the json file.
+    data (dict): The data to dump.
+    indent (int): The indentation of the json, None for the compact form.
+    '''
+    with tracing.span('saveConfig', 'config', path=path) as s:
+        def write(f):
+            json.dump(data, f, indent=indent)
+            if s: # tell() isn't free on a text file, only ask while tracing
+                s.set(bytes=f.tell())
+        atomicWrite(path, write)
+
+class JsonSerializer:
+    '''
+    The configs as indented json, readable and diffable, what the PMT always wrote.
+    '''
+    name = 'json'
+    extension = '.json'
+    lazy = False # a single record costs a full parse anyway
+
+    def getPath(self, path):
+        '''
+        Returns:
+        str: The path with the extension of this format.
+        '''
+        return os.path.splitext(path)[0] + self.extension
+
+    def load(self, path):
+        '''
+        Args:
+        path (str): The path of the config.
+
+        Returns:
+        dict: The parsed config.
+        '''
+        with tracing.span('loadConfig', 'config', path=path) as s:
+            with open(path, 'r') as f:
+                data = json.load(f)
+                if s:
+                    s.set(bytes=f.tell())
+            return data
+
+    def dump(self, path, data):
+        '''
+        Writes a config (crash-safe).
+
+        Args:
+        path (str): The path of the config.
+        data (dict): The config.
+        '''
+        atomicWriteJson(path, data)
+
+    def loadRecord(self, path, name):
+        '''
+        Returns:
+        The entry called name of the config's table, None if there is none.
+        '''
+        return next((table.get(name) for table in self.load(path).values() if isinstance(table, dict)), None)
+
+class BinarySerializer(JsonSerializer):
+    '''
+    The configs in the length-prefixed record format described at the top of the module.
+    '''
+    name = 'binary'
+    extension = '.pmtb'
+    lazy = True
+    MAGIC = b'PMTB'
+    VERSION = 1
+    MARSHAL_VERSION = 4 # pinned, every python from 3.4 on reads it (mayapy included)
+    BLOCK_SIZE = 128 # records per block, what a single record read decodes
+    HEADER = struct.Struct('<4sHH') # magic, format version, marshal version
+    FOOTER = struct.Struct('<QQQ4s') # head offset, index offset, footer offset, magic
+
+    def encode(self, data):
+        '''
+        Args:
+        data (dict): The config, its first dict value is the table that is split into records.
+
+        Returns:
+        bytes: The encoded config.
+        '''
+        key = next((key for key, value in data.items() if isinstance(value, dict)), None)
+        table = data[key] if key is not None else {}
+        rest = {k: v for k, v in data.items() if k != key}
+
+        values = list(table.values())
+        chunks = [self.HEADER.pack(self.MAGIC, self.VERSION, self.MARSHAL_VERSION)]
+        offsets = []
+        position = self.HEADER.size
+        for start in range(0, len(values), self.BLOCK_SIZE):
+            block = marshal.dumps(values[start:start + self.BLOCK_SIZE], self.MARSHAL_VERSION)
+            offsets.append(position)
+            chunks.append(block)
+            position += len(block)
+        offsets.append(position) # the end of the last block, where the head starts
+
+        head = marshal.dumps({'key': key, 'data': rest}, self.MARSHAL_VERSION)
+        index = marshal.dumps((self.BLOCK_SIZE, tuple(table), tuple(offsets)), self.MARSHAL_VERSION)
+        chunks += [head, index, self.FOOTER.pack(position, position + len(head), position + len(head) + len(index), self.MAGIC)]
+        return b''.join(chunks)
+
+    def readFooter(self, buffer, path):
+        '''
+        Checks the header/ footer of a whole file or of its last FOOTER.size bytes.
+
+        Returns:
+        tuple: (head offset, index offset, footer offset).
+        '''
+        headOffset, indexOffset, footerOffset, magic = self.FOOTER.unpack(buffer[-self.FOOTER.size:])
+        if magic != self.MAGIC or not headOffset <= indexOffset <= footerOffset:
+            raise ValueError(f'{path} is not a PMT binary config (or it is truncated).')
+        return headOffset, indexOffset, footerOffset
+
+    def decode(self, buffer, path=''):
+        '''
+        Args:
+        buffer (bytes): A whole encoded config.
+        path (str): Where it comes from, for the errors.
+
+        Returns:
+        dict: The config.
+        '''
+        if len(buffer) < self.HEADER.size + self.FOOTER.size:
+            raise ValueError(f'{path} is not a PMT binary config (or it is truncated).')
+        magic, version, _ = self.HEADER.unpack_from(buffer)
+        if magic != self.MAGIC or version > self.VERSION:
+            raise ValueError(f'{path} is not a PMT binary config this PMT can read (version {version}).')
+        headOffset, indexOffset, footerOffset = self.readFooter(buffer, path)
+
+        view = memoryview(buffer)
+        head = marshal.loads(view[headOffset:indexOffset])
+        _, names, offsets = marshal.loads(view[indexOffset:footerOffset])
+        values = []
+        for j in range(len(offsets) - 1):
+            values += marshal.loads(view[offsets[j]:offsets[j + 1]])
+        data = head['data']
+        if head['key'] is not None:
+            data[head['key']] = dict(zip(names, values))
+        return data
+
+    def load(self, path):
+        with tracing.span('loadConfig', 'config', path=path, format=self.name) as s:
+            with open(path, 'rb') as f:
+                buffer = f.read()
+            s.set(bytes=len(buffer))
+            return self.decode(buffer, path)
+
+    def dump(self, path, data):
+        with tracing.span('saveConfig', 'config', path=path, format=self.name) as s:
+            buffer = self.encode(data)
+            atomicWrite(path, lambda f: f.write(buffer), binary=True)
+            s.set(bytes=len(buffer))
+
+    def loadRecord(self, path, name):
+        '''
+        Reads a single entry of the table: the footer, the index, then only the block of that record.
+        '''
+        with tracing.span('loadRecord', 'config', path=path, record=name), open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < self.HEADER.size + self.FOOTER.size:
+                raise ValueError(f'{path} is not a PMT binary config (or it is truncated).')
+            f.seek(-self.FOOTER.size, os.SEEK_END)
+            _, indexOffset, footerOffset = self.readFooter(f.read(self.FOOTER.size), path)
+            f.seek(indexOffset)
+            blockSize, names, offsets = marshal.loads(f.read(footerOffset - indexOffset))
+            try:
+                i = names.index(name)
+            except ValueError:
+                return None
+            j = i // blockSize
+            f.seek(offsets[j])
+            return marshal.loads(f.read(offsets[j + 1] - offsets[j]))[i % blockSize]
+
+SERIALIZERS = {serializer.name: serializer for serializer in (JsonSerializer(), BinarySerializer())}
+
+def getSerializer(name):
+    '''
+    Args:
+    name (str): The FORMAT of the path config (json/ binary).
+
+    Returns:
+    JsonSerializer/BinarySerializer: The serializer, json for an unknown name.
+    '''
+    return SERIALIZERS.get(name, SERIALIZERS['json'])
+
+def findConfigFile(path):
+    '''
+    Args:
+    path (str): The path of a config, the extension doesn't matter.
+
+    Returns:
+    str: The path it exists at in whichever format it was written, None if it doesn't exist.
+    '''
+    for serializer in SERIALIZERS.values():
+        formatPath = serializer.getPath(path)
+        if os.path.exists(formatPath):
+            return formatPath
+    return None
+
+def loadConfigFile(path):
+    '''
+    Loads a config in whichever format it was written, e.g. for a migration.
+
+    Args:
+    path (str): The path of the config, the extension doesn't matter.
+
+    Returns:
+    dict: The config.
+
+    Raises:
+    FileNotFoundError: If there is no such config in any format.
+    '''
+    for serializer in SERIALIZERS.values():
+        formatPath = serializer.getPath(path)
+        if os.path.exists(formatPath):
+            return serializer.load(formatPath)
+    raise FileNotFoundError(f'No config at {path}')
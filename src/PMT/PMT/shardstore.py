@@ -0,0 +1,267 @@
+import os
+import json
+import shutil
+import contextlib
+from store import JournalStore
+from serializers import atomicWriteJson
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module holds the store for several artists on the same shared root.
+# Every asset gets its own small file, so two people editing two different
+# assets never write the same file, and advisory file locks (flock on linux/
+# mac, msvcrt on windows) serialize the ones editing the same asset:
+#
+#   <proj>/Tools/Assets/<asset>.json         the asset, this is the truth
+#   <proj>/Tools/Assets/.locks/<asset>.lock  held while the asset is changed
+#   <proj>/Tools/PMT_<proj>_Config.json      the project index, derived from the
+#   <proj>/Tools/PMT_<proj>_Config.journal   shards, journaled like the journal store
+#   <proj>/Tools/PMT_<proj>_Config.lock      held while the index is appended/ compacted
+#
+# The index is only there so listing a project stays one read, it is rebuilt
+# from the shards if it goes missing or gets corrupted. It follows the FORMAT
+# of the path config, the shards are always json.
+#-------------------------------------------------------------------------------
+
+class ShardedStore(JournalStore):
+    '''
+    One file per asset plus a derived project index, see the top of the module.
+    The projects themselves (parent config) are journaled like the journal store, under its lock.
+    '''
+    def __init__(self, basePath, parentConfigPath, cache=None, journalLimit=256 * 1024, serializer=None):
+        '''
+        Initializes the sharded store.
+
+        Args:
+        basePath (str): The base path of the PMT.
+        parentConfigPath (str): The path of the parent config file.
+        cache (ConfigCache): The cache of the parsed config files.
+        journalLimit (int): The size in bytes after which the index journal is compacted.
+        serializer (JsonSerializer/BinarySerializer): The format of the index and the parent config.
+        '''
+        super().__init__(basePath, parentConfigPath, cache, journalLimit, serializer)
+        self.sharded = set() # projects known to have their shards, so the migration check is done once
+
+    def getShardDir(self, projName):
+        return os.path.join(self.basePath, projName, 'Tools', 'Assets')
+
+    def getShardPath(self, projName, assetName):
+        return os.path.join(self.getShardDir(projName), f'{assetName}.json')
+
+    def getIndexLock(self, projName):
+        return self.getConfigLock(self.getProjConfigPath(projName))
+
+    def getAssetLock(self, projName, assetName):
+        return self.getLock(os.path.join(self.getShardDir(projName), '.locks', f'{assetName}.lock'))
+
+    def lockAssets(self, keys):
+        '''
+        Holds the locks of some assets, for a read-modify-write of them across processes.
+        They are taken in sorted order, so two callers locking overlapping sets can't deadlock.
+
+        Args:
+        keys (iterable): (projName, assetName) pairs.
+
+        Returns:
+        contextmanager: Holds the locks inside the with block.
+        '''
+        stack = contextlib.ExitStack()
+        try:
+            for projName, assetName in sorted(set(keys)):
+                stack.enter_context(self.getAssetLock(projName, assetName))
+        except BaseException:
+            stack.close()
+            raise
+        return stack
+
+    def loadShard(self, path):
+        with tracing.span('loadShard', 'config', path=path), open(path, 'r') as f:
+            return json.load(f)
+
+    def readShard(self, projName, assetName):
+        '''
+        Returns:
+        dict: The details of an asset straight from its file, None if there is no such asset.
+        '''
+        try:
+            return self.loadShard(self.getShardPath(projName, assetName))
+        except FileNotFoundError:
+            return None
+
+    def ensureShards(self, projName):
+        '''
+        Splits the config of a project made by the json/ journal store into shards, the first time the project is used.
+        The shards are written to a temp folder that is renamed into place, so other processes see all of them or none.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        if projName in self.sharded:
+            return
+        shardDir = self.getShardDir(projName)
+        if not os.path.isdir(shardDir):
+            configPath = self.getProjConfigPath(projName)
+            if not self.configExists(configPath):
+                return # no such project (yet)
+            with self.getIndexLock(projName):
+                if not os.path.isdir(shardDir):
+                    assets = self.readView(configPath, 'Assets').get('Assets', {})
+                    tmpDir = f'{shardDir}.migrating_{os.getpid()}'
+                    shutil.rmtree(tmpDir, ignore_errors=True)
+                    os.makedirs(tmpDir)
+                    for assetName, assetDetails in assets.items():
+                        atomicWriteJson(os.path.join(tmpDir, f'{assetName}.json'), assetDetails)
+                    os.rename(tmpDir, shardDir)
+        self.sharded.add(projName)
+
+    def refreshIndex(self, projName, assetNames):
+        '''
+        Brings the index entries of some assets in line with their shards.
+        The shards are read under the index lock, so whoever appends last appends the latest
+        shards and the index can't end up behind them, however the writers interleave.
+
+        Args:
+        projName (str): The name of the project.
+        assetNames (iterable): The assets whose shards changed.
+        '''
+        with self.getIndexLock(projName):
+            records = []
+            for assetName in assetNames:
+                assetDetails = self.readShard(projName, assetName)
+                if assetDetails is None:
+                    records.append({'op': 'del', 'name': assetName})
+                else:
+                    records.append({'op': 'put', 'name': assetName, 'value': assetDetails})
+            self.append(self.getProjConfigPath(projName), 'Assets', records)
+
+    def rebuildIndex(self, projName):
+        '''
+        Writes the project index again from the shards, e.g. after it got lost or corrupted.
+
+        Args:
+        projName (str): The name of the project.
+
+        Returns:
+        int: The number of assets in the index.
+        '''
+        shardDir = self.getShardDir(projName)
+        with self.getIndexLock(projName), tracing.span('rebuildIndex', 'config', project=projName):
+            assets = {}
+            for entry in os.scandir(shardDir):
+                if entry.name.startswith('.') or not entry.name.endswith('.json') or not entry.is_file():
+                    continue # the locks and the temp files of writes in flight
+                try:
+                    assets[entry.name[:-len('.json')]] = self.loadShard(entry.path)
+                except (FileNotFoundError, ValueError):
+                    continue # removed meanwhile
+            self.compact(self.getProjConfigPath(projName), {'Assets': assets})
+            return len(assets)
+
+    def initProject(self, projName):
+        '''
+        Creates an empty index and shard folder for a project, dropping the leftovers of an older project with the same name.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        shardDir = self.getShardDir(projName)
+        with self.getIndexLock(projName):
+            shutil.rmtree(shardDir, ignore_errors=True)
+            os.makedirs(os.path.join(shardDir, '.locks'))
+            super().initProject(projName)
+        self.sharded.add(projName)
+
+    def renameProject(self, oldName, newName):
+        '''
+        Renames the index files of a project, the shards move along with the project folder.
+
+        Args:
+        oldName (str): The old name of the project.
+        newName (str): The new name of the project.
+        '''
+        oldLockPath = os.path.splitext(self.getProjConfigPath(oldName))[0] + '.lock'
+        if os.path.exists(oldLockPath):
+            os.rename(oldLockPath, os.path.join(os.path.dirname(oldLockPath), f'PMT_{newName}_Config.lock'))
+        super().renameProject(oldName, newName)
+        self.sharded.discard(oldName)
+
+    def deleteProject(self, projName):
+        super().deleteProject(projName)
+        self.sharded.discard(projName)
+
+    def getAssets(self, projName):
+        '''
+        Returns all the assets of a project from its index, rebuilt first if it's missing or corrupted.
+
+        Args:
+        projName (str): The name of the project.
+
+        Returns:
+        dict: The assets of the project keyed by their names (shared with the cache, don't modify).
+        '''
+        self.ensureShards(projName)
+        try:
+            return super().getAssets(projName)
+        except (FileNotFoundError, ValueError):
+            if not os.path.isdir(self.getShardDir(projName)):
+                raise
+            self.rebuildIndex(projName)
+            return super().getAssets(projName)
+
+    def getAsset(self, projName, assetName):
+        '''
+        Returns the details of an asset from its shard, which is never behind the index.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+
+        Returns:
+        dict: The details of the asset, None if the asset doesn't exist.
+        '''
+        self.ensureShards(projName)
+        try:
+            return self.readShard(projName, assetName)
+        except ValueError:
+            return None
+
+    def putAsset(self, projName, assetName, assetDetails):
+        '''
+        Writes the shard of an asset and then refreshes its index entry.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The details of the asset.
+        '''
+        self.putAssets(projName, {assetName: assetDetails})
+
+    def putAssets(self, projName, assets):
+        '''
+        Writes the shards of many assets, one lock at a time, and refreshes the index with a single append.
+
+        Args:
+        projName (str): The name of the project.
+        assets (dict): The details of the assets keyed by their names.
+        '''
+        self.ensureShards(projName)
+        for assetName, assetDetails in assets.items():
+            with self.getAssetLock(projName, assetName):
+                atomicWriteJson(self.getShardPath(projName, assetName), assetDetails)
+        self.refreshIndex(projName, assets)
+
+    def removeAsset(self, projName, assetName):
+        '''
+        Deletes the shard of an asset and its index entry.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        '''
+        self.ensureShards(projName)
+        with self.getAssetLock(projName, assetName):
+            try:
+                os.remove(self.getShardPath(projName, assetName))
+            except FileNotFoundError:
+                pass
+        self.refreshIndex(projName, [assetName])
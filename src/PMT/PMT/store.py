@@ -0,0 +1,906 @@
+import os
+import json
+import copy
+import threading
+import contextlib
+from collections import OrderedDict
+from serializers import getSerializer, findConfigFile, SERIALIZERS
+import tracing
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+#-------------------------------------------------------------------------------
+# This module holds the storage backends that the PMT reads and writes its
+# project/asset metadata through. The PMT class never touches the config files
+# directly anymore, it just talks to one of these stores.
+# The file stores write their configs through a serializer (serializers.py),
+# json or the binary format, whichever FORMAT the path config sets.
+#-------------------------------------------------------------------------------
+
+class ConfigCache:
+    '''
+    An in-process cache of parsed config files keyed by their path.
+    An entry is only trusted as long as the file's stat (mtime, size, inode) hasn't changed,
+    so edits from other PMT sessions on the shared root are still picked up.
+    The least recently used entries are evicted once there are more than maxEntries.
+    '''
+    def __init__(self, maxEntries=64):
+        '''
+        Initializes the cache.
+
+        Args:
+        maxEntries (int): The maximum number of config files to keep parsed in memory.
+        '''
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict() # path -> (signature, data)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def signature(self, path, deps=()):
+        '''
+        Returns what we compare to decide if a file changed since it was parsed.
+
+        Args:
+        path (str): The path of the file.
+        deps (tuple): Other files the parsed data depends on (e.g. a journal), these may not exist.
+
+        Returns:
+        tuple: The mtime, size and inode of the file (and of its dependencies).
+        '''
+        st = os.stat(path) # raises FileNotFoundError like open() would
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        for dep in deps:
+            try:
+                st = os.stat(dep)
+                sig += (st.st_mtime_ns, st.st_size, st.st_ino)
+            except FileNotFoundError:
+                sig += (None,)
+        return sig
+
+    def get(self, path, loader, deps=()):
+        '''
+        Returns the parsed data of a file, only calling the loader if the file changed on disk.
+
+        Args:
+        path (str): The path of the file.
+        loader (function): Parses the file at the given path.
+        deps (tuple): Other files the parsed data depends on.
+
+        Returns:
+        The parsed data, shared with other callers so it must not be modified.
+        '''
+        sig = self.signature(path, deps)
+
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[0] == sig:
+                self.entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        data = loader(path)
+        self.store(path, sig, data)
+        return data
+
+    def isFresh(self, path, deps=()):
+        '''
+        Tells if a get would be a hit, without loading anything.
+
+        Args:
+        path (str): The path of the file.
+        deps (tuple): Other files the parsed data depends on.
+
+        Returns:
+        bool: True if the file is in the cache and unchanged on disk.
+        '''
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry is None:
+            return False
+        try:
+            return entry[0] == self.signature(path, deps)
+        except FileNotFoundError:
+            return False
+
+    def put(self, path, data, deps=()):
+        '''
+        Stores the data we just wrote to a file so that the next read is a hit.
+
+        Args:
+        path (str): The path of the file.
+        data: The data that was written.
+        deps (tuple): Other files the data depends on.
+        '''
+        self.store(path, self.signature(path, deps), data)
+
+    def store(self, path, sig, data):
+        '''
+        Adds an entry and evicts the least recently used ones if the cache is full.
+        '''
+        with self.lock:
+            self.entries[path] = (sig, data)
+            self.entries.move_to_end(path)
+            while len(self.entries) > self.maxEntries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, path=None):
+        '''
+        Drops an entry, or the whole cache if no path is given.
+
+        Args:
+        path (str): The path of the file to drop.
+        '''
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(path, None)
+
+    def getStats(self):
+        '''
+        Returns:
+        dict: The hit/miss counters of the cache.
+        '''
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self.entries),
+                'maxEntries': self.maxEntries
+            }
+
+class JsonStore:
+    '''
+    The original storage layout of the PMT.
+    - One parent config (PMT_ParentConfig.json) with all the projects.
+    - One config per project (<proj>/Tools/PMT_<proj>_Config.json) with all the assets.
+    In the binary FORMAT the same files end in .pmtb instead.
+    '''
+    def __init__(self, basePath, parentConfigPath, cache=None, serializer=None):
+        '''
+        Initializes the JSON store.
+
+        Args:
+        basePath (str): The base path of the PMT.
+        parentConfigPath (str): The path of the parent config file, its extension follows the serializer.
+        cache (ConfigCache): The cache of the parsed config files.
+        serializer (JsonSerializer/BinarySerializer): The format of the config files, json if None.
+        '''
+        self.basePath = basePath
+        self.serializer = serializer or getSerializer('json')
+        self.parentConfigPath = self.serializer.getPath(parentConfigPath)
+        self.cache = cache if cache is not None else ConfigCache()
+
+    def getProjConfigPath(self, projName):
+        '''
+        Returns the path of the config file of a project (naming convention of the project config file).
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        return os.path.join(self.basePath, projName, 'Tools', f'PMT_{projName}_Config{self.serializer.extension}')
+
+    def parseConfig(self, path):
+        '''
+        Parses a config file from disk.
+
+        Args:
+        path (str): The path of the config file.
+
+        Returns:
+        dict: The parsed data.
+        '''
+        return self.serializer.load(path)
+
+    def readCached(self, path, loader, deps=()):
+        '''
+        Reads a config through the cache, converting it first if it's still in another format.
+
+        Args:
+        path (str): The path of the config file.
+        loader (function): Parses the file at the given path.
+        deps (tuple): Other files the parsed data depends on.
+
+        Returns:
+        dict: The parsed data, shared with the cache so it must not be modified.
+        '''
+        try:
+            return self.cache.get(path, loader, deps)
+        except FileNotFoundError:
+            if not self.convertConfig(path):
+                raise
+            return self.cache.get(path, loader, deps)
+
+    def readConfig(self, path):
+        '''
+        Reads a config file through the cache, so it's only parsed again if it changed on disk.
+
+        Args:
+        path (str): The path of the config file.
+
+        Returns:
+        dict: The parsed data, shared with the cache so it must not be modified.
+        '''
+        return self.readCached(path, self.parseConfig)
+
+    def writeConfig(self, path, data):
+        '''
+        Dumps the data to a config file (crash-safe).
+
+        Args:
+        path (str): The path of the config file.
+        data (dict): The data to dump.
+        '''
+        self.serializer.dump(path, data)
+        self.cache.put(path, data)
+
+    def configExists(self, path):
+        '''
+        Returns:
+        bool: True if the config exists, in any format.
+        '''
+        return findConfigFile(path) is not None
+
+    def convertConfig(self, path):
+        '''
+        Rewrites a config that is still in another format (the FORMAT was changed) in the current one.
+        The old file is only dropped once the new one is in place.
+
+        Args:
+        path (str): The path of the config in the current format.
+
+        Returns:
+        bool: True if there was a config to convert.
+        '''
+        for serializer in SERIALIZERS.values():
+            otherPath = serializer.getPath(path)
+            if serializer.name == self.serializer.name or not os.path.exists(otherPath):
+                continue
+            with tracing.span('convertConfig', 'config', path=otherPath, to=self.serializer.name):
+                self.serializer.dump(path, serializer.load(otherPath))
+            try:
+                os.remove(otherPath)
+            except FileNotFoundError:
+                pass # another session converted it too
+            return True
+        return False
+
+    def loadProjects(self):
+        '''
+        Loads the projects from the parent config.
+
+        Returns:
+        dict: The data about the projects, empty if there is no parent config yet.
+        '''
+        try:
+            return copy.deepcopy(self.readConfig(self.parentConfigPath).get('Projects', {})) # the PMT edits this dict in place
+        except FileNotFoundError:
+            return {}
+
+    def saveProjects(self, projects, projNames=None):
+        '''
+        Saves the projects to the parent config.
+
+        Args:
+        projects (dict): The data about the projects.
+        projNames (iterable): The projects the caller added/ changed/ removed, only those are written over what's on disk,
+                              so the projects another session made meanwhile stay. None writes the whole dict.
+        '''
+        if projNames is None:
+            self.writeConfig(self.parentConfigPath, {'Projects': copy.deepcopy(projects)})
+            return
+
+        current = self.loadProjects()
+        for name in projNames:
+            if name in projects:
+                current[name] = copy.deepcopy(projects[name])
+            else:
+                current.pop(name, None)
+        self.writeConfig(self.parentConfigPath, {'Projects': current})
+
+    def updateAssetCounts(self, deltas):
+        '''
+        Adds to the Asset Count of some projects, counting on top of what's on disk rather than on the caller's
+        (maybe stale) projects dict, so the assets another session added/ removed meanwhile still count.
+
+        Args:
+        deltas (dict): project name -> how many assets it gained (negative if it lost some).
+
+        Returns:
+        dict: project name -> its new Asset Count, for the projects that still exist.
+        '''
+        current = self.loadProjects()
+        counts = {}
+        for name, delta in deltas.items():
+            if name in current:
+                counts[name] = current[name]['Asset Count'] = current[name].get('Asset Count', 0) + delta
+        if counts:
+            self.writeConfig(self.parentConfigPath, {'Projects': current})
+        return counts
+
+    def initProject(self, projName):
+        '''
+        Creates an empty asset config for a project.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        self.writeConfig(self.getProjConfigPath(projName), {'Assets': {}})
+
+    def renameProject(self, oldName, newName):
+        '''
+        Renames the config file of a project.
+        Called before the project folder itself is renamed, so the file is still in the old folder.
+
+        Args:
+        oldName (str): The old name of the project.
+        newName (str): The new name of the project.
+        '''
+        oldConfigPath = self.getProjConfigPath(oldName)
+        newConfigPath = os.path.join(os.path.dirname(oldConfigPath), os.path.basename(self.getProjConfigPath(newName)))
+
+        if os.path.exists(oldConfigPath):
+            os.rename(oldConfigPath, newConfigPath)
+        self.cache.invalidate(oldConfigPath)
+
+    def deleteProject(self, projName):
+        '''
+        The project config goes away with the project folder, so just forget about it.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        self.cache.invalidate(self.getProjConfigPath(projName))
+
+    def getAssets(self, projName):
+        '''
+        Returns all the assets of a project.
+
+        Args:
+        projName (str): The name of the project.
+
+        Returns:
+        dict: The assets of the project keyed by their names (shared with the cache, don't modify).
+        '''
+        return self.readConfig(self.getProjConfigPath(projName)).get('Assets', {})
+
+    def getAsset(self, projName, assetName):
+        '''
+        Returns a single asset of a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+
+        Returns:
+        dict: The details of the asset, None if the asset doesn't exist.
+        '''
+        projConfigPath = self.getProjConfigPath(projName)
+        if self.serializer.lazy and not self.cache.isFresh(projConfigPath):
+            try:
+                return self.serializer.loadRecord(projConfigPath, assetName) # just that record, not the whole project
+            except FileNotFoundError:
+                pass # maybe still in the other format, the full read converts it
+        return self.getAssets(projName).get(assetName)
+
+    def queryAssets(self, projName, query, cursor=None):
+        '''
+        Returns a page of the assets of a project that match a query.
+        The file stores hold the whole project in memory anyway, so the query runs over it there.
+
+        Args:
+        projName (str): The name of the project.
+        query (AssetQuery): The filters, fields, order and page size.
+        cursor (str): The nextCursor of the previous page, None for the first page.
+
+        Returns:
+        dict: {'assets': [(name, details), ...], 'nextCursor': str/ None, 'total': int}.
+        '''
+        return query.run(self.getAssets(projName), cursor)
+
+    def putAsset(self, projName, assetName, assetDetails):
+        '''
+        Adds or replaces an asset in a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The details of the asset.
+        '''
+        projConfigPath = self.getProjConfigPath(projName)
+        data = self.readConfig(projConfigPath)
+        assets = dict(data['Assets']) # shallow copy so the cached dict stays as it is on disk until the write went through
+        assets[assetName] = assetDetails
+        self.writeConfig(projConfigPath, {**data, 'Assets': assets})
+
+    def putAssets(self, projName, assets):
+        '''
+        Adds or replaces many assets in a project with a single write of the project config.
+
+        Args:
+        projName (str): The name of the project.
+        assets (dict): The details of the assets keyed by their names.
+        '''
+        projConfigPath = self.getProjConfigPath(projName)
+        data = self.readConfig(projConfigPath)
+        self.writeConfig(projConfigPath, {**data, 'Assets': {**data['Assets'], **assets}})
+
+    def removeAsset(self, projName, assetName):
+        '''
+        Removes an asset from a project.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        '''
+        projConfigPath = self.getProjConfigPath(projName)
+        data = self.readConfig(projConfigPath)
+        assets = dict(data['Assets'])
+        assets.pop(assetName, None)
+        self.writeConfig(projConfigPath, {**data, 'Assets': assets})
+
+    def lockAssets(self, keys):
+        '''
+        Holds some assets while the PMT reads, changes and writes them back.
+        Only the sharded store locks anything across processes, here it's a no-op.
+
+        Args:
+        keys (iterable): (projName, assetName) pairs.
+
+        Returns:
+        contextmanager: Holds the locks inside the with block.
+        '''
+        return contextlib.nullcontext()
+
+#-------------------------------------------------------------------------------
+# The journaled flavour of the json store.
+#-------------------------------------------------------------------------------
+
+class FileLock:
+    '''
+    An exclusive advisory lock on a lock file, between processes through the OS and between
+    the threads of this process through an RLock. Reentrant for the thread that holds it, so a
+    store call made while the PMT already holds the lock of the same asset doesn't deadlock.
+    '''
+    def __init__(self, path):
+        '''
+        Args:
+        path (str): The lock file, created if needed and never deleted (deleting it would let two holders in).
+        '''
+        self.path = path
+        self.threadLock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+    def acquire(self):
+        '''
+        Blocks until the lock is held.
+        '''
+        self.threadLock.acquire()
+        if self.depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+                try:
+                    with tracing.span('waitLock', 'lock', path=self.path):
+                        lockFile(fd)
+                except BaseException:
+                    os.close(fd)
+                    raise
+                self.fd = fd
+            except BaseException:
+                self.threadLock.release()
+                raise
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            try:
+                unlockFile(self.fd)
+            finally:
+                os.close(self.fd) # closing drops the lock anyway
+                self.fd = None
+        self.threadLock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        self.release()
+        return False
+
+def lockFile(fd):
+    if os.name == 'nt':
+        os.lseek(fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1) # gives up after ~10s, so keep asking
+                return
+            except OSError:
+                continue
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+def unlockFile(fd):
+    if os.name == 'nt':
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class JournalStore(JsonStore):
+    '''
+    Same files as the JsonStore, but a mutation only appends a small record to a journal next to the config
+    (PMT_<proj>_Config.journal/ PMT_ParentConfig.journal) instead of rewriting the whole config.
+    Reads replay the journal over the last snapshot, and once a journal grows past journalLimit bytes
+    it's folded back into the snapshot (compaction).
+    Appends and compactions hold PMT_<proj>_Config.lock/ PMT_ParentConfig.lock, so several sessions can share a root.
+    '''
+    def __init__(self, basePath, parentConfigPath, cache=None, journalLimit=256 * 1024, serializer=None):
+        '''
+        Initializes the journal store.
+
+        Args:
+        basePath (str): The base path of the PMT.
+        parentConfigPath (str): The path of the parent config file.
+        cache (ConfigCache): The cache of the parsed config files.
+        journalLimit (int): The size in bytes after which a journal is compacted into its snapshot.
+        serializer (JsonSerializer/BinarySerializer): The format of the snapshots, the journal itself is always json lines.
+        '''
+        super().__init__(basePath, parentConfigPath, cache, serializer)
+        self.journalLimit = journalLimit
+        self.locks = {} # lock file path -> FileLock, one per file so the threads of this process share it
+        self.locksLock = threading.Lock()
+
+    def getLock(self, path):
+        with self.locksLock:
+            lock = self.locks.get(path)
+            if lock is None:
+                lock = self.locks[path] = FileLock(path)
+            return lock
+
+    def getConfigLock(self, configPath):
+        '''
+        Returns the lock held while the journal of a config is appended to/ compacted, by this and the other sessions.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        '''
+        return self.getLock(os.path.splitext(configPath)[0] + '.lock')
+
+    def getJournalPath(self, configPath):
+        '''
+        Returns the path of the journal that belongs to a config.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        '''
+        return os.path.splitext(configPath)[0] + '.journal'
+
+    def replay(self, configPath, key):
+        '''
+        Loads the snapshot and applies the journal records on top of it.
+        A half written last record (crash during an append) is ignored.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        key (str): The top level key the records apply to ('Assets'/ 'Projects').
+
+        Returns:
+        dict: The current data.
+        '''
+        data = self.parseConfig(configPath)
+        entries = data.setdefault(key, {})
+
+        with tracing.span('replayJournal', 'config', path=configPath) as s:
+            records = 0
+            try:
+                with open(self.getJournalPath(configPath), 'r') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue # torn record from a crash during an append
+                        records += 1
+                        if record['op'] == 'put':
+                            entries[record['name']] = record['value']
+                        elif record['op'] == 'del':
+                            entries.pop(record['name'], None)
+            except FileNotFoundError:
+                pass
+            s.set(records=records)
+
+        return data
+
+    def readView(self, configPath, key):
+        '''
+        Reads the current data of a config (snapshot + journal) through the cache.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        key (str): The top level key the records apply to.
+
+        Returns:
+        dict: The current data, shared with the cache so it must not be modified.
+        '''
+        return self.readCached(configPath, lambda path: self.replay(path, key), deps=(self.getJournalPath(configPath),))
+
+    def append(self, configPath, key, records):
+        '''
+        Appends records to the journal of a config and compacts it if it got too big.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        key (str): The top level key the records apply to.
+        records (list): The records to append, e.g. {'op': 'put', 'name': ..., 'value': ...}.
+        '''
+        if not records:
+            return
+
+        journalPath = self.getJournalPath(configPath)
+
+        with self.getConfigLock(configPath): # the view is read under the lock too, so another session's records aren't lost at compaction
+            data = self.readView(configPath, key)
+            entries = dict(data.get(key, {})) # the cached view is shared, so work on a copy
+            for record in records:
+                if record['op'] == 'put':
+                    entries[record['name']] = record['value']
+                else:
+                    entries.pop(record['name'], None)
+            data = {**data, key: entries}
+
+            with tracing.span('appendJournal', 'config', path=journalPath, records=len(records)) as s, open(journalPath, 'a+') as f:
+                lead = ''
+                if f.tell() > 0:
+                    f.seek(f.tell() - 1)
+                    if f.read(1) != '\n':
+                        lead = '\n' # close off a torn record so the new ones start on their own line
+                text = lead + ''.join(json.dumps(record) + '\n' for record in records)
+                f.write(text) # one write for the whole batch
+                f.flush()
+                os.fsync(f.fileno())
+                s.set(bytes=len(text))
+
+            if os.path.getsize(journalPath) > self.journalLimit:
+                self.compact(configPath, data)
+            else:
+                self.cache.put(configPath, data, deps=(journalPath,))
+
+    def compact(self, configPath, data):
+        '''
+        Folds the journal back into the snapshot.
+        The snapshot is replaced atomically before the journal is dropped, and replaying a record twice
+        doesn't change anything, so a crash in between is harmless.
+
+        Args:
+        configPath (str): The path of the config (snapshot).
+        data (dict): The current data of the config.
+        '''
+        journalPath = self.getJournalPath(configPath)
+        with self.getConfigLock(configPath):
+            self.serializer.dump(configPath, data)
+            if os.path.exists(journalPath):
+                os.remove(journalPath)
+            self.cache.put(configPath, data, deps=(journalPath,))
+
+    def loadProjects(self):
+        '''
+        Loads the projects from the parent config and its journal.
+
+        Returns:
+        dict: The data about the projects, empty if there is no parent config yet.
+        '''
+        try:
+            return copy.deepcopy(self.readView(self.parentConfigPath, 'Projects').get('Projects', {}))
+        except FileNotFoundError:
+            return {}
+
+    def saveProjects(self, projects, projNames=None):
+        '''
+        Journals only the projects that changed compared to what's on disk.
+
+        Args:
+        projects (dict): The data about the projects.
+        projNames (iterable): The projects the caller added/ changed/ removed, only those are journaled, so a stale
+                              projects dict never deletes the projects another session made meanwhile. None syncs the whole dict.
+        '''
+        with self.getConfigLock(self.parentConfigPath): # compared and appended in one go, against what the other sessions wrote
+            if not self.configExists(self.parentConfigPath):
+                self.serializer.dump(self.parentConfigPath, {'Projects': {}})
+
+            current = self.readView(self.parentConfigPath, 'Projects').get('Projects', {})
+            names = list(projects) + [name for name in current if name not in projects] if projNames is None else projNames
+            records = []
+            for name in names:
+                if name in projects:
+                    if current.get(name) != projects[name]:
+                        records.append({'op': 'put', 'name': name, 'value': copy.deepcopy(projects[name])})
+                elif name in current:
+                    records.append({'op': 'del', 'name': name})
+
+            self.append(self.parentConfigPath, 'Projects', records)
+
+    def updateAssetCounts(self, deltas):
+        '''
+        Adds to the Asset Count of some projects, read and journaled under the lock of the parent config
+        so two sessions counting at once both count.
+
+        Args:
+        deltas (dict): project name -> how many assets it gained (negative if it lost some).
+
+        Returns:
+        dict: project name -> its new Asset Count, for the projects that still exist.
+        '''
+        with self.getConfigLock(self.parentConfigPath):
+            current = self.readView(self.parentConfigPath, 'Projects').get('Projects', {})
+            counts = {}
+            records = []
+            for name, delta in deltas.items():
+                if name in current:
+                    counts[name] = current[name].get('Asset Count', 0) + delta
+                    records.append({'op': 'put', 'name': name, 'value': {**copy.deepcopy(current[name]), 'Asset Count': counts[name]}})
+            self.append(self.parentConfigPath, 'Projects', records)
+        return counts
+
+    def initProject(self, projName):
+        '''
+        Creates an empty asset config for a project and drops any journal left over from an older project with the same name.
+
+        Args:
+        projName (str): The name of the project.
+        '''
+        projConfigPath = self.getProjConfigPath(projName)
+        journalPath = self.getJournalPath(projConfigPath)
+        if os.path.exists(journalPath):
+            os.remove(journalPath)
+        self.writeConfig(projConfigPath, {'Assets': {}})
+
+    def renameProject(self, oldName, newName):
+        '''
+        Renames the config file and the journal of a project.
+
+        Args:
+        oldName (str): The old name of the project.
+        newName (str): The new name of the project.
+        '''
+        oldJournalPath = self.getJournalPath(self.getProjConfigPath(oldName))
+        newJournalPath = os.path.join(os.path.dirname(oldJournalPath), f'PMT_{newName}_Config.journal')
+
+        if os.path.exists(oldJournalPath):
+            os.rename(oldJournalPath, newJournalPath)
+        super().renameProject(oldName, newName)
+
+    def getAssets(self, projName):
+        '''
+        Returns all the assets of a project (snapshot + journal).
+
+        Args:
+        projName (str): The name of the project.
+
+        Returns:
+        dict: The assets of the project keyed by their names (shared with the cache, don't modify).
+        '''
+        return self.readView(self.getProjConfigPath(projName), 'Assets').get('Assets', {})
+
+    def getAsset(self, projName, assetName):
+        '''
+        Returns a single asset of a project. In the binary format, with a cold cache, only its record
+        of the snapshot is read, plus the journal records about it.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+
+        Returns:
+        dict: The details of the asset, None if the asset doesn't exist.
+        '''
+        configPath = self.getProjConfigPath(projName)
+        journalPath = self.getJournalPath(configPath)
+        if self.serializer.lazy and not self.cache.isFresh(configPath, (journalPath,)):
+            try:
+                assetDetails = self.serializer.loadRecord(configPath, assetName)
+            except FileNotFoundError:
+                pass # maybe still in the other format, the full read converts it
+            else:
+                return self.replayRecord(journalPath, assetName, assetDetails)
+        return self.getAssets(projName).get(assetName)
+
+    def replayRecord(self, journalPath, name, value):
+        '''
+        Applies the journal records about a single entry.
+
+        Args:
+        journalPath (str): The path of the journal.
+        name (str): The name of the entry.
+        value: Its value in the snapshot, None if it's not there.
+
+        Returns:
+        The current value, None if it got deleted.
+        '''
+        needle = json.dumps(name) # how the name shows up in its records, the other lines aren't parsed
+        try:
+            with open(journalPath, 'r') as f:
+                for line in f:
+                    if needle not in line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('name') != name:
+                        continue
+                    value = record['value'] if record['op'] == 'put' else None
+        except FileNotFoundError:
+            pass
+        return value
+
+    def putAsset(self, projName, assetName, assetDetails):
+        '''
+        Journals an added/ replaced asset.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        assetDetails (dict): The details of the asset.
+        '''
+        self.append(self.getProjConfigPath(projName), 'Assets', [{'op': 'put', 'name': assetName, 'value': assetDetails}])
+
+    def putAssets(self, projName, assets):
+        '''
+        Journals many added/ replaced assets with a single append.
+
+        Args:
+        projName (str): The name of the project.
+        assets (dict): The details of the assets keyed by their names.
+        '''
+        self.append(self.getProjConfigPath(projName), 'Assets',
+                    [{'op': 'put', 'name': assetName, 'value': assetDetails} for assetName, assetDetails in assets.items()])
+
+    def removeAsset(self, projName, assetName):
+        '''
+        Journals a removed asset.
+
+        Args:
+        projName (str): The name of the project.
+        assetName (str): The name of the asset.
+        '''
+        self.append(self.getProjConfigPath(projName), 'Assets', [{'op': 'del', 'name': assetName}])
+
+def createStore(backend, basePath, parentConfigPath, cache=None, journalLimit=256 * 1024, configFormat='json'):
+    '''
+    Creates the store for the backend set in the path config.
+
+    Args:
+    backend (str): The name of the backend (json/ journal/ sharded/ sqlite).
+    basePath (str): The base path of the PMT.
+    parentConfigPath (str): The path of the parent config file.
+    cache (ConfigCache): The cache of the parsed config files (not needed by the sqlite catalog).
+    journalLimit (int): The size in bytes after which a journal is compacted (journal/ sharded backends only).
+    configFormat (str): The format of the config files (json/ binary), not used by the sqlite catalog.
+
+    Returns:
+    JsonStore/JournalStore/ShardedStore/Catalog: The store to read and write the metadata through.
+    '''
+    if backend == 'sqlite':
+        from catalog import Catalog # only pulling in sqlite when it's actually used
+        return Catalog(basePath, parentConfigPath)
+
+    if backend == 'sharded':
+        from shardstore import ShardedStore
+        return ShardedStore(basePath, parentConfigPath, cache, journalLimit, getSerializer(configFormat))
+
+    if backend == 'journal':
+        return JournalStore(basePath, parentConfigPath, cache, journalLimit, getSerializer(configFormat))
+
+    return JsonStore(basePath, parentConfigPath, cache, getSerializer(configFormat))
@@ -0,0 +1,12 @@
+import os
+import sys
+
+#-------------------------------------------------------------------------------
+# The PMT modules import each other as top level modules (from store import ...),
+# so the tests need the PMT folder on the path, like running from it does.
+#   cd src/PMT/PMT && python -m pytest tests
+#-------------------------------------------------------------------------------
+
+PMT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PMT_DIR not in sys.path:
+    sys.path.insert(0, PMT_DIR)
@@ -0,0 +1,92 @@
+import os
+import threading
+import pytest
+from blobstore import BlobStore, hashFile
+from copyengine import CopyEngine
+
+#-------------------------------------------------------------------------------
+# Deduplicated copies of one asset to several projects at once. The copy engine
+# runs every (file, target) pair on its own thread, so the same content is
+# ingested by several threads at the same time, and a file may be linked to a
+# blob it's already linked to.
+#-------------------------------------------------------------------------------
+
+TARGETS = 6
+
+def makeAsset(root):
+    src = os.path.join(root, 'src', 'crate')
+    os.makedirs(os.path.join(src, 'Maya'))
+    for i in range(20):
+        with open(os.path.join(src, 'Maya', f'data_{i}.bin'), 'wb') as f:
+            f.write(os.urandom(4096) if i % 2 else b'same content' * 100) # half of them share their content too
+    return src
+
+def listLeftovers(root):
+    return [name for _, _, files in os.walk(root) for name in files if name.startswith('.tmp_')]
+
+def test_ingest_race_for_the_same_blob(tmp_path, monkeypatch):
+    blobs = BlobStore(str(tmp_path))
+    paths = [os.path.join(str(tmp_path), f'file_{i}.bin') for i in range(2)]
+    for path in paths:
+        with open(path, 'wb') as f:
+            f.write(b'same content')
+
+    barrier = threading.Barrier(len(paths), timeout=10)
+    link = os.link
+
+    def linkTogether(src, dst):
+        if dst.startswith(blobs.blobPath):
+            barrier.wait() # both ingests saw no blob, now they both try to become it
+        link(src, dst)
+
+    monkeypatch.setattr(os, 'link', linkTogether)
+
+    results = {}
+    def ingest(path):
+        try:
+            results[path] = blobs.ingest(path)
+        except Exception as e:
+            results[path] = e
+
+    threads = [threading.Thread(target=ingest, args=(path,)) for path in paths]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [result for result in results.values() if isinstance(result, Exception)] == []
+    digest = hashFile(paths[0])
+    assert sorted(results.values()) == [(digest, 0), (digest, len(b'same content'))] # one became the blob, the other got linked to it
+    for path in paths:
+        assert os.path.samefile(path, blobs.getBlobPath(digest))
+    assert listLeftovers(str(tmp_path)) == []
+
+def test_link_file_already_linked(tmp_path):
+    blobs = BlobStore(str(tmp_path))
+    path = os.path.join(str(tmp_path), 'file.bin')
+    with open(path, 'wb') as f:
+        f.write(b'content')
+    digest, _ = blobs.ingest(path)
+
+    blobs.linkFile(blobs.getBlobPath(digest), path) # the rename onto the same inode does nothing
+
+    assert os.path.samefile(path, blobs.getBlobPath(digest))
+    assert listLeftovers(str(tmp_path)) == []
+
+def test_copy_to_many_targets_at_once(tmp_path):
+    src = makeAsset(str(tmp_path))
+    blobs = BlobStore(str(tmp_path))
+    targets = [os.path.join(str(tmp_path), f'Proj{i}', 'crate') for i in range(TARGETS)]
+
+    CopyEngine(workers=16, blobs=blobs).copyTree(src, targets)
+
+    for name in os.listdir(os.path.join(src, 'Maya')):
+        srcPath = os.path.join(src, 'Maya', name)
+        blobPath = blobs.getBlobPath(hashFile(srcPath))
+        for target in targets:
+            assert os.path.samefile(os.path.join(target, 'Maya', name), blobPath)
+        assert os.path.samefile(srcPath, blobPath)
+
+    blobCount = sum(len(files) for _, _, files in os.walk(blobs.blobPath))
+    assert blobCount == 11 # 10 random files + the shared content
+    assert listLeftovers(str(tmp_path)) == []
@@ -0,0 +1,89 @@
+import os
+import json
+from store import ConfigCache, JsonStore
+
+#-------------------------------------------------------------------------------
+# The cache of parsed configs: a config is parsed once while it's unchanged on
+# disk, and parsed again as soon as it (or a file it depends on) changes, e.g.
+# because another session on the shared root wrote it.
+#-------------------------------------------------------------------------------
+
+def writeJson(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path, 'r') as f:
+            return json.load(f)
+
+def test_unchanged_file_is_parsed_once(tmp_path):
+    path = str(tmp_path / 'config.json')
+    writeJson(path, {'a': 1})
+    cache = ConfigCache()
+    loader = CountingLoader()
+
+    assert cache.get(path, loader) == {'a': 1}
+    assert cache.get(path, loader) == {'a': 1}
+    assert loader.calls == 1
+    assert cache.getStats()['hits'] == 1
+
+def test_changed_file_is_parsed_again(tmp_path):
+    path = str(tmp_path / 'config.json')
+    writeJson(path, {'a': 1})
+    cache = ConfigCache()
+    loader = CountingLoader()
+    cache.get(path, loader)
+
+    writeJson(path, {'a': 1, 'b': 2})
+
+    assert cache.get(path, loader) == {'a': 1, 'b': 2}
+    assert loader.calls == 2
+
+def test_changed_dependency_is_parsed_again(tmp_path):
+    path = str(tmp_path / 'config.json')
+    dep = str(tmp_path / 'config.journal')
+    writeJson(path, {'a': 1})
+    cache = ConfigCache()
+    loader = CountingLoader()
+    cache.get(path, loader, deps=(dep,))
+    assert cache.isFresh(path, (dep,))
+
+    with open(dep, 'w') as f: # the journal shows up
+        f.write('{}\n')
+
+    assert not cache.isFresh(path, (dep,))
+    cache.get(path, loader, deps=(dep,))
+    assert loader.calls == 2
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = ConfigCache(maxEntries=2)
+    loader = CountingLoader()
+    paths = [str(tmp_path / f'config_{i}.json') for i in range(3)]
+    for path in paths:
+        writeJson(path, {})
+
+    cache.get(paths[0], loader)
+    cache.get(paths[1], loader)
+    cache.get(paths[0], loader) # 1 is the least recently used now
+    cache.get(paths[2], loader)
+
+    assert cache.isFresh(paths[0])
+    assert not cache.isFresh(paths[1])
+    assert cache.getStats()['evictions'] == 1
+
+def test_store_sees_other_session_writes(tmp_path):
+    root = str(tmp_path)
+    parentConfigPath = os.path.join(root, 'PMT_ParentConfig.json')
+    ours = JsonStore(root, parentConfigPath)
+    theirs = JsonStore(root, parentConfigPath) # its own cache, like another PMT on the shared root
+
+    ours.saveProjects({'A': {'Asset Count': 0}})
+    assert theirs.loadProjects() == {'A': {'Asset Count': 0}}
+
+    theirs.saveProjects({'A': {'Asset Count': 0}, 'B': {'Asset Count': 0}})
+    assert set(ours.loadProjects()) == {'A', 'B'}
@@ -0,0 +1,72 @@
+import os
+import json
+import pytest
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Creating many assets in one go, from a list or a csv/ json manifest: the good
+# rows are created and counted, the bad ones are reported without touching the
+# disk, on every backend. Only Maya files, the Substance template isn't shipped
+# with the repo.
+#-------------------------------------------------------------------------------
+
+PROJECT = 'Props Project'
+
+@pytest.fixture(params=['json', 'journal', 'sharded', 'sqlite'])
+def pmt(request):
+    studio = SyntheticStudio(request.param)
+    assert studio.pmt.createProjectFolder(PROJECT)[0]
+    yield studio.pmt
+    studio.close()
+
+def test_batch_creates_and_counts_the_assets(pmt):
+    success, _, results = pmt.createAssets(PROJECT, [('Props', 'crate', True), ('char', 'hero', 'yes', ''), ('Environments', 'forest')])
+
+    assert success
+    assert [result['success'] for result in results] == [True, True, True]
+    assets = pmt.store.getAssets(PROJECT)
+    assert set(assets) == {'crate', 'hero', 'forest'}
+    assert assets['hero']['type'] == 'Characters'
+    assert assets['hero']['Maya'] != 'NA' and assets['hero']['Substance'] == 'NA'
+    assert assets['forest']['Maya'] == 'NA'
+    assert os.path.isdir(assets['forest']['path'])
+    assert pmt.projects[PROJECT]['Asset Count'] == 3
+    assert pmt.store.loadProjects()[PROJECT]['Asset Count'] == 3
+
+def test_bad_rows_are_reported_and_skipped(pmt):
+    assert pmt.createAsset(PROJECT, 'Props', 'crate')[0]
+
+    success, _, results = pmt.createAssets(PROJECT, [('Props', 'crate'), ('Vehicles', 'car'), ('Props', ''), ('Props', 'barrel'), ('Props', 'barrel')])
+
+    assert not success
+    assert [result['success'] for result in results] == [False, False, False, True, False]
+    assert set(pmt.store.getAssets(PROJECT)) == {'crate', 'barrel'}
+    assert not os.path.exists(os.path.join(pmt.basePath, PROJECT, 'Art Depot', 'Vehicles'))
+    assert pmt.store.loadProjects()[PROJECT]['Asset Count'] == 2
+
+@pytest.mark.parametrize('extension', ['csv', 'json'])
+def test_manifest(pmt, tmp_path, extension):
+    manifestPath = str(tmp_path / f'assets.{extension}')
+    if extension == 'csv':
+        with open(manifestPath, 'w') as f:
+            f.write('type, name, useMaya, useSubstance\nprop, crate, x,\nenv, forest, , no\n')
+    else:
+        with open(manifestPath, 'w') as f:
+            json.dump({'Assets': [{'type': 'prop', 'name': 'crate', 'useMaya': True}, {'type': 'env', 'name': 'forest', 'useSubstance': False}]}, f)
+
+    success, _, _ = pmt.createAssets(PROJECT, manifestPath)
+
+    assert success
+    assets = pmt.store.getAssets(PROJECT)
+    assert {assetName: assetDetails['type'] for assetName, assetDetails in assets.items()} == {'crate': 'Props', 'forest': 'Environments'}
+    assert assets['crate']['Maya'] != 'NA' and assets['forest']['Maya'] == 'NA'
+
+def test_broken_manifest(pmt, tmp_path):
+    manifestPath = str(tmp_path / 'assets.json')
+    with open(manifestPath, 'w') as f:
+        f.write('{not json')
+
+    success, msg, results = pmt.createAssets(PROJECT, manifestPath)
+
+    assert not success and results == []
+    assert 'manifest' in msg
@@ -0,0 +1,54 @@
+import os
+import pytest
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Maya exports through the fake workers (Files/io/fakeworker.py), which write
+# the FBX in place like maya does. An FBX deduplicated with another project's
+# copy has to get its own data before that, or the other copy changes too.
+#-------------------------------------------------------------------------------
+
+@pytest.fixture
+def pmt():
+    studio = SyntheticStudio('json')
+    pmt = studio.pmt
+    pmt.workersEnabled = True
+    pmt.fakeWorkers = True
+    for projName in ('A', 'B'):
+        assert pmt.createProjectFolder(projName)[0]
+    assert pmt.createAsset('A', 'Props', 'crate', useMaya=True)[0]
+    yield pmt
+    pmt.shutdownWorkers()
+    studio.close()
+
+def linkExports(pmt):
+    '''
+    Returns the FBX of A's crate and a copy of it in B, both linked to the same blob.
+    '''
+    assetDetails = pmt.store.getAsset('A', 'crate')
+    scenePath = os.path.join(assetDetails['path'], 'Maya', assetDetails['Maya']['filename'])
+    exportPath = pmt.getExportPath('A', 'Props', scenePath)
+    otherPath = pmt.getExportPath('B', 'Props', scenePath)
+    for path in (exportPath, otherPath):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(exportPath, 'wb') as f:
+        f.write(b'old export')
+    pmt.blobs.copyFile(exportPath, otherPath)
+    assert os.path.samefile(exportPath, otherPath)
+    return exportPath, otherPath
+
+def test_export_breaks_the_link_of_the_fbx(pmt):
+    exportPath, otherPath = linkExports(pmt)
+    assert pmt.exportAssetFromMaya(projName='A', assetName='crate', force=True)[0]
+    with open(exportPath, 'rb') as f:
+        assert f.read().startswith(b'FAKEFBX')
+    with open(otherPath, 'rb') as f:
+        assert f.read() == b'old export'
+
+def test_batch_export_breaks_the_link_of_the_fbx(pmt):
+    exportPath, otherPath = linkExports(pmt)
+    assert pmt.exportAssetsFromMaya('A', ['crate'], force=True)[0]
+    with open(exportPath, 'rb') as f:
+        assert f.read().startswith(b'FAKEFBX')
+    with open(otherPath, 'rb') as f:
+        assert f.read() == b'old export'
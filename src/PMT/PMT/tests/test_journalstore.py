@@ -0,0 +1,114 @@
+import os
+import json
+import multiprocessing
+from store import JournalStore
+
+#-------------------------------------------------------------------------------
+# The journal store on its own: replaying a journal over its snapshot, folding
+# it back in, surviving a crash in the middle of either, and several sessions
+# appending to the same journals at once, with a journal limit small enough
+# that they keep compacting over each other's records.
+#-------------------------------------------------------------------------------
+
+WORKERS = 4
+ASSETS = 40 # per worker
+PROJECT = 'Shared'
+JOURNAL_LIMIT = 2048
+
+def makeStore(root, journalLimit=JOURNAL_LIMIT):
+    return JournalStore(root, os.path.join(root, 'PMT_ParentConfig.json'), journalLimit=journalLimit)
+
+def makeProject(root, journalLimit=JOURNAL_LIMIT):
+    os.makedirs(os.path.join(root, PROJECT, 'Tools'))
+    store = makeStore(root, journalLimit)
+    store.initProject(PROJECT)
+    return store
+
+def readSnapshot(store):
+    with open(store.getProjConfigPath(PROJECT), 'r') as f:
+        return json.load(f)['Assets']
+
+def test_replay_applies_puts_and_deletes(tmp_path):
+    store = makeProject(str(tmp_path), journalLimit=1024 * 1024)
+    store.putAssets(PROJECT, {'crate': {'index': 0}, 'barrel': {'index': 1}})
+    store.putAsset(PROJECT, 'crate', {'index': 2})
+    store.removeAsset(PROJECT, 'barrel')
+
+    assert readSnapshot(store) == {} # nothing compacted yet
+    fresh = makeStore(str(tmp_path))
+    assert fresh.getAssets(PROJECT) == {'crate': {'index': 2}}
+    assert fresh.getAsset(PROJECT, 'barrel') is None
+
+def test_torn_record_is_skipped(tmp_path):
+    store = makeProject(str(tmp_path), journalLimit=1024 * 1024)
+    store.putAsset(PROJECT, 'crate', {'index': 0})
+    journalPath = store.getJournalPath(store.getProjConfigPath(PROJECT))
+    with open(journalPath, 'a') as f:
+        f.write('{"op": "put", "name": "bar') # the session died in the middle of an append
+
+    assert set(makeStore(str(tmp_path)).getAssets(PROJECT)) == {'crate'}
+
+    store.putAsset(PROJECT, 'barrel', {'index': 1}) # starts on its own line, not glued to the torn one
+    assert set(makeStore(str(tmp_path)).getAssets(PROJECT)) == {'crate', 'barrel'}
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    store = makeProject(str(tmp_path), journalLimit=512)
+    journalPath = store.getJournalPath(store.getProjConfigPath(PROJECT))
+    assets = {f'asset_{i}': {'index': i} for i in range(20)}
+    for assetName, assetDetails in assets.items():
+        store.putAsset(PROJECT, assetName, assetDetails)
+        assert not os.path.exists(journalPath) or os.path.getsize(journalPath) <= 512
+
+    snapshot = readSnapshot(store)
+    assert snapshot and set(snapshot) < set(assets) # compacted at least once, the latest ones still in the journal
+    assert makeStore(str(tmp_path)).getAssets(PROJECT) == assets
+
+def test_crash_between_snapshot_and_journal_removal(tmp_path):
+    store = makeProject(str(tmp_path), journalLimit=1024 * 1024)
+    store.putAsset(PROJECT, 'crate', {'index': 0})
+    store.removeAsset(PROJECT, 'crate')
+    store.putAsset(PROJECT, 'barrel', {'index': 1})
+    configPath = store.getProjConfigPath(PROJECT)
+    store.serializer.dump(configPath, {'Assets': store.getAssets(PROJECT)}) # the snapshot is in, the journal didn't get dropped
+
+    assert makeStore(str(tmp_path)).getAssets(PROJECT) == {'barrel': {'index': 1}} # replaying it again changes nothing
+
+def appendWorker(root, workerId, barrier, queue):
+    '''
+    One session: journals its own assets into the shared project and its own project into the parent config.
+    Puts (workerId, error) on the queue.
+    '''
+    error = None
+    try:
+        store = makeStore(root)
+        barrier.wait()
+        for i in range(ASSETS):
+            store.putAsset(PROJECT, f'w{workerId}_asset_{i}', {'type': 'Props', 'index': i})
+            if i % 10 == 0:
+                projName = f'W{workerId}_P{i}'
+                store.saveProjects({projName: {'path': projName}}, [projName])
+    except Exception as e:
+        error = repr(e)
+    finally:
+        queue.put((workerId, error))
+
+def test_concurrent_appends_survive_compaction(tmp_path):
+    root = str(tmp_path)
+    store = makeProject(root)
+    store.saveProjects({PROJECT: {'path': PROJECT}}, [PROJECT])
+
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(WORKERS)
+    queue = ctx.Queue()
+    processes = [ctx.Process(target=appendWorker, args=(root, workerId, barrier, queue)) for workerId in range(WORKERS)]
+    for process in processes:
+        process.start()
+    results = dict(queue.get(timeout=300) for _ in processes)
+    for process in processes:
+        process.join(timeout=60)
+
+    assert results == {workerId: None for workerId in range(WORKERS)}
+
+    fresh = makeStore(root)
+    assert set(fresh.getAssets(PROJECT)) == {f'w{workerId}_asset_{i}' for workerId in range(WORKERS) for i in range(ASSETS)}
+    assert set(fresh.loadProjects()) == {PROJECT} | {f'W{workerId}_P{i}' for workerId in range(WORKERS) for i in range(0, ASSETS, 10)}
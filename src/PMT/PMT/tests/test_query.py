@@ -0,0 +1,116 @@
+import pytest
+from bench import SyntheticStudio
+from query import AssetQuery
+
+#-------------------------------------------------------------------------------
+# Asset listings (query.py) have to come out the same from the file stores,
+# which run the query in python, and from the sqlite catalog, which runs it as
+# SQL, so a cursor means the same thing whichever store made it.
+#-------------------------------------------------------------------------------
+
+PROJECT = 'Props Project'
+NAMES = ['apple', 'Zebra', 'Ärger', 'Éclair', 'éclair_b', 'Ñandú', 'ñu', 'Ωmega', 'ωmega2', 'Straße']
+
+def listAll(store, query):
+    '''
+    Returns:
+    list: The names of every page of a query, in order.
+    '''
+    names = []
+    cursor = None
+    while True:
+        page = store.queryAssets(PROJECT, query, cursor)
+        names += [assetName for assetName, _ in page['assets']]
+        cursor = page['nextCursor']
+        if cursor is None:
+            return names
+
+@pytest.fixture
+def stores():
+    studios = {backend: SyntheticStudio(backend) for backend in ('json', 'sqlite')}
+    for studio in studios.values():
+        assert studio.pmt.createProjectFolder(PROJECT)[0]
+        studio.pmt.store.putAssets(PROJECT, {assetName: {'type': 'Props', 'path': '', 'creationDate': ''} for assetName in NAMES})
+    yield {backend: studio.pmt.store for backend, studio in studios.items()}
+    for studio in studios.values():
+        studio.close()
+
+@pytest.mark.parametrize('query', [
+    AssetQuery(),
+    AssetQuery(limit=3),
+    AssetQuery(descending=True, limit=4),
+    AssetQuery(namePrefix='É'),
+    AssetQuery(namePrefix='ñ'),
+    AssetQuery(nameContains='MEGA'),
+], ids=['all', 'pages', 'descending', 'prefix', 'prefixLower', 'contains'])
+def test_non_ascii_names_match_across_stores(stores, query):
+    expected = listAll(stores['json'], query)
+    assert expected # the filters do match something
+    assert listAll(stores['sqlite'], query) == expected
+
+def test_non_ascii_prefix_is_case_insensitive(stores):
+    assert listAll(stores['sqlite'], AssetQuery(namePrefix='é')) == ['Éclair', 'éclair_b']
+
+#-------------------------------------------------------------------------------
+# Keyset pagination over a bigger project, with ties on every sort field.
+#-------------------------------------------------------------------------------
+
+def makeAsset(i):
+    return {'type': ('Props', 'Characters', 'Environments', None)[i % 4], 'path': '', 'creationDate': f'2024-05-{1 + i % 5:02d} 10:00:00',
+            'Maya': {'filename': f'scene_{i % 6}.ma', 'version': '2024'} if i % 3 else 'NA', 'Substance': 'NA'}
+
+@pytest.fixture
+def paged():
+    studios = {backend: SyntheticStudio(backend) for backend in ('json', 'sqlite')}
+    for studio in studios.values():
+        assert studio.pmt.createProjectFolder(PROJECT)[0]
+        studio.pmt.store.putAssets(PROJECT, {f'{"Asset" if i % 2 else "asset"}_{i:03d}': makeAsset(i) for i in range(60)})
+    yield {backend: studio.pmt.store for backend, studio in studios.items()}
+    for studio in studios.values():
+        studio.close()
+
+@pytest.mark.parametrize('descending', [False, True])
+@pytest.mark.parametrize('sortBy', ['name', 'type', 'creationDate', 'file', 'status'])
+def test_pages_match_across_stores(paged, sortBy, descending):
+    query = AssetQuery(dcc='Maya', sortBy=sortBy, descending=descending, limit=7)
+    expected = listAll(paged['json'], query)
+
+    assert sorted(expected) == sorted(paged['json'].getAssets(PROJECT)) # every asset once
+    assert listAll(paged['sqlite'], query) == expected
+
+@pytest.mark.parametrize('query', [
+    AssetQuery(dcc='Maya', hasFile=True, limit=5),
+    AssetQuery(dcc='Maya', hasFile=False, sortBy='type', limit=5),
+    AssetQuery(types=['Props', 'Environments'], sortBy='creationDate', descending=True, limit=5),
+    AssetQuery(createdAfter='2024-05-02', createdBefore='2024-05-04', limit=5),
+    AssetQuery(namePrefix='asset_0', fields=['type'], limit=5),
+], ids=['hasFile', 'noFile', 'types', 'dates', 'prefix'])
+def test_filtered_pages_match_across_stores(paged, query):
+    first = {backend: store.queryAssets(PROJECT, query) for backend, store in paged.items()}
+    assert first['json'] == first['sqlite'] # same page, same cursor, same total
+    assert listAll(paged['sqlite'], query) == listAll(paged['json'], query)
+
+def test_cursor_works_on_the_other_store(paged):
+    query = AssetQuery(dcc='Maya', sortBy='file', limit=9)
+    cursor = paged['json'].queryAssets(PROJECT, query)['nextCursor']
+    assert paged['sqlite'].queryAssets(PROJECT, query, cursor) == paged['json'].queryAssets(PROJECT, query, cursor)
+
+def test_pages_dont_shift_when_assets_change(paged):
+    for store in paged.values():
+        query = AssetQuery(limit=10)
+        first = store.queryAssets(PROJECT, query)
+        seen = [assetName for assetName, _ in first['assets']]
+        store.putAsset(PROJECT, 'aaa_new', makeAsset(0)) # sorts before the cursor
+        store.removeAsset(PROJECT, seen[0])
+
+        second = store.queryAssets(PROJECT, query, first['nextCursor'])
+        rest = listAll(store, query.replace(limit=None))
+        assert [assetName for assetName, _ in second['assets']] == rest[rest.index(seen[-1]) + 1:][:10] # neither skipped nor repeated
+
+def test_cursor_of_another_order_is_rejected(paged):
+    cursor = paged['json'].queryAssets(PROJECT, AssetQuery(limit=5))['nextCursor']
+    for store in paged.values():
+        with pytest.raises(ValueError):
+            store.queryAssets(PROJECT, AssetQuery(sortBy='creationDate', limit=5), cursor)
+        with pytest.raises(ValueError):
+            store.queryAssets(PROJECT, AssetQuery(limit=5), 'not a cursor')
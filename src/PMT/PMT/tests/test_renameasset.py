@@ -0,0 +1,34 @@
+import pytest
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Renaming an asset, on every backend: the asset has to survive a rename onto
+# a name that's taken, its own one included.
+#-------------------------------------------------------------------------------
+
+PROJECT = 'Props Project'
+
+@pytest.fixture(params=['json', 'journal', 'sharded', 'sqlite'])
+def pmt(request):
+    studio = SyntheticStudio(request.param)
+    assert studio.pmt.createProjectFolder(PROJECT)[0]
+    assert studio.pmt.createAsset(PROJECT, 'Props', 'crate')[0]
+    yield studio.pmt
+    studio.close()
+
+def test_rename_to_the_same_name_keeps_the_asset(pmt):
+    success, _ = pmt.renameAsset(PROJECT, 'crate', 'crate')
+    assert not success
+    assert pmt.store.getAsset(PROJECT, 'crate') is not None
+
+def test_rename_onto_another_asset_is_rejected(pmt):
+    assert pmt.createAsset(PROJECT, 'Props', 'barrel')[0]
+    success, _ = pmt.renameAsset(PROJECT, 'crate', 'barrel')
+    assert not success
+    assert set(pmt.store.getAssets(PROJECT)) == {'crate', 'barrel'}
+
+def test_rename_moves_the_asset(pmt):
+    success, _ = pmt.renameAsset(PROJECT, 'crate', 'box')
+    assert success
+    assert set(pmt.store.getAssets(PROJECT)) == {'box'}
+    assert pmt.store.getAsset(PROJECT, 'box')['path'].endswith('box')
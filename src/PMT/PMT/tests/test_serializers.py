@@ -0,0 +1,87 @@
+import os
+import json
+import pytest
+from serializers import BinarySerializer, JsonSerializer, getSerializer, loadConfigFile
+from store import JournalStore
+
+#-------------------------------------------------------------------------------
+# The binary config format: whatever goes in comes back out, a single record
+# is read without the rest of the file, and a broken file is an error rather
+# than a half loaded config.
+#-------------------------------------------------------------------------------
+
+binary = BinarySerializer()
+
+def makeConfig(count):
+    return {'Assets': {f'asset_{i}' if i % 3 else f'Éclair_{i}': {
+                'type': 'Props', 'path': f'/studio/Props/asset_{i}', 'creationDate': '2024-05-01 10:00:00',
+                'Maya': {'filename': f'asset_{i}.ma', 'version': '2024'} if i % 2 else 'NA', 'Substance': 'NA'}
+            for i in range(count)},
+            'Version': 3}
+
+@pytest.mark.parametrize('count', [0, 1, BinarySerializer.BLOCK_SIZE, BinarySerializer.BLOCK_SIZE * 2 + 5])
+def test_round_trip(tmp_path, count):
+    path = str(tmp_path / 'config.pmtb')
+    data = makeConfig(count)
+
+    binary.dump(path, data)
+    loaded = binary.load(path)
+
+    assert loaded == data
+    assert list(loaded['Assets']) == list(data['Assets']) # the order of the assets stays too
+
+def test_round_trip_without_a_table(tmp_path):
+    path = str(tmp_path / 'config.pmtb')
+    binary.dump(path, {'Version': 3})
+    assert binary.load(path) == {'Version': 3}
+
+def test_load_record_matches_full_load(tmp_path):
+    path = str(tmp_path / 'config.pmtb')
+    data = makeConfig(BinarySerializer.BLOCK_SIZE * 2 + 5)
+    binary.dump(path, data)
+
+    for name in list(data['Assets'])[::37] + [list(data['Assets'])[-1]]: # across the blocks, the last one included
+        assert binary.loadRecord(path, name) == data['Assets'][name]
+    assert binary.loadRecord(path, 'no such asset') is None
+
+def test_same_records_as_json(tmp_path):
+    data = makeConfig(50)
+    jsonPath = str(tmp_path / 'config.json')
+    binaryPath = str(tmp_path / 'config.pmtb')
+    JsonSerializer().dump(jsonPath, data)
+    binary.dump(binaryPath, data)
+
+    assert loadConfigFile(str(tmp_path / 'config')) == loadConfigFile(binaryPath) == data
+    for name in data['Assets']:
+        assert JsonSerializer().loadRecord(jsonPath, name) == binary.loadRecord(binaryPath, name)
+
+@pytest.mark.parametrize('keep', [4, 20, -3])
+def test_truncated_file_is_an_error(tmp_path, keep):
+    path = str(tmp_path / 'config.pmtb')
+    binary.dump(path, makeConfig(10))
+    with open(path, 'rb') as f:
+        buffer = f.read()
+    with open(path, 'wb') as f:
+        f.write(buffer[:keep])
+
+    with pytest.raises(ValueError):
+        binary.load(path)
+    with pytest.raises(ValueError):
+        binary.loadRecord(path, 'asset_1')
+
+def test_single_asset_read_replays_the_journal(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, 'Proj', 'Tools'))
+    store = JournalStore(root, os.path.join(root, 'PMT_ParentConfig.json'), serializer=getSerializer('binary'))
+    store.initProject('Proj')
+    store.compact(store.getProjConfigPath('Proj'), makeConfig(10))
+    store.putAsset('Proj', 'asset_1', {'type': 'Characters'})
+    store.removeAsset('Proj', 'asset_2')
+
+    fresh = JournalStore(root, os.path.join(root, 'PMT_ParentConfig.json'), serializer=getSerializer('binary')) # cold cache, reads the record only
+    assert fresh.getAsset('Proj', 'asset_1') == {'type': 'Characters'}
+    assert fresh.getAsset('Proj', 'asset_2') is None
+    assert fresh.getAsset('Proj', 'asset_4') == makeConfig(10)['Assets']['asset_4']
+    assert fresh.cache.getStats()['entries'] == 0
+    with open(store.getJournalPath(store.getProjConfigPath('Proj')), 'r') as f:
+        assert [json.loads(line)['name'] for line in f] == ['asset_1', 'asset_2']
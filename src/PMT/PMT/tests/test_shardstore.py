@@ -0,0 +1,89 @@
+import multiprocessing
+import pytest
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Several PMT sessions, each in its own process, working on one studio root
+# through the sharded store at the same time, like artists on a shared drive.
+# Whatever they interleave, no project or asset one of them made may be lost.
+#-------------------------------------------------------------------------------
+
+WORKERS = 4
+PROJECTS = 4 # per worker
+ASSETS = 8 # per worker, in the shared project
+SHARED = 'Shared'
+COUNTER = 'counter'
+
+def sessionWorker(root, workerId, barrier, queue):
+    '''
+    One session: creates its own projects, its own assets in the shared project, and bumps
+    a counter every session shares, interleaved so the parent config and the shared project
+    index are written by everyone at once. Puts (workerId, errors) on the queue.
+    '''
+    errors = []
+    studio = None
+    try:
+        studio = SyntheticStudio('sharded', root)
+        pmt = studio.pmt
+        barrier.wait()
+        for i in range(max(PROJECTS, ASSETS)):
+            if i < PROJECTS:
+                success, msg = pmt.createProjectFolder(f'W{workerId}_P{i}')
+                if not success:
+                    errors.append(msg)
+            if i < ASSETS:
+                success, msg = pmt.createAsset(SHARED, 'Props', f'w{workerId}_asset_{i}')
+                if not success:
+                    errors.append(msg)
+            with pmt.store.lockAssets([(SHARED, COUNTER)]):
+                details = dict(pmt.store.getAsset(SHARED, COUNTER))
+                details['hits'] += 1
+                pmt.store.putAsset(SHARED, COUNTER, details)
+    except Exception as e:
+        errors.append(repr(e))
+    finally:
+        if studio is not None:
+            studio.close()
+        queue.put((workerId, errors))
+
+@pytest.fixture
+def studio():
+    studio = SyntheticStudio('sharded')
+    yield studio
+    studio.close()
+
+def test_concurrent_sessions_lose_nothing(studio):
+    pmt = studio.pmt
+    assert pmt.createProjectFolder(SHARED)[0]
+    pmt.store.putAsset(SHARED, COUNTER, {'type': 'Props', 'path': '', 'creationDate': '', 'hits': 0})
+
+    ctx = multiprocessing.get_context('spawn') # what windows does anyway, and no forked locks
+    barrier = ctx.Barrier(WORKERS)
+    queue = ctx.Queue()
+    processes = [ctx.Process(target=sessionWorker, args=(studio.root, workerId, barrier, queue)) for workerId in range(WORKERS)]
+    for process in processes:
+        process.start()
+    results = dict(queue.get(timeout=300) for _ in processes)
+    for process in processes:
+        process.join(timeout=60)
+
+    assert results == {workerId: [] for workerId in range(WORKERS)}
+
+    fresh = SyntheticStudio('sharded', studio.root) # a new session sees what's on disk, nothing cached
+    try:
+        projects = fresh.pmt.projects
+        expectedProjects = {f'W{workerId}_P{i}' for workerId in range(WORKERS) for i in range(PROJECTS)}
+        assert expectedProjects | {SHARED} <= set(projects)
+        for projName in expectedProjects:
+            assert fresh.pmt.store.getAssets(projName) == {}
+
+        assets = fresh.pmt.store.getAssets(SHARED)
+        expectedAssets = {f'w{workerId}_asset_{i}' for workerId in range(WORKERS) for i in range(ASSETS)}
+        assert set(assets) == expectedAssets | {COUNTER}
+        assert projects[SHARED]['Asset Count'] == len(expectedAssets) # the counter asset went in through the store, it isn't counted
+        assert assets[COUNTER]['hits'] == WORKERS * max(PROJECTS, ASSETS)
+
+        assert fresh.pmt.store.rebuildIndex(SHARED) == len(assets) # the index agrees with the shards
+        assert fresh.pmt.store.getAssets(SHARED) == assets
+    finally:
+        fresh.close()
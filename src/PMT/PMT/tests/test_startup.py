@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+from cli import STARTUP_BUDGET, HEAVY_MODULES
+
+#-------------------------------------------------------------------------------
+# The cold start of the backend, in a fresh interpreter every time so nothing is
+# imported already: importing the PMT and loading the projects has to stay within
+# the budget of the cli, and mustn't pull in Qt or the other heavy modules.
+#-------------------------------------------------------------------------------
+
+RUNS = 5
+PMT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = f'''
+import sys, json
+from pmt import PMT
+PMT().getProjects()
+print(json.dumps(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules)))
+'''
+
+def runProbe(env):
+    '''
+    Returns:
+    float: The seconds the fresh interpreter took.
+    list: The heavy modules it imported.
+    '''
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-c', PROBE], cwd=PMT_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    assert process.returncode == 0, process.stderr
+    return elapsed, json.loads(process.stdout.strip().splitlines()[-1])
+
+def test_cold_start_within_budget(tmp_path):
+    env = {**os.environ, 'LOCALAPPDATA': str(tmp_path)}
+    runProbe(env) # the first one creates the base folder, an existing studio doesn't pay for that
+
+    times = []
+    for _ in range(RUNS):
+        elapsed, heavy = runProbe(env)
+        assert heavy == []
+        times.append(elapsed)
+
+    median = statistics.median(times)
+    assert median <= STARTUP_BUDGET, f'Cold start took {median:.3f}s, over the {STARTUP_BUDGET}s budget ({", ".join(f"{t:.3f}" for t in times)}).'
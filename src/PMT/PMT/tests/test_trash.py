@@ -0,0 +1,78 @@
+import os
+import pytest
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Deleting into the trash and restoring from it, on every backend: the folders
+# and the config entries (assets, Asset Count, projects) come back as they were.
+#-------------------------------------------------------------------------------
+
+PROJECT = 'Props Project'
+
+@pytest.fixture(params=['json', 'journal', 'sharded', 'sqlite'])
+def studio(request):
+    studio = SyntheticStudio(request.param)
+    studio.pmt.trashEnabled = True # off in the shipped path config
+    assert studio.pmt.createProjectFolder(PROJECT)[0]
+    assert studio.pmt.createAsset(PROJECT, 'Props', 'crate', useMaya=True)[0]
+    yield studio
+    studio.close()
+
+def test_asset_delete_and_restore(studio):
+    pmt = studio.pmt
+    assetPath = pmt.store.getAsset(PROJECT, 'crate')['path']
+
+    success, msg = pmt.deleteAsset(PROJECT, 'crate', 'Maya')
+    assert success and 'restorable' in msg
+    assert pmt.store.getAsset(PROJECT, 'crate') is None
+    assert not os.path.exists(assetPath)
+    assert pmt.store.loadProjects()[PROJECT]['Asset Count'] == 0
+
+    items = pmt.listTrash()
+    assert [(item['kind'], item['project'], item['asset']) for item in items] == [('asset', PROJECT, 'crate')]
+
+    assert pmt.restoreFromTrash(items[0]['id'])[0]
+    assert pmt.store.getAsset(PROJECT, 'crate')['path'] == assetPath
+    assert os.path.isdir(os.path.join(assetPath, 'Maya'))
+    assert pmt.store.loadProjects()[PROJECT]['Asset Count'] == 1
+    assert pmt.listTrash() == []
+
+def test_restore_refuses_to_overwrite(studio):
+    pmt = studio.pmt
+    assert pmt.deleteAsset(PROJECT, 'crate', 'Maya')[0]
+    assert pmt.createAsset(PROJECT, 'Props', 'crate')[0] # a new asset with the same name meanwhile
+
+    itemId = pmt.listTrash()[0]['id']
+    assert not pmt.restoreFromTrash(itemId)[0]
+    assert [item['id'] for item in pmt.listTrash()] == [itemId] # still there to be restored later
+
+def test_project_delete_and_restore(studio):
+    pmt = studio.pmt
+    projPath = os.path.join(pmt.basePath, PROJECT)
+
+    assert pmt.deleteProject(PROJECT)[0]
+    assert PROJECT not in pmt.store.loadProjects()
+    assert not os.path.exists(projPath)
+
+    items = pmt.listTrash()
+    assert [(item['kind'], item['project']) for item in items] == [('project', PROJECT)]
+
+    assert pmt.restoreFromTrash(items[0]['id'])[0]
+    assert pmt.store.loadProjects()[PROJECT]['Asset Count'] == 1
+    assert set(pmt.store.getAssets(PROJECT)) == {'crate'}
+    assert os.path.isdir(pmt.store.getAsset(PROJECT, 'crate')['path'])
+
+def test_empty_trash(studio):
+    pmt = studio.pmt
+    assert pmt.deleteAsset(PROJECT, 'crate', 'Maya')[0]
+
+    assert pmt.emptyTrash()[0]
+    assert pmt.listTrash() == []
+
+def test_trash_off_deletes_for_good(studio):
+    pmt = studio.pmt
+    pmt.trashEnabled = False
+
+    success, msg = pmt.deleteAsset(PROJECT, 'crate', 'Maya')
+    assert success and 'restorable' not in msg
+    assert pmt.listTrash() == []
@@ -0,0 +1,90 @@
+import os
+import json
+import pytest
+import pmt as pmtModule
+from bench import SyntheticStudio
+
+#-------------------------------------------------------------------------------
+# Batch imports to Unreal: one editor launch per destination folder, the
+# per-file results read back from the manifest the editor writes, and only the
+# new/ changed FBX files pending the next time. The editor itself is faked.
+#-------------------------------------------------------------------------------
+
+PROJECT = 'Game Project'
+
+@pytest.fixture
+def pmt():
+    studio = SyntheticStudio('json')
+    pmt = studio.pmt
+    assert pmt.createProjectFolder(PROJECT)[0]
+    uprojectPath = os.path.join(pmt.basePath, PROJECT, 'Game Engine Depot', f'{PROJECT}.uproject')
+    os.makedirs(os.path.dirname(uprojectPath), exist_ok=True)
+    with open(uprojectPath, 'w') as f:
+        f.write('{}')
+    yield pmt
+    studio.close()
+
+def writeFbx(pmt, assetType, name, content=b'fbx'):
+    path = os.path.join(pmt.basePath, PROJECT, 'Intermediate Depot', assetType, f'{name}.fbx')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def fakeEditor(calls, fail=()):
+    '''
+    Returns a runProcess that plays the editor running batchImport: it reads the request and writes the manifest,
+    leaving out the files in fail as if the editor died before them.
+    '''
+    def runProcess(command, job=None):
+        requestPath = command.split("batchImport('")[1].split("')")[0]
+        with open(requestPath, 'r') as f:
+            request = json.load(f)
+        calls.append((request['destinationPath'], request['files']))
+        results = [{'file': filePath, 'success': True, 'assets': [f'{request["destinationPath"]}{os.path.basename(filePath)}'], 'error': None}
+                   for filePath in request['files'] if os.path.basename(filePath) not in fail]
+        with open(request['manifestPath'], 'w') as f:
+            json.dump({'results': results}, f)
+        return (0 if len(results) == len(request['files']) else 1), '', 'crashed'
+    return runProcess
+
+def test_one_launch_per_destination(pmt, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pmtModule, 'runProcess', fakeEditor(calls))
+    crate, barrel, hero = writeFbx(pmt, 'Props', 'crate'), writeFbx(pmt, 'Props', 'barrel'), writeFbx(pmt, 'Characters', 'hero')
+
+    success, _, results = pmt.importAssetsToUnreal(PROJECT, {crate: '/Game/Props/', barrel: '/Game/Props/', hero: '/Game/Characters/'})
+
+    assert success
+    assert sorted((destinationPath, sorted(files)) for destinationPath, files in calls) == [
+        ('/Game/Characters/', [hero.replace('\\', '/')]),
+        ('/Game/Props/', sorted(path.replace('\\', '/') for path in (crate, barrel)))]
+    assert all(result['success'] for result in results)
+    assert [name for name in os.listdir(os.path.join(pmt.basePath, PROJECT, 'Tools')) if name.startswith('PMT_BatchImport_')] == []
+
+def test_only_changed_files_are_pending(pmt, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pmtModule, 'runProcess', fakeEditor(calls))
+    crate, barrel = writeFbx(pmt, 'Props', 'crate'), writeFbx(pmt, 'Props', 'barrel')
+
+    assert pmt.getPendingImports(PROJECT) == sorted([crate, barrel])
+    assert pmt.importAssetsToUnreal(PROJECT)[0]
+    assert pmt.getPendingImports(PROJECT) == []
+    assert pmt.importAssetsToUnreal(PROJECT)[1] == 'Nothing to import, Unreal is up to date.'
+
+    writeFbx(pmt, 'Props', 'crate', b'fbx, exported again')
+    assert pmt.getPendingImports(PROJECT) == [crate]
+    assert len(calls) == 1
+
+def test_files_the_editor_never_got_to_stay_pending(pmt, monkeypatch):
+    calls = []
+    monkeypatch.setattr(pmtModule, 'runProcess', fakeEditor(calls, fail=('barrel.fbx',)))
+    crate, barrel = writeFbx(pmt, 'Props', 'crate'), writeFbx(pmt, 'Props', 'barrel')
+
+    success, _, results = pmt.importAssetsToUnreal(PROJECT)
+
+    assert not success
+    failed = [result for result in results if not result['success']]
+    assert [result['file'] for result in failed] == [barrel.replace('\\', '/')]
+    assert 'code 1' in failed[0]['error']
+    assert pmt.getPendingImports(PROJECT) == [barrel]
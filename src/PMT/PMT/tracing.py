@@ -0,0 +1,288 @@
+import os
+import sys
+import time
+import json
+import atexit
+import functools
+import threading
+from collections import deque
+
+#-------------------------------------------------------------------------------
+# This module records what the PMT spends its time on, as spans (name, start,
+# duration, plus a few args like bytes moved or exit codes) that are dumped as
+# a Chrome Trace Event file, open it in chrome://tracing or ui.perfetto.dev.
+# Disabled (the default) a span is a shared do-nothing object and a traced
+# method is one attribute check away from the real call, so it can stay in.
+# The spans still running when the file is written are dumped too, that's the
+# "PMT hung" case: whatever never finished is right there at the end.
+#-------------------------------------------------------------------------------
+
+class NullSpan:
+    '''
+    What span() hands out while tracing is off.
+    '''
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        return False
+
+    def __bool__(self):
+        return False # lets callers skip computing args nobody records
+
+    def set(self, **args):
+        pass
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    '''
+    A running span, recorded as a complete ("X") event once it ends.
+    '''
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+        self.tid = 0
+
+    def __enter__(self):
+        self.tid = threading.get_ident()
+        self.start = time.perf_counter_ns()
+        self.tracer.begin(self)
+        return self
+
+    def __exit__(self, excType, exc, tb):
+        if excType is not None:
+            self.args['error'] = f'{excType.__name__}: {exc}'
+        self.tracer.end(self, time.perf_counter_ns())
+        return False
+
+    def __bool__(self):
+        return True
+
+    def set(self, **args):
+        '''
+        Adds args to the span, e.g. span.set(bytes=1024, returncode=0).
+        '''
+        self.args.update(args)
+
+class Tracer:
+    '''
+    Collects the spans of the process in a bounded buffer and writes them out as a Chrome trace.
+    '''
+    MAX_FILES = 10 # older trace files in the output folder are deleted
+
+    def __init__(self):
+        self.enabled = False
+        self.outputDir = None
+        self.tracePath = None
+        self.events = deque(maxlen=200000) # oldest events drop off in a long session
+        self.active = set()
+        self.threadNames = {}
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        self.dumpLock = threading.Lock() # the periodic dump and the one at exit write the same file
+        self.dumpInterval = None
+        self.dumpedCount = 0
+        self.recordedCount = 0
+        self.stopEvent = threading.Event()
+        self.dumpThread = None
+        self.atexitRegistered = False
+
+    def enable(self, outputDir=None, maxEvents=None, dumpInterval=None):
+        '''
+        Starts recording, calling it again just updates the settings.
+
+        Args:
+        outputDir (str): The folder the trace file is written to, usually Tools/.
+        maxEvents (int): How many finished spans to keep, the oldest go first.
+        dumpInterval (float): Seconds between two writes of the trace file, None to only write it at exit.
+        '''
+        with self.lock:
+            if outputDir:
+                self.outputDir = outputDir
+            if maxEvents and maxEvents != self.events.maxlen:
+                self.events = deque(self.events, maxlen=maxEvents)
+            self.enabled = True
+
+        if not self.atexitRegistered:
+            atexit.register(self.dump)
+            self.atexitRegistered = True
+        if dumpInterval and self.dumpThread is None: # so a session that gets killed still leaves a trace behind
+            self.dumpInterval = dumpInterval
+            self.stopEvent.clear()
+            self.dumpThread = threading.Thread(target=self.runDumps, name='PMT-trace-dump', daemon=True)
+            self.dumpThread.start()
+
+    def disable(self):
+        '''
+        Stops recording, what was recorded so far is kept until the next dump.
+        '''
+        self.enabled = False
+        self.stopEvent.set()
+        self.dumpThread = None
+
+    def span(self, name, cat='pmt', **args):
+        '''
+        Args:
+        name (str): What is being done, e.g. "PMT.createAsset".
+        cat (str): The category, the trace viewer can filter on it.
+        args: Anything worth seeing next to the span, kept json friendly.
+
+        Returns:
+        Span: A context manager, NULL_SPAN while tracing is off.
+        '''
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, cat, args)
+
+    def instant(self, name, cat='pmt', **args):
+        '''
+        Records a single point in time, e.g. a process getting killed.
+        '''
+        if not self.enabled:
+            return
+        with self.lock:
+            self.events.append({'name': name, 'cat': cat, 'ph': 'i', 's': 't', 'ts': self.toMicros(time.perf_counter_ns()),
+                                'pid': self.pid, 'tid': threading.get_ident(), 'args': args})
+            self.recordedCount += 1
+
+    def begin(self, span):
+        with self.lock:
+            self.active.add(span)
+            self.threadNames.setdefault(span.tid, threading.current_thread().name)
+
+    def end(self, span, endNs):
+        with self.lock:
+            self.active.discard(span)
+            self.events.append({'name': span.name, 'cat': span.cat, 'ph': 'X', 'ts': self.toMicros(span.start),
+                                'dur': (endNs - span.start) / 1000, 'pid': self.pid, 'tid': span.tid, 'args': span.args})
+            self.recordedCount += 1
+
+    def toMicros(self, ns):
+        return (ns - self.origin) / 1000
+
+    def getEvents(self):
+        '''
+        Returns:
+        list: The trace events, the spans still running as begin ("B") events without an end.
+        '''
+        with self.lock:
+            events = list(self.events)
+            running = [{'name': span.name, 'cat': span.cat, 'ph': 'B', 'ts': self.toMicros(span.start), 'pid': self.pid,
+                        'tid': span.tid, 'args': {**span.args, 'running': True}} for span in self.active]
+            threadNames = dict(self.threadNames)
+        meta = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': f'PMT ({os.path.basename(sys.argv[0]) or "python"})'}}]
+        meta += [{'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid, 'args': {'name': name}} for tid, name in threadNames.items()]
+        return meta + events + sorted(running, key=lambda event: event['ts'])
+
+    def dump(self, path=None):
+        '''
+        Writes the trace file, the same file is rewritten for the whole session.
+
+        Args:
+        path (str): Where to write it, a timestamped file in the output folder by default.
+
+        Returns:
+        str: The path of the trace file, None if there was nothing to write.
+        '''
+        if not self.recordedCount and not self.active:
+            return None
+        if path is None:
+            if self.outputDir is None:
+                return None
+            if self.tracePath is None:
+                self.tracePath = os.path.join(self.outputDir, f'PMT_Trace_{time.strftime("%Y%m%d_%H%M%S")}_{self.pid}.json')
+                self.pruneFiles()
+            path = self.tracePath
+
+        with self.dumpLock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            recorded = self.recordedCount
+            events = self.getEvents()
+            tmpPath = f'{path}.tmp' # not atomicWriteJson, that one is traced and would show up in its own trace
+            with open(tmpPath, 'w') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+            os.replace(tmpPath, path)
+            self.dumpedCount = recorded
+        return path
+
+    def runDumps(self):
+        while not self.stopEvent.wait(self.dumpInterval):
+            if self.recordedCount != self.dumpedCount or self.active:
+                try:
+                    self.dump()
+                except OSError as e:
+                    print(f'Error writing the trace: {e}')
+
+    def pruneFiles(self):
+        '''
+        Keeps the newest trace files of the output folder, every session writes a new one.
+        '''
+        try:
+            files = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(self.outputDir)
+                           if entry.name.startswith('PMT_Trace_') and entry.name.endswith('.json'))
+        except OSError:
+            return
+        for _, path in files[:max(0, len(files) - self.MAX_FILES + 1)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+TRACER = Tracer() # one per process, every module records into it
+
+def span(name, cat='pmt', **args):
+    '''
+    Shortcut for TRACER.span, e.g. "with tracing.span('copyTree', 'fs') as s: ... s.set(bytes=n)".
+    '''
+    if not TRACER.enabled:
+        return NULL_SPAN
+    return Span(TRACER, name, cat, args)
+
+def traced(fn, name=None, cat='pmt'):
+    '''
+    Wraps a function so every call is a span. Calls that return the usual (bool, msg) tuple
+    get the bool and the message as args, a failed operation stands out in the viewer.
+
+    Args:
+    fn (function): The function.
+    name (str): The name of the span, the qualified name of the function by default.
+    cat (str): The category of the span.
+
+    Returns:
+    function: The wrapped function.
+    '''
+    name = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not TRACER.enabled:
+            return fn(*args, **kwargs)
+        with Span(TRACER, name, cat, {}) as s:
+            result = fn(*args, **kwargs)
+            if isinstance(result, tuple) and len(result) >= 2 and isinstance(result[0], bool):
+                s.set(ok=result[0], msg=str(result[1])[:200])
+            return result
+    return wrapper
+
+def traceMethods(cls, cat='pmt', skip=()):
+    '''
+    Wraps every public method of a class with traced.
+
+    Args:
+    cls (type): The class.
+    cat (str): The category of the spans.
+    skip (tuple): Methods to leave alone, e.g. the ones called per file/ folder.
+
+    Returns:
+    type: The class, so it works as a decorator too.
+    '''
+    for attrName, attr in list(vars(cls).items()):
+        if attrName.startswith('_') or attrName in skip or not callable(attr) or isinstance(attr, (staticmethod, classmethod, type)):
+            continue
+        setattr(cls, attrName, traced(attr, f'{cls.__name__}.{attrName}', cat))
+    return cls
@@ -0,0 +1,256 @@
+import os
+import time
+import uuid
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from serializers import atomicWriteJson
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module makes deleting instant. A deleted project/ asset folder is renamed
+# into <base>/.trash (same volume, so it's a single rename whatever its size),
+# next to a small json with what's needed to put it back. A background thread
+# frees the space of the items older than the retention window, a few at a time
+# so the disk isn't saturated. Until then the item can be restored.
+#
+#   .trash/<id>/meta.json   what it was (kind, project, asset, ...) and when it was deleted
+#   .trash/<id>/payload     the folder itself
+#-------------------------------------------------------------------------------
+
+class Trash:
+    '''
+    The trash of a PMT base path.
+    '''
+    STALE_AGE = 3600 # seconds before an item without a meta/ payload counts as a crash leftover and not one being put right now
+
+    def __init__(self, basePath, retention=7 * 24 * 3600, workers=2):
+        '''
+        Args:
+        basePath (str): The base path of the PMT, the trash is a hidden folder inside it.
+        retention (float): Seconds an item can still be restored, 0 frees it right away (in the background).
+        workers (int): How many items are deleted at the same time by the reclaimer.
+        '''
+        self.trashPath = os.path.join(basePath, '.trash')
+        self.retention = retention
+        self.workers = max(1, workers)
+        self.lock = threading.Lock()
+        self.wakeEvent = threading.Event()
+        self.stopEvent = threading.Event()
+        self.reclaimer = None
+
+    def put(self, path, meta):
+        '''
+        Moves a folder into the trash.
+
+        Args:
+        path (str): The folder to delete.
+        meta (dict): What the caller needs to restore it, json friendly.
+
+        Returns:
+        str: The id of the trash item.
+
+        Raises:
+        OSError: If the folder can't be renamed into the trash (e.g. EXDEV, it's on another volume).
+        '''
+        with tracing.span('trash', 'fs', path=path), self.lock:
+            itemId = f'{time.strftime("%Y%m%d%H%M%S")}_{uuid.uuid4().hex[:8]}'
+            itemPath = os.path.join(self.trashPath, itemId)
+            os.makedirs(itemPath)
+            meta = {**meta, 'id': itemId, 'originalPath': path, 'deletedAt': time.time()}
+            atomicWriteJson(os.path.join(itemPath, 'meta.json'), meta) # written first, a crash before the rename leaves an empty item the reclaimer drops
+            try:
+                os.rename(path, os.path.join(itemPath, 'payload'))
+            except OSError:
+                shutil.rmtree(itemPath, ignore_errors=True)
+                raise
+            if self.retention <= 0:
+                self.wakeEvent.set()
+            return itemId
+
+    def getItem(self, itemId):
+        '''
+        Returns:
+        dict: The meta of an item, None if there is no such item (anymore).
+        '''
+        try:
+            with open(os.path.join(self.trashPath, itemId, 'meta.json'), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def listItems(self):
+        '''
+        Returns:
+        list: The meta of every item, newest first, each with 'expiresAt' added.
+        '''
+        items = []
+        try:
+            names = os.listdir(self.trashPath)
+        except FileNotFoundError:
+            return []
+        for name in names:
+            if name.startswith('.'): # being reclaimed
+                continue
+            meta = self.getItem(name)
+            if meta is not None and os.path.exists(os.path.join(self.trashPath, name, 'payload')):
+                items.append({**meta, 'expiresAt': meta['deletedAt'] + self.retention})
+        return sorted(items, key=lambda item: item['deletedAt'], reverse=True)
+
+    def restore(self, itemId, targetPath=None):
+        '''
+        Moves an item back out of the trash.
+
+        Args:
+        itemId (str): The id of the item.
+        targetPath (str): Where to put it, where it was deleted from by default.
+
+        Returns:
+        dict: The meta of the item.
+
+        Raises:
+        FileNotFoundError: If the item is gone (restored, reclaimed).
+        FileExistsError: If something else is in its place by now.
+        '''
+        with self.lock: # not while the reclaimer claims it
+            meta = self.getItem(itemId)
+            payloadPath = os.path.join(self.trashPath, itemId, 'payload')
+            if meta is None or not os.path.exists(payloadPath):
+                raise FileNotFoundError(f'"{itemId}" is not in the trash.')
+            targetPath = targetPath or meta['originalPath']
+            if os.path.exists(targetPath):
+                raise FileExistsError(f'{targetPath} exists already.')
+            os.makedirs(os.path.dirname(targetPath), exist_ok=True)
+            os.rename(payloadPath, targetPath)
+            shutil.rmtree(os.path.join(self.trashPath, itemId), ignore_errors=True)
+            return meta
+
+    def claim(self, itemId):
+        '''
+        Takes an item out of the trash listing for deleting, so a restore can't race the delete.
+
+        Returns:
+        str: The path to delete, None if the item is gone already.
+        '''
+        with self.lock:
+            claimedPath = os.path.join(self.trashPath, f'.reclaiming_{itemId}')
+            try:
+                os.rename(os.path.join(self.trashPath, itemId), claimedPath)
+                return claimedPath
+            except OSError:
+                return None
+
+    def getExpired(self, everything=False):
+        '''
+        Returns:
+        list: The ids of the items past the retention window (or of all of them), plus the
+              leftovers of a crash: items without a meta/ payload and half reclaimed ones.
+        '''
+        try:
+            names = os.listdir(self.trashPath)
+        except FileNotFoundError:
+            return []
+        now = time.time()
+        expired = []
+        for name in names:
+            if name.startswith('.reclaiming_'):
+                expired.append(name) # interrupted last time
+                continue
+            itemPath = os.path.join(self.trashPath, name)
+            meta = self.getItem(name)
+            try:
+                age = now - (meta['deletedAt'] if meta else os.stat(itemPath).st_mtime)
+            except OSError:
+                continue
+            if meta is None or not os.path.exists(os.path.join(itemPath, 'payload')):
+                if age >= self.STALE_AGE:
+                    expired.append(name)
+            elif everything or age >= self.retention:
+                expired.append(name)
+        return expired
+
+    def reclaim(self, everything=False):
+        '''
+        Frees the space of the expired items, a few at a time.
+
+        Args:
+        everything (bool): Free every item, not just the expired ones (empty the trash).
+
+        Returns:
+        int: The number of items freed.
+        '''
+        expired = self.getExpired(everything)
+        if not expired:
+            return 0
+
+        def free(name):
+            path = os.path.join(self.trashPath, name) if name.startswith('.') else self.claim(name)
+            if path is None:
+                return 0
+            with tracing.span('reclaim', 'fs', item=name) as s:
+                size = getTreeSize(path) if s else 0
+                shutil.rmtree(path, ignore_errors=True)
+                s.set(bytes=size)
+            return 1
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool: # bounded, an artist is still working on the same disk
+            return sum(pool.map(free, expired))
+
+    def startReclaimer(self, interval=3600):
+        '''
+        Starts the background thread that reclaims the expired items, right away and then every interval seconds.
+
+        Args:
+        interval (float): Seconds between two passes.
+        '''
+        if self.reclaimer is not None:
+            return
+        self.stopEvent.clear()
+
+        def run():
+            while not self.stopEvent.is_set():
+                try:
+                    self.reclaim()
+                except OSError as e:
+                    print(f'Error reclaiming the trash: {e}')
+                self.wakeEvent.wait(interval)
+                self.wakeEvent.clear()
+
+        self.reclaimer = threading.Thread(target=run, name='PMT-trash-reclaimer', daemon=True)
+        self.reclaimer.start()
+
+    def wake(self):
+        '''
+        Makes the reclaimer do a pass now.
+        '''
+        self.wakeEvent.set()
+
+    def stopReclaimer(self):
+        '''
+        Stops the reclaimer, an item it's deleting is finished next time.
+        '''
+        if self.reclaimer is None:
+            return
+        self.stopEvent.set()
+        self.wakeEvent.set()
+        self.reclaimer = None
+
+def getTreeSize(path):
+    '''
+    Returns:
+    int: The size of the files in a folder tree, in bytes.
+    '''
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
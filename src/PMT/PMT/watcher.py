@@ -0,0 +1,370 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import threading
+
+#-------------------------------------------------------------------------------
+# This module watches the PMT folders for changes made outside of the PMT
+# (files saved/ renamed/ deleted in Explorer or from inside a DCC).
+# On linux it listens to inotify through ctypes, everywhere else (or if inotify
+# runs out of watches) it polls the folder mtimes. Either way the changed paths
+# are coalesced over a debounce window and handed over in one batch, so an
+# artist dragging a folder of 200 files causes one sync instead of 200.
+# It doesn't know anything about projects or assets, the PMT maps the paths.
+#-------------------------------------------------------------------------------
+
+class InotifyBackend:
+    '''
+    Watches a folder tree with inotify, one watch per folder (inotify isn't recursive).
+    '''
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct('iIII') # wd, mask, cookie, len, followed by the name
+
+    name = 'inotify'
+
+    def __init__(self, root, report, shouldWatch):
+        '''
+        Args:
+        root (str): The folder to watch.
+        report (function): Called with the list of changed paths.
+        shouldWatch (function): Called with a folder path, False to leave that folder (and everything in it) alone.
+
+        Raises:
+        OSError: If inotify isn't available or the tree needs more watches than the system allows.
+        '''
+        import ctypes
+        import ctypes.util
+
+        self.root = root
+        self.report = report
+        self.shouldWatch = shouldWatch
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.ctypes = ctypes
+
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.watches = {} # wd -> folder path
+        self.paths = {} # folder path -> wd
+        self.addTree(root)
+
+    def addWatch(self, path):
+        '''
+        Watches a single folder.
+
+        Returns:
+        bool: False if the folder is gone already.
+        '''
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = self.ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return False
+            raise OSError(err, f'inotify_add_watch failed for {path}: {os.strerror(err)}') # ENOSPC is the watch limit, the watcher falls back to polling
+        self.watches[wd] = path
+        self.paths[path] = wd
+        return True
+
+    def addTree(self, path):
+        '''
+        Watches a folder and every folder below it.
+
+        Returns:
+        list: Every path found below the folder, the ones that showed up before their folder was watched are only known this way.
+        '''
+        found = []
+        stack = [path]
+        while stack:
+            folder = stack.pop()
+            if not self.shouldWatch(folder) or not self.addWatch(folder):
+                continue
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        found.append(entry.path)
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+            except OSError:
+                pass
+        return found
+
+    def removeTree(self, path):
+        '''
+        Stops watching a folder and every folder below it, e.g. when it was moved away.
+        '''
+        prefix = path + os.sep
+        for folder in [folder for folder in self.paths if folder == path or folder.startswith(prefix)]:
+            wd = self.paths.pop(folder)
+            self.watches.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def run(self, stopEvent):
+        '''
+        Reads the inotify events until the stop event is set.
+        '''
+        while not stopEvent.is_set():
+            ready, _, _ = select.select([self.fd], [], [], 0.5) # short timeout so a stop is noticed
+            if not ready:
+                continue
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            changed = []
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(buffer):
+                wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self.EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & self.IN_Q_OVERFLOW: # missed events, whoever listens has to look at everything
+                    changed.append(self.root)
+                    continue
+                if mask & self.IN_IGNORED:
+                    folder = self.watches.pop(wd, None)
+                    if folder is not None and self.paths.get(folder) == wd:
+                        del self.paths[folder]
+                    continue
+
+                folder = self.watches.get(wd)
+                if folder is None:
+                    continue
+                path = os.path.join(folder, os.fsdecode(name)) if name else folder
+                changed.append(path)
+
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        changed.extend(self.addTree(path))
+                    elif mask & self.IN_MOVED_FROM:
+                        self.removeTree(path) # the watches would keep following the folder under its old path
+
+            if changed:
+                self.report(changed)
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class PollingBackend:
+    '''
+    Watches a folder tree by comparing the entries of every folder whose mtime changed.
+    Costs a stat per folder per pass, so the interval is a few seconds.
+    '''
+    name = 'polling'
+
+    def __init__(self, root, report, shouldWatch, interval=5.0):
+        '''
+        Args:
+        root (str): The folder to watch.
+        report (function): Called with the list of changed paths.
+        shouldWatch (function): Called with a folder path, False to leave that folder (and everything in it) alone.
+        interval (float): Seconds between two passes.
+        '''
+        self.root = root
+        self.report = report
+        self.shouldWatch = shouldWatch
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self, previous=None):
+        '''
+        Walks the tree, only listing the folders whose mtime changed since the previous pass.
+
+        Args:
+        previous (dict): The snapshot of the previous pass.
+
+        Returns:
+        dict: folder path -> (mtime, {entry name: (is folder, mtime, size)}).
+        '''
+        previous = previous or {}
+        snapshot = {}
+        stack = [self.root]
+        while stack:
+            folder = stack.pop()
+            if not self.shouldWatch(folder):
+                continue
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+
+            old = previous.get(folder)
+            if old is not None and old[0] == mtime:
+                entries = old[1] # unchanged folder, no need to list it again
+            else:
+                entries = {}
+                try:
+                    with os.scandir(folder) as it:
+                        for entry in it:
+                            try:
+                                stat = entry.stat(follow_symlinks=False)
+                                entries[entry.name] = (entry.is_dir(follow_symlinks=False), stat.st_mtime_ns, stat.st_size)
+                            except OSError:
+                                pass
+                except OSError:
+                    continue
+
+            snapshot[folder] = (mtime, entries)
+            stack.extend(os.path.join(folder, name) for name, (isDir, _, _) in entries.items() if isDir)
+        return snapshot
+
+    def diff(self, old, new):
+        '''
+        Returns:
+        list: The paths that were added, removed or changed between two snapshots.
+        '''
+        changed = []
+        for folder, (mtime, entries) in new.items():
+            oldEntries = old.get(folder, (None, {}))[1]
+            if entries is oldEntries:
+                continue
+            for name in set(entries) | set(oldEntries):
+                if entries.get(name) != oldEntries.get(name):
+                    changed.append(os.path.join(folder, name))
+        return changed
+
+    def run(self, stopEvent):
+        '''
+        Polls the tree until the stop event is set.
+        '''
+        while not stopEvent.wait(self.interval):
+            snapshot = self.scan(self.snapshot)
+            changed = self.diff(self.snapshot, snapshot)
+            self.snapshot = snapshot
+            if changed:
+                self.report(changed)
+
+    def close(self):
+        pass
+
+class Watcher:
+    '''
+    Watches a folder tree and hands the changed paths to a callback in debounced batches.
+    The callback runs on the watcher's own thread, never on the caller's.
+    '''
+    def __init__(self, root, callback, debounce=1.0, pollInterval=5.0, backend='auto', shouldWatch=None):
+        '''
+        Args:
+        root (str): The folder to watch.
+        callback (function): Called with the sorted list of changed paths once things calm down.
+        debounce (float): Seconds without new changes before a batch is handed over.
+        pollInterval (float): Seconds between two passes of the polling backend.
+        backend (str): 'auto' (inotify if possible), 'inotify' or 'polling'.
+        shouldWatch (function): Called with a folder path, False to leave that folder (and everything in it) alone.
+        '''
+        self.root = os.path.abspath(root)
+        self.callback = callback
+        self.debounce = debounce
+        self.maxDelay = max(debounce * 5, 5.0) # a folder that never calms down still gets synced now and then
+        self.pollInterval = pollInterval
+        self.requestedBackend = backend
+        self.shouldWatch = shouldWatch or (lambda path: True)
+        self.backend = None
+        self.pending = set()
+        self.firstChange = None
+        self.lastChange = None
+        self.condition = threading.Condition()
+        self.stopEvent = threading.Event()
+        self.threads = []
+
+    def createBackend(self):
+        '''
+        Picks inotify on linux and falls back to polling if it can't be used.
+        '''
+        if self.requestedBackend in ('auto', 'inotify') and sys.platform.startswith('linux'):
+            try:
+                return InotifyBackend(self.root, self.queue, self.shouldWatch)
+            except (OSError, AttributeError) as e: # no libc inotify, or out of watches
+                if self.requestedBackend == 'inotify':
+                    raise
+                print(f'inotify not usable ({e}), polling {self.root} instead')
+        return PollingBackend(self.root, self.queue, self.shouldWatch, self.pollInterval)
+
+    def start(self):
+        '''
+        Starts watching, the tree is walked once right here to set up the watches/ the first snapshot.
+
+        Returns:
+        str: The name of the backend in use.
+        '''
+        if self.backend is not None:
+            return self.backend.name
+        self.stopEvent.clear()
+        self.backend = self.createBackend()
+        self.threads = [threading.Thread(target=self.backend.run, args=(self.stopEvent,), name='PMT-watcher', daemon=True),
+                        threading.Thread(target=self.dispatch, name='PMT-watcher-dispatch', daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        return self.backend.name
+
+    def stop(self):
+        '''
+        Stops watching, changes that are still waiting for the debounce are dropped.
+        '''
+        if self.backend is None:
+            return
+        self.stopEvent.set()
+        with self.condition:
+            self.condition.notify_all()
+        for thread in self.threads:
+            thread.join(timeout=2)
+        self.backend.close()
+        self.backend = None
+        self.threads = []
+
+    def queue(self, paths):
+        '''
+        Adds changed paths to the pending batch, called by the backends.
+        '''
+        now = time.monotonic()
+        with self.condition:
+            if not self.pending:
+                self.firstChange = now
+            self.pending.update(paths)
+            self.lastChange = now
+            self.condition.notify()
+
+    def dispatch(self):
+        '''
+        Hands the pending batch to the callback once no new change came in for the debounce window.
+        '''
+        while not self.stopEvent.is_set():
+            with self.condition:
+                if not self.pending:
+                    self.condition.wait()
+                    continue
+                now = time.monotonic()
+                due = min(self.lastChange + self.debounce, self.firstChange + self.maxDelay)
+                if now < due:
+                    self.condition.wait(due - now)
+                    continue
+                batch = sorted(self.pending)
+                self.pending = set()
+
+            try:
+                self.callback(batch)
+            except Exception as e: # a bad batch shouldn't kill the watcher
+                print(f'Error syncing {len(batch)} changed paths: {e}')
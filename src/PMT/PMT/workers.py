@@ -0,0 +1,429 @@
+import os
+import json
+import time
+import itertools
+import threading
+import subprocess
+from collections import deque
+from jobs import JobCancelled, killProcess
+import tracing
+
+#-------------------------------------------------------------------------------
+# This module keeps headless Maya/ Unreal processes warm between requests,
+# so an export doesn't pay for the DCC startup every time.
+# The PMT talks to them over their stdin/stdout with one json message per
+# line (the worker side is Files/io/worker.py). Idle workers are pinged,
+# and crashed, hung or bloated ones are replaced.
+#-------------------------------------------------------------------------------
+
+class WorkerCrashed(Exception):
+    '''
+    Raised when a worker dies, hangs or can't be started.
+    '''
+    pass
+
+class WorkerProcess:
+    '''
+    A single DCC process answering requests one after the other.
+    '''
+    def __init__(self, name, command, env=None, startupTimeout=300):
+        '''
+        Initializes the worker (it's not started yet).
+
+        Args:
+        name (str): What the worker is called in messages.
+        command (list): The command line of the worker.
+        env (dict): Extra environment variables for the worker.
+        startupTimeout (float): How long the DCC may take to come up.
+        '''
+        self.name = name
+        self.command = command
+        self.env = env or {}
+        self.startupTimeout = startupTimeout
+        self.process = None
+        self.pid = None
+        self.rss = 0
+        self.requests = 0
+        self.startedAt = None
+        self.lastSeen = None
+        self.busy = False
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.ready = threading.Event()
+        self.writeLock = threading.Lock()
+        self.lock = threading.Lock()
+        self.stderrTail = deque(maxlen=50) # the last lines the DCC printed, for the crash message
+
+    def start(self):
+        '''
+        Launches the worker and waits for it to say it's ready.
+        '''
+        with tracing.span('startWorker', 'process', worker=self.name, command=str(self.command)[:300]) as s:
+            env = dict(os.environ, **self.env)
+            kwargs = {'start_new_session': True} if os.name != 'nt' else {}
+            self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            text=True, bufsize=1, env=env, **kwargs)
+            self.startedAt = time.time()
+            s.set(pid=self.process.pid)
+
+            threading.Thread(target=self.readResponses, daemon=True, name=f'PMTWorker-{self.name}-out').start()
+            threading.Thread(target=self.readErrors, daemon=True, name=f'PMTWorker-{self.name}-err').start()
+
+            if not self.ready.wait(self.startupTimeout) or not self.isAlive():
+                self.kill()
+                raise WorkerCrashed(f'{self.name} worker failed to start. {self.getErrors()}')
+
+    def readResponses(self):
+        '''
+        Reads the responses of the worker and hands them to whoever is waiting on them.
+        When the pipe closes the worker is gone, and everything still waiting fails.
+        '''
+        for line in self.process.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue # stray output, the worker side should have kept it off this pipe
+
+            self.lastSeen = time.time()
+            self.rss = message.get('rss', self.rss)
+
+            if message.get('event') == 'ready':
+                self.pid = message.get('pid')
+                self.ready.set()
+                continue
+
+            with self.lock:
+                waiter = self.pending.pop(message.get('id'), None)
+            if waiter is not None:
+                waiter['response'] = message
+                waiter['event'].set()
+
+        self.ready.set() # so start() doesn't wait for a worker that already died
+        with self.lock:
+            waiters, self.pending = list(self.pending.values()), {}
+        for waiter in waiters:
+            waiter['event'].set() # no response means crashed
+
+    def readErrors(self):
+        '''
+        Keeps draining stderr (everything the DCC prints ends up there), a full pipe would block the worker.
+        '''
+        for line in self.process.stderr:
+            self.stderrTail.append(line.rstrip())
+
+    def getErrors(self):
+        '''
+        Returns:
+        str: The last lines the worker printed.
+        '''
+        return '\n'.join(self.stderrTail)
+
+    def isAlive(self):
+        '''
+        Returns:
+        bool: True if the process is still running.
+        '''
+        return self.process is not None and self.process.poll() is None
+
+    def call(self, op, args=None, timeout=None, job=None, pollInterval=0.25):
+        '''
+        Sends a request and waits for its response.
+
+        Args:
+        op (str): The operation to run in the worker.
+        args (dict): The keyword arguments of the operation.
+        timeout (float): How long to wait before the worker counts as hung, None to wait forever.
+        job (Job): The background job this runs for, if any. Cancelling it kills the worker, a DCC can't be interrupted mid-export.
+        pollInterval (float): How often to check for cancellation.
+
+        Returns:
+        dict: The response, {'id', 'ok', 'result'/ 'error', 'rss'}.
+        '''
+        with tracing.span(f'worker: {op}', 'process', worker=self.name, pid=self.process.pid if self.process else None) as s:
+            response = self.waitForResponse(op, args, timeout, job, pollInterval)
+            s.set(ok=response.get('ok'))
+            return response
+
+    def waitForResponse(self, op, args, timeout, job, pollInterval):
+        '''
+        The body of call, see there.
+        '''
+        requestId = next(self.ids)
+        waiter = {'event': threading.Event(), 'response': None}
+        with self.lock:
+            self.pending[requestId] = waiter
+
+        try:
+            with self.writeLock:
+                self.process.stdin.write(json.dumps({'id': requestId, 'op': op, 'args': args or {}}) + '\n')
+                self.process.stdin.flush()
+        except (OSError, ValueError):
+            with self.lock:
+                self.pending.pop(requestId, None)
+            raise WorkerCrashed(f'{self.name} worker is gone. {self.getErrors()}')
+
+        deadline = time.time() + timeout if timeout else None
+        while not waiter['event'].wait(pollInterval):
+            if job is not None and job.isCancelled():
+                self.kill()
+                raise JobCancelled()
+            if deadline and time.time() > deadline:
+                self.kill()
+                raise WorkerCrashed(f'{self.name} worker didn\'t answer "{op}" within {timeout} seconds.')
+
+        if waiter['response'] is None:
+            raise WorkerCrashed(f'{self.name} worker crashed during "{op}". {self.getErrors()}')
+        if op != 'ping':
+            self.requests += 1
+        return waiter['response']
+
+    def ping(self, timeout=10):
+        '''
+        The heartbeat, also refreshes the memory use of the worker.
+
+        Returns:
+        bool: True if the worker answered in time.
+        '''
+        try:
+            return self.call('ping', timeout=timeout)['ok']
+        except WorkerCrashed:
+            return False
+
+    def stop(self, timeout=10):
+        '''
+        Asks the worker to quit, and kills it if it doesn't.
+        '''
+        if self.isAlive():
+            try:
+                self.call('shutdown', timeout=timeout)
+                self.process.wait(timeout)
+            except (WorkerCrashed, subprocess.TimeoutExpired):
+                pass
+        self.kill()
+
+    def kill(self):
+        '''
+        Kills the worker along with anything it launched.
+        '''
+        if self.process is not None:
+            killProcess(self.process)
+            try:
+                self.process.wait(5)
+            except subprocess.TimeoutExpired:
+                pass
+            tracing.TRACER.instant('workerExit', 'process', worker=self.name, pid=self.process.pid, returncode=self.process.returncode)
+
+    def getStats(self):
+        '''
+        Returns:
+        dict: The pid, memory use, number of requests served and uptime of the worker.
+        '''
+        return {'pid': self.pid, 'alive': self.isAlive(), 'busy': self.busy, 'rss': self.rss,
+                'requests': self.requests, 'uptime': round(time.time() - self.startedAt, 1) if self.startedAt else 0}
+
+class WorkerPool:
+    '''
+    A few warm workers of the same kind. Requests go to whichever worker is idle,
+    workers are started on demand and replaced when they crash, hang or use too much memory.
+    '''
+    def __init__(self, name, command, size=1, memoryLimit=4096 * 1024 * 1024, heartbeatInterval=10, requestTimeout=None,
+                 maxRequests=0, env=None):
+        '''
+        Initializes the pool (no worker is started until it's needed).
+
+        Args:
+        name (str): What the workers are called in messages.
+        command (list): The command line of a worker.
+        size (int): The most workers running at the same time.
+        memoryLimit (int): Bytes of memory after which a worker is recycled, 0 for no limit.
+        heartbeatInterval (float): Seconds between pings of the idle workers, 0 for no heartbeat.
+        requestTimeout (float): How long a single request may take, None for no limit.
+        maxRequests (int): Requests after which a worker is recycled anyway, 0 for no limit.
+        env (dict): Extra environment variables for the workers.
+        '''
+        self.name = name
+        self.command = command
+        self.size = max(1, size)
+        self.memoryLimit = memoryLimit
+        self.heartbeatInterval = heartbeatInterval
+        self.requestTimeout = requestTimeout
+        self.maxRequests = maxRequests
+        self.env = env
+        self.workers = []
+        self.restarts = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.stopEvent = threading.Event()
+        self.heartbeat = None
+
+    def acquire(self):
+        '''
+        Takes an idle worker, starting a new one if the pool isn't full yet, or waits for one to free up.
+
+        Returns:
+        WorkerProcess: The worker, marked busy.
+        '''
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise WorkerCrashed(f'{self.name} worker pool is shut down.')
+                for worker in [worker for worker in self.workers if not worker.busy and not worker.isAlive()]:
+                    self.workers.remove(worker) # died while idle, make room for a fresh one
+                    self.restarts += 1
+                for worker in self.workers:
+                    if not worker.busy:
+                        worker.busy = True
+                        return worker
+                if len(self.workers) < self.size:
+                    worker = WorkerProcess(self.name, self.command, self.env)
+                    worker.busy = True
+                    self.workers.append(worker)
+                    break
+                self.condition.wait()
+
+        try:
+            worker.start() # outside the lock, a DCC takes a while to come up
+        except BaseException:
+            self.discard(worker)
+            raise
+
+        self.startHeartbeat()
+        return worker
+
+    def release(self, worker):
+        '''
+        Gives a worker back to the pool, or throws it away if it shouldn't serve anymore.
+
+        Args:
+        worker (WorkerProcess): The worker.
+        '''
+        if self.shouldRecycle(worker):
+            worker.stop()
+            self.discard(worker)
+            return
+
+        with self.condition:
+            worker.busy = False
+            self.condition.notify()
+
+    def discard(self, worker):
+        '''
+        Kills a worker and removes it from the pool, its slot gets a fresh worker on the next request.
+
+        Args:
+        worker (WorkerProcess): The worker.
+        '''
+        worker.kill()
+        with self.condition:
+            if worker in self.workers:
+                self.workers.remove(worker)
+                if worker.startedAt is not None:
+                    self.restarts += 1
+            self.condition.notify()
+
+    def shouldRecycle(self, worker):
+        '''
+        Args:
+        worker (WorkerProcess): The worker.
+
+        Returns:
+        bool: True if the worker is dead, over the memory limit or has served enough requests.
+        '''
+        if not worker.isAlive():
+            return True
+        if self.memoryLimit and worker.rss > self.memoryLimit:
+            return True
+        return bool(self.maxRequests) and worker.requests >= self.maxRequests
+
+    def call(self, op, args=None, job=None, retries=1):
+        '''
+        Runs a request on one of the workers.
+        If the worker crashes, the request is tried again on a fresh worker (exports and imports just overwrite their output).
+
+        Args:
+        op (str): The operation to run.
+        args (dict): The keyword arguments of the operation.
+        job (Job): The background job this runs for, if any.
+        retries (int): How many times to retry after a crash.
+
+        Returns:
+        bool: True if the worker ran the request successfully, False otherwise.
+        dict or str: The result of the request, or the error message.
+        '''
+        for attempt in range(retries + 1):
+            worker = self.acquire()
+            try:
+                response = worker.call(op, args, timeout=self.requestTimeout, job=job)
+            except WorkerCrashed as e:
+                self.discard(worker)
+                if attempt == retries:
+                    return False, str(e)
+                continue
+            except BaseException:
+                self.discard(worker) # e.g. cancelled, the worker was killed mid-request
+                raise
+            self.release(worker)
+            return response['ok'], response.get('result') if response['ok'] else response.get('error')
+
+    def warmUp(self):
+        '''
+        Starts all the workers now instead of on the first requests (e.g. while the user is still browsing).
+        '''
+        workers = []
+        try:
+            while len(workers) < self.size:
+                workers.append(self.acquire())
+        finally:
+            for worker in workers:
+                self.release(worker)
+
+    def startHeartbeat(self):
+        '''
+        Starts the heartbeat thread once the first worker is up.
+        '''
+        with self.condition:
+            if self.heartbeat is not None or not self.heartbeatInterval:
+                return
+            self.heartbeat = threading.Thread(target=self.runHeartbeat, daemon=True, name=f'PMTWorker-{self.name}-heartbeat')
+        self.heartbeat.start()
+
+    def runHeartbeat(self):
+        '''
+        Pings the idle workers every so often and replaces the ones that don't answer or grew too big.
+        Busy workers are left alone, their request times out on its own.
+        '''
+        while not self.stopEvent.wait(self.heartbeatInterval):
+            with self.condition:
+                idle = [worker for worker in self.workers if not worker.busy]
+                for worker in idle:
+                    worker.busy = True
+
+            for worker in idle:
+                if not worker.ping(timeout=max(5, self.heartbeatInterval)):
+                    self.discard(worker)
+                else:
+                    self.release(worker)
+
+    def getStats(self):
+        '''
+        Returns:
+        dict: The number of restarts and the stats of every worker.
+        '''
+        with self.condition:
+            return {'name': self.name, 'size': self.size, 'restarts': self.restarts,
+                    'workers': [worker.getStats() for worker in self.workers]}
+
+    def shutdown(self):
+        '''
+        Stops every worker, e.g. when the app closes.
+        '''
+        self.stopEvent.set()
+        with self.condition:
+            self.closed = True
+            workers, self.workers = list(self.workers), []
+            self.condition.notify_all()
+        for worker in workers:
+            if worker.busy:
+                worker.kill()
+            else:
+                worker.stop()